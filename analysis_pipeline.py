@@ -0,0 +1,482 @@
+import os
+import hashlib
+import logging
+from collections import namedtuple
+from contextlib import nullcontext
+
+import pandas as pd
+
+from engine_processor import ENGINE_REFERENCE_SHEETS, process_engine_data
+from auxiliary_engine_processor import AuxiliaryEngineProcessor
+from purifier_processor import PurifierProcessor
+from bwts_processor import BWTSProcessor
+from hatch_processor import HatchProcessor
+from cargopumping_processor import CargoPumpingProcessor
+from cargohandling_processor import CargoHandlingSystemProcessor
+from cargoventing_processor import CargoVentingSystemProcessor
+from inertgas_processor import InertGasSystemProcessor
+from compressor_processor import CompressorSystemProcessor
+from ladder_processor import LadderSystemProcessor
+from boat_processor import BoatSystemProcessor
+from mooring_processor import MooringSystemProcessor
+from steering_processor import SteeringSystemProcessor
+from incin_processor import IncineratorSystemProcessor
+from stp_processor import STPSystemProcessor
+from ows_processor import OWSSystemProcessor
+from powerdist_processor import PowerDistSystemProcessor
+from crane_processor import CraneSystemProcessor
+from refac_processor import RefacSystemProcessor
+from tank_processor import TankSystemProcessor
+from fwg_processor import FWGSystemProcessor
+from workshop_processor import WorkshopSystemProcessor
+from boiler_processor import BoilerSystemProcessor
+from bridge_processor import BridgeSystemProcessor
+from misc_processor import MiscSystemProcessor
+from battery_processor import BatterySystemProcessor
+from bt_processor import BTSystemProcessor
+from lpscr_processor import LPSCRSystemProcessor
+from hpscr_processor import HPSCRSystemProcessor
+from lsamapping_processor import LSAMappingProcessor
+from ffamapping_processor import FFAMappingProcessor
+from inactive_processor import InactiveMappingProcessor
+from criticaljobs_processor import CriticalJobsProcessor
+from csv_validator import CSVValidator
+from engine_detector import detect_bwts_model, detect_engine_type
+from quickview import QuickViewAnalyzer
+from export_handler import ExportHandler
+from reference_bundle import normalize_job_codes, read_reference_sheet
+from count_cube import JobCountCube
+from job_code_aliases import ALIAS_SHEET, apply_job_code_aliases, load_aliases
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENGINE_TYPE = "MAN ME-C and ME-B Engine"
+
+JOB_CODE_COLUMNS = ['UI Job Code', 'Job Code', 'JobCode', 'Code']
+TITLE_COLUMNS = ['Title', 'J3 Job Title', 'Job Title', 'Task Description']
+MACHINERY_COLUMNS = ['Machinery', 'Machinery Location']
+
+# Partition label of export rows without a vessel name
+UNKNOWN_VESSEL = 'Unknown'
+
+# Processors return single-row frames such as 'No data found' or 'Column Error' instead of empty ones
+PLACEHOLDER_CODE_PATTERN = r'(?i)^(no .*|.*error)$'
+
+# reference_sheets(sheet_names, options) lists the sheets a system reads; an empty list means "unknown"
+PipelineSystem = namedtuple('PipelineSystem', ['label', 'run', 'reference_sheets'])
+
+
+def _sheet_system(processor_cls, method, sheet_name, missing_attr, uses_cube=False):
+    """Runner for processors called with (data, reference sheet DataFrame) that store their missing jobs.
+
+    uses_cube: the method also takes the upload's JobCountCube as cube=.
+    """
+    def run(data, ref_sheet, sheets, perf=None, **options):
+        processor = processor_cls()
+        if perf is not None:
+            perf.instrument(processor)
+        kwargs = {'cube': options['count_cube']} if uses_cube and options.get('count_cube') is not None else {}
+        getattr(processor, method)(data, sheets.get(sheet_name, pd.DataFrame()).copy(), **kwargs)
+        return getattr(processor, missing_attr)
+    run.uses_cube = uses_cube
+    return run
+
+
+def _workbook_system(processor_cls, missing_attr=None, **call_kwargs):
+    """Runner for processors whose process_reference_data opens the workbook itself."""
+    def run(data, ref_sheet, sheets, perf=None, **options):
+        processor = processor_cls()
+        if perf is not None:
+            perf.instrument(processor)
+        kwargs = {key: options[option] for key, option in call_kwargs.items() if options.get(option) is not None}
+        result = processor.process_reference_data(data, ref_sheet, **kwargs)
+        return getattr(processor, missing_attr) if missing_attr else result
+    return run
+
+
+def _named(*names):
+    return lambda sheet_names, options: [name for name in names if name in sheet_names]
+
+
+def _matching(*words):
+    return lambda sheet_names, options: [name for name in sheet_names if any(word in name.lower() for word in words)]
+
+
+def _bwts_sheets(sheet_names, options):
+    if options.get('bwts_sheet') in sheet_names:
+        return [options['bwts_sheet']]
+    return _matching('bwts', 'ballast')(sheet_names, options)
+
+
+def _engine_sheets(sheet_names, options):
+    sheet = ENGINE_REFERENCE_SHEETS.get(options.get('engine_type') or DEFAULT_ENGINE_TYPE, "ME Jobs")
+    return [sheet] if sheet in sheet_names else []
+
+
+def _run_ae(data, ref_sheet, sheets, perf=None, **options):
+    processor = AuxiliaryEngineProcessor()
+    if perf is not None:
+        perf.instrument(processor)
+    _, missing_jobs = processor.process_reference_data(data, ref_sheet)
+    return missing_jobs
+
+
+def _run_main_engine(data, ref_sheet, sheets, perf=None, **options):
+    engine_type = options.get('engine_type') or DEFAULT_ENGINE_TYPE
+    run = perf.wrap(process_engine_data, name="process_engine_data") if perf is not None else process_engine_data
+    results = run(data, ref_sheet, engine_type)
+    return results[6]
+
+
+# Systems summarized by QuickView, in display order; labels are the get_basic_counts keyword names
+MISSING_JOB_SYSTEMS = [
+    PipelineSystem('ae_missing_jobs', _run_ae, _named('AE Jobs')),
+    PipelineSystem('battery_missing_jobs', _sheet_system(BatterySystemProcessor, 'process_battery_data', 'Battery', 'missingjobsbatteryresult'), _named('Battery')),
+    PipelineSystem('boat_missing_jobs', _sheet_system(BoatSystemProcessor, 'process_boat_data', 'Boats', 'missingjobsBoatsresult'), _named('Boats')),
+    PipelineSystem('boiler_missing_jobs', _sheet_system(BoilerSystemProcessor, 'process_boiler_data', 'Boiler', 'missingjobsboilerresult'), _named('Boiler')),
+    PipelineSystem('bridge_missing_jobs', _sheet_system(BridgeSystemProcessor, 'process_bridge_data', 'Bridge', 'missingjobsbridgeresult', uses_cube=True), _named('Bridge')),
+    PipelineSystem('bt_missing_jobs', _sheet_system(BTSystemProcessor, 'process_bt_data', 'Bow Thruster', 'missingjobsBTresult'), _named('Bow Thruster')),
+    PipelineSystem('bwts_missing_jobs', _workbook_system(BWTSProcessor, preferred_sheet='bwts_sheet'), _bwts_sheets),
+    PipelineSystem('Cargo_Handling_System', _workbook_system(CargoHandlingSystemProcessor, 'missing_jobs_cargohandling'), _named('Cargohanding')),
+    PipelineSystem('Cargo_Pumping_System', _workbook_system(CargoPumpingProcessor, 'missingjobscargopumpingresult'), _named('Cargo Pumping')),
+    PipelineSystem('Cargo_Venting_System', _workbook_system(CargoVentingSystemProcessor, 'missing_jobs_cargovent'), _named('Cargovent')),
+    PipelineSystem('compressor_missing_jobs', _sheet_system(CompressorSystemProcessor, 'process_compressor_data', 'Compressor', 'missingjobsCompressorresult'), _named('Compressor')),
+    PipelineSystem('crane_missing_jobs', _sheet_system(CraneSystemProcessor, 'process_crane_data', 'Crane', 'missingjobscraneresult'), _named('Crane')),
+    PipelineSystem('Critical_Jobs', _sheet_system(CriticalJobsProcessor, 'process_critical_data', 'criticalmapping', 'missingcriticaljobsresult', uses_cube=True), _named('criticalmapping')),
+    PipelineSystem('Main_Engine', _run_main_engine, _engine_sheets),
+    PipelineSystem('FFA_Mapping', _sheet_system(FFAMappingProcessor, 'process_ffa_data', 'ffamapping', 'missingffajobsresult', uses_cube=True), _named('ffamapping')),
+    PipelineSystem('FWG_System', _sheet_system(FWGSystemProcessor, 'process_fwg_data', 'FWG', 'missingjobsfwgresult'), _named('FWG')),
+    PipelineSystem('Hatch_System', _workbook_system(HatchProcessor), _matching('hatch')),
+    PipelineSystem('HPSCR_System', _sheet_system(HPSCRSystemProcessor, 'process_hpscr_data', 'HPSCRHITACHI', 'missingjobsHPSCRresult'), _named('HPSCRHITACHI')),
+    PipelineSystem('Inactive_Jobs', _sheet_system(InactiveMappingProcessor, 'process_inactive_data', 'inactivemapping', 'missinginactivejobsresult', uses_cube=True), _named('inactivemapping')),
+    PipelineSystem('Inert_Gas_System', _workbook_system(InertGasSystemProcessor, 'missing_jobs_igsystem'), _named('IGSystem')),
+    PipelineSystem('Ladder_System', _sheet_system(LadderSystemProcessor, 'process_ladder_data', 'Ladders', 'missingjobsLadderresult'), _named('Ladders')),
+    PipelineSystem('Incinerator_System', _sheet_system(IncineratorSystemProcessor, 'process_incin_data', 'Incin', 'missingjobsIncinresult'), _named('Incin')),
+    PipelineSystem('LPSCR_System', _sheet_system(LPSCRSystemProcessor, 'process_lpscr_data', 'LPSCRYANMAR', 'missingjobsLPSCRresult'), _named('LPSCRYANMAR')),
+    PipelineSystem('LSA_Mapping', _sheet_system(LSAMappingProcessor, 'process_lsa_data', 'lsamapping', 'missinglsajobsresult', uses_cube=True), _named('lsamapping')),
+    PipelineSystem('Misc_Jobs', _sheet_system(MiscSystemProcessor, 'process_misc_data', 'Misc', 'missingmiscjobsresult', uses_cube=True), _named('Misc')),
+    PipelineSystem('Mooring_System', _sheet_system(MooringSystemProcessor, 'process_mooring_data', 'Mooring', 'missingjobsMooringresult'), _named('Mooring')),
+    PipelineSystem('OWS_System', _sheet_system(OWSSystemProcessor, 'process_ows_data', 'OWS', 'missingjobsOWSresult'), _named('OWS')),
+    PipelineSystem('Power_Distribution_System', _sheet_system(PowerDistSystemProcessor, 'process_powerdist_data', 'Powerdist', 'missingjobspowerdistresult'), _named('Powerdist')),
+    PipelineSystem('Purifier_System', _workbook_system(PurifierProcessor), _matching('purifier')),
+    PipelineSystem('Refac_System', _sheet_system(RefacSystemProcessor, 'process_refac_data', 'Refac', 'missingjobsrefacresult'), _named('Refac')),
+    PipelineSystem('Steering_System', _sheet_system(SteeringSystemProcessor, 'process_steering_data', 'Steering', 'missingjobsSteeringresult'), _named('Steering')),
+    PipelineSystem('STP_System', _sheet_system(STPSystemProcessor, 'process_stp_data', 'STP', 'missingjobsSTPresult'), _named('STP')),
+    PipelineSystem('Tank_System', _sheet_system(TankSystemProcessor, 'process_tank_data', 'Tanks', 'missingjobstankresult', uses_cube=True), _named('Tanks')),
+    PipelineSystem('Workshop_System', _sheet_system(WorkshopSystemProcessor, 'process_workshop_data', 'Workshop', 'missingjobsworkshopresult'), _named('Workshop')),
+]
+
+
+def first_column(df, candidates):
+    return next((col for col in candidates if col in df.columns), None)
+
+
+def missing_job_entries(missing):
+    """Normalized (Job Code, Machinery, Title) rows of a system's missing jobs, without placeholder rows."""
+    columns = ['Job Code', 'Machinery', 'Title']
+    if not isinstance(missing, pd.DataFrame) or missing.empty:
+        return pd.DataFrame(columns=columns)
+    code_col = first_column(missing, JOB_CODE_COLUMNS)
+    if code_col is None:
+        return pd.DataFrame(columns=columns)
+    machinery_col = first_column(missing, MACHINERY_COLUMNS)
+    title_col = first_column(missing, TITLE_COLUMNS)
+
+    entries = pd.DataFrame({'Job Code': normalize_job_codes(missing[code_col])}, index=missing.index)
+    entries['Machinery'] = missing[machinery_col].astype(str).str.strip() if machinery_col else ''
+    entries['Title'] = missing[title_col] if title_col else None
+    entries = entries[missing[code_col].notna() & ~entries['Job Code'].isin(['', 'nan'])]
+    entries = entries[~entries['Job Code'].str.match(PLACEHOLDER_CODE_PATTERN)]
+    return entries.reset_index(drop=True)
+
+
+def data_fingerprint(data):
+    """Content hash of a vessel DataFrame (column names and values)."""
+    digest = hashlib.sha256(repr(list(map(str, data.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def load_vessel_export(path, name=None):
+    """Read a vessel export (CSV or Excel) and apply the validator's machinery-location auto-corrections.
+    name gives the file name when path is a file-like object."""
+    if str(name or path).lower().endswith(('.xlsx', '.xls')):
+        data = pd.read_excel(path)
+    else:
+        data = pd.read_csv(path)
+    return prepare_vessel_data(data)
+
+
+def prepare_vessel_data(data):
+    """Validate like the app does and keep the corrected 'Machinery Location' values."""
+    is_valid, errors = CSVValidator().validate_data(data)
+    if not is_valid:
+        logger.warning('Validation issues in vessel export: %s', errors)
+    if '_machinery_location_fixed' in data.columns:
+        data['Machinery Location'] = data['_machinery_location_fixed']
+        data = data.drop(columns=['_machinery_location_fixed'])
+    return data
+
+
+def resolve_engine_options(data, engine_type=None, bwts_sheet=None):
+    """Fill an engine_type / bwts_sheet left as None from the export itself.
+
+    Batch and HTTP callers rarely know the engine type; an undetectable type falls back to
+    DEFAULT_ENGINE_TYPE and an undetectable BWTS model to the processor's own sheet search.
+    """
+    if engine_type is None:
+        detection = detect_engine_type(data)
+        engine_type = detection.engine_type or DEFAULT_ENGINE_TYPE
+        logger.info('Engine type not given; using %s (detected: %s)', engine_type, detection.engine_type)
+    if bwts_sheet is None:
+        bwts_sheet = detect_bwts_model(data).sheet
+    return engine_type, bwts_sheet
+
+
+def run_missing_jobs(data, ref_sheet, engine_type=None, bwts_sheet=None, systems=None, sheets=None, perf=None,
+                     progress=None, count_cube=None):
+    """Run the registered systems for one vessel.
+
+    Args:
+        data: Vessel job DataFrame
+        ref_sheet: Reference workbook path/upload or a compiled ReferenceBundle
+        engine_type: Main engine type used for the Main_Engine system
+        bwts_sheet: Optional BWTS model sheet; the processor's own fallback is used when None
+        systems: Optional iterable of labels to run; all systems by default
+        sheets: Already-read {sheet name: DataFrame}; read once from ref_sheet when None
+        perf: Optional PerfMonitor recording one 'system' span per label
+        progress: Optional callback(fraction, message) called before each system
+        count_cube: JobCountCube of data for the mapping processors; built here when None
+
+    Returns:
+        Dict of label -> missing jobs DataFrame, in registry order
+    """
+    if sheets is None:
+        sheets = read_reference_sheet(ref_sheet, sheet_name=None)
+    # Canonical job codes for every system (a no-op when the caller already applied them)
+    data = apply_job_code_aliases(data, load_aliases(sheets.get(ALIAS_SHEET)))
+    engine_type, bwts_sheet = resolve_engine_options(data, engine_type, bwts_sheet)
+    wanted = set(systems) if systems is not None else None
+    options = {'engine_type': engine_type, 'bwts_sheet': bwts_sheet}
+
+    selected = [(label, run) for label, run, _ in MISSING_JOB_SYSTEMS if wanted is None or label in wanted]
+    # One count cube of the upload, sliced by every mapping processor instead of merging it again
+    if count_cube is None and 'Job Code' in data.columns and any(getattr(run, 'uses_cube', False) for _, run in selected):
+        count_cube = JobCountCube(data)
+    options['count_cube'] = count_cube
+    missing_sources = {}
+    for position, (label, run) in enumerate(selected):
+        if progress is not None:
+            progress(position / len(selected), label.replace('_', ' '))
+        span = perf.track(label, category='system', rows_in=len(data)) if perf is not None else nullcontext({})
+        with span as record:
+            try:
+                missing = run(data, ref_sheet, sheets, perf=perf, **options)
+            except Exception as e:
+                logger.exception('System %s failed', label)
+                missing = pd.DataFrame({'Error': [f'{label} failed: {e}']})
+            if not isinstance(missing, pd.DataFrame):
+                missing = pd.DataFrame()
+            record['Rows Out'] = len(missing)
+        missing_sources[label] = missing
+    return missing_sources
+
+
+def run_quickview(data, ref_sheet, engine_type=None, bwts_sheet=None, sheets=None, perf=None, missing_sources=None,
+                  progress=None):
+    """Everything the QuickView tab shows for one vessel, computed headlessly.
+
+    missing_sources may be passed in when they were already computed, e.g. by IncrementalAnalyzer.
+
+    Returns:
+        Dict with 'analyzer', 'missing_sources', 'vesselname', 'totaljobs', 'criticaljobscount',
+        'total_missing_jobs', 'missing_jobs_df', 'missing_machinery_count' and 'total_machinery'
+    """
+    if sheets is None:
+        sheets = read_reference_sheet(ref_sheet, sheet_name=None)
+    dfML = sheets.get('Machinery Location', pd.DataFrame())
+    dfCM = sheets.get('Critical Machinery', pd.DataFrame())
+    dfVSM = sheets.get('Vessel Specific Machinery', pd.DataFrame())
+
+    analyzer = QuickViewAnalyzer(data, dfML, dfCM, dfVSM)
+    if missing_sources is None:
+        missing_sources = run_missing_jobs(data, ref_sheet, engine_type, bwts_sheet, sheets=sheets, perf=perf,
+                                           progress=progress)
+
+    # get_basic_counts adds helper columns, so hand it copies
+    (vesselname, totaljobs, criticaljobscount, total_missing_jobs,
+     missing_jobs_df, missing_machinery_count) = analyzer.get_basic_counts(
+        **{label: df.copy() for label, df in missing_sources.items()}
+    )
+
+    return {
+        'analyzer': analyzer,
+        'missing_sources': missing_sources,
+        'vesselname': vesselname,
+        'totaljobs': totaljobs,
+        'criticaljobscount': criticaljobscount,
+        'total_missing_jobs': total_missing_jobs,
+        'missing_jobs_df': missing_jobs_df,
+        'missing_machinery_count': missing_machinery_count,
+        'total_machinery': len(dfML),
+    }
+
+
+def _json_records(df):
+    """DataFrame rows as JSON-safe dicts (NaN -> None, numpy scalars -> Python)."""
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return []
+    clean = df.astype(object).where(df.notna(), None)
+    return [{str(key): (value.item() if hasattr(value, 'item') else value) for key, value in row.items()}
+            for row in clean.to_dict(orient='records')]
+
+
+def quickview_summary(data, ref_sheet, engine_type=None, bwts_sheet=None, sheets=None, perf=None, progress=None):
+    """QuickView results as a JSON-serializable dict, for the HTTP service and other headless callers."""
+    engine_type, bwts_sheet = resolve_engine_options(data, engine_type, bwts_sheet)
+    quickview = run_quickview(data, ref_sheet, engine_type, bwts_sheet, sheets=sheets, perf=perf, progress=progress)
+    return {
+        'vessel': str(quickview['vesselname']),
+        'engine_type': engine_type,
+        'bwts_sheet': bwts_sheet,
+        'total_jobs': int(quickview['totaljobs']),
+        'critical_jobs': int(quickview['criticaljobscount']),
+        'total_missing_jobs': int(quickview['total_missing_jobs']),
+        'missing_machinery_count': int(quickview['missing_machinery_count']),
+        'total_machinery': int(quickview['total_machinery']),
+        'missing_jobs_by_system': _json_records(quickview['missing_jobs_df']),
+        'missing_jobs': {
+            label: _json_records(missing_job_entries(missing))
+            for label, missing in quickview['missing_sources'].items()
+        },
+    }
+
+
+# Results build_full_report() can take from the caller instead of recomputing them
+REPORT_RESULT_KEYS = ['engine', 'ae_reference', 'aux_task_count', 'aux_component_dist', 'aux_component_status',
+                      'missing_sources', 'quickview']
+
+
+def build_full_report(data, ref_sheet, engine_type=None, bwts_sheet=None, sheets=None, perf=None, progress=None,
+                      cached=None):
+    """The "Export Full HTML Report" artifact, computed without Streamlit.
+
+    cached holds results the caller already computed for the same inputs, under REPORT_RESULT_KEYS:
+    'engine' (the process_engine_data tuple), 'ae_reference' ((ref pivot, missing jobs) from
+    process_reference_data), the three AE tables, 'missing_sources' (any subset of the systems)
+    and 'quickview' (run_quickview's dict). Only the sections missing from it are computed.
+
+    Returns:
+        (file name, HTML string)
+    """
+    cached = {key: value for key, value in (cached or {}).items() if value is not None}
+    engine_type, bwts_sheet = resolve_engine_options(data, engine_type, bwts_sheet)
+    if sheets is None and 'quickview' not in cached:
+        sheets = read_reference_sheet(ref_sheet, sheet_name=None)
+    if progress is not None:
+        progress(0.0, 'Main and auxiliary engines')
+
+    ae_processor = AuxiliaryEngineProcessor()
+    run_engine = process_engine_data
+    if perf is not None:
+        perf.instrument(ae_processor)
+        run_engine = perf.wrap(process_engine_data, name="process_engine_data")
+
+    if 'engine' not in cached:
+        cached['engine'] = run_engine(data, ref_sheet, engine_type)
+    (main_engine_data, _, _, _, _, ref_pivot_table, me_missing_jobs, cylinder_pivot_table, _,
+     component_status, missing_count) = cached['engine']
+    if 'ae_reference' not in cached:
+        cached['ae_reference'] = ae_processor.process_reference_data(data, ref_sheet)
+    ae_ref_pivot, ae_missing_jobs = cached['ae_reference']
+    if 'aux_task_count' not in cached:
+        cached['aux_task_count'] = ae_processor.create_task_count_table(data)
+    if 'aux_component_dist' not in cached:
+        cached['aux_component_dist'] = ae_processor.create_component_distribution(data)
+    if 'aux_component_status' not in cached:
+        cached['aux_component_status'], _ = ae_processor.analyze_components(data)
+    aux_task_count = cached['aux_task_count']
+    aux_component_dist = cached['aux_component_dist']
+    aux_component_status = cached['aux_component_status']
+
+    quickview = cached.get('quickview')
+    if quickview is None:
+        # The engines were just processed; run every other system not already known through the registry
+        known = dict(cached.get('missing_sources', {}))
+        known.setdefault('ae_missing_jobs', ae_missing_jobs)
+        known.setdefault('Main_Engine', me_missing_jobs)
+        others = [label for label, _, _ in MISSING_JOB_SYSTEMS if label not in known]
+        computed = run_missing_jobs(
+            data, ref_sheet, engine_type, bwts_sheet, systems=others, sheets=sheets, perf=perf,
+            progress=(lambda fraction, message: progress(0.1 + 0.8 * fraction, message)) if progress else None
+        ) if others else {}
+        missing_sources = {
+            label: known[label] if label in known else computed.get(label)
+            for label, _, _ in MISSING_JOB_SYSTEMS
+        }
+        missing_sources = {label: frame if isinstance(frame, pd.DataFrame) else pd.DataFrame()
+                           for label, frame in missing_sources.items()}
+        quickview = run_quickview(data, ref_sheet, engine_type, bwts_sheet, sheets=sheets,
+                                  missing_sources=missing_sources)
+
+    if progress is not None:
+        progress(0.9, 'Building HTML report')
+
+    all_tab_tables = {
+        "QuickView Summary": [quickview['missing_jobs_df']],
+        "Main Engine": [
+            main_engine_data,                  # ➤ Maintenance Data for Main Engine
+            cylinder_pivot_table,             # ➤ Main Engine Cylinder Unit Analysis
+            ref_pivot_table,                  # ➤ Reference Analysis Main Engine
+            me_missing_jobs,                  # ➤ Missing Jobs for Main Engine
+            component_status,                 # ➤ Component Status Analysis for Main Engine
+            missing_count                     # ➤ Number of missing components for Main Engine
+        ],
+        "Auxiliary Engine": [
+            aux_task_count,
+            aux_component_dist,
+            aux_component_status,
+            ae_ref_pivot,
+            ae_missing_jobs
+        ],
+    }
+
+    html_report = ExportHandler(data, engine_type).export_all_tabs_to_html(
+        all_tab_tables,
+        totaljobs=quickview['totaljobs'],
+        total_missing_jobs=quickview['total_missing_jobs'],
+        total_machinery=quickview['total_machinery'],
+        missing_machinery=quickview['missing_machinery_count'],
+        vesselname=quickview['vesselname'],
+        criticaljobscount=quickview['criticaljobscount']
+    )
+    filename = f"{data['Vessel'].iloc[0]}_Maintenance_Report.html" if "Vessel" in data.columns else "Maintenance_Report.html"
+    if progress is not None:
+        progress(1.0, 'Done')
+    return filename, html_report
+
+
+def split_by_vessel(data):
+    """Partition a multi-vessel export with a single groupby.
+
+    Rows without a vessel name are kept together under UNKNOWN_VESSEL rather than dropped.
+    """
+    if 'Vessel' not in data.columns:
+        return {UNKNOWN_VESSEL: data}
+    vessels = data['Vessel']
+    unnamed = vessels.isna() | (vessels.astype(str).str.strip() == '')
+    if unnamed.any():
+        logger.warning('%d rows have no vessel name; analysing them as %r', int(unnamed.sum()), UNKNOWN_VESSEL)
+        data = data.assign(Vessel=vessels.where(~unnamed, UNKNOWN_VESSEL))
+    return {vessel: frame.reset_index(drop=True) for vessel, frame in data.groupby('Vessel', sort=True)}
+
+
+def export_paths(paths):
+    """Expand directories into the CSV/Excel exports they contain."""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(('.csv', '.xlsx', '.xls')):
+                    yield os.path.join(path, name)
+        else:
+            yield path
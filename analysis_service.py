@@ -0,0 +1,316 @@
+import io
+import os
+import sys
+import json
+import math
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from collections import OrderedDict
+from email.parser import BytesParser
+from email.policy import HTTP as HTTP_POLICY
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from analysis_pipeline import MISSING_JOB_SYSTEMS, load_vessel_export
+from job_queue import JobQueue, UnknownJobError
+from reference_bundle import open_reference
+
+logger = logging.getLogger(__name__)
+
+MAX_UPLOAD_BYTES = 200 * 1024 * 1024
+DEFAULT_WAIT_SECONDS = 300
+MAX_WAIT_SECONDS = 3600
+
+
+def wait_timeout(query):
+    """The request's ?timeout= in seconds, clamped to 0..MAX_WAIT_SECONDS; ValueError when not a number."""
+    value = query.get('timeout', [DEFAULT_WAIT_SECONDS])[0]
+    try:
+        timeout = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"timeout must be a number of seconds, got {value!r}") from None
+    if math.isnan(timeout):
+        raise ValueError("timeout must be a number of seconds, got 'nan'")
+    return min(max(timeout, 0.0), float(MAX_WAIT_SECONDS))
+
+
+class ResultCache:
+    """Content-addressed JSON results: an in-memory LRU in front of optional <cache_dir>/<key>.json files."""
+
+    def __init__(self, cache_dir=None, max_entries=256):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json') if self.cache_dir else None
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        path = self._path(key)
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                payload = f.read()
+            self._remember(key, payload)
+            return payload
+        return None
+
+    def put(self, key, result):
+        payload = json.dumps(result, default=str).encode('utf-8')
+        path = self._path(key)
+        if path:
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        self._remember(key, payload)
+        return payload
+
+    def _remember(self, key, payload):
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def content_key(export_raw, reference_raw, params):
+    """sha256 over the export bytes, reference bytes and analysis parameters."""
+    digest = hashlib.sha256()
+    for part in (export_raw, reference_raw, json.dumps(params, sort_keys=True).encode()):
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+
+def parse_multipart(content_type, body):
+    """{field name: (file name or None, bytes)} from a multipart/form-data body."""
+    message = BytesParser(policy=HTTP_POLICY).parsebytes(
+        f'Content-Type: {content_type}\r\nMIME-Version: 1.0\r\n\r\n'.encode('latin-1') + body
+    )
+    if not message.is_multipart():
+        raise ValueError('Expected a multipart/form-data body')
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        if name:
+            fields[name] = (part.get_filename(), part.get_payload(decode=True) or b'')
+    return fields
+
+
+class AnalysisService:
+    """Request handling independent of the HTTP layer: resolve inputs, consult the cache, run jobs."""
+
+    def __init__(self, reference=None, data_root=None, cache_dir=None, workers=None):
+        self.default_reference = reference
+        self.data_root = os.path.realpath(data_root or os.getcwd())
+        self.cache = ResultCache(cache_dir)
+        self.queue = JobQueue(max_workers=workers)
+        self._pending = {}  # content key -> job id
+        self._lock = threading.Lock()
+
+    def _read_path(self, path):
+        # Only files below data_root may be read on behalf of a client
+        full_path = os.path.realpath(os.path.join(self.data_root, path))
+        if os.path.commonpath([full_path, self.data_root]) != self.data_root:
+            raise PermissionError(f'{path} is outside the service data root')
+        with open(full_path, 'rb') as f:
+            return os.path.basename(full_path), f.read()
+
+    def resolve_inputs(self, fields):
+        """fields: {'export': (name, bytes) or path, 'reference': ..., 'engine_type': str, 'bwts_sheet': str}"""
+        export = fields.get('export') or fields.get('export_path')
+        if export is None:
+            raise ValueError("Missing 'export' file or 'export_path'")
+        if isinstance(export, str):
+            export = self._read_path(export)
+
+        reference = fields.get('reference') or fields.get('reference_path')
+        if reference is None:
+            if self.default_reference is None:
+                raise ValueError("Missing 'reference' file or 'reference_path' and no default reference configured")
+            with open(self.default_reference, 'rb') as f:
+                reference = (os.path.basename(self.default_reference), f.read())
+        elif isinstance(reference, str):
+            reference = self._read_path(reference)
+
+        params = {key: fields[key] for key in ('engine_type', 'bwts_sheet') if fields.get(key)}
+        return export, reference, params
+
+    def submit(self, export, reference, params):
+        """Return (content key, cached JSON bytes or None); starts a job on a cache miss."""
+        key = content_key(export[1], reference[1], params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return key, cached
+
+        if key not in self._pending:
+            data = load_vessel_export(io.BytesIO(export[1]), name=export[0])
+            ref_buffer = io.BytesIO(reference[1])
+            ref_buffer.name = reference[0]
+            # Concurrent identical requests get the same job id from the queue's own deduplication
+            job_id = self.queue.submit('summary', data, open_reference(ref_buffer), **params)
+            with self._lock:
+                self._pending.setdefault(key, job_id)
+        return key, None
+
+    def poll(self, key):
+        """(HTTP status, JSON-able dict or cached bytes) for a content key."""
+        cached = self.cache.get(key)
+        if cached is not None:
+            return HTTPStatus.OK, cached
+        # The done -> cached transition happens once, under the lock; a concurrent poll then finds the cache
+        with self._lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return HTTPStatus.OK, cached
+            job_id = self._pending.get(key)
+            if job_id is None:
+                return HTTPStatus.NOT_FOUND, {'error': 'Unknown result key'}
+
+            status = self.queue.status(job_id)
+            if status['state'] == 'done':
+                try:
+                    result = self.queue.result(job_id)
+                except UnknownJobError:
+                    status = self.queue.status(job_id)
+                else:
+                    result['key'] = key
+                    payload = self.cache.put(key, result)
+                    self._pending.pop(key, None)
+                    return HTTPStatus.OK, payload
+            if status['state'] in ('failed', 'unknown'):
+                self._pending.pop(key, None)
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {'key': key, 'error': status['error'] or status['message']}
+        return HTTPStatus.ACCEPTED, dict(status, key=key, result_url=f'/results/{key}')
+
+    def wait(self, key, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            status, payload = self.poll(key)
+            if status != HTTPStatus.ACCEPTED or time.monotonic() >= deadline:
+                return status, payload
+            time.sleep(0.2)
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'VesselAnalysis/1.0'
+    service = None  # set by make_server
+
+    def log_message(self, format, *args):
+        logger.info('%s - %s', self.address_string(), format % args)
+
+    def _send(self, status, payload):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            self._send(HTTPStatus.OK, {'status': 'ok'})
+        elif url.path == '/systems':
+            self._send(HTTPStatus.OK, {'systems': [system.label for system in MISSING_JOB_SYSTEMS]})
+        elif url.path.startswith('/results/'):
+            try:
+                response = self.service.poll(url.path[len('/results/'):])
+            except Exception as e:
+                logger.exception('Error handling %s', url.path)
+                response = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+            self._send(*response)
+        else:
+            self._send(HTTPStatus.NOT_FOUND, {'error': 'Not found'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/analyze':
+            self._send(HTTPStatus.NOT_FOUND, {'error': 'Not found'})
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_UPLOAD_BYTES:
+            self._send(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': 'Upload too large'})
+            return
+        body = self.rfile.read(length)
+        content_type = self.headers.get('Content-Type', '')
+        query = parse_qs(url.query)
+
+        try:
+            timeout = wait_timeout(query)
+            if content_type.startswith('multipart/form-data'):
+                # File parts stay (file name, bytes); plain fields become strings
+                fields = {
+                    name: (filename, value) if filename else value.decode('utf-8').strip()
+                    for name, (filename, value) in parse_multipart(content_type, body).items()
+                }
+            else:
+                fields = json.loads(body or b'{}')
+            export, reference, params = self.service.resolve_inputs(fields)
+            key, cached = self.service.submit(export, reference, params)
+        except (ValueError, KeyError) as e:
+            self._send(HTTPStatus.BAD_REQUEST, {'error': str(e)})
+            return
+        except (PermissionError, FileNotFoundError) as e:
+            self._send(HTTPStatus.FORBIDDEN if isinstance(e, PermissionError) else HTTPStatus.NOT_FOUND,
+                       {'error': str(e)})
+            return
+        except Exception as e:
+            logger.exception('Error handling /analyze')
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)})
+            return
+
+        if cached is not None:
+            self._send(HTTPStatus.OK, cached)
+            return
+        wait = query.get('wait', ['1'])[0] not in ('0', 'false', 'no')
+        self._send(*(self.service.wait(key, timeout) if wait else self.service.poll(key)))
+
+
+def make_server(host='127.0.0.1', port=8765, **service_options):
+    """ThreadingHTTPServer bound to an AnalysisService; analyses run in the service's worker processes."""
+    handler = type('BoundAnalysisRequestHandler', (AnalysisRequestHandler,),
+                   {'service': AnalysisService(**service_options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless HTTP service for vessel maintenance analysis.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--reference', default=None, help="Default reference workbook (.xlsx) or bundle (.zip)")
+    parser.add_argument('--data-root', default=None, help="Directory that export_path/reference_path may point into")
+    parser.add_argument('--cache-dir', default='.analysis_cache')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, reference=args.reference, data_root=args.data_root,
+                         cache_dir=args.cache_dir, workers=args.workers)
+    print(f"Serving on http://{args.host}:{args.port} (POST /analyze, GET /results/<key>, /systems, /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.RequestHandlerClass.service.queue.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    from log_config import configure_logging
+    configure_logging()
+    sys.exit(main())
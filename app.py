@@ -1,3 +1,6 @@
+import hashlib
+import logging
+from collections import OrderedDict
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -44,13 +47,200 @@ from criticaljobs_processor import CriticalJobsProcessor
 from export_handler import ExportHandler
 from machinery_analyzer import MachineryAnalyzer
 from report_styler import ReportStyler
-from quickview import QuickViewAnalyzer, create_and_style_pivot_table
+from quickview import create_and_style_pivot_table
+from perf_monitor import PerfMonitor
+from log_config import configure_logging
+from reference_bundle import open_reference, reference_version
+from reference_catalog import reference_catalog
+from analysis_pipeline import UNKNOWN_VESSEL, build_full_report, prepare_vessel_data, run_quickview, split_by_vessel
+from incremental_analysis import IncrementalAnalyzer
+from chart_builder import bar_chart_spec, pie_chart_spec
+from job_queue import JobQueue, UnknownJobError
+from fleet_matrix import fleet_from_summaries, fleet_overview
+from results_store import ResultsStore
+from due_date_engine import DueDateEngine
+from cylinder_matrix import CylinderMatrix
+from count_cube import JobCountCube
+from title_matcher import TitleMatcher, missing_titles
+from job_code_aliases import RAW_CODE_COLUMN, apply_job_code_aliases, reference_aliases
+from engine_detector import BWTS_MODEL_SHEETS, detect_bwts_model, detect_engine_type
+from running_hours_projection import DEFAULT_DAILY_HOURS, RunningHoursProjector
+from table_pager import paged_table
+from download_artifacts import download_table
  # Added import for ReportStyler
 
 
 #
 
 
+# Leveled logging (VESSEL_LOG_LEVEL / VESSEL_LOG_MODULES / VESSEL_LOG_JSON); safe across reruns
+configure_logging()
+logger = logging.getLogger("app")
+
+
+# Worker processes shared by every session on this server; identical jobs are deduplicated
+@st.cache_resource
+def get_job_queue():
+    return JobQueue()
+
+
+# One SQLite history database per server (VESSEL_RESULTS_DB, default vessel_results.db)
+@st.cache_resource
+def get_results_store():
+    return ResultsStore()
+
+
+# Input sets whose results a session keeps, so switching between vessels does not recompute them
+MAX_SESSION_RESULTS = 8
+
+
+def session_results(*inputs):
+    """Analysis results already computed in this session for these inputs; least recently used sets are dropped."""
+    cache = st.session_state.get('analysis_results')
+    if not isinstance(cache, OrderedDict):
+        cache = st.session_state.analysis_results = OrderedDict()
+    if inputs in cache:
+        cache.move_to_end(inputs)
+    else:
+        cache[inputs] = {}
+        while len(cache) > MAX_SESSION_RESULTS:
+            cache.popitem(last=False)
+    return cache[inputs]
+
+
+def session_reference_sheets(results, perf, ref_sheet):
+    """Every reference sheet, read once per session and inputs."""
+    if 'sheets' not in results:
+        results['sheets'] = perf.read_reference(ref_sheet, sheet_name=None)
+    return results['sheets']
+
+
+def session_count_cube(results, data):
+    """The upload's JobCountCube for the mapping tabs, built once per session and inputs."""
+    if 'count_cube' not in results and 'Job Code' in data.columns:
+        results['count_cube'] = JobCountCube(data)
+    return results.get('count_cube')
+
+
+def session_title_matcher(results, data):
+    """TitleMatcher over the upload's job titles, fitted once per session and inputs."""
+    if 'title_matcher' not in results:
+        results['title_matcher'] = TitleMatcher(data)
+    return results['title_matcher']
+
+
+@st.fragment(run_every=1.0)
+def poll_job(job_id, label):
+    """Progress bar for a background job; reruns the page once the job has finished."""
+    status = get_job_queue().status(job_id)
+    if status['state'] in ('queued', 'running'):
+        st.progress(status['progress'], text=f"{label}: {status['message']} ({status['elapsed']:.0f}s)")
+    else:
+        st.rerun()
+
+
+def vessel_partitions(data, upload_hash):
+    """The upload validated once and split by vessel, kept in the session until another file is uploaded."""
+    cache = st.session_state.get('vessel_partitions')
+    if cache is None or cache['upload'] != upload_hash:
+        cache = st.session_state.vessel_partitions = {
+            'upload': upload_hash,
+            'frames': split_by_vessel(prepare_vessel_data(data)),
+            'jobs': {},
+            'summaries': {},
+        }
+    return cache
+
+
+def fleet_summaries(partitions, ref_sheet):
+    """QuickView summary of every vessel partition, computed on the job queue's workers.
+
+    Finished summaries are copied into the session, so they outlive the queue's finished-job limit.
+    Returns (summaries by vessel, ids of jobs still running, errors by vessel).
+    """
+    queue = get_job_queue()
+    ref_key = reference_version(ref_sheet)
+    summaries, pending, errors = {}, [], {}
+    for vessel, frame in partitions['frames'].items():
+        key = (vessel, ref_key)
+        if key in partitions['summaries']:
+            summaries[vessel] = partitions['summaries'][key]
+            continue
+        job_id = partitions['jobs'].get(key)
+        status = queue.status(job_id) if job_id else {'state': 'unknown'}
+        if status['state'] == 'done':
+            try:
+                summaries[vessel] = partitions['summaries'][key] = queue.result(job_id)
+                continue
+            except UnknownJobError:
+                # Evicted since the status check: resubmitted like an unknown job
+                status = {'state': 'unknown'}
+        if status['state'] == 'unknown':
+            # Engine type and BWTS model are detected per vessel in the worker
+            partitions['jobs'][key] = queue.submit('summary', frame, ref_sheet)
+            pending.append(partitions['jobs'][key])
+        elif status['state'] == 'failed':
+            errors[vessel] = status['error']
+        else:
+            pending.append(job_id)
+    return summaries, pending, errors
+
+
+@st.fragment(run_every=1.0)
+def poll_fleet(job_ids, total):
+    """Progress bar over the per-vessel jobs; reruns the page once all of them have finished."""
+    statuses = [get_job_queue().status(job_id) for job_id in job_ids]
+    running = [status for status in statuses if status['state'] in ('queued', 'running')]
+    if running:
+        done = total - len(running)
+        fraction = (done + sum(status['progress'] for status in running)) / total
+        st.progress(min(fraction, 1.0), text=f"Analysing vessels: {done} of {total} done")
+    else:
+        st.rerun()
+
+
+def multi_vessel_section(data, upload_hash, ref_sheet):
+    """Vessel selector and fleet comparison for an upload holding several vessels.
+
+    Returns (copy of the selected vessel's rows, vessel name); the rest of the page analyses only those.
+    """
+    partitions = vessel_partitions(data, upload_hash)
+    vessels = list(partitions['frames'])
+
+    st.header("Multi-Vessel Upload")
+    st.info(f"This file contains {len(vessels)} vessels. The analysis below covers the selected vessel; "
+            "the comparison covers all of them.")
+    if UNKNOWN_VESSEL in partitions['frames'] and UNKNOWN_VESSEL not in set(data['Vessel'].dropna()):
+        st.warning(f"{len(partitions['frames'][UNKNOWN_VESSEL])} rows have no vessel name; "
+                   f"they are listed as '{UNKNOWN_VESSEL}'.")
+    selected = st.selectbox("Vessel", vessels, key="selected_vessel")
+
+    with st.expander("Fleet Comparison", expanded=False):
+        if ref_sheet is None:
+            st.info("Upload a reference sheet to compare missing jobs across the vessels.")
+        else:
+            summaries, pending, errors = fleet_summaries(partitions, ref_sheet)
+            if pending:
+                poll_fleet(pending, len(vessels))
+            for vessel, error in errors.items():
+                st.warning(f"{vessel}: analysis failed ({error})")
+            if summaries:
+                st.subheader("Totals per Vessel")
+                paged_table(fleet_overview(summaries), key="fleet_overview", hide_index=True)
+
+                fleet = fleet_from_summaries(summaries)
+                missing_counts = fleet.missing_counts_by_vessel()
+                if not missing_counts.empty:
+                    st.subheader("Missing Jobs per System")
+                    paged_table(missing_counts, key="fleet_missing_counts")
+                    download_table(missing_counts, "Download Comparison CSV", "fleet_missing_jobs.csv",
+                                   key="download_fleet_missing_counts")
+
+                    st.subheader("Jobs Missing on Most Vessels")
+                    paged_table(fleet.top_missing_jobs(20), key="fleet_top_missing", hide_index=True)
+
+    return partitions['frames'][selected].copy(), selected
+
 # === Processor Initializations ===
 
 workshop_processor = WorkshopSystemProcessor()
@@ -157,14 +347,51 @@ with col1:
         uploaded_file = st.file_uploader("Upload Excel file", type=["xlsx", "xls"], key="data_file")
 with col2:
     st.subheader("Reference Sheet")
-    ref_sheet = st.file_uploader("Upload Reference Sheet (Excel)", type=["xlsx"], key="ref_sheet")
+    ref_sheet = st.file_uploader(
+        "Upload Reference Sheet (Excel or compiled bundle)", type=["xlsx", "zip"], key="ref_sheet",
+        help="A .zip bundle from `python reference_bundle.py compile` loads in milliseconds instead of parsing the workbook"
+    )
+    # Compiled bundles are opened once and cached by content; workbooks are passed through unchanged
+    ref_sheet = open_reference(ref_sheet)
+    # Resolve each system's sheet and key columns once, and report problems before any analysis runs
+    if ref_sheet is not None:
+        try:
+            reference_check = reference_catalog(ref_sheet).validate()
+            reference_problems = reference_check[reference_check['Problems'] != '']
+            if not reference_problems.empty:
+                with st.expander(f"⚠️ Reference sheet check: {len(reference_problems)} system(s) need attention"):
+                    st.dataframe(reference_problems, hide_index=True, use_container_width=True)
+        except Exception as e:
+            st.warning(f"Could not read the reference sheet: {e}")
+
+st.sidebar.checkbox("Record peak memory in Performance panel", value=False, key="perf_track_memory",
+                    help="Uses tracemalloc, which slows the analysis down while enabled")
+st.sidebar.checkbox("Run heavy analyses in background workers", value=False, key="background_jobs",
+                    help="QuickView and the full HTML export run in separate processes; repeated clicks "
+                         "attach to the running job instead of starting over")
+st.sidebar.checkbox("Incremental re-analysis", value=False, key="incremental_mode",
+                    help="When the same vessel is uploaded again, QuickView only recomputes the systems "
+                         "affected by changed rows and lists new/resolved missing jobs")
+st.sidebar.checkbox("Save results to history", value=False, key="save_history",
+                    help="Stores each QuickView run in a local database so missing-job trends "
+                         "can be compared across uploads of the same vessel")
 
 if uploaded_file is not None:
+    # Per-run instrumentation shown in the Performance expander
+    perf = PerfMonitor(track_memory=st.session_state.get('perf_track_memory', False))
     try:
-        if file_type == "CSV":
-            data = pd.read_csv(uploaded_file)
-        else:
-            data = pd.read_excel(uploaded_file)
+        with perf.track("read:upload", category='input') as perf_record:
+            if file_type == "CSV":
+                data = pd.read_csv(uploaded_file)
+            else:
+                data = pd.read_excel(uploaded_file)
+            perf_record['Rows Out'] = len(data)
+        upload_hash = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+
+        # Several vessels in one export: each is analysed on its own partition
+        selected_vessel = None
+        if 'Vessel' in data.columns and data['Vessel'].nunique() > 1:
+            data, selected_vessel = multi_vessel_section(data, upload_hash, ref_sheet)
 
         # Engine and Equipment Configuration section
         st.header("Engine and Equipment Configuration")
@@ -186,13 +413,24 @@ if uploaded_file is not None:
             "WINGD Engine": "WinGD X series engines"
         }
 
+        # Preselect the engine type and BWTS model detected from the export's location vocabulary
+        engine_detection = detect_engine_type(data)
+        bwts_detection = detect_bwts_model(data)
+        engine_options = list(engine_descriptions.keys())
+
         # Create radio buttons for engine selection with descriptions
         engine_type = st.radio(
             "Select Engine Type",
-            list(engine_descriptions.keys()),
-            index=1,
+            engine_options,
+            index=engine_options.index(engine_detection.engine_type) if engine_detection.engine_type in engine_options else 1,
             help="Choose the type of main engine installed on your vessel"
         )
+        if engine_detection.engine_type is not None:
+            detected_note = "Detected" if engine_detection.confident else "Best guess"
+            st.caption(f"{detected_note} from machinery locations: {engine_detection.engine_type}"
+                       + (f" ({', '.join(engine_detection.evidence[:4])})" if engine_detection.evidence else ""))
+            with st.expander("Engine type scores"):
+                st.dataframe(engine_detection.scores, use_container_width=True)
 
         # Show description for selected engine type
         st.info(engine_descriptions[engine_type])
@@ -205,27 +443,22 @@ if uploaded_file is not None:
         </div>
         """, unsafe_allow_html=True)
 
-        bwts_models = {
-            "BWTS Optimarine": "BWTSOpti",
-            "BWTS Alfalaval": "BWTSAlfalaval",
-            "BWTS Echlor": "BWTSEchlor",
-            "BWTS ERMA": "BWTSERMA",
-            "BWTS Sunrai": "BWTSSunrai",
-            "BWTS Techcross": "BWTStechcross",
-            "Other BWTS": "BWTS"
-        }
+        bwts_models = BWTS_MODEL_SHEETS
 
         # Initialize BWTS model in session state if not already there
         if 'bwts_model' not in st.session_state:
             st.session_state.bwts_model = "BWTS Optimarine"
 
         # Create radio buttons for BWTS model selection
+        bwts_options = list(bwts_models.keys())
         bwts_model = st.radio(
             "Select BWTS Model",
-            list(bwts_models.keys()),
-            index=0,
+            bwts_options,
+            index=bwts_options.index(bwts_detection.model) if bwts_detection.model in bwts_options else 0,
             help="Choose the type of Ballast Water Treatment System installed on your vessel"
         )
+        if bwts_detection.model is not None:
+            st.caption(f"Detected from BWTS entries: {bwts_detection.model} ({', '.join(bwts_detection.evidence)})")
 
         # Store the selected model in session state
         st.session_state.bwts_model = bwts_model
@@ -252,6 +485,17 @@ if uploaded_file is not None:
                 # Remove the temporary column
                 data = data.drop(columns=['_machinery_location_fixed'])
 
+        # Canonical job codes for every system; the uploaded codes stay in 'Raw Job Code'
+        try:
+            data = apply_job_code_aliases(data, reference_aliases(ref_sheet))
+        except Exception as e:
+            logger.exception("Job code aliasing failed")
+            st.warning(f"Job code aliases were not applied: {e}")
+        if RAW_CODE_COLUMN in data.columns:
+            aliased_count = (data['Job Code'].astype(str) != data[RAW_CODE_COLUMN].astype(str)).sum()
+            if aliased_count > 0:
+                st.info(f"Mapped {aliased_count} job codes to their canonical codes (originals kept in '{RAW_CODE_COLUMN}')")
+
         # Show validation results
         if not is_valid:
             st.warning("Data Validation Issues Detected:")
@@ -264,16 +508,36 @@ if uploaded_file is not None:
         # Initialize AuxiliaryEngineProcessor
         ae_processor = AuxiliaryEngineProcessor()
 
+        # Record timing, rows and memory for every processor call
+        for processor in [
+            ae_processor, workshop_processor, fwg_processor, bwts_processor, compressor_processor,
+            ladder_processor, boat_processor, mooring_processor, hatch_processor, steering_processor,
+            boiler_processor, incin_processor, stp_processor, ows_processor, powerdist_processor,
+            crane_processor, emg_processor, bridge_processor, refac_processor, lsamapping_processor,
+            ffamapping_processor, tank_processor, battery_processor, bt_processor, cargohandling_processor,
+            cargopumping_processor, cargoventing_processor, critical_processor, hpscr_processor,
+            inactive_processor, inertgas_processor, lpscr_processor, misc_processor, purifier_processor
+        ]:
+            perf.instrument(processor)
+        process_engine_data = perf.wrap(process_engine_data, name="process_engine_data")
+
+        # Tabs store what they compute here so the HTML export can reuse it
+        results = session_results(
+            upload_hash,
+            selected_vessel,
+            reference_version(ref_sheet) if ref_sheet is not None else None,
+            engine_type
+        )
+
         # Process main engine data
         if ref_sheet is None:
             st.warning("No reference sheet uploaded. Some analysis features will be limited.")
-            (main_engine_data, aux_engine_data, main_engine_running_hours, aux_running_hours,
-             pivot_table, ref_pivot_table, missing_jobs, cylinder_pivot_table, pivot_table_filteredAE,
-             component_status, missing_count) = process_engine_data(data, engine_type=engine_type)
+            results['engine'] = process_engine_data(data, engine_type=engine_type)
         else:
-            (main_engine_data, aux_engine_data, main_engine_running_hours, aux_running_hours,
-             pivot_table, ref_pivot_table, missing_jobs, cylinder_pivot_table, pivot_table_filteredAE,
-             component_status, missing_count) = process_engine_data(data, ref_sheet, engine_type)
+            results['engine'] = process_engine_data(data, ref_sheet, engine_type)
+        (main_engine_data, aux_engine_data, main_engine_running_hours, aux_running_hours,
+         pivot_table, ref_pivot_table, missing_jobs, cylinder_pivot_table, pivot_table_filteredAE,
+         component_status, missing_count) = results['engine']
 
         # Get auxiliary engine data
         aux_engine_data = ae_processor.get_maintenance_data(data)
@@ -284,19 +548,15 @@ if uploaded_file is not None:
 
         # Running Hours Summary
         st.subheader("Running Hours Summary")
-        m1, m2, m3, m4 = st.columns(4)
-        with m1:
+        # One metric per auxiliary engine found in the export (AE1-AE3 at least)
+        metric_cols = st.columns(1 + len(aux_running_hours))
+        with metric_cols[0]:
             st.metric("Main Engine", value=main_engine_running_hours if main_engine_running_hours != "Not Available" else "N/A",
                       help="Main Engine Running Hours")
-        with m2:
-            st.metric("AE1", value=aux_running_hours['AE1'] if aux_running_hours['AE1'] != "Not Available" else "N/A",
-                      help="Auxiliary Engine 1 Running Hours")
-        with m3:
-            st.metric("AE2", value=aux_running_hours['AE2'] if aux_running_hours['AE2'] != "Not Available" else "N/A",
-                      help="Auxiliary Engine 2 Running Hours")
-        with m4:
-            st.metric("AE3", value=aux_running_hours['AE3'] if aux_running_hours['AE3'] != "Not Available" else "N/A",
-                      help="Auxiliary Engine 3 Running Hours")
+        for col, (unit, hours) in zip(metric_cols[1:], aux_running_hours.items()):
+            with col:
+                st.metric(unit, value=hours if hours != "Not Available" else "N/A",
+                          help=f"Auxiliary Engine {unit[2:]} Running Hours")
 
 
         
@@ -313,150 +573,53 @@ if uploaded_file is not None:
         with col1:
             try:
                 if st.button("📥 Export Full HTML Report", key="export_html_btn"):
-                    export_handler = ExportHandler(data, engine_type)
-
-                    # ✅ Re-run QuickViewAnalyzer to get missing_jobs_df
-                    ref_sheets = pd.read_excel(ref_sheet, sheet_name=None)
-                    dfML = ref_sheets.get('Machinery Location', pd.DataFrame())
-                    dfCM = ref_sheets.get('Critical Machinery', pd.DataFrame())
-                    dfVSM = ref_sheets.get('Vessel Specific Machinery', pd.DataFrame())
-
-                    analyzer = QuickViewAnalyzer(data, dfML, dfCM, dfVSM)
-
-                    ae_ref_pivot, ae_missing_jobs = ae_processor.process_reference_data(data, ref_sheet)
-                    main_engine_data, *_ , missing_jobs, _ = process_engine_data(data, ref_sheet, engine_type)
-                    aux_task_count = ae_processor.create_task_count_table(data)
-                    aux_component_dist = ae_processor.create_component_distribution(data)
-                    aux_component_status, aux_missing_component_count = ae_processor.analyze_components(data)
-                    ref_sheets = pd.read_excel(ref_sheet, sheet_name=None)
-                    dfML = ref_sheets.get('Machinery Location', pd.DataFrame())
-                    dfCM = ref_sheets.get('Critical Machinery', pd.DataFrame())
-                    dfVSM = ref_sheets.get('Vessel Specific Machinery', pd.DataFrame())
-
-                    analyzer = QuickViewAnalyzer(data, dfML, dfCM, dfVSM)
-
-                    ae_ref_pivot, ae_missing_jobs = ae_processor.process_reference_data(data, ref_sheet)
-                    battery_processor.process_battery_data(data, ref_sheets.get("Battery", pd.DataFrame()))
-                    boat_processor.process_boat_data(data, ref_sheets.get("Boats", pd.DataFrame()))
-                    boiler_processor.process_boiler_data(data, ref_sheets.get("Boiler", pd.DataFrame()))
-                    bridge_processor.process_bridge_data(data, ref_sheets.get("Bridge", pd.DataFrame()))
-                    bt_processor.process_bt_data(data, ref_sheets.get("Bow Thruster", pd.DataFrame()))
-                    bwts_missing_jobs = bwts_processor.process_reference_data(data, ref_sheet)
-
-                    chs_processor = CargoHandlingSystemProcessor()
-                    dfCargoHandling = pd.read_excel(ref_sheet, sheet_name="Cargohanding")
-                    chs_processor.process_reference_data(data, ref_sheet)
-
-                    cargopumping_processor.process_reference_data(data, ref_sheet)
-                    cargoventing_processor.process_reference_data(data, ref_sheet)
-                    compressor_processor.process_compressor_data(data, ref_sheets.get("Compressor", pd.DataFrame()))
-                    crane_processor.process_crane_data(data, ref_sheets.get("Crane", pd.DataFrame()))
-                    critical_processor.process_critical_data(data, ref_sheets.get("criticalmapping", pd.DataFrame()))
-                    main_engine_data, *_ , missing_jobs, _ = process_engine_data(data, ref_sheet, engine_type)
-                    ffamapping_processor.process_ffa_data(data, pd.read_excel(ref_sheet, sheet_name="ffamapping"))
-                    fwg_processor.process_fwg_data(data, pd.read_excel(ref_sheet, sheet_name="FWG"))
-                    missing_jobs_hatch = hatch_processor.process_reference_data(data, ref_sheet)
-                    hpscr_processor.process_hpscr_data(data, pd.read_excel(ref_sheet, sheet_name="HPSCRHITACHI"))
-                    inactive_processor.process_inactive_data(data, pd.read_excel(ref_sheet, sheet_name="inactivemapping"))
-                    inertgas_processor.process_reference_data(data, ref_sheet)
-                    ladder_processor.process_ladder_data(data, pd.read_excel(ref_sheet, sheet_name="Ladders"))
-                    incin_processor.process_incin_data(data, pd.read_excel(ref_sheet, sheet_name="Incin"))
-                    lpscr_processor.process_lpscr_data(data, pd.read_excel(ref_sheet, sheet_name="LPSCRYANMAR"))
-                    lsamapping_processor.process_lsa_data(data, pd.read_excel(ref_sheet, sheet_name="lsamapping"))
-                    misc_processor.process_misc_data(data, pd.read_excel(ref_sheet, sheet_name="Misc"))
-                    mooring_processor.process_mooring_data(data, pd.read_excel(ref_sheet, sheet_name="Mooring"))
-                    ows_processor.process_ows_data(data, pd.read_excel(ref_sheet, sheet_name="OWS"))
-                    powerdist_processor.process_powerdist_data(data, pd.read_excel(ref_sheet, sheet_name="Powerdist"))
-                    missingjobspurifierresult = purifier_processor.process_reference_data(data, ref_sheet)
-                    refac_processor.process_refac_data(data, pd.read_excel(ref_sheet, sheet_name="Refac"))
-                    steering_processor.process_steering_data(data, pd.read_excel(ref_sheet, sheet_name="Steering"))
-                    stp_processor.process_stp_data(data, pd.read_excel(ref_sheet, sheet_name="STP"))
-                    tank_processor.process_tank_data(data, pd.read_excel(ref_sheet, sheet_name="Tanks"))
-                    workshop_processor.process_workshop_data(data, pd.read_excel(ref_sheet, sheet_name="Workshop"))
-
-
-                    # Add more processors if needed here...
-
-                    vesselname, totaljobs, criticaljobscount, total_missing_jobs, missing_jobs_df, missing_machinery_count = analyzer.get_basic_counts(
-                                            ae_missing_jobs=ae_missing_jobs,
-                                            battery_missing_jobs=battery_processor.missingjobsbatteryresult,
-                                            boat_missing_jobs=boat_processor.missingjobsBoatsresult,
-                                            boiler_missing_jobs=boiler_processor.missingjobsboilerresult,
-                                            bridge_missing_jobs=bridge_processor.missingjobsbridgeresult,
-                                            bt_missing_jobs=bt_processor.missingjobsBTresult,
-                                            bwts_missing_jobs=bwts_missing_jobs,
-                                            Cargo_Handling_System=chs_processor.missing_jobs_cargohandling.copy(),
-                                            Cargo_Pumping_System=cargopumping_processor.missingjobscargopumpingresult.copy(),
-                                            Cargo_Venting_System=cargoventing_processor.missing_jobs_cargovent.copy(),
-                                            compressor_missing_jobs=compressor_processor.missingjobsCompressorresult,
-                                            crane_missing_jobs=crane_processor.missingjobscraneresult,
-                                            Critical_Jobs=critical_processor.missingcriticaljobsresult.copy(),
-                                            Main_Engine=missing_jobs.copy(),
-                                            FFA_Mapping=ffamapping_processor.missingffajobsresult.copy(),
-                                            FWG_System=fwg_processor.missingjobsfwgresult.copy(),
-                                            Hatch_System=missing_jobs_hatch.copy(),
-                                            HPSCR_System=hpscr_processor.missingjobsHPSCRresult.copy(),
-                                            Inactive_Jobs=inactive_processor.missinginactivejobsresult.copy(),
-                                            Inert_Gas_System=inertgas_processor.missing_jobs_igsystem.copy(),
-                                            Ladder_System=ladder_processor.missingjobsLadderresult.copy(),
-                                            Incinerator_System=incin_processor.missingjobsIncinresult.copy(),
-                                            LPSCR_System=lpscr_processor.missingjobsLPSCRresult.copy(),
-                                            LSA_Mapping=lsamapping_processor.missinglsajobsresult.copy(),
-                                            Misc_Jobs=misc_processor.missingmiscjobsresult.copy(),
-                                            Mooring_System=mooring_processor.missingjobsMooringresult.copy(),
-                                            OWS_System=ows_processor.missingjobsOWSresult.copy(),
-                                            Power_Distribution_System=powerdist_processor.missingjobspowerdistresult.copy(),
-                                            Purifier_System=missingjobspurifierresult.copy(),
-                                            Refac_System=refac_processor.missingjobsrefacresult.copy(),
-                                            Steering_System=steering_processor.missingjobsSteeringresult.copy(),
-                                            STP_System=stp_processor.missingjobsSTPresult.copy(),
-                                            Tank_System=tank_processor.missingjobstankresult.copy(),
-                                            Workshop_System=workshop_processor.missingjobsworkshopresult.copy(),
-                                        )
-
-
-                    # ✅ Collect all exportable tables
-                    all_tab_tables = {
-                        "QuickView Summary": [missing_jobs_df],
-                        "Main Engine": [
-                            main_engine_data,                  # ➤ Maintenance Data for Main Engine
-                            cylinder_pivot_table,             # ➤ Main Engine Cylinder Unit Analysis
-                            ref_pivot_table,                  # ➤ Reference Analysis Main Engine
-                            missing_jobs,                     # ➤ Missing Jobs for Main Engine
-                            component_status,                 # ➤ Component Status Analysis for Main Engine
-                            missing_count                     # ➤ Number of missing components for Main Engine
-                        ],
-                            "Auxiliary Engine": [
-                                aux_task_count,
-                                aux_component_dist,
-                                aux_component_status,
-                                ae_ref_pivot,
-                                ae_missing_jobs
-                            ],
-                            
-                    }
-
-                    html_report = export_handler.export_all_tabs_to_html(
-                                all_tab_tables,
-                                totaljobs=totaljobs,
-                                total_missing_jobs=total_missing_jobs,
-                                total_machinery=len(dfML),
-                                missing_machinery=missing_machinery_count,
-                                vesselname=vesselname,
-                                criticaljobscount=criticaljobscount
-                            )
-
-
-                    filename = f"{data['Vessel'].iloc[0]}_Maintenance_Report.html" if "Vessel" in data.columns else "Maintenance_Report.html"
+                    if st.session_state.get('background_jobs', False):
+                        st.session_state.export_job_id = get_job_queue().submit(
+                            'full_report', data, ref_sheet, engine_type=engine_type
+                        )
+                    else:
+                        # Only sections no tab has computed yet for these inputs are run
+                        filename, html_report = build_full_report(
+                            data, ref_sheet, engine_type,
+                            sheets=None if 'quickview' in results else session_reference_sheets(results, perf, ref_sheet),
+                            perf=perf,
+                            cached=results
+                        )
 
-                    st.success("✅ Full HTML Report generated successfully!")
-                    st.download_button(
-                        label="📄 Download Full Report",
-                        data=html_report,
-                        file_name=filename,
-                        mime="text/html",
-                        key="download_html_btn"
-                    )
+                        st.success("✅ Full HTML Report generated successfully!")
+                        st.download_button(
+                            label="📄 Download Full Report",
+                            data=html_report,
+                            file_name=filename,
+                            mime="text/html",
+                            key="download_html_btn"
+                        )
+
+                # Background export: poll until the worker has finished, then offer the artifact
+                export_job_id = st.session_state.get('export_job_id')
+                if export_job_id is not None:
+                    export_status = get_job_queue().status(export_job_id)
+                    export_artifact = None
+                    if export_status['state'] == 'done':
+                        try:
+                            export_artifact = get_job_queue().result(export_job_id)
+                        except UnknownJobError:
+                            export_status = get_job_queue().status(export_job_id)
+                    if export_status['state'] in ('queued', 'running'):
+                        poll_job(export_job_id, "Full HTML Report")
+                    elif export_artifact is not None:
+                        filename, html_report = export_artifact
+                        st.success("✅ Full HTML Report generated successfully!")
+                        st.download_button(
+                            label="📄 Download Full Report",
+                            data=html_report,
+                            file_name=filename,
+                            mime="text/html",
+                            key="download_html_job_btn"
+                        )
+                    else:
+                        st.session_state.pop('export_job_id', None)
+                        st.error(f"❌ Error exporting HTML report: {export_status['error'] or export_status['message']}")
 
             except Exception as e:
                 st.error(f"❌ Error exporting HTML report: {e}")
@@ -652,16 +815,47 @@ if uploaded_file is not None:
             st.subheader("Main Engine Cylinder Unit Analysis")
             if cylinder_pivot_table is not None:
                 styled_cylinder = cylinder_pivot_table.style.applymap(color_binary_cells)
-                st.dataframe(styled_cylinder, use_container_width=True)
+                paged_table(styled_cylinder, key="cylinder", use_container_width=True)
+
+            # Per-cylinder components expected for this engine type but without jobs
+            try:
+                cylinder_matrix = CylinderMatrix.from_data(data)
+                cylinder_diff = cylinder_matrix.diff(engine_type)
+                cylinder_gaps = cylinder_diff[cylinder_diff['Status'] == 'Missing']
+                with st.expander(f"Expected Cylinder Components ({len(cylinder_gaps)} gaps)"):
+                    if cylinder_matrix.missing_units():
+                        st.warning(f"No jobs found for cylinder units: {', '.join(map(str, cylinder_matrix.missing_units()))}")
+                    if cylinder_gaps.empty:
+                        st.success("Every cylinder unit has jobs for all expected components.")
+                    else:
+                        paged_table(cylinder_gaps, key="cylinder_gaps", use_container_width=True)
+            except Exception as e:
+                st.error(f"Error comparing cylinder components: {str(e)}")
 
             if ref_sheet is not None and ref_pivot_table is not None:
                 st.subheader("Reference Analysis Main Engine")
                 styled_ref_pivot = ref_pivot_table.style.applymap(color_binary_cells)
-                st.dataframe(styled_ref_pivot, use_container_width=True)
+                paged_table(styled_ref_pivot, key="main_engine_ref_pivot", use_container_width=True)
                 st.subheader("Missing Jobs for Main Engine")
-                st.dataframe(missing_jobs, use_container_width=True)
+                paged_table(missing_jobs, key="main_engine_missing_jobs", use_container_width=True)
             st.subheader("Maintenance Data for Main Engine")
-            st.dataframe(main_engine_data, use_container_width=True)
+            paged_table(main_engine_data, key="main_engine_data", use_container_width=True)
+
+            # Projected due dates from running hours and a daily utilization
+            st.subheader("Running-Hours Projection (ME and AE)")
+            try:
+                rh1, rh2 = st.columns(2)
+                me_daily = rh1.number_input("Main Engine running hours per day", min_value=0.5, max_value=24.0,
+                                            value=DEFAULT_DAILY_HOURS['Main Engine'], step=0.5, key="me_daily_hours")
+                ae_daily = rh2.number_input("Auxiliary Engine running hours per day", min_value=0.5, max_value=24.0,
+                                            value=DEFAULT_DAILY_HOURS['Auxiliary Engine'], step=0.5, key="ae_daily_hours")
+                projection = RunningHoursProjector({'Main Engine': me_daily, 'Auxiliary Engine': ae_daily}).project(data)
+                if projection.empty:
+                    st.info("No running-hour based ME/AE jobs found.")
+                else:
+                    paged_table(projection, key="projection", use_container_width=True)
+            except Exception as e:
+                st.error(f"Error projecting running-hours due dates: {str(e)}")
             # Component Status Analysis
             st.subheader("Component Status Analysis for Main Engine")
             if component_status is not None:
@@ -670,7 +864,7 @@ if uploaded_file is not None:
                     return f'color: {color}'
 
                 styled_status = component_status.style.map(color_status, subset=['Status'])
-                st.dataframe(styled_status, use_container_width=True)
+                paged_table(styled_status, key="main_engine_status", use_container_width=True)
                 st.info(f"Number of missing components: {missing_count}")
         elif st.session_state.current_tab == 1:
             st.header("Auxiliary Engine Analysis")
@@ -678,18 +872,17 @@ if uploaded_file is not None:
             try:
                 # Task Count Analysis
                 st.subheader("Task Count Analysis for Auxiliary Engine")
-                task_count = ae_processor.create_task_count_table(data)
+                task_count = results['aux_task_count'] = ae_processor.create_task_count_table(data)
                 if task_count is not None and not task_count.empty:
                     # Add a safe display method that converts to HTML to avoid JS errors
-                    st.write(task_count.to_html(index=False), unsafe_allow_html=True)
+                    paged_table(task_count, key="ae_task_count", hide_index=True)
 
                     # Also provide download option for this table
-                    csv = task_count.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        task_count,
                         label="Download Task Count CSV",
-                        data=csv,
                         file_name="auxiliary_engine_task_count.csv",
-                        mime="text/csv"
+                        index=False
                     )
                 else:
                     st.info("No task count data available for auxiliary engines.")
@@ -700,10 +893,10 @@ if uploaded_file is not None:
             try:
                 # Component Distribution
                 st.subheader("Component Distribution for Auxiliary Engine")
-                component_dist = ae_processor.create_component_distribution(data)
+                component_dist = results['aux_component_dist'] = ae_processor.create_component_distribution(data)
                 if component_dist is not None and not component_dist.empty:
                         styled_component_distAE = component_dist.style.applymap(color_binary_cells)
-                        st.dataframe(styled_component_distAE, use_container_width=True)
+                        paged_table(styled_component_distAE, key="component_distAE", use_container_width=True)
                 else:
                     st.info("No component distribution data available for auxiliary engines.")
             except Exception as e:
@@ -712,13 +905,14 @@ if uploaded_file is not None:
             try:
                 # Component Status Analysis
                 component_status, missing_count = ae_processor.analyze_components(data)
+                results['aux_component_status'] = component_status
                 if component_status is not None and not component_status.empty:
                     st.subheader("Component Status Analysis for Auxiliary Engine")
                     def color_status(val):
                         color = '#28a745' if val == 'Present' else '#dc3545'
                         return f'color: {color}'
                     styled_status = component_status.style.map(color_status, subset=['Status'])
-                    st.dataframe(styled_status, use_container_width=True)
+                    paged_table(styled_status, key="ae_status", use_container_width=True)
                     st.info(f"Number of missing components: {missing_count}")
                 else:
                     st.info("No component status data available for auxiliary engines.")
@@ -728,7 +922,7 @@ if uploaded_file is not None:
             try:
                 # Reference Analysis
                 if ref_sheet is not None:
-                    ae_ref_pivot, ae_missing_jobs = ae_processor.process_reference_data(data, ref_sheet)
+                    ae_ref_pivot, ae_missing_jobs = results['ae_reference'] = ae_processor.process_reference_data(data, ref_sheet)
 
                     # Always show reference analysis section heading
                     st.subheader("Reference Analysis for Auxiliary Engine")
@@ -736,15 +930,14 @@ if uploaded_file is not None:
                     if ae_ref_pivot is not None and not ae_ref_pivot.empty:
                         # Use the HTML rendering approach to avoid JavaScript errors
                         styled_ref_ae = ae_ref_pivot.style.applymap(color_binary_cells)
-                        st.dataframe(styled_ref_ae, use_container_width=True)
+                        paged_table(styled_ref_ae, key="ref_ae", use_container_width=True)
 
                         # Provide download option for this reference analysis
-                        csv = ae_ref_pivot.to_csv(index=False)
-                        st.download_button(
+                        download_table(
+                            ae_ref_pivot,
                             label="Download Reference Analysis CSV",
-                            data=csv,
                             file_name="auxiliary_engine_reference_analysis.csv",
-                            mime="text/csv"
+                            index=False
                         )
                     else:
                         st.info("No reference analysis matching records found for auxiliary engines.")
@@ -754,15 +947,14 @@ if uploaded_file is not None:
 
                     if ae_missing_jobs is not None and not ae_missing_jobs.empty:
                         # Use the HTML rendering approach to avoid JavaScript errors
-                        st.write(ae_missing_jobs.to_html(index=False), unsafe_allow_html=True)
+                        paged_table(ae_missing_jobs, key="ae_missing_jobs", hide_index=True)
 
                         # Provide download option for missing jobs
-                        csv = ae_missing_jobs.to_csv(index=False)
-                        st.download_button(
+                        download_table(
+                            ae_missing_jobs,
                             label="Download Missing Jobs CSV",
-                            data=csv,
                             file_name="auxiliary_engine_missing_jobs.csv",
-                            mime="text/csv"
+                            index=False
                         )
                     else:
                         st.info("No missing jobs analysis available for auxiliary engines.")
@@ -774,7 +966,7 @@ if uploaded_file is not None:
                 # Maintenance Data
                 st.subheader("Maintenance Data for Auxiliary Engine")
                 if aux_engine_data is not None and not aux_engine_data.empty:
-                    st.dataframe(aux_engine_data, use_container_width=True)
+                    paged_table(aux_engine_data, key="aux_engine_data", use_container_width=True)
                 else:
                     st.info("No maintenance data available for auxiliary engines.")
             except Exception as e:
@@ -805,7 +997,7 @@ if uploaded_file is not None:
                     different_df = analysis_results['different_machinery'].rename(columns={
                         'Machinery Location': 'Standardized Machinery Location'
                     })
-                    st.dataframe(different_df, use_container_width=True, 
+                    paged_table(different_df, key="different_df", use_container_width=True, 
                                 column_config={
                                     "Standardized Machinery Location": st.column_config.TextColumn(
                                         "Standardized Machinery Location",
@@ -820,7 +1012,7 @@ if uploaded_file is not None:
                     missing_df = analysis_results['missing_machinery'].rename(columns={
                         'Machinery Location': 'Standardized Machinery Location'
                     })
-                    st.dataframe(missing_df, use_container_width=True,
+                    paged_table(missing_df, key="missing_df", use_container_width=True,
                                 column_config={
                                     "Standardized Machinery Location": st.column_config.TextColumn(
                                         "Standardized Machinery Location",
@@ -828,6 +1020,16 @@ if uploaded_file is not None:
                                     )
                                 })
 
+                # Near-misses listed as both different and missing, for reconciling them
+                machinery_matches = analysis_results.get('machinery_matches')
+                if machinery_matches is not None and not machinery_matches.empty:
+                    st.subheader("Likely Renamed Machinery")
+                    st.caption("Different machinery paired with the missing machinery whose name is closest "
+                               "(trigram similarity, 1.0 = same words)")
+                    paged_table(machinery_matches, key="machinery_matches", hide_index=True, use_container_width=True)
+                    download_table(machinery_matches, "Download Machinery Matches CSV", "machinery_matches.csv",
+                                   index=False, key="download_machinery_matches")
+
                 # These detailed machinery location analysis tables have been removed as requested
             else:
                 st.warning("Reference sheet is required for machinery location analysis. Please upload a reference sheet.")
@@ -836,7 +1038,7 @@ if uploaded_file is not None:
             st.header("Purifier Analysis")
 
             # Initialize PurifierProcessor
-            pu_processor = PurifierProcessor()
+            pu_processor = perf.instrument(PurifierProcessor())
 
             try:
                 # Running Hours for Purifiers
@@ -844,15 +1046,15 @@ if uploaded_file is not None:
 
                 if not purifier_hours.empty:
                     st.subheader("Purifier Running Hours")
-                    st.dataframe(purifier_hours, use_container_width=True)
+                    paged_table(purifier_hours, key="purifier_hours", use_container_width=True,
+                                column_config={"Running Hours": st.column_config.NumberColumn(format="%d")})
 
                     # Create download option for running hours
-                    csv = purifier_hours.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        purifier_hours,
                         label="Download Purifier Running Hours CSV",
-                        data=csv,
                         file_name="purifier_running_hours.csv",
-                        mime="text/csv"
+                        index=False
                     )
                 else:
                     st.info("No running hours data available for purifiers.")
@@ -865,15 +1067,14 @@ if uploaded_file is not None:
                 task_count = pu_processor.create_task_count_table(data)
                 if not task_count.empty:
                     # Use HTML rendering approach to avoid JS errors
-                    st.write(task_count.to_html(index=False), unsafe_allow_html=True)
+                    paged_table(task_count, key="purifier_task_count", hide_index=True)
 
                     # Provide download option
-                    csv = task_count.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        task_count,
                         label="Download Task Count CSV",
-                        data=csv,
                         file_name="purifier_task_count.csv",
-                        mime="text/csv"
+                        index=False
                     )
                 else:
                     st.info("No task count data available for purifiers.")
@@ -885,141 +1086,51 @@ if uploaded_file is not None:
             try:
                 # Reference Job Analysis
                 if ref_sheet is not None:
-                    # Get missing jobs data
-                    missing_jobs_purifier = pu_processor.process_reference_data(data, ref_sheet)
-
-                    # Generate result_dfpurifiers data
-                    # Create a copy of data to avoid modifications to original
-                    data_copy = data.copy()
-
-                    # Filter for purifier jobs
-                    filtered_dfpurifierjobs = data_copy[data_copy['Machinery Location'].str.contains('Purifier', case=False, na=False)].copy()
-
-                    # Read the reference sheet
-                    ref_sheet_names = pd.ExcelFile(ref_sheet).sheet_names
-
-                    # Look for 'Purifiers' sheet specifically first
-                    purifier_sheet = 'Purifiers' if 'Purifiers' in ref_sheet_names else None
-
-                    # If not found, try to find any sheet with 'Purifier' or 'PU' in the name
-                    if purifier_sheet is None:
-                        for sheet in ref_sheet_names:
-                            if 'Purifier' in sheet.lower() or 'PU' in sheet:
-                                purifier_sheet = sheet
-                                break
+                    # Matched jobs, pivot and missing jobs are computed once by the processor
+                    purifier_result = pu_processor.match_reference(data, ref_sheet)
+                    missing_jobs_purifier = purifier_result.missing
+
+                    # Display Reference Jobs for Purifiers
+                    st.subheader("Reference Jobs for Purifiers")
+                    if not purifier_result.pivot.empty:
+                        pivot_table_resultpurifierJobs = purifier_result.pivot
+                        title_col = purifier_result.title_column
+                        styled_pivotpurifier = pivot_table_resultpurifierJobs.style.applymap(color_binary_cells)
+
+                        # Display styled dataframe
+                        paged_table(
+                            styled_pivotpurifier, key="pivotpurifier",
+                            use_container_width=True,
+                            column_config={
+                                pivot_table_resultpurifierJobs.index.name or title_col: st.column_config.TextColumn(
+                                    label=title_col,
+                                    width="large"
+                                )
+                            }
+                        )
 
-                    # If still no purifier-specific sheet, use the first sheet
-                    if purifier_sheet is None:
-                        purifier_sheet = ref_sheet_names[0]
-                        print(f"No purifier sheet found in app.py, using the first sheet: {purifier_sheet}")
+                        # Provide download option
+                        download_table(
+                            pivot_table_resultpurifierJobs,
+                            label="Download Reference Jobs Pivot Table CSV",
+                            file_name="purifier_ref_jobs_pivot.csv"
+                        )
+                        st.caption(f"{purifier_result.matched_count} of {purifier_result.reference_count} reference jobs found")
                     else:
-                        print(f"Using reference sheet in app.py: {purifier_sheet}")
-
-                    dfpurifiers = pd.read_excel(ref_sheet, sheet_name=purifier_sheet)
-
-                    # Create Job Codecopy column
-                    if 'Job Code' in filtered_dfpurifierjobs.columns:
-                        filtered_dfpurifierjobs['Job Codecopy'] = filtered_dfpurifierjobs['Job Code'].astype(str)
-
-                        # Display Reference Jobs for Purifiers
-                        st.subheader("Reference Jobs for Purifiers")
-                        if not filtered_dfpurifierjobs.empty and not dfpurifiers.empty:
-                            try:
-                                # Display the columns in the reference data (for debugging)
-                                print(f"Columns in reference data: {dfpurifiers.columns.tolist()}")
-
-                                # Check which column to use for job code in reference data
-                                job_code_col = None
-                                for possible_col in ['UI Job Code', 'Job Code', 'JobCode', 'Code']:
-                                    if possible_col in dfpurifiers.columns:
-                                        job_code_col = possible_col
-                                        print(f"Found job code column: {job_code_col}")
-                                        break
-
-                                if job_code_col is None:
-                                    st.error(f"No job code column found in reference data. Available columns: {', '.join(dfpurifiers.columns.tolist())}")
-
-                                if job_code_col is not None:
-                                    # Convert both columns to string to avoid type mismatch
-                                    filtered_dfpurifierjobs['Job Codecopy'] = filtered_dfpurifierjobs['Job Codecopy'].astype(str)
-                                    dfpurifiers[job_code_col] = dfpurifiers[job_code_col].astype(str)
-
-                                    # Print sample values from both columns for debugging
-                                    print(f"Sample Job Codecopy values: {filtered_dfpurifierjobs['Job Codecopy'].iloc[:5].tolist()}")
-                                    print(f"Sample {job_code_col} values: {dfpurifiers[job_code_col].iloc[:5].tolist()}")
-
-                                    # Merge filtered_dfpurifierjobs with dfpurifiers on matching job codes
-                                    result_dfpurifiers = filtered_dfpurifierjobs.merge(
-                                        dfpurifiers, 
-                                        left_on='Job Codecopy', 
-                                        right_on=job_code_col, 
-                                        suffixes=('_filtered', '_ref')
-                                    )
-
-                                    # Reset index of the result DataFrame
-                                    result_dfpurifiers.reset_index(drop=True, inplace=True)
-
-                                    # Check for title column with different possible names
-                                    title_col = None
-                                    for possible_title in ['Title', 'J3 Job Title', 'Task Description', 'Job Title']:
-                                        if possible_title in result_dfpurifiers.columns:
-                                            title_col = possible_title
-                                            print(f"Found title column: {title_col}")
-                                            break
-
-                                    # Create pivot table if we have the necessary columns
-                                    if title_col is not None and 'Machinery Location' in result_dfpurifiers.columns:
-                                        pivot_table_resultpurifierJobs = result_dfpurifiers.pivot_table(
-                                            index=title_col, 
-                                            columns='Machinery Location', 
-                                            values='Job Codecopy', 
-                                            aggfunc='count'
-                                            ).fillna(0).astype(int)  # Fill NaNs with 0s and convert to int
-
-                                        # Apply color formatting only to numeric part
-                                        # numeric_cols = pivot_table_resultpurifierJobs.select_dtypes(include=[np.number]).columns
-                                        styled_pivotpurifier = pivot_table_resultpurifierJobs.style.applymap(color_binary_cells)
-
-                                        # Display styled dataframe
-                                        st.dataframe(
-                                            styled_pivotpurifier,
-                                            use_container_width=True,
-                                            column_config={
-                                                pivot_table_resultpurifierJobs.index.name or title_col: st.column_config.TextColumn(
-                                                    label=title_col,
-                                                    width="large"
-                                                )
-                                            }
-                                        )
-
-                                        # Provide download option
-                                        csv_pivot = pivot_table_resultpurifierJobs.to_csv()
-                                        st.download_button(
-                                            label="Download Reference Jobs Pivot Table CSV",
-                                            data=csv_pivot,
-                                            file_name="purifier_ref_jobs_pivot.csv",
-                                            mime="text/csv"
-                                        )
-                                else:
-                                    st.info("Required columns for pivot table not found in merged data.")
-                            except Exception as e:
-                                st.error(f"Error creating purifier reference pivot table: {str(e)}")
-                        else:
-                            st.info("No reference job data available for purifiers.")
+                        st.info("No reference job data available for purifiers.")
 
                     # Display Missing Jobs for Purifiers
                     st.subheader("Missing Jobs for Purifiers")
                     if not missing_jobs_purifier.empty:
                         # Use the HTML rendering approach to avoid JavaScript errors
-                        st.write(missing_jobs_purifier.to_html(index=False), unsafe_allow_html=True)
+                        paged_table(missing_jobs_purifier, key="missing_jobs_purifier", hide_index=True)
 
                         # Provide download option
-                        csv = missing_jobs_purifier.to_csv(index=False)
-                        st.download_button(
+                        download_table(
+                            missing_jobs_purifier,
                             label="Download Missing Jobs CSV",
-                            data=csv,
                             file_name="purifier_missing_jobs.csv",
-                            mime="text/csv"
+                            index=False
                         )
                     else:
                         st.info("No missing jobs analysis available for purifiers.")
@@ -1032,7 +1143,7 @@ if uploaded_file is not None:
             st.header("Ballast Water Treatment System (BWTS) Analysis")
 
             # Initialize BWTSProcessor
-            bwts_processor = BWTSProcessor()
+            bwts_processor = perf.instrument(BWTSProcessor())
 
             # BWTS Running Hours section removed as requested
 
@@ -1042,15 +1153,14 @@ if uploaded_file is not None:
                 task_count = bwts_processor.create_task_count_table(data)
                 if not task_count.empty:
                     # Use HTML rendering approach to avoid JS errors
-                    st.write(task_count.to_html(index=False), unsafe_allow_html=True)
+                    paged_table(task_count, key="bwts_task_count", hide_index=True)
 
                     # Provide download option
-                    csv = task_count.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        task_count,
                         label="Download Task Count CSV",
-                        data=csv,
                         file_name="bwts_task_count.csv",
-                        mime="text/csv"
+                        index=False
                     )
                 else:
                     st.info("No task count data available for BWTS.")
@@ -1066,131 +1176,42 @@ if uploaded_file is not None:
 
                     st.info(f"Using Reference Sheet: {selected_sheet_name} for {selected_bwts_model}")
 
-                    # Get missing jobs data using the selected model's sheet name
-                    missing_jobs_bwts = bwts_processor.process_reference_data(data, ref_sheet, preferred_sheet=selected_sheet_name)
-
-                    # Generate result_dfbwts data
-                    # Create a copy of data to avoid modifications to original
-                    data_copy = data.copy()
-
-                    # Filter for BWTS jobs with more flexible patterns
-                    bwts_patterns = ['Ballast Water Treatment Plant', 'BWTS', 'Ballast Treatment']
-                    mask = data_copy['Machinery Location'].str.contains('|'.join(bwts_patterns), case=False, na=False)
-                    filtered_dfbwtsjobs = data_copy[mask].copy()
+                    # Matched jobs, pivot and missing jobs for the selected model's sheet, computed once
+                    bwts_result = bwts_processor.match_reference(data, ref_sheet, preferred_sheet=selected_sheet_name)
+                    missing_jobs_bwts = bwts_result.missing
+                    if bwts_result.schema is not None and bwts_result.schema.sheet != selected_sheet_name:
+                        st.warning(f"Sheet '{selected_sheet_name}' not found; using '{bwts_result.schema.sheet}'")
 
-                    # Read the reference sheet
-                    ref_sheet_names = pd.ExcelFile(ref_sheet).sheet_names
+                    # Display Reference Jobs for BWTS
+                    st.subheader("Reference Jobs for BWTS")
+                    if not bwts_result.pivot.empty:
+                        pivot_table_resultbwtsJobs = bwts_result.pivot
 
-                    # First try to use the selected model sheet
-                    bwts_sheet = selected_sheet_name if selected_sheet_name in ref_sheet_names else None
+                        # Display the pivot table
+                        paged_table(pivot_table_resultbwtsJobs, key="pivot_table_resultbwtsJobs")
 
-                    # If the selected sheet doesn't exist, fall back to default behavior
-                    if bwts_sheet is None:
-                        # Look for 'BWTS' sheet
-                        bwts_sheet = 'BWTS' if 'BWTS' in ref_sheet_names else None
-
-                        # If not found, try to find any sheet with 'BWTS', 'Ballast' or 'Water' in the name
-                        if bwts_sheet is None:
-                            for sheet in ref_sheet_names:
-                                if 'BWTS' in sheet or 'Ballast' in sheet or 'Water' in sheet:
-                                    bwts_sheet = sheet
-                                    break
-
-                        # If still no BWTS-specific sheet, use the first sheet
-                        if bwts_sheet is None:
-                            bwts_sheet = ref_sheet_names[0]
-                            print(f"Selected sheet '{selected_sheet_name}' not found. No BWTS sheet found in app.py, using the first sheet: {bwts_sheet}")
-                        else:
-                            print(f"Selected sheet '{selected_sheet_name}' not found. Using reference sheet in app.py: {bwts_sheet}")
+                        # Provide download option
+                        download_table(
+                            pivot_table_resultbwtsJobs,
+                            label="Download Reference Jobs Pivot Table CSV",
+                            file_name="bwts_ref_jobs_pivot.csv"
+                        )
+                        st.caption(f"{bwts_result.matched_count} of {bwts_result.reference_count} reference jobs found")
                     else:
-                        print(f"Using selected model sheet in app.py: {bwts_sheet}")
-
-                    # Read the reference sheet
-                    dfbwts = pd.read_excel(ref_sheet, sheet_name=bwts_sheet)
-
-                    # Create Job Codecopy column
-                    if 'Job Code' in filtered_dfbwtsjobs.columns:
-                        filtered_dfbwtsjobs['Job Codecopy'] = filtered_dfbwtsjobs['Job Code'].astype(str)
-
-                        # Display Reference Jobs for BWTS
-                        st.subheader("Reference Jobs for BWTS")
-                        if not filtered_dfbwtsjobs.empty and not dfbwts.empty:
-                            try:
-                                # Display the columns in the reference data (for debugging)
-                                print(f"Columns in reference data: {dfbwts.columns.tolist()}")
-
-                                # Check which column to use for job code in reference data
-                                job_code_col = None
-                                for possible_col in ['UI Job Code', 'Job Code', 'JobCode', 'Code']:
-                                    if possible_col in dfbwts.columns:
-                                        job_code_col = possible_col
-                                        print(f"Found job code column: {job_code_col}")
-                                        break
-
-                                if job_code_col is not None:
-                                    # Convert job codes to string for proper matching
-                                    dfbwts[job_code_col] = dfbwts[job_code_col].astype(str)
-
-                                    # Print sample values for debugging
-                                    print(f"Sample Job Codecopy values: {filtered_dfbwtsjobs['Job Codecopy'].iloc[:5].tolist()}")
-                                    print(f"Sample {job_code_col} values: {dfbwts[job_code_col].iloc[:5].tolist()}")
-
-                                    # Merge filtered_dfbwtsjobs with dfbwts on the matching job codes
-                                    result_dfbwts = filtered_dfbwtsjobs.merge(dfbwts, left_on='Job Codecopy', right_on=job_code_col, suffixes=('_filtered', '_ref'))
-
-                                    # Reset index of the result DataFrame
-                                    result_dfbwts.reset_index(drop=True, inplace=True)
-
-                                    # Check for title column with different possible names
-                                    title_col = None
-                                    for possible_title in ['Title', 'J3 Job Title', 'Task Description', 'Job Title']:
-                                        if possible_title in result_dfbwts.columns:
-                                            title_col = possible_title
-                                            print(f"Found title column: {title_col}")
-                                            break
-
-                                    # Create pivot table if we have the necessary columns
-                                    if title_col is not None and 'Machinery Location' in result_dfbwts.columns:
-                                        pivot_table_resultbwtsJobs = result_dfbwts.pivot_table(
-                                            index=title_col, 
-                                            columns='Machinery Location', 
-                                            values='Job Codecopy', 
-                                            aggfunc='count'
-                                        )
-
-                                        # Display the pivot table
-                                        st.write(pivot_table_resultbwtsJobs.to_html(), unsafe_allow_html=True)
-
-                                        # Provide download option
-                                        csv_pivot = pivot_table_resultbwtsJobs.to_csv()
-                                        st.download_button(
-                                            label="Download Reference Jobs Pivot Table CSV",
-                                            data=csv_pivot,
-                                            file_name="bwts_ref_jobs_pivot.csv",
-                                            mime="text/csv"
-                                        )
-                                    else:
-                                        st.info("Required columns for pivot table not found in merged data.")
-                                else:
-                                    st.info("No job code column found in reference data.")
-                            except Exception as e:
-                                st.error(f"Error creating BWTS reference pivot table: {str(e)}")
-                        else:
-                            st.info("No reference job data available for BWTS.")
+                        st.info("No reference job data available for BWTS.")
 
                     # Display Missing Jobs for BWTS
                     st.subheader("Missing Jobs for BWTS")
                     if not missing_jobs_bwts.empty:
                         # Use the HTML rendering approach to avoid JavaScript errors
-                        st.write(missing_jobs_bwts.to_html(index=False), unsafe_allow_html=True)
+                        paged_table(missing_jobs_bwts, key="missing_jobs_bwts", hide_index=True)
 
                         # Provide download option
-                        csv = missing_jobs_bwts.to_csv(index=False)
-                        st.download_button(
+                        download_table(
+                            missing_jobs_bwts,
                             label="Download Missing Jobs CSV",
-                            data=csv,
                             file_name="bwts_missing_jobs.csv",
-                            mime="text/csv"
+                            index=False
                         )
                     else:
                         st.info("No missing jobs analysis available for BWTS.")
@@ -1203,7 +1224,7 @@ if uploaded_file is not None:
             st.header("Hatch Analysis")
 
             # Initialize HatchProcessor
-            hatch_processor = HatchProcessor()
+            hatch_processor = perf.instrument(HatchProcessor())
 
             try:
                 # Task Count Analysis
@@ -1211,15 +1232,14 @@ if uploaded_file is not None:
                 task_count = hatch_processor.create_task_count_table(data)
                 if not task_count.empty:
                     # Use HTML rendering approach to avoid JS errors
-                    st.write(task_count.to_html(index=False), unsafe_allow_html=True)
+                    paged_table(task_count, key="hatch_task_count", hide_index=True)
 
                     # Provide download option
-                    csv = task_count.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        task_count,
                         label="Download Task Count CSV",
-                        data=csv,
                         file_name="hatch_task_count.csv",
-                        mime="text/csv"
+                        index=False
                     )
                 else:
                     st.info("No task count data available for hatches.")
@@ -1231,14 +1251,13 @@ if uploaded_file is not None:
             try:
                 # Reference Job Analysis
                 if ref_sheet is not None:
-                    # Create reference pivot table for Hatch Covers
-                    pivot_table_hatch = hatch_processor.create_reference_pivot_table(data, ref_sheet)
+                    # Pivot and missing jobs come from one match against the reference sheet
+                    hatch_result = hatch_processor.match_reference(data, ref_sheet)
+                    pivot_table_hatch = hatch_result.pivot
 
                     # Display Reference Jobs Pivot Table for Hatch Covers 
                     st.subheader("Reference Jobs for Hatch Covers")
                     if not pivot_table_hatch.empty:
-                        pivot_table_hatch = pivot_table_hatch.fillna(0).astype(int)
-
                         # Apply conditional formatting
                         styled_pivothatch = pivot_table_hatch.style.applymap(
                             color_binary_cells
@@ -1246,8 +1265,8 @@ if uploaded_file is not None:
 
                         # Display styled dataframe with wider first column
                         st.subheader("Reference Jobs for Hatch Covers")
-                        st.dataframe(
-                            styled_pivothatch,
+                        paged_table(
+                            styled_pivothatch, key="pivothatch",
                             use_container_width=True,
                             column_config={
                                 pivot_table_hatch.index.name or pivot_table_hatch.columns[0]: st.column_config.TextColumn(
@@ -1257,32 +1276,28 @@ if uploaded_file is not None:
                             }
                         )
                         # Provide download option for pivot table
-                        csv_pivot = pivot_table_hatch.to_csv()
-                        st.download_button(
+                        download_table(
+                            pivot_table_hatch,
                             label="Download Reference Jobs Pivot Table CSV",
-                            data=csv_pivot,
-                            file_name="hatch_ref_jobs_pivot.csv",
-                            mime="text/csv"
+                            file_name="hatch_ref_jobs_pivot.csv"
                         )
                     else:
                         st.info("No reference jobs pivot table available for hatches.")
 
-                    # Get missing jobs data
-                    missing_jobs_hatch = hatch_processor.process_reference_data(data, ref_sheet)
+                    missing_jobs_hatch = hatch_result.missing
 
                     # Display Missing Jobs for Hatch Covers
                     st.subheader("Missing Jobs for Hatch Covers")
                     if not missing_jobs_hatch.empty:
                         # Use the HTML rendering approach to avoid JavaScript errors
-                        st.write(missing_jobs_hatch.to_html(index=False), unsafe_allow_html=True)
+                        paged_table(missing_jobs_hatch, key="missing_jobs_hatch", hide_index=True)
 
                         # Provide download option
-                        csv = missing_jobs_hatch.to_csv(index=False)
-                        st.download_button(
+                        download_table(
+                            missing_jobs_hatch,
                             label="Download Missing Jobs CSV",
-                            data=csv,
                             file_name="hatch_missing_jobs.csv",
-                            mime="text/csv"
+                            index=False
                         )
                     else:
                         st.info("No missing jobs analysis available for hatches.")
@@ -1295,7 +1310,7 @@ if uploaded_file is not None:
             st.header("Cargo Pumping System Analysis")
 
             # Initialize processor
-            cargopump_processor = CargoPumpingProcessor()
+            cargopump_processor = perf.instrument(CargoPumpingProcessor())
 
             # First: process data with reference
             if ref_sheet is not None:
@@ -1306,14 +1321,13 @@ if uploaded_file is not None:
                     st.subheader("Task Count Analysis for Cargo Pumping")
                     task_count = cargopump_processor.create_task_count_table()
                     if task_count is not None and hasattr(task_count, 'to_html'):
-                        st.write(task_count.to_html(index=False), unsafe_allow_html=True)
+                        paged_table(task_count, key="cargo_pumping_task_count", hide_index=True)
 
-                        csv = cargopump_processor.result_dfcargopumping.to_csv(index=False)
-                        st.download_button(
+                        download_table(
+                            cargopump_processor.result_dfcargopumping,
                             label="Download Task Count CSV",
-                            data=csv,
                             file_name="cargo_pumping_task_count.csv",
-                            mime="text/csv"
+                            index=False
                         )
                     else:
                         st.info("No task count data available.")
@@ -1330,14 +1344,13 @@ if uploaded_file is not None:
                     # Remove duplicates by UI Job Code
                     filtered_matched_jobs = filtered_matched_jobs.drop_duplicates(subset=['UI Job Code'])
 
-                    st.write(filtered_matched_jobs.to_html(index=False), unsafe_allow_html=True)
+                    paged_table(filtered_matched_jobs, key="cargo_pumping_matched_jobs", hide_index=True)
 
-                    csv = filtered_matched_jobs.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        filtered_matched_jobs,
                         label="Download Matched Jobs CSV",
-                        data=csv,
                         file_name="cargo_pumping_matched_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
                 else:
                     st.info("No matching jobs found for Cargo Pumping.")
@@ -1345,14 +1358,13 @@ if uploaded_file is not None:
                 st.subheader("Missing Jobs for Cargo Pumping")
                 missing_jobs = cargopump_processor.missingjobscargopumpingresult
                 if not missing_jobs.empty:
-                    st.write(missing_jobs.to_html(index=False), unsafe_allow_html=True)
+                    paged_table(missing_jobs, key="cargo_pumping_missing_jobs", hide_index=True)
 
-                    csv = missing_jobs.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        missing_jobs,
                         label="Download Missing Jobs CSV",
-                        data=csv,
                         file_name="cargo_pumping_missing_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
                 else:
                     st.info("No missing job codes for Cargo Pumping.")
@@ -1362,7 +1374,7 @@ if uploaded_file is not None:
         elif st.session_state.current_tab == 7:
             st.header("Inert Gas System Analysis")
 
-            ig_processor = InertGasSystemProcessor()
+            ig_processor = perf.instrument(InertGasSystemProcessor())
 
             if ref_sheet is not None:
                 matched_jobs = ig_processor.process_reference_data(data, ref_sheet)
@@ -1371,14 +1383,13 @@ if uploaded_file is not None:
                     st.subheader("Task Count Analysis for Inert Gas System")
                     task_count = ig_processor.create_task_count_table()
                     if task_count is not None and hasattr(task_count, 'to_html'):
-                        st.write(task_count.to_html(index=False), unsafe_allow_html=True)
+                        paged_table(task_count, key="inert_gas_task_count", hide_index=True)
 
-                        csv = ig_processor.result_df_igsystem.to_csv(index=False)
-                        st.download_button(
+                        download_table(
+                            ig_processor.result_df_igsystem,
                             label="Download Task Count CSV",
-                            data=csv,
                             file_name="igsystem_task_count.csv",
-                            mime="text/csv"
+                            index=False
                         )
                     else:
                         st.info("No task count data available.")
@@ -1395,14 +1406,13 @@ if uploaded_file is not None:
                     # Remove duplicates by UI Job Code
                     filtered_matched_jobs = filtered_matched_jobs.drop_duplicates(subset=['UI Job Code'])
 
-                    st.write(filtered_matched_jobs.to_html(index=False), unsafe_allow_html=True)
+                    paged_table(filtered_matched_jobs, key="inert_gas_matched_jobs", hide_index=True)
 
-                    csv = filtered_matched_jobs.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        filtered_matched_jobs,
                         label="Download Matched Jobs CSV",
-                        data=csv,
                         file_name="igsystem_matched_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
                 else:
                     st.info("No matching jobs found for Inert Gas System.")
@@ -1410,14 +1420,13 @@ if uploaded_file is not None:
                 st.subheader("Missing Jobs for Inert Gas System")
                 missing_jobs = ig_processor.missing_jobs_igsystem
                 if not missing_jobs.empty:
-                    st.dataframe(missing_jobs)
+                    paged_table(missing_jobs, key="inert_gas_missing_jobs")
 
-                    csv = missing_jobs.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        missing_jobs,
                         label="Download Missing Jobs CSV",
-                        data=csv,
                         file_name="igsystem_missing_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
                 else:
                     st.info("No missing jobs from reference for Inert Gas System.")
@@ -1427,7 +1436,7 @@ if uploaded_file is not None:
         elif st.session_state.current_tab == 8:
             st.header("Cargo Handling System Analysis")
 
-            chs_processor = CargoHandlingSystemProcessor()
+            chs_processor = perf.instrument(CargoHandlingSystemProcessor())
 
             if ref_sheet is not None:
                 matched_jobs = chs_processor.process_reference_data(data, ref_sheet)
@@ -1436,14 +1445,13 @@ if uploaded_file is not None:
                     st.subheader("Task Count Analysis for Cargo Handling System")
                     task_count = chs_processor.create_task_count_table()
                     if task_count is not None and hasattr(task_count, 'to_html'):
-                        st.write(task_count.to_html(index=False), unsafe_allow_html=True)
+                        paged_table(task_count, key="cargo_handling_task_count", hide_index=True)
 
-                        csv = chs_processor.result_df_cargohandling.to_csv(index=False)
-                        st.download_button(
+                        download_table(
+                            chs_processor.result_df_cargohandling,
                             label="Download Task Count CSV",
-                            data=csv,
                             file_name="cargohandling_task_count.csv",
-                            mime="text/csv"
+                            index=False
                         )
                     else:
                         st.info("No task count data available.")
@@ -1460,14 +1468,13 @@ if uploaded_file is not None:
                     # Remove duplicates by UI Job Code
                     filtered_matched_jobs = filtered_matched_jobs.drop_duplicates(subset=['UI Job Code'])
 
-                    st.write(filtered_matched_jobs.to_html(index=False), unsafe_allow_html=True)
+                    paged_table(filtered_matched_jobs, key="cargo_handling_matched_jobs", hide_index=True)
 
-                    csv = filtered_matched_jobs.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        filtered_matched_jobs,
                         label="Download Matched Jobs CSV",
-                        data=csv,
                         file_name="cargohandling_matched_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
                 else:
                     st.info("No matching jobs found for Cargo Handling System.")
@@ -1475,14 +1482,13 @@ if uploaded_file is not None:
                 st.subheader("Missing Jobs for Cargo Handling System")
                 missing_jobs = chs_processor.missing_jobs_cargohandling
                 if not missing_jobs.empty:
-                    st.dataframe(missing_jobs)
+                    paged_table(missing_jobs, key="cargo_handling_missing_jobs")
 
-                    csv = missing_jobs.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        missing_jobs,
                         label="Download Missing Jobs CSV",
-                        data=csv,
                         file_name="cargohandling_missing_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
                 else:
                     st.info("No missing jobs from reference for Cargo Handling System.")
@@ -1493,7 +1499,7 @@ if uploaded_file is not None:
         elif st.session_state.current_tab == 9:
             st.header("Cargo Venting System Analysis")
 
-            cvs_processor = CargoVentingSystemProcessor()
+            cvs_processor = perf.instrument(CargoVentingSystemProcessor())
 
             if ref_sheet is not None:
                 matched_jobs = cvs_processor.process_reference_data(data, ref_sheet)
@@ -1502,14 +1508,13 @@ if uploaded_file is not None:
                     st.subheader("Task Count Analysis for Cargo Venting System")
                     task_count = cvs_processor.create_task_count_table()
                     if task_count is not None and hasattr(task_count, 'to_html'):
-                        st.write(task_count.to_html(index=False), unsafe_allow_html=True)
+                        paged_table(task_count, key="cargo_venting_task_count", hide_index=True)
 
-                        csv = cvs_processor.result_df_cargovent.to_csv(index=False)
-                        st.download_button(
+                        download_table(
+                            cvs_processor.result_df_cargovent,
                             label="Download Task Count CSV",
-                            data=csv,
                             file_name="cargoventing_task_count.csv",
-                            mime="text/csv"
+                            index=False
                         )
                     else:
                         st.info("No task count data available.")
@@ -1526,14 +1531,13 @@ if uploaded_file is not None:
                     # Remove duplicates by UI Job Code
                     filtered_matched_jobs = filtered_matched_jobs.drop_duplicates(subset=['UI Job Code'])
 
-                    st.write(filtered_matched_jobs.to_html(index=False), unsafe_allow_html=True)
+                    paged_table(filtered_matched_jobs, key="cargo_venting_matched_jobs", hide_index=True)
 
-                    csv = filtered_matched_jobs.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        filtered_matched_jobs,
                         label="Download Matched Jobs CSV",
-                        data=csv,
                         file_name="cargoventing_matched_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
                 else:
                     st.info("No matching jobs found for Cargo Venting System.")
@@ -1541,14 +1545,13 @@ if uploaded_file is not None:
                 st.subheader("Missing Jobs for Cargo Venting System")
                 missing_jobs = cvs_processor.missing_jobs_cargovent
                 if not missing_jobs.empty:
-                    st.dataframe(missing_jobs)
+                    paged_table(missing_jobs, key="cargo_venting_missing_jobs")
 
-                    csv = missing_jobs.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        missing_jobs,
                         label="Download Missing Jobs CSV",
-                        data=csv,
                         file_name="cargoventing_missing_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
                 else:
                     st.info("No missing jobs from reference for Cargo Venting System.")
@@ -1559,7 +1562,7 @@ if uploaded_file is not None:
         elif st.session_state.current_tab == 10:
                 st.header("LSA/FFA System Analysis")
 
-                lsaffa_processor = LSAFFAProcessor()
+                lsaffa_processor = perf.instrument(LSAFFAProcessor())
 
                 if ref_sheet is not None:
                     matched_jobs = lsaffa_processor.process_reference_data(data, ref_sheet)
@@ -1568,14 +1571,13 @@ if uploaded_file is not None:
                         st.subheader("Task Count Analysis for LSA/FFA")
                         task_count = lsaffa_processor.create_task_count_table()
                         if task_count is not None and hasattr(task_count, 'to_html'):
-                            st.write(task_count.to_html(index=False), unsafe_allow_html=True)
+                            paged_table(task_count, key="lsa_ffa_task_count", hide_index=True)
 
-                            csv = lsaffa_processor.result_df_lsaffa.to_csv(index=False)
-                            st.download_button(
+                            download_table(
+                                lsaffa_processor.result_df_lsaffa,
                                 label="Download Task Count CSV",
-                                data=csv,
                                 file_name="lsaffa_task_count.csv",
-                                mime="text/csv"
+                                index=False
                             )
                         else:
                             st.info("No task count data available.")
@@ -1587,13 +1589,12 @@ if uploaded_file is not None:
                         display_cols = ['Machinery', 'UI Job Code', 'J3 Job Title', 'Remarks', 'Applicability']
                         filtered_matched_jobs = matched_jobs[[col for col in display_cols if col in matched_jobs.columns]]
 
-                        st.write(filtered_matched_jobs.to_html(index=False), unsafe_allow_html=True)
-                        csv = matched_jobs.to_csv(index=False)
-                        st.download_button(
+                        paged_table(filtered_matched_jobs, key="lsa_ffa_matched_jobs", hide_index=True)
+                        download_table(
+                            matched_jobs,
                             label="Download Matched Jobs CSV",
-                            data=csv,
                             file_name="lsaffa_matched_jobs.csv",
-                            mime="text/csv"
+                            index=False
                         )
                     else:
                         st.info("No matching jobs found for LSA/FFA.")
@@ -1601,14 +1602,13 @@ if uploaded_file is not None:
                     st.subheader("Missing Jobs for LSA/FFA")
                     missing_jobs = lsaffa_processor.missing_jobs_lsaffa
                     if not missing_jobs.empty:
-                        st.dataframe(missing_jobs)
+                        paged_table(missing_jobs, key="lsa_ffa_missing_jobs")
 
-                        csv = missing_jobs.to_csv(index=False)
-                        st.download_button(
+                        download_table(
+                            missing_jobs,
                             label="Download Missing Jobs CSV",
-                            data=csv,
                             file_name="lsaffa_missing_jobs.csv",
-                            mime="text/csv"
+                            index=False
                         )
                     else:
                         st.info("No missing jobs from reference for LSA/FFA.")
@@ -1618,7 +1618,7 @@ if uploaded_file is not None:
         elif st.session_state.current_tab == 11:
                 st.header("Fire Fighting System Analysis")
 
-                ffasys_processor = FFASystemProcessor()
+                ffasys_processor = perf.instrument(FFASystemProcessor())
 
                 if ref_sheet is not None:
                     matched_jobs = ffasys_processor.process_reference_data(data, ref_sheet)
@@ -1627,14 +1627,13 @@ if uploaded_file is not None:
                         st.subheader("Task Count Analysis for Fire Fighting System")
                         task_count = ffasys_processor.create_task_count_table()
                         if task_count is not None and hasattr(task_count, 'to_html'):
-                            st.write(task_count.to_html(index=False), unsafe_allow_html=True)
+                            paged_table(task_count, key="fire_fighting_task_count", hide_index=True)
 
-                            csv = ffasys_processor.result_df_ffasys.to_csv(index=False)
-                            st.download_button(
+                            download_table(
+                                ffasys_processor.result_df_ffasys,
                                 label="Download Task Count CSV",
-                                data=csv,
                                 file_name="ffasys_task_count.csv",
-                                mime="text/csv"
+                                index=False
                             )
                         else:
                             st.info("No task count data available.")
@@ -1646,14 +1645,13 @@ if uploaded_file is not None:
                         display_cols = ['Machinery', 'UI Job Code', 'J3 Job Title', 'Remarks', 'Applicability']
                         filtered_matched_jobs = matched_jobs[[col for col in display_cols if col in matched_jobs.columns]]
 
-                        st.write(filtered_matched_jobs.to_html(index=False), unsafe_allow_html=True)
+                        paged_table(filtered_matched_jobs, key="fire_fighting_matched_jobs", hide_index=True)
 
-                        csv = matched_jobs.to_csv(index=False)
-                        st.download_button(
+                        download_table(
+                            matched_jobs,
                             label="Download Matched Jobs CSV",
-                            data=csv,
                             file_name="ffasys_matched_jobs.csv",
-                            mime="text/csv"
+                            index=False
                         )
                     else:
                         st.info("No matching jobs found for Fire Fighting System.")
@@ -1661,14 +1659,13 @@ if uploaded_file is not None:
                     st.subheader("Missing Jobs for Fire Fighting System")
                     missing_jobs = ffasys_processor.missing_jobs_ffasys
                     if not missing_jobs.empty:
-                        st.dataframe(missing_jobs)
+                        paged_table(missing_jobs, key="fire_fighting_missing_jobs")
 
-                        csv = missing_jobs.to_csv(index=False)
-                        st.download_button(
+                        download_table(
+                            missing_jobs,
                             label="Download Missing Jobs CSV",
-                            data=csv,
                             file_name="ffasys_missing_jobs.csv",
-                            mime="text/csv"
+                            index=False
                         )
                     else:
                         st.info("No missing jobs from reference for Fire Fighting System.")
@@ -1679,44 +1676,41 @@ if uploaded_file is not None:
         elif st.session_state.current_tab == 12:
                 st.header("Pump System Analysis")
 
-                pump_processor = PumpSystemProcessor()
+                pump_processor = perf.instrument(PumpSystemProcessor())
 
                 if ref_sheet is not None:
                     try:
-                        dfpump = pd.read_excel(ref_sheet, sheet_name='Pumps')
+                        dfpump = perf.read_reference(ref_sheet, sheet_name='Pumps')
                         pump_output = pump_processor.process_pump_data(data, dfpump)
 
                         # 🔹 Display Pump Count by Location
                         st.subheader("Pump Location Task Count")
                         if pump_processor.styled_pivot_table_pump is not None:
-                            st.markdown(pump_processor.styled_pivot_table_pump.to_html(), unsafe_allow_html=True)
+                            paged_table(pump_processor.styled_pivot_table_pump, key="pump_styled_pivot_table_pump")
                         else:
-                            st.dataframe(pump_processor.pivot_table_pump)
+                            paged_table(pump_processor.pivot_table_pump, key="pump_pivot_table_pump")
 
                         # 🔹 Display Mapped Job Code Summary Table
                         st.subheader("Mapped Job Code Summary Table")
                         if pump_processor.styled_pivot_table_resultpumpJobs is not None:
-                            st.markdown(pump_processor.styled_pivot_table_resultpumpJobs.to_html(), unsafe_allow_html=True)
+                            paged_table(pump_processor.styled_pivot_table_resultpumpJobs, key="pump_styled_pivot_table_resultpumpJobs")
                         elif not pump_processor.pivot_table_resultpumpJobs.empty:
-                            st.dataframe(pump_processor.pivot_table_resultpumpJobs)
+                            paged_table(pump_processor.pivot_table_resultpumpJobs, key="pump_pivot_table_resultpumpJobs")
                         else:
                             st.info("No mapped pump jobs found to display.")
 
                         # 🔹 Download Buttons
-                        csv1 = pump_processor.filtered_dfpump.to_csv(index=False)
-                        st.download_button(
+                        download_table(
+                            pump_processor.filtered_dfpump,
                             label="Download Mapped Pump Jobs CSV",
-                            data=csv1,
                             file_name="mapped_pump_jobs.csv",
-                            mime="text/csv"
+                            index=False
                         )
 
-                        csv2 = pump_processor.pivot_table_resultpumpJobs.to_csv()
-                        st.download_button(
+                        download_table(
+                            pump_processor.pivot_table_resultpumpJobs,
                             label="Download Job Code Summary CSV",
-                            data=csv2,
-                            file_name="pump_summary_table.csv",
-                            mime="text/csv"
+                            file_name="pump_summary_table.csv"
                         )
 
                     except Exception as e:
@@ -1728,19 +1722,19 @@ if uploaded_file is not None:
         elif st.session_state.current_tab == 13:
             st.header("Compressor System Analysis")
 
-            compressor_processor = CompressorSystemProcessor()
+            compressor_processor = perf.instrument(CompressorSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfCompressor = pd.read_excel(ref_sheet, sheet_name='Compressor')
+                    dfCompressor = perf.read_reference(ref_sheet, sheet_name='Compressor')
                     compressor_processor.process_compressor_data(data, dfCompressor)
 
                     st.subheader("Matched Compressor Job Code Summary Table")
                     if compressor_processor.pivot_table_resultCompressorJobs is not None and not compressor_processor.pivot_table_resultCompressorJobs.empty:
                         styled_compressor = compressor_processor.pivot_table_resultCompressorJobs.style.applymap(color_binary_cells)
 
-                        st.dataframe(
-                            styled_compressor,
+                        paged_table(
+                            styled_compressor, key="compressor",
                             use_container_width=True,
                             column_config={
                                 compressor_processor.pivot_table_resultCompressorJobs.index.name or compressor_processor.pivot_table_resultCompressorJobs.columns[0]: st.column_config.TextColumn(
@@ -1754,25 +1748,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Compressor Reference")
                     if not compressor_processor.missingjobsCompressorresult.empty:
-                        st.dataframe(compressor_processor.missingjobsCompressorresult)
+                        paged_table(compressor_processor.missingjobsCompressorresult, key="compressor_missingjobsCompressorresult")
                     else:
                         st.success("All job codes are matched in the Compressor reference sheet.")
 
                     # Downloads
-                    csv1 = compressor_processor.result_dfCompressor.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        compressor_processor.result_dfCompressor,
                         label="Download Matched Compressor Jobs CSV",
-                        data=csv1,
                         file_name="matched_compressor_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = compressor_processor.pivot_table_resultCompressorJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        compressor_processor.pivot_table_resultCompressorJobs,
                         label="Download Compressor Summary Table CSV",
-                        data=csv2,
-                        file_name="compressor_summary_table.csv",
-                        mime="text/csv"
+                        file_name="compressor_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -1786,19 +1777,19 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Ladder System Analysis")
 
-            ladder_processor = LadderSystemProcessor()
+            ladder_processor = perf.instrument(LadderSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfLadder = pd.read_excel(ref_sheet, sheet_name='Ladders')
+                    dfLadder = perf.read_reference(ref_sheet, sheet_name='Ladders')
                     ladder_processor.process_ladder_data(data, dfLadder)
 
                     st.subheader("Matched Ladder Job Code Summary Table")
                     if ladder_processor.pivot_table_resultLadderJobs is not None and not ladder_processor.pivot_table_resultLadderJobs.empty:
                         styled_ladder = ladder_processor.pivot_table_resultLadderJobs.style.applymap(color_binary_cells)
 
-                        st.dataframe(
-                            styled_ladder,
+                        paged_table(
+                            styled_ladder, key="ladder",
                             use_container_width=True,
                             column_config={
                                 ladder_processor.pivot_table_resultLadderJobs.index.name or ladder_processor.pivot_table_resultLadderJobs.columns[0]: st.column_config.TextColumn(
@@ -1812,25 +1803,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Ladder Reference")
                     if not ladder_processor.missingjobsLadderresult.empty:
-                        st.dataframe(ladder_processor.missingjobsLadderresult)
+                        paged_table(ladder_processor.missingjobsLadderresult, key="ladder_missingjobsLadderresult")
                     else:
                         st.success("All job codes are matched in the Ladder reference sheet.")
 
                     # Downloads
-                    csv1 = ladder_processor.result_dfLadder.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        ladder_processor.result_dfLadder,
                         label="Download Matched Ladder Jobs CSV",
-                        data=csv1,
                         file_name="matched_ladder_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = ladder_processor.pivot_table_resultLadderJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        ladder_processor.pivot_table_resultLadderJobs,
                         label="Download Ladder Summary Table CSV",
-                        data=csv2,
-                        file_name="ladder_summary_table.csv",
-                        mime="text/csv"
+                        file_name="ladder_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -1845,19 +1833,19 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Boat System Analysis")
 
-            boat_processor = BoatSystemProcessor()
+            boat_processor = perf.instrument(BoatSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfBoats = pd.read_excel(ref_sheet, sheet_name='Boats')
+                    dfBoats = perf.read_reference(ref_sheet, sheet_name='Boats')
                     boat_processor.process_boat_data(data, dfBoats)
 
                     st.subheader("Matched Boat Job Code Summary Table")
                     if boat_processor.pivot_table_resultBoatJobs is not None and not boat_processor.pivot_table_resultBoatJobs.empty:
                         styled_boat = boat_processor.pivot_table_resultBoatJobs.style.applymap(color_binary_cells)
 
-                        st.dataframe(
-                            styled_boat,
+                        paged_table(
+                            styled_boat, key="boat",
                             use_container_width=True,
                             column_config={
                                 boat_processor.pivot_table_resultBoatJobs.index.name or boat_processor.pivot_table_resultBoatJobs.columns[0]: st.column_config.TextColumn(
@@ -1871,25 +1859,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Boat Reference")
                     if not boat_processor.missingjobsBoatsresult.empty:
-                        st.dataframe(boat_processor.missingjobsBoatsresult)
+                        paged_table(boat_processor.missingjobsBoatsresult, key="boat_missingjobsBoatsresult")
                     else:
                         st.success("All job codes are matched in the Boat reference sheet.")
 
                     # Downloads
-                    csv1 = boat_processor.result_dfBoat.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        boat_processor.result_dfBoat,
                         label="Download Matched Boat Jobs CSV",
-                        data=csv1,
                         file_name="matched_boat_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = boat_processor.pivot_table_resultBoatJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        boat_processor.pivot_table_resultBoatJobs,
                         label="Download Boat Summary Table CSV",
-                        data=csv2,
-                        file_name="boat_summary_table.csv",
-                        mime="text/csv"
+                        file_name="boat_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -1904,19 +1889,19 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Mooring System Analysis")
 
-            mooring_processor = MooringSystemProcessor()
+            mooring_processor = perf.instrument(MooringSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfMooring = pd.read_excel(ref_sheet, sheet_name='Mooring')
+                    dfMooring = perf.read_reference(ref_sheet, sheet_name='Mooring')
                     mooring_processor.process_mooring_data(data, dfMooring)
 
                     st.subheader("Matched Mooring Job Code Summary Table")
                     if mooring_processor.pivot_table_resultMooringJobs is not None and not mooring_processor.pivot_table_resultMooringJobs.empty:
                         styled_mooring = mooring_processor.pivot_table_resultMooringJobs.style.applymap(color_binary_cells)
 
-                        st.dataframe(
-                            styled_mooring,
+                        paged_table(
+                            styled_mooring, key="mooring",
                             use_container_width=True,
                             column_config={
                                 mooring_processor.pivot_table_resultMooringJobs.index.name or mooring_processor.pivot_table_resultMooringJobs.columns[0]: st.column_config.TextColumn(
@@ -1930,25 +1915,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Mooring Reference")
                     if not mooring_processor.missingjobsMooringresult.empty:
-                        st.dataframe(mooring_processor.missingjobsMooringresult)
+                        paged_table(mooring_processor.missingjobsMooringresult, key="mooring_missingjobsMooringresult")
                     else:
                         st.success("All job codes are matched in the Mooring reference sheet.")
 
                     # Downloads
-                    csv1 = mooring_processor.result_dfMooring.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        mooring_processor.result_dfMooring,
                         label="Download Matched Mooring Jobs CSV",
-                        data=csv1,
                         file_name="matched_mooring_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = mooring_processor.pivot_table_resultMooringJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        mooring_processor.pivot_table_resultMooringJobs,
                         label="Download Mooring Summary Table CSV",
-                        data=csv2,
-                        file_name="mooring_summary_table.csv",
-                        mime="text/csv"
+                        file_name="mooring_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -1964,19 +1946,19 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Steering System Analysis")
 
-            steering_processor = SteeringSystemProcessor()
+            steering_processor = perf.instrument(SteeringSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfSteering = pd.read_excel(ref_sheet, sheet_name='Steering')
+                    dfSteering = perf.read_reference(ref_sheet, sheet_name='Steering')
                     steering_processor.process_steering_data(data, dfSteering)
 
                     st.subheader("Matched Steering Job Code Summary Table")
                     if steering_processor.pivot_table_resultSteeringJobs is not None and not steering_processor.pivot_table_resultSteeringJobs.empty:
                         styled_steering = steering_processor.pivot_table_resultSteeringJobs.style.applymap(color_binary_cells)
 
-                        st.dataframe(
-                            styled_steering,
+                        paged_table(
+                            styled_steering, key="steering",
                             use_container_width=True,
                             column_config={
                                 steering_processor.pivot_table_resultSteeringJobs.index.name or steering_processor.pivot_table_resultSteeringJobs.columns[0]: st.column_config.TextColumn(
@@ -1990,25 +1972,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Steering Reference")
                     if not steering_processor.missingjobsSteeringresult.empty:
-                        st.dataframe(steering_processor.missingjobsSteeringresult)
+                        paged_table(steering_processor.missingjobsSteeringresult, key="steering_missingjobsSteeringresult")
                     else:
                         st.success("All job codes are matched in the Steering reference sheet.")
 
                     # Downloads
-                    csv1 = steering_processor.result_dfSteering.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        steering_processor.result_dfSteering,
                         label="Download Matched Steering Jobs CSV",
-                        data=csv1,
                         file_name="matched_steering_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = steering_processor.pivot_table_resultSteeringJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        steering_processor.pivot_table_resultSteeringJobs,
                         label="Download Steering Summary Table CSV",
-                        data=csv2,
-                        file_name="steering_summary_table.csv",
-                        mime="text/csv"
+                        file_name="steering_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -2022,19 +2001,19 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Incinerator System Analysis")
 
-            incin_processor = IncineratorSystemProcessor()
+            incin_processor = perf.instrument(IncineratorSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfIncin = pd.read_excel(ref_sheet, sheet_name='Incin')
+                    dfIncin = perf.read_reference(ref_sheet, sheet_name='Incin')
                     incin_processor.process_incin_data(data, dfIncin)
 
                     st.subheader("Matched Incinerator Job Code Summary Table")
                     if incin_processor.pivot_table_resultIncinJobs is not None and not incin_processor.pivot_table_resultIncinJobs.empty:
                         styled_incin = incin_processor.pivot_table_resultIncinJobs.style.applymap(color_binary_cells)
 
-                        st.dataframe(
-                            styled_incin,
+                        paged_table(
+                            styled_incin, key="incin",
                             use_container_width=True,
                             column_config={
                                 incin_processor.pivot_table_resultIncinJobs.index.name or incin_processor.pivot_table_resultIncinJobs.columns[0]: st.column_config.TextColumn(
@@ -2048,25 +2027,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Incinerator Reference")
                     if not incin_processor.missingjobsIncinresult.empty:
-                        st.dataframe(incin_processor.missingjobsIncinresult)
+                        paged_table(incin_processor.missingjobsIncinresult, key="incin_missingjobsIncinresult")
                     else:
                         st.success("All job codes are matched in the Incinerator reference sheet.")
 
                     # Downloads
-                    csv1 = incin_processor.result_dfIncin.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        incin_processor.result_dfIncin,
                         label="Download Matched Incinerator Jobs CSV",
-                        data=csv1,
                         file_name="matched_incinerator_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = incin_processor.pivot_table_resultIncinJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        incin_processor.pivot_table_resultIncinJobs,
                         label="Download Incinerator Summary Table CSV",
-                        data=csv2,
-                        file_name="incinerator_summary_table.csv",
-                        mime="text/csv"
+                        file_name="incinerator_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -2080,11 +2056,11 @@ if uploaded_file is not None:
                 with col3:
                     st.header("STP System Analysis")
 
-            stp_processor = STPSystemProcessor()
+            stp_processor = perf.instrument(STPSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfSTP = pd.read_excel(ref_sheet, sheet_name='STP')
+                    dfSTP = perf.read_reference(ref_sheet, sheet_name='STP')
                     stp_processor.process_stp_data(data, dfSTP)
 
                     st.subheader("Matched STP Job Code Summary Table")
@@ -2092,8 +2068,8 @@ if uploaded_file is not None:
                     if stp_processor.pivot_table_resultSTPJobs is not None and not stp_processor.pivot_table_resultSTPJobs.empty:
                         styled_stp = stp_processor.pivot_table_resultSTPJobs.style.applymap(color_binary_cells)
 
-                        st.dataframe(
-                            styled_stp,
+                        paged_table(
+                            styled_stp, key="stp",
                             use_container_width=True,
                             column_config={
                                 stp_processor.pivot_table_resultSTPJobs.index.name or stp_processor.pivot_table_resultSTPJobs.columns[0]: st.column_config.TextColumn(
@@ -2107,25 +2083,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from STP Reference")
                     if not stp_processor.missingjobsSTPresult.empty:
-                        st.dataframe(stp_processor.missingjobsSTPresult)
+                        paged_table(stp_processor.missingjobsSTPresult, key="stp_missingjobsSTPresult")
                     else:
                         st.success("All job codes are matched in the STP reference sheet.")
 
                     # Downloads
-                    csv1 = stp_processor.result_dfSTP.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        stp_processor.result_dfSTP,
                         label="Download Matched STP Jobs CSV",
-                        data=csv1,
                         file_name="matched_stp_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = stp_processor.pivot_table_resultSTPJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        stp_processor.pivot_table_resultSTPJobs,
                         label="Download STP Summary Table CSV",
-                        data=csv2,
-                        file_name="stp_summary_table.csv",
-                        mime="text/csv"
+                        file_name="stp_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -2141,19 +2114,19 @@ if uploaded_file is not None:
                 with col3:
                     st.header("OWS System Analysis")
 
-            ows_processor = OWSSystemProcessor()
+            ows_processor = perf.instrument(OWSSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfOWS = pd.read_excel(ref_sheet, sheet_name='OWS')
+                    dfOWS = perf.read_reference(ref_sheet, sheet_name='OWS')
                     ows_processor.process_ows_data(data, dfOWS)
 
                     st.subheader("Matched OWS Job Code Summary Table")
                     if ows_processor.pivot_table_resultOWSJobs is not None and not ows_processor.pivot_table_resultOWSJobs.empty:
                         styled_ows = ows_processor.pivot_table_resultOWSJobs.style.applymap(color_binary_cells)
 
-                        st.dataframe(
-                            styled_ows,
+                        paged_table(
+                            styled_ows, key="ows",
                             use_container_width=True,
                             column_config={
                                 ows_processor.pivot_table_resultOWSJobs.index.name or ows_processor.pivot_table_resultOWSJobs.columns[0]: st.column_config.TextColumn(
@@ -2167,25 +2140,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from OWS Reference")
                     if not ows_processor.missingjobsOWSresult.empty:
-                        st.dataframe(ows_processor.missingjobsOWSresult)
+                        paged_table(ows_processor.missingjobsOWSresult, key="ows_missingjobsOWSresult")
                     else:
                         st.success("All job codes are matched in the OWS reference sheet.")
 
                     # Downloads
-                    csv1 = ows_processor.result_dfOWS.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        ows_processor.result_dfOWS,
                         label="Download Matched OWS Jobs CSV",
-                        data=csv1,
                         file_name="matched_ows_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = ows_processor.pivot_table_resultOWSJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        ows_processor.pivot_table_resultOWSJobs,
                         label="Download OWS Summary Table CSV",
-                        data=csv2,
-                        file_name="ows_summary_table.csv",
-                        mime="text/csv"
+                        file_name="ows_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -2199,11 +2169,11 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Power Distribution System Analysis")
 
-            powerdist_processor = PowerDistSystemProcessor()
+            powerdist_processor = perf.instrument(PowerDistSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfpowerdist = pd.read_excel(ref_sheet, sheet_name='Powerdist')
+                    dfpowerdist = perf.read_reference(ref_sheet, sheet_name='Powerdist')
                     powerdist_processor.process_powerdist_data(data, dfpowerdist)
 
                     st.subheader("Matched Power Distribution Job Code Summary Table")
@@ -2214,8 +2184,8 @@ if uploaded_file is not None:
 
                         first_col = pivot_df.index.name or (pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1")
 
-                        st.dataframe(
-                            styled_powerdist,
+                        paged_table(
+                            styled_powerdist, key="powerdist",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -2226,25 +2196,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Power Distribution Reference")
                     if not powerdist_processor.missingjobspowerdistresult.empty:
-                        st.dataframe(powerdist_processor.missingjobspowerdistresult)
+                        paged_table(powerdist_processor.missingjobspowerdistresult, key="powerdist_missingjobspowerdistresult")
                     else:
                         st.success("All job codes are matched in the Power Distribution reference sheet.")
 
                     # Downloads
-                    csv1 = powerdist_processor.result_dfpowerdist.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        powerdist_processor.result_dfpowerdist,
                         label="Download Matched Power Distribution Jobs CSV",
-                        data=csv1,
                         file_name="matched_powerdist_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = powerdist_processor.pivot_table_resultpowerdistJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        powerdist_processor.pivot_table_resultpowerdistJobs,
                         label="Download Power Distribution Summary Table CSV",
-                        data=csv2,
-                        file_name="powerdist_summary_table.csv",
-                        mime="text/csv"
+                        file_name="powerdist_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -2258,11 +2225,11 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Crane System Analysis")
 
-            crane_processor = CraneSystemProcessor()
+            crane_processor = perf.instrument(CraneSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfcrane = pd.read_excel(ref_sheet, sheet_name='Crane')
+                    dfcrane = perf.read_reference(ref_sheet, sheet_name='Crane')
                     crane_processor.process_crane_data(data, dfcrane)
 
                     st.subheader("Matched Crane Job Code Summary Table")
@@ -2273,8 +2240,8 @@ if uploaded_file is not None:
 
                         first_col = pivot_df.index.name or (pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1")
 
-                        st.dataframe(
-                            styled_crane,
+                        paged_table(
+                            styled_crane, key="crane",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -2285,25 +2252,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Crane Reference")
                     if not crane_processor.missingjobscraneresult.empty:
-                        st.dataframe(crane_processor.missingjobscraneresult)
+                        paged_table(crane_processor.missingjobscraneresult, key="crane_missingjobscraneresult")
                     else:
                         st.success("All job codes are matched in the Crane reference sheet.")
 
                     # Downloads
-                    csv1 = crane_processor.result_dfcrane.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        crane_processor.result_dfcrane,
                         label="Download Matched Crane Jobs CSV",
-                        data=csv1,
                         file_name="matched_crane_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = crane_processor.pivot_table_resultcraneJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        crane_processor.pivot_table_resultcraneJobs,
                         label="Download Crane Summary Table CSV",
-                        data=csv2,
-                        file_name="crane_summary_table.csv",
-                        mime="text/csv"
+                        file_name="crane_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -2319,11 +2283,11 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Emergency Generator System Analysis")
 
-            emg_processor = EmergencyGenSystemProcessor()
+            emg_processor = perf.instrument(EmergencyGenSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfEmg = pd.read_excel(ref_sheet, sheet_name='Emg')
+                    dfEmg = perf.read_reference(ref_sheet, sheet_name='Emg')
                     emg_processor.process_emg_data(data, dfEmg)
 
                     st.subheader("Matched Emergency Generator Job Code Summary Table")
@@ -2334,8 +2298,8 @@ if uploaded_file is not None:
 
                         first_col = pivot_df.index.name or (pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1")
 
-                        st.dataframe(
-                            styled_emg,
+                        paged_table(
+                            styled_emg, key="emg",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -2346,25 +2310,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Emergency Generator Reference")
                     if not emg_processor.missingjobsEmgresult.empty:
-                        st.dataframe(emg_processor.missingjobsEmgresult)
+                        paged_table(emg_processor.missingjobsEmgresult, key="emg_missingjobsEmgresult")
                     else:
                         st.success("All job codes are matched in the Emergency Generator reference sheet.")
 
                     # Downloads
-                    csv1 = emg_processor.result_dfEmg.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        emg_processor.result_dfEmg,
                         label="Download Matched Emergency Generator Jobs CSV",
-                        data=csv1,
                         file_name="matched_emg_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = emg_processor.pivot_table_resultEmgJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        emg_processor.pivot_table_resultEmgJobs,
                         label="Download Emergency Generator Summary Table CSV",
-                        data=csv2,
-                        file_name="emg_summary_table.csv",
-                        mime="text/csv"
+                        file_name="emg_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -2379,12 +2340,12 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Bridge System Analysis")
 
-            bridge_processor = BridgeSystemProcessor()
+            bridge_processor = perf.instrument(BridgeSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfbridge = pd.read_excel(ref_sheet, sheet_name='Bridge')
-                    bridge_processor.process_bridge_data(data, dfbridge)
+                    dfbridge = perf.read_reference(ref_sheet, sheet_name='Bridge')
+                    bridge_processor.process_bridge_data(data, dfbridge, cube=session_count_cube(results, data))
 
                     st.subheader("Matched Bridge Job Code Summary Table")
                     pivot_df = bridge_processor.pivot_table_resultbridgeJobs  # ✅ correct attribute name
@@ -2394,8 +2355,8 @@ if uploaded_file is not None:
 
                         first_col = pivot_df.index.name or (pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1")
 
-                        st.dataframe(
-                            styled_bridge,
+                        paged_table(
+                            styled_bridge, key="bridge",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -2406,25 +2367,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Bridge Reference")
                     if not bridge_processor.missingjobsbridgeresult.empty:
-                        st.dataframe(bridge_processor.missingjobsbridgeresult)
+                        paged_table(bridge_processor.missingjobsbridgeresult, key="bridge_missingjobsbridgeresult")
                     else:
                         st.success("All job codes are matched in the Bridge reference sheet.")
 
                     # Downloads
-                    csv1 = bridge_processor.result_dfbridge.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        bridge_processor.result_dfbridge,
                         label="Download Matched Bridge Jobs CSV",
-                        data=csv1,
                         file_name="matched_bridge_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = bridge_processor.pivot_table_resultbridgeJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        bridge_processor.pivot_table_resultbridgeJobs,
                         label="Download Bridge Summary Table CSV",
-                        data=csv2,
-                        file_name="bridge_summary_table.csv",
-                        mime="text/csv"
+                        file_name="bridge_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -2439,11 +2397,11 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Reefer & AC System Analysis")
 
-            refac_processor = RefacSystemProcessor()
+            refac_processor = perf.instrument(RefacSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfrefac = pd.read_excel(ref_sheet, sheet_name='Refac')
+                    dfrefac = perf.read_reference(ref_sheet, sheet_name='Refac')
                     refac_processor.process_refac_data(data, dfrefac)
 
                     st.subheader("Matched Reefer & AC Job Code Summary Table")
@@ -2454,8 +2412,8 @@ if uploaded_file is not None:
 
                         first_col = pivot_df.index.name or (pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1")
 
-                        st.dataframe(
-                            styled_refac,
+                        paged_table(
+                            styled_refac, key="refac",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -2466,25 +2424,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Reefer & AC Reference")
                     if not refac_processor.missingjobsrefacresult.empty:
-                        st.dataframe(refac_processor.missingjobsrefacresult)
+                        paged_table(refac_processor.missingjobsrefacresult, key="refac_missingjobsrefacresult")
                     else:
                         st.success("All job codes are matched in the Reefer & AC reference sheet.")
 
                     # Downloads
-                    csv1 = refac_processor.result_dfrefac.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        refac_processor.result_dfrefac,
                         label="Download Matched Reefer & AC Jobs CSV",
-                        data=csv1,
                         file_name="matched_refac_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = refac_processor.pivot_table_resultrefacJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        refac_processor.pivot_table_resultrefacJobs,
                         label="Download Reefer & AC Summary Table CSV",
-                        data=csv2,
-                        file_name="refac_summary_table.csv",
-                        mime="text/csv"
+                        file_name="refac_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -2498,11 +2453,11 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Fan System Analysis")
 
-            fan_processor = FanSystemProcessor()
+            fan_processor = perf.instrument(FanSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dffan = pd.read_excel(ref_sheet, sheet_name='Fans')
+                    dffan = perf.read_reference(ref_sheet, sheet_name='Fans')
                     fan_processor.process_fan_data(data, dffan)
 
                     st.subheader("Matched Fan Job Code Summary Table (By Title)")
@@ -2517,8 +2472,8 @@ if uploaded_file is not None:
                             else pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1"
                         )
 
-                        st.dataframe(
-                            styled_fan,
+                        paged_table(
+                            styled_fan, key="fan",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -2529,36 +2484,30 @@ if uploaded_file is not None:
 
                     st.subheader("Total Fan Jobs by Machinery and Sub Component")
                     if fan_processor.styled_pivot_table_fan is not None:
-                        st.markdown(
-                            fan_processor.styled_pivot_table_fan.to_html(),
-                            unsafe_allow_html=True
+                        paged_table(
+                            fan_processor.styled_pivot_table_fan, key="fan_styled_pivot_table_fan"
                         )
                     else:
-                        st.dataframe(fan_processor.pivot_table_fan)
+                        paged_table(fan_processor.pivot_table_fan, key="fan_pivot_table_fan")
 
                     # Downloads
-                    csv1 = fan_processor.matching_jobsfan.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        fan_processor.matching_jobsfan,
                         label="Download Matched Fan Jobs CSV",
-                        data=csv1,
                         file_name="matched_fan_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = fan_processor.pivot_table_resultfanJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        fan_processor.pivot_table_resultfanJobs,
                         label="Download Fan Summary by Title CSV",
-                        data=csv2,
-                        file_name="fan_summary_by_title.csv",
-                        mime="text/csv"
+                        file_name="fan_summary_by_title.csv"
                     )
 
-                    csv3 = fan_processor.pivot_table_fan.to_csv()
-                    st.download_button(
+                    download_table(
+                        fan_processor.pivot_table_fan,
                         label="Download Fan Summary by Location CSV",
-                        data=csv3,
-                        file_name="fan_summary_by_location.csv",
-                        mime="text/csv"
+                        file_name="fan_summary_by_location.csv"
                     )
 
                 except Exception as e:
@@ -2572,12 +2521,12 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Tank System Analysis")
 
-            tank_processor = TankSystemProcessor()
+            tank_processor = perf.instrument(TankSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dftanks = pd.read_excel(ref_sheet, sheet_name='Tanks')
-                    tank_processor.process_tank_data(data, dftanks)
+                    dftanks = perf.read_reference(ref_sheet, sheet_name='Tanks')
+                    tank_processor.process_tank_data(data, dftanks, cube=session_count_cube(results, data))
 
                     st.subheader("Matched Tank Job Code Summary Table")
                     pivot_df = tank_processor.pivot_table_resulttanksJobs  # ✅ correct attribute
@@ -2591,8 +2540,8 @@ if uploaded_file is not None:
                             else pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1"
                         )
 
-                        st.dataframe(
-                            styled_tanks,
+                        paged_table(
+                            styled_tanks, key="tanks",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -2603,25 +2552,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Tank Reference")
                     if not tank_processor.missingjobstankresult.empty:
-                        st.dataframe(tank_processor.missingjobstankresult)
+                        paged_table(tank_processor.missingjobstankresult, key="tank_missingjobstankresult")
                     else:
                         st.success("All job codes are matched in the Tank reference sheet.")
 
                     # Downloads
-                    csv1 = tank_processor.result_dftanks.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        tank_processor.result_dftanks,
                         label="Download Matched Tank Jobs CSV",
-                        data=csv1,
                         file_name="matched_tank_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = tank_processor.pivot_table_resulttanksJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        tank_processor.pivot_table_resulttanksJobs,
                         label="Download Tank Summary Table CSV",
-                        data=csv2,
-                        file_name="tank_summary_table.csv",
-                        mime="text/csv"
+                        file_name="tank_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -2637,11 +2583,11 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Fresh Water Generator & Hydrophore System Analysis")
 
-            fwg_processor = FWGSystemProcessor()
+            fwg_processor = perf.instrument(FWGSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dffwg = pd.read_excel(ref_sheet, sheet_name='FWG')
+                    dffwg = perf.read_reference(ref_sheet, sheet_name='FWG')
                     fwg_processor.process_fwg_data(data, dffwg)
 
                     st.subheader("Matched FWG & Hydrophore Job Code Summary Table")
@@ -2656,8 +2602,8 @@ if uploaded_file is not None:
                             else pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1"
                         )
 
-                        st.dataframe(
-                            styled_fwg,
+                        paged_table(
+                            styled_fwg, key="fwg",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -2668,25 +2614,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from FWG Reference")
                     if not fwg_processor.missingjobsfwgresult.empty:
-                        st.dataframe(fwg_processor.missingjobsfwgresult)
+                        paged_table(fwg_processor.missingjobsfwgresult, key="fwg_missingjobsfwgresult")
                     else:
                         st.success("All job codes are matched in the FWG reference sheet.")
 
                     # Downloads
-                    csv1 = fwg_processor.result_dffwg.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        fwg_processor.result_dffwg,
                         label="Download Matched FWG Jobs CSV",
-                        data=csv1,
                         file_name="matched_fwg_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = fwg_processor.pivot_table_resultfwgJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        fwg_processor.pivot_table_resultfwgJobs,
                         label="Download FWG Summary Table CSV",
-                        data=csv2,
-                        file_name="fwg_summary_table.csv",
-                        mime="text/csv"
+                        file_name="fwg_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -2701,11 +2644,11 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Workshop System Analysis")
 
-            workshop_processor = WorkshopSystemProcessor()
+            workshop_processor = perf.instrument(WorkshopSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfworkshop = pd.read_excel(ref_sheet, sheet_name='Workshop')
+                    dfworkshop = perf.read_reference(ref_sheet, sheet_name='Workshop')
                     workshop_processor.process_workshop_data(data, dfworkshop)
 
                     st.subheader("Matched Workshop Job Code Summary Table")
@@ -2720,8 +2663,8 @@ if uploaded_file is not None:
                             else pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1"
                         )
 
-                        st.dataframe(
-                            styled_workshop,
+                        paged_table(
+                            styled_workshop, key="workshop",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -2732,25 +2675,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Workshop Reference")
                     if not workshop_processor.missingjobsworkshopresult.empty:
-                        st.dataframe(workshop_processor.missingjobsworkshopresult)
+                        paged_table(workshop_processor.missingjobsworkshopresult, key="workshop_missingjobsworkshopresult")
                     else:
                         st.success("All job codes are matched in the Workshop reference sheet.")
 
                     # Downloads
-                    csv1 = workshop_processor.result_dfworkshop.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        workshop_processor.result_dfworkshop,
                         label="Download Matched Workshop Jobs CSV",
-                        data=csv1,
                         file_name="matched_workshop_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = workshop_processor.pivot_table_resultworkshopJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        workshop_processor.pivot_table_resultworkshopJobs,
                         label="Download Workshop Summary Table CSV",
-                        data=csv2,
-                        file_name="workshop_summary_table.csv",
-                        mime="text/csv"
+                        file_name="workshop_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -2765,11 +2705,11 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Boiler System Analysis")
 
-            boiler_processor = BoilerSystemProcessor()
+            boiler_processor = perf.instrument(BoilerSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfboiler = pd.read_excel(ref_sheet, sheet_name='Boiler')
+                    dfboiler = perf.read_reference(ref_sheet, sheet_name='Boiler')
                     boiler_processor.process_boiler_data(data, dfboiler)
 
                     st.subheader("Matched Boiler Job Code Summary Table")
@@ -2784,8 +2724,8 @@ if uploaded_file is not None:
                             else pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1"
                         )
 
-                        st.dataframe(
-                            styled_boiler,
+                        paged_table(
+                            styled_boiler, key="boiler",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -2796,25 +2736,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Boiler Reference")
                     if not boiler_processor.missingjobsboilerresult.empty:
-                        st.dataframe(boiler_processor.missingjobsboilerresult)
+                        paged_table(boiler_processor.missingjobsboilerresult, key="boiler_missingjobsboilerresult")
                     else:
                         st.success("All job codes are matched in the Boiler reference sheet.")
 
                     # Downloads
-                    csv1 = boiler_processor.result_dfboiler.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        boiler_processor.result_dfboiler,
                         label="Download Matched Boiler Jobs CSV",
-                        data=csv1,
                         file_name="matched_boiler_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = boiler_processor.pivot_table_resultboilerJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        boiler_processor.pivot_table_resultboilerJobs,
                         label="Download Boiler Summary Table CSV",
-                        data=csv2,
-                        file_name="boiler_summary_table.csv",
-                        mime="text/csv"
+                        file_name="boiler_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -2830,12 +2767,12 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Miscellaneous System Analysis")
 
-            misc_processor = MiscSystemProcessor()
+            misc_processor = perf.instrument(MiscSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfmisc = pd.read_excel(ref_sheet, sheet_name='Misc')
-                    misc_processor.process_misc_data(data, dfmisc)
+                    dfmisc = perf.read_reference(ref_sheet, sheet_name='Misc')
+                    misc_processor.process_misc_data(data, dfmisc, cube=session_count_cube(results, data))
 
                     # Matched Job Code Summary
                     st.subheader("Matched Misc Job Code Summary by Function")
@@ -2851,8 +2788,8 @@ if uploaded_file is not None:
                             else pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1"
                         )
 
-                        st.dataframe(
-                            styled_misc,
+                        paged_table(
+                            styled_misc, key="misc",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -2864,46 +2801,39 @@ if uploaded_file is not None:
                     # Total Count Table
                     st.subheader("Total Misc Jobs by Title")
                     if misc_processor.styled_pivot_table_resultmiscJobstotal is not None:
-                        st.markdown(
-                            misc_processor.styled_pivot_table_resultmiscJobstotal.to_html(),
-                            unsafe_allow_html=True
+                        paged_table(
+                            misc_processor.styled_pivot_table_resultmiscJobstotal, key="misc_styled_pivot_table_resultmiscJobstotal"
                         )
                     else:
-                        st.dataframe(misc_processor.pivot_table_resultmiscJobstotal)
+                        paged_table(misc_processor.pivot_table_resultmiscJobstotal, key="misc_pivot_table_resultmiscJobstotal")
 
                     # Missing Job Codes
                     st.subheader("Missing Job Codes from Misc Reference")
                     if misc_processor.styled_missingmiscjobsresult is not None and not misc_processor.missingmiscjobsresult.empty:
-                        st.markdown(
-                            misc_processor.styled_missingmiscjobsresult.to_html(),
-                            unsafe_allow_html=True
+                        paged_table(
+                            misc_processor.styled_missingmiscjobsresult, key="misc_styled_missingmiscjobsresult"
                         )
                     elif misc_processor.missingmiscjobsresult.empty:
                         st.success("All job codes are matched in the Misc reference sheet.")
 
                     # Downloads
-                    csv1 = misc_processor.result_dfmisc.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        misc_processor.result_dfmisc,
                         label="Download Matched Misc Jobs CSV",
-                        data=csv1,
                         file_name="matched_misc_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = misc_processor.pivot_table_resultmiscJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        misc_processor.pivot_table_resultmiscJobs,
                         label="Download Misc Summary Table CSV",
-                        data=csv2,
-                        file_name="misc_summary_table.csv",
-                        mime="text/csv"
+                        file_name="misc_summary_table.csv"
                     )
 
-                    csv3 = misc_processor.pivot_table_resultmiscJobstotal.to_csv()
-                    st.download_button(
+                    download_table(
+                        misc_processor.pivot_table_resultmiscJobstotal,
                         label="Download Misc Total Count CSV",
-                        data=csv3,
-                        file_name="misc_total_jobs_by_title.csv",
-                        mime="text/csv"
+                        file_name="misc_total_jobs_by_title.csv"
                     )
 
                 except Exception as e:
@@ -2917,11 +2847,11 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Battery System Analysis")
 
-            battery_processor = BatterySystemProcessor()
+            battery_processor = perf.instrument(BatterySystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfbattery = pd.read_excel(ref_sheet, sheet_name='Battery')
+                    dfbattery = perf.read_reference(ref_sheet, sheet_name='Battery')
                     battery_processor.process_battery_data(data, dfbattery)
 
                     st.subheader("Matched Battery Job Code Summary Table")
@@ -2936,8 +2866,8 @@ if uploaded_file is not None:
                             else pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1"
                         )
 
-                        st.dataframe(
-                            styled_battery,
+                        paged_table(
+                            styled_battery, key="battery",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -2948,25 +2878,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Battery Reference")
                     if not battery_processor.missingjobsbatteryresult.empty:
-                        st.dataframe(battery_processor.missingjobsbatteryresult)
+                        paged_table(battery_processor.missingjobsbatteryresult, key="battery_missingjobsbatteryresult")
                     else:
                         st.success("All job codes are matched in the Battery reference sheet.")
 
                     # Downloads
-                    csv1 = battery_processor.result_dfbattery.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        battery_processor.result_dfbattery,
                         label="Download Matched Battery Jobs CSV",
-                        data=csv1,
                         file_name="matched_battery_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = battery_processor.pivot_table_resultbatteryJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        battery_processor.pivot_table_resultbatteryJobs,
                         label="Download Battery Summary Table CSV",
-                        data=csv2,
-                        file_name="battery_summary_table.csv",
-                        mime="text/csv"
+                        file_name="battery_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -2981,19 +2908,19 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Bow Thruster (BT) System Analysis")
 
-            bt_processor = BTSystemProcessor()
+            bt_processor = perf.instrument(BTSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfBT = pd.read_excel(ref_sheet, sheet_name='BT')
+                    dfBT = perf.read_reference(ref_sheet, sheet_name='BT')
                     bt_processor.process_bt_data(data, dfBT)
 
                     st.subheader("Matched BT Job Code Summary Table")
                     if bt_processor.pivot_table_resultBTJobs is not None and not bt_processor.pivot_table_resultBTJobs.empty:
                         styled_bt = bt_processor.pivot_table_resultBTJobs.style.applymap(color_binary_cells)
 
-                        st.dataframe(
-                            styled_bt,
+                        paged_table(
+                            styled_bt, key="bt",
                             use_container_width=True,
                             column_config={
                                 bt_processor.pivot_table_resultBTJobs.index.name or bt_processor.pivot_table_resultBTJobs.columns[0]: st.column_config.TextColumn(
@@ -3007,25 +2934,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from BT Reference")
                     if not bt_processor.missingjobsBTresult.empty:
-                        st.dataframe(bt_processor.missingjobsBTresult)
+                        paged_table(bt_processor.missingjobsBTresult, key="bt_missingjobsBTresult")
                     else:
                         st.success("All job codes are matched in the BT reference sheet.")
 
                     # Downloads
-                    csv1 = bt_processor.result_dfBT.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        bt_processor.result_dfBT,
                         label="Download Matched BT Jobs CSV",
-                        data=csv1,
                         file_name="matched_bt_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = bt_processor.pivot_table_resultBTJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        bt_processor.pivot_table_resultBTJobs,
                         label="Download BT Summary Table CSV",
-                        data=csv2,
-                        file_name="bt_summary_table.csv",
-                        mime="text/csv"
+                        file_name="bt_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -3040,11 +2964,11 @@ if uploaded_file is not None:
                 with col3:
                     st.header("LPSCR System Analysis")
 
-            lpscr_processor = LPSCRSystemProcessor()
+            lpscr_processor = perf.instrument(LPSCRSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfLPSCR = pd.read_excel(ref_sheet, sheet_name='LPSCRYANMAR')
+                    dfLPSCR = perf.read_reference(ref_sheet, sheet_name='LPSCRYANMAR')
                     lpscr_processor.process_lpscr_data(data, dfLPSCR)
 
                     st.subheader("Matched LPSCR Job Code Summary Table")
@@ -3060,8 +2984,8 @@ if uploaded_file is not None:
                             else pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1"
                         )
 
-                        st.dataframe(
-                            styled_lpscr,
+                        paged_table(
+                            styled_lpscr, key="lpscr",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -3072,25 +2996,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from LPSCR Reference")
                     if not lpscr_processor.missingjobsLPSCRresult.empty:
-                        st.dataframe(lpscr_processor.missingjobsLPSCRresult)
+                        paged_table(lpscr_processor.missingjobsLPSCRresult, key="lpscr_missingjobsLPSCRresult")
                     else:
                         st.success("All job codes are matched in the LPSCR reference sheet.")
 
                     # Downloads
-                    csv1 = lpscr_processor.result_dfLPSCR.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        lpscr_processor.result_dfLPSCR,
                         label="Download Matched LPSCR Jobs CSV",
-                        data=csv1,
                         file_name="matched_lpscr_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = lpscr_processor.pivot_table_resultLPSCRJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        lpscr_processor.pivot_table_resultLPSCRJobs,
                         label="Download LPSCR Summary Table CSV",
-                        data=csv2,
-                        file_name="lpscr_summary_table.csv",
-                        mime="text/csv"
+                        file_name="lpscr_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -3104,11 +3025,11 @@ if uploaded_file is not None:
                 with col3:
                     st.header("HPSCR System Analysis")
 
-            hpscr_processor = HPSCRSystemProcessor()
+            hpscr_processor = perf.instrument(HPSCRSystemProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfHPSCR = pd.read_excel(ref_sheet, sheet_name='HPSCRHITACHI')
+                    dfHPSCR = perf.read_reference(ref_sheet, sheet_name='HPSCRHITACHI')
                     hpscr_processor.process_hpscr_data(data, dfHPSCR)
 
                     st.subheader("Matched HPSCR Job Code Summary Table")
@@ -3123,8 +3044,8 @@ if uploaded_file is not None:
                             else pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1"
                         )
 
-                        st.dataframe(
-                            styled_hpscr,
+                        paged_table(
+                            styled_hpscr, key="hpscr",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -3135,25 +3056,22 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from HPSCR Reference")
                     if not hpscr_processor.missingjobsHPSCRresult.empty:
-                        st.dataframe(hpscr_processor.missingjobsHPSCRresult)
+                        paged_table(hpscr_processor.missingjobsHPSCRresult, key="hpscr_missingjobsHPSCRresult")
                     else:
                         st.success("All job codes are matched in the HPSCR reference sheet.")
 
                     # Downloads
-                    csv1 = hpscr_processor.result_dfHPSCR.to_csv(index=False)
-                    st.download_button(
+                    download_table(
+                        hpscr_processor.result_dfHPSCR,
                         label="Download Matched HPSCR Jobs CSV",
-                        data=csv1,
                         file_name="matched_hpscr_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
 
-                    csv2 = hpscr_processor.pivot_table_resultHPSCRJobs.to_csv()
-                    st.download_button(
+                    download_table(
+                        hpscr_processor.pivot_table_resultHPSCRJobs,
                         label="Download HPSCR Summary Table CSV",
-                        data=csv2,
-                        file_name="hpscr_summary_table.csv",
-                        mime="text/csv"
+                        file_name="hpscr_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -3168,12 +3086,12 @@ if uploaded_file is not None:
                 with col3:
                     st.header("LSA Mapping Analysis")
 
-            lsa_processor = LSAMappingProcessor()
+            lsa_processor = perf.instrument(LSAMappingProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dflsa = pd.read_excel(ref_sheet, sheet_name='lsamapping')
-                    lsa_processor.process_lsa_data(data, dflsa)
+                    dflsa = perf.read_reference(ref_sheet, sheet_name='lsamapping')
+                    lsa_processor.process_lsa_data(data, dflsa, cube=session_count_cube(results, data))
 
                     st.subheader("LSA Mapping Summary by Function")
 
@@ -3188,8 +3106,8 @@ if uploaded_file is not None:
                             else pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1"
                         )
 
-                        st.dataframe(
-                            styled_lsa,
+                        paged_table(
+                            styled_lsa, key="lsa",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -3211,8 +3129,8 @@ if uploaded_file is not None:
                             else pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1"
                         )
 
-                        st.dataframe(
-                            styled_total_lsa,
+                        paged_table(
+                            styled_total_lsa, key="total_lsa",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -3222,22 +3140,21 @@ if uploaded_file is not None:
                         st.info("No total mapped LSA job data found.")
                     st.subheader("Missing Job Codes from LSA Reference")
                     if not lsa_processor.missinglsajobsresult.empty:
-                        st.dataframe(lsa_processor.missinglsajobsresult, use_container_width=True)
+                        paged_table(lsa_processor.missinglsajobsresult, key="lsa_missinglsajobsresult", use_container_width=True)
                     else:
                         st.success("All job codes are matched in the LSA reference sheet.")
 
                     # Download buttons
-                    st.download_button(
+                    download_table(
+                        lsa_processor.result_dflsa,
                         label="Download Mapped LSA Jobs CSV",
-                        data=lsa_processor.result_dflsa.to_csv(index=False),
                         file_name="mapped_lsa_jobs.csv",
-                        mime="text/csv"
+                        index=False
                     )
-                    st.download_button(
+                    download_table(
+                        lsa_processor.pivot_table_resultlsaJobs,
                         label="Download LSA Summary Table CSV",
-                        data=lsa_processor.pivot_table_resultlsaJobs.to_csv(),
-                        file_name="lsa_summary_table.csv",
-                        mime="text/csv"
+                        file_name="lsa_summary_table.csv"
                     )
 
                 except Exception as e:
@@ -3252,12 +3169,12 @@ if uploaded_file is not None:
                 with col3:
                     st.header("FFA Mapping Analysis")
 
-            ffa_processor = FFAMappingProcessor()
+            ffa_processor = perf.instrument(FFAMappingProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfffa = pd.read_excel(ref_sheet, sheet_name='ffamapping')
-                    ffa_processor.process_ffa_data(data, dfffa)
+                    dfffa = perf.read_reference(ref_sheet, sheet_name='ffamapping')
+                    ffa_processor.process_ffa_data(data, dfffa, cube=session_count_cube(results, data))
 
                     st.subheader("FFA Mapping Summary by Function")
                     pivot_df = ffa_processor.pivot_table_resultffaJobs
@@ -3269,8 +3186,8 @@ if uploaded_file is not None:
                             pivot_df.index.name or pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1"
                         )
 
-                        st.dataframe(
-                            styled_ffa,
+                        paged_table(
+                            styled_ffa, key="ffa",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -3289,8 +3206,8 @@ if uploaded_file is not None:
                             pivot_df_total.index.name or pivot_df_total.columns[0] if len(pivot_df_total.columns) > 0 else "Column 1"
                         )
 
-                        st.dataframe(
-                            styled_total_ffa,
+                        paged_table(
+                            styled_total_ffa, key="total_ffa",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -3301,7 +3218,7 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from FFA Reference")
                     if not ffa_processor.missingffajobsresult.empty:
-                        st.dataframe(ffa_processor.missingffajobsresult, use_container_width=True)
+                        paged_table(ffa_processor.missingffajobsresult, key="ffa_missingffajobsresult", use_container_width=True)
                     else:
                         st.success("All job codes are matched in the FFA reference sheet.")
 
@@ -3317,12 +3234,12 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Inactive Mapping Analysis")
 
-            inactive_processor = InactiveMappingProcessor()
+            inactive_processor = perf.instrument(InactiveMappingProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfinactive = pd.read_excel(ref_sheet, sheet_name='inactivemapping')
-                    inactive_processor.process_inactive_data(data, dfinactive)
+                    dfinactive = perf.read_reference(ref_sheet, sheet_name='inactivemapping')
+                    inactive_processor.process_inactive_data(data, dfinactive, cube=session_count_cube(results, data))
 
                     st.subheader("Inactive Mapping Summary by Function")
                     pivot_df = inactive_processor.pivot_table_resultinactiveJobs
@@ -3332,8 +3249,8 @@ if uploaded_file is not None:
 
                         first_col = pivot_df.index.name or pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1"
 
-                        st.dataframe(
-                            styled_inactive,
+                        paged_table(
+                            styled_inactive, key="inactive",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -3350,8 +3267,8 @@ if uploaded_file is not None:
 
                         first_col = pivot_df_total.index.name or pivot_df_total.columns[0] if len(pivot_df_total.columns) > 0 else "Column 1"
 
-                        st.dataframe(
-                            styled_total_inactive,
+                        paged_table(
+                            styled_total_inactive, key="total_inactive",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -3362,7 +3279,7 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Inactive Reference")
                     if not inactive_processor.missinginactivejobsresult.empty:
-                        st.dataframe(inactive_processor.missinginactivejobsresult, use_container_width=True)
+                        paged_table(inactive_processor.missinginactivejobsresult, key="inactive_missinginactivejobsresult", use_container_width=True)
                     else:
                         st.success("All job codes are matched in the Inactive reference sheet.")
 
@@ -3377,12 +3294,12 @@ if uploaded_file is not None:
                 with col3:
                     st.header("Critical Jobs Mapping Analysis")
 
-            critical_processor = CriticalJobsProcessor()
+            critical_processor = perf.instrument(CriticalJobsProcessor())
 
             if ref_sheet is not None:
                 try:
-                    dfcritical = pd.read_excel(ref_sheet, sheet_name='criticalmapping')
-                    critical_processor.process_critical_data(data, dfcritical)
+                    dfcritical = perf.read_reference(ref_sheet, sheet_name='criticalmapping')
+                    critical_processor.process_critical_data(data, dfcritical, cube=session_count_cube(results, data))
 
                     st.subheader("Critical Mapping Summary by Function")
                     pivot_df = critical_processor.pivot_table_resultcriticalJobs
@@ -3392,8 +3309,8 @@ if uploaded_file is not None:
 
                         first_col = pivot_df.index.name or pivot_df.columns[0] if len(pivot_df.columns) > 0 else "Column 1"
 
-                        st.dataframe(
-                            styled_critical,
+                        paged_table(
+                            styled_critical, key="critical",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -3410,8 +3327,8 @@ if uploaded_file is not None:
 
                         first_col = pivot_df_total.index.name or pivot_df_total.columns[0] if len(pivot_df_total.columns) > 0 else "Column 1"
 
-                        st.dataframe(
-                            styled_critical_total,
+                        paged_table(
+                            styled_critical_total, key="critical_total",
                             use_container_width=True,
                             column_config={
                                 first_col: st.column_config.TextColumn(label=first_col, width="large")
@@ -3422,7 +3339,7 @@ if uploaded_file is not None:
 
                     st.subheader("Missing Job Codes from Critical Reference")
                     if not critical_processor.missingcriticaljobsresult.empty:
-                        st.dataframe(critical_processor.missingcriticaljobsresult, use_container_width=True)
+                        paged_table(critical_processor.missingcriticaljobsresult, key="critical_missingcriticaljobsresult", use_container_width=True)
                     else:
                         st.success("All job codes are matched in the Critical reference sheet.")
 
@@ -3436,90 +3353,62 @@ if uploaded_file is not None:
 
             if ref_sheet is not None:
                 try:
-                    # Load reference sheets
-                    ref_sheets = pd.read_excel(ref_sheet, sheet_name=None)
-                    dfML = ref_sheets.get('Machinery Location', pd.DataFrame())
-                    dfCM = ref_sheets.get('Critical Machinery', pd.DataFrame())
-                    dfVSM = ref_sheets.get('Vessel Specific Machinery', pd.DataFrame())
-
-                    analyzer = QuickViewAnalyzer(data, dfML, dfCM, dfVSM)
-
-                    ae_ref_pivot, ae_missing_jobs = ae_processor.process_reference_data(data, ref_sheet)
-                    battery_processor.process_battery_data(data, ref_sheets.get("Battery", pd.DataFrame()))
-                    boat_processor.process_boat_data(data, ref_sheets.get("Boats", pd.DataFrame()))
-                    boiler_processor.process_boiler_data(data, ref_sheets.get("Boiler", pd.DataFrame()))
-                    bridge_processor.process_bridge_data(data, ref_sheets.get("Bridge", pd.DataFrame()))
-                    bt_processor.process_bt_data(data, ref_sheets.get("Bow Thruster", pd.DataFrame()))
-                    bwts_missing_jobs = bwts_processor.process_reference_data(data, ref_sheet)
-
-                    chs_processor = CargoHandlingSystemProcessor()
-                    dfCargoHandling = pd.read_excel(ref_sheet, sheet_name="Cargohanding")
-                    chs_processor.process_reference_data(data, ref_sheet)
-
-                    cargopumping_processor.process_reference_data(data, ref_sheet)
-                    cargoventing_processor.process_reference_data(data, ref_sheet)
-                    compressor_processor.process_compressor_data(data, ref_sheets.get("Compressor", pd.DataFrame()))
-                    crane_processor.process_crane_data(data, ref_sheets.get("Crane", pd.DataFrame()))
-                    critical_processor.process_critical_data(data, ref_sheets.get("criticalmapping", pd.DataFrame()))
-                    main_engine_data, *_ , missing_jobs, _ = process_engine_data(data, ref_sheet, engine_type)
-                    ffamapping_processor.process_ffa_data(data, pd.read_excel(ref_sheet, sheet_name="ffamapping"))
-                    fwg_processor.process_fwg_data(data, pd.read_excel(ref_sheet, sheet_name="FWG"))
-                    missing_jobs_hatch = hatch_processor.process_reference_data(data, ref_sheet)
-                    hpscr_processor.process_hpscr_data(data, pd.read_excel(ref_sheet, sheet_name="HPSCRHITACHI"))
-                    inactive_processor.process_inactive_data(data, pd.read_excel(ref_sheet, sheet_name="inactivemapping"))
-                    inertgas_processor.process_reference_data(data, ref_sheet)
-                    ladder_processor.process_ladder_data(data, pd.read_excel(ref_sheet, sheet_name="Ladders"))
-                    incin_processor.process_incin_data(data, pd.read_excel(ref_sheet, sheet_name="Incin"))
-                    lpscr_processor.process_lpscr_data(data, pd.read_excel(ref_sheet, sheet_name="LPSCRYANMAR"))
-                    lsamapping_processor.process_lsa_data(data, pd.read_excel(ref_sheet, sheet_name="lsamapping"))
-                    misc_processor.process_misc_data(data, pd.read_excel(ref_sheet, sheet_name="Misc"))
-                    mooring_processor.process_mooring_data(data, pd.read_excel(ref_sheet, sheet_name="Mooring"))
-                    ows_processor.process_ows_data(data, pd.read_excel(ref_sheet, sheet_name="OWS"))
-                    powerdist_processor.process_powerdist_data(data, pd.read_excel(ref_sheet, sheet_name="Powerdist"))
-                    missingjobspurifierresult = purifier_processor.process_reference_data(data, ref_sheet)
-                    refac_processor.process_refac_data(data, pd.read_excel(ref_sheet, sheet_name="Refac"))
-                    steering_processor.process_steering_data(data, pd.read_excel(ref_sheet, sheet_name="Steering"))
-                    stp_processor.process_stp_data(data, pd.read_excel(ref_sheet, sheet_name="STP"))
-                    tank_processor.process_tank_data(data, pd.read_excel(ref_sheet, sheet_name="Tanks"))
-                    workshop_processor.process_workshop_data(data, pd.read_excel(ref_sheet, sheet_name="Workshop"))
-
-                    # Collect job count summaries
-                    vesselname, totaljobs, criticaljobscount, total_missing_jobs, missing_jobs_df, missing_machinery_count = analyzer.get_basic_counts(
-                        ae_missing_jobs=ae_missing_jobs,
-                        battery_missing_jobs=battery_processor.missingjobsbatteryresult,
-                        boat_missing_jobs=boat_processor.missingjobsBoatsresult,
-                        boiler_missing_jobs=boiler_processor.missingjobsboilerresult,
-                        bridge_missing_jobs=bridge_processor.missingjobsbridgeresult,
-                        bt_missing_jobs=bt_processor.missingjobsBTresult,
-                        bwts_missing_jobs=bwts_missing_jobs,
-                        Cargo_Handling_System=chs_processor.missing_jobs_cargohandling.copy(),
-                        Cargo_Pumping_System=cargopumping_processor.missingjobscargopumpingresult.copy(),
-                        Cargo_Venting_System=cargoventing_processor.missing_jobs_cargovent.copy(),
-                        compressor_missing_jobs=compressor_processor.missingjobsCompressorresult,
-                        crane_missing_jobs=crane_processor.missingjobscraneresult,
-                        Critical_Jobs=critical_processor.missingcriticaljobsresult.copy(),
-                        Main_Engine=missing_jobs.copy(),
-                        FFA_Mapping=ffamapping_processor.missingffajobsresult.copy(),
-                        FWG_System=fwg_processor.missingjobsfwgresult.copy(),
-                        Hatch_System=missing_jobs_hatch.copy(),
-                        HPSCR_System=hpscr_processor.missingjobsHPSCRresult.copy(),
-                        Inactive_Jobs=inactive_processor.missinginactivejobsresult.copy(),
-                        Inert_Gas_System=inertgas_processor.missing_jobs_igsystem.copy(),
-                        Ladder_System=ladder_processor.missingjobsLadderresult.copy(),
-                        Incinerator_System=incin_processor.missingjobsIncinresult.copy(),
-                        LPSCR_System=lpscr_processor.missingjobsLPSCRresult.copy(),
-                        LSA_Mapping=lsamapping_processor.missinglsajobsresult.copy(),
-                        Misc_Jobs=misc_processor.missingmiscjobsresult.copy(),
-                        Mooring_System=mooring_processor.missingjobsMooringresult.copy(),
-                        OWS_System=ows_processor.missingjobsOWSresult.copy(),
-                        Power_Distribution_System=powerdist_processor.missingjobspowerdistresult.copy(),
-                        Purifier_System=missingjobspurifierresult.copy(),
-                        Refac_System=refac_processor.missingjobsrefacresult.copy(),
-                        Steering_System=steering_processor.missingjobsSteeringresult.copy(),
-                        STP_System=stp_processor.missingjobsSTPresult.copy(),
-                        Tank_System=tank_processor.missingjobstankresult.copy(),
-                        Workshop_System=workshop_processor.missingjobsworkshopresult.copy(),
-                    )
+                    # Same system registry as the headless fleet pipeline
+                    ref_sheets = session_reference_sheets(results, perf, ref_sheet)
+                    incremental = None
+                    missing_sources = None
+                    if st.session_state.get('incremental_mode', False):
+                        if 'incremental_analyzer' not in st.session_state:
+                            st.session_state.incremental_analyzer = IncrementalAnalyzer()
+                        incremental = st.session_state.incremental_analyzer.analyze(
+                            data, ref_sheet, engine_type, sheets=ref_sheets, perf=perf
+                        )
+                        missing_sources = incremental['missing_sources']
+                    elif st.session_state.get('background_jobs', False):
+                        # Reruns and tab switches resubmit the same inputs and attach to the same job
+                        quickview_job_id = get_job_queue().submit('missing_jobs', data, ref_sheet, engine_type=engine_type)
+                        quickview_status = get_job_queue().status(quickview_job_id)
+                        if quickview_status['state'] == 'done':
+                            try:
+                                missing_sources = get_job_queue().result(quickview_job_id)
+                            except UnknownJobError:
+                                # Evicted since the status check: the rerun resubmits it
+                                st.rerun()
+                        elif quickview_status['state'] == 'failed':
+                            st.error(f"Error in QuickView Summary: {quickview_status['error']}")
+                            st.stop()
+                        else:
+                            poll_job(quickview_job_id, "QuickView analysis")
+                            st.stop()
+                    quickview = run_quickview(
+                        data, ref_sheet, engine_type,
+                        sheets=ref_sheets,
+                        perf=perf,
+                        missing_sources=missing_sources
+                    )
+                    results['quickview'] = quickview
+                    analyzer = quickview['analyzer']
+                    vesselname = quickview['vesselname']
+                    totaljobs = quickview['totaljobs']
+                    criticaljobscount = quickview['criticaljobscount']
+                    total_missing_jobs = quickview['total_missing_jobs']
+                    missing_jobs_df = quickview['missing_jobs_df']
+                    missing_machinery_count = quickview['missing_machinery_count']
+
+                    if st.session_state.get('save_history', False):
+                        try:
+                            get_results_store().save_quickview(
+                                data, quickview, reference_version(ref_sheet), engine_type,
+                                running_hours={'Main Engine': main_engine_running_hours, **aux_running_hours},
+                                tables={
+                                    'main_engine_pivot': pivot_table,
+                                    'cylinder_pivot': cylinder_pivot_table,
+                                    'me_reference_pivot': ref_pivot_table,
+                                }
+                            )
+                        except Exception as e:
+                            logger.exception("Error saving results to history")
+                            st.warning(f"Could not save results to history: {e}")
 
                             # 🎯 Metrics Display - grouped layout
                     col1, col2, col3 = st.columns(3)
@@ -3530,48 +3419,82 @@ if uploaded_file is not None:
                     col4, col5 = st.columns(2)
                     col4.metric("❌ Total Missing Jobs", total_missing_jobs)
                     col5.metric("🔧 Missing Machinery", missing_machinery_count)
+                    try:
+                        renamed_count = len(analyzer.match_missing_and_diff())
+                        if renamed_count:
+                            col5.caption(f"{renamed_count} of these closely match a differently named vessel machinery "
+                                         "(see Machinery Location Analysis)")
+                    except Exception as e:
+                        logger.warning("Machinery name matching failed: %s", e)
+
+                    # 🔁 Changes since the previous upload of this vessel
+                    if incremental is not None and not incremental['full_run']:
+                        with st.expander("🔁 Changes Since Previous Upload", expanded=True):
+                            d1, d2, d3 = st.columns(3)
+                            d1.metric("Rows Added", incremental['rows_added'])
+                            d2.metric("Rows Removed", incremental['rows_removed'])
+                            d3.metric("Systems Recomputed", f"{len(incremental['recomputed'])} / {len(incremental['missing_sources'])}")
+                            delta = incremental['delta']
+                            if delta.empty:
+                                st.info("No change in missing jobs.")
+                            else:
+                                paged_table(delta, key="delta", use_container_width=True)
+
+                    # 📈 Missing-job trend across saved uploads of this vessel
+                    if st.session_state.get('save_history', False):
+                        with st.expander("📈 History"):
+                            store = get_results_store()
+                            total_trend = store.total_trend(str(vesselname))
+                            if len(total_trend) < 2:
+                                st.info("History needs at least two saved uploads of this vessel.")
+                            else:
+                                st.line_chart(total_trend.set_index('uploaded_at')['total_missing_jobs'])
+                                trend = store.missing_trend(str(vesselname))
+                                system = st.selectbox("System", sorted(trend['system'].unique()), key="history_system")
+                                system_trend = trend[trend['system'] == system]
+                                st.line_chart(system_trend.set_index('uploaded_at')['missing_count'])
+
+                    # 📅 Overdue and upcoming work from 'Calculated Due Date'
+                    with st.expander("📅 Due-Date Status"):
+                        try:
+                            due_engine = DueDateEngine()
+                            due_dates = due_engine.analyze(data)
+                            status_counts = due_dates['prepared']['Status'].value_counts()
+                            u1, u2, u3 = st.columns(3)
+                            u1.metric("Overdue Jobs", int(status_counts.get('Overdue', 0)))
+                            u2.metric("Due in 30 Days", len(due_engine.due_within(due_dates['prepared'], 30)))
+                            u3.metric("No Due Date", int(status_counts.get('No Due Date', 0)))
+                            st.markdown("**Status by Machinery**")
+                            st.dataframe(due_engine.status_summary(due_dates['prepared'], by_vessel=False),
+                                         use_container_width=True)
+                            st.markdown("**Monthly Workload**")
+                            paged_table(due_dates['calendar'], key="due_dates_calendar", use_container_width=True)
+                        except Exception as e:
+                            st.error(f"Error computing due-date status: {str(e)}")
 
                     # 📊 Add Pie Charts for Job and Machinery Comparison
-                    import matplotlib.pyplot as plt
-
                     try:
-                        def generate_pie_chart_with_values(labels, values, title):
-                            fig, ax = plt.subplots(figsize=(4, 4))  # Smaller chart size
-                            total = sum(values)
-
-                            def format_label(pct):
-                                absolute = int(round(pct / 100. * total))
-                                return f"{pct:.1f}%\n({absolute})"
-
-                            wedges, texts, autotexts = ax.pie(
-                                values, labels=labels, autopct=lambda pct: format_label(pct),
-                                startangle=90, textprops=dict(color="black")
-                            )
-                            ax.set_title(title, fontsize=10)
-                            ax.axis('equal')
-                            return fig
-
                         # 📊 Layout: Side-by-side columns
                         col_pie1, col_pie2 = st.columns(2)
 
                         with col_pie1:
                             st.subheader("📊 Jobs Summary")
-                            job_pie = generate_pie_chart_with_values(
+                            job_pie = pie_chart_spec(
                                 ["Total Jobs", "Missing Jobs"],
                                 [totaljobs, total_missing_jobs],
                                 "Total Jobs vs Missing Jobs"
                             )
-                            st.pyplot(job_pie)
+                            st.vega_lite_chart(job_pie, use_container_width=True)
 
                         with col_pie2:
                             st.subheader("⚙️ Machinery Summary")
                             total_onboard_machinery = len(analyzer.df['Machinery Locationcopy'].dropna().astype(str).str.lower().str.strip().unique())
-                            mach_pie = generate_pie_chart_with_values(
+                            mach_pie = pie_chart_spec(
                                 ["Present Machinery", "Missing Machinery"],
                                 [total_onboard_machinery - missing_machinery_count, missing_machinery_count],
                                 "Total Machinery vs Missing Machinery"
                             )
-                            st.pyplot(mach_pie)
+                            st.vega_lite_chart(mach_pie, use_container_width=True)
 
                     except Exception as pie_err:
                         st.warning(f"⚠️ Unable to render pie charts: {pie_err}")
@@ -3580,7 +3503,7 @@ if uploaded_file is not None:
                     with st.expander("📋 View Job Source Breakdown"):
                         try:
                             jobsource_summary = analyzer.generate_jobsource_summary()
-                            st.dataframe(jobsource_summary, use_container_width=True)
+                            paged_table(jobsource_summary, key="jobsource_summary", use_container_width=True)
                             st.metric("🔢 CMS Code Entries", analyzer.cms_code_count)
                         except Exception as e:
                             st.warning(f"Job Source Summary unavailable: {e}")
@@ -3588,31 +3511,64 @@ if uploaded_file is not None:
                     # 📊 Missing Jobs Chart (Styled)
                     if not missing_jobs_df.empty:
                         st.subheader("📊 Missing Jobs by Machinery System")
-                        import matplotlib.pyplot as plt
-                        fig, ax = plt.subplots(figsize=(12, 6))
-                        bars = ax.bar(missing_jobs_df["Machinery System"], missing_jobs_df["Missing Jobs Count"], color='#5DADE2')
-
-                        for bar in bars:
-                            height = bar.get_height()
-                            ax.text(bar.get_x() + bar.get_width() / 2, height + 0.5, str(int(height)), ha='center', va='bottom', fontsize=9)
-
-                        ax.set_title("📊 Missing Jobs by Machinery System", fontsize=14, weight='bold')
-                        ax.set_xlabel("Machinery System", fontsize=12)
-                        ax.set_ylabel("Missing Jobs Count", fontsize=12)
-                        ax.set_xticks(range(len(missing_jobs_df["Machinery System"])))
-                        ax.set_xticklabels(missing_jobs_df["Machinery System"], rotation=45, ha='right')
-                        ax.grid(axis='y', linestyle='--', alpha=0.5)
-                        st.pyplot(fig)
+                        missing_bar = bar_chart_spec(
+                            missing_jobs_df, "Machinery System", "Missing Jobs Count",
+                            "📊 Missing Jobs by Machinery System"
+                        )
+                        st.vega_lite_chart(missing_bar, use_container_width=True)
 
                     # 📁 Display Missing Jobs Table
                     st.subheader("🗂 Missing Jobs Summary Table")
-                    st.dataframe(missing_jobs_df, use_container_width=True)
+                    paged_table(missing_jobs_df, key="missing_jobs_df", use_container_width=True)
+
+                    # 🔎 Missing jobs that may be on the vessel under another job code
+                    if 'Title' in data.columns and st.checkbox(
+                            "🔎 Find vessel jobs with titles similar to the missing jobs", key="explain_missing_jobs"):
+                        min_score = st.slider("Minimum title similarity", 0.3, 1.0, 0.6, 0.05, key="title_match_min_score")
+                        title_matches = session_title_matcher(results, data).explain(
+                            missing_titles(quickview['missing_sources']), k=3, min_score=min_score
+                        )
+                        if title_matches.empty:
+                            st.info("No vessel job has a title close to a missing job.")
+                        else:
+                            matched_count = len(title_matches[['System', 'Job Code']].drop_duplicates())
+                            st.caption(f"{matched_count} missing jobs have a similar vessel job under another code")
+                            paged_table(title_matches, key="title_matches", hide_index=True, use_container_width=True)
+                            download_table(title_matches, "Download Matches CSV", "missing_job_matches.csv",
+                                           index=False, key="download_title_matches")
 
                 except Exception as e:
                     st.error(f"Error in QuickView Summary: {str(e)}")
     except Exception as e:
         st.error(f"An error occurred: {str(e)}")
         st.exception(e)
+    finally:
+        # ⏱️ Performance panel: timings of this run, shown even when the analysis failed
+        perf.stop()
+        with st.expander("⏱️ Performance"):
+            perf_summary = perf.summary()
+            if perf_summary.empty:
+                st.info("No processor calls were recorded in this run.")
+            else:
+                p1, p2, p3 = st.columns(3)
+                p1.metric("Recorded Calls", len(perf.records))
+                p2.metric("Processor Time (s)", f"{perf_summary.loc[perf_summary['Category'] == 'processor', 'Total Time (ms)'].sum() / 1000:.2f}")
+                p3.metric("Reference Read Time (s)", f"{perf_summary.loc[perf_summary['Category'] == 'reference', 'Total Time (ms)'].sum() / 1000:.2f}")
+
+                st.subheader("Slowest Steps")
+                paged_table(perf_summary, key="perf_summary", use_container_width=True)
+
+                st.subheader("All Calls")
+                st.dataframe(perf.to_frame(), use_container_width=True)
+
+                st.download_button(
+                    label="Download Chrome Trace",
+                    data=perf.to_chrome_trace(),
+                    file_name="vessel_report_trace.json",
+                    mime="application/json",
+                    help="Open in chrome://tracing or https://ui.perfetto.dev",
+                    key="download_perf_trace"
+                )
 else:
     st.info("Please upload a data file to begin analysis.")
 
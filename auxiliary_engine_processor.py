@@ -1,5 +1,41 @@
+import logging
 import pandas as pd
 import numpy as np
+import re
+from reference_bundle import read_reference_sheet
+
+logger = logging.getLogger(__name__)
+
+# Engine number in 'Machinery Location': 'Auxiliary Engine#5', 'Auxiliary EngineNo5'
+AE_UNIT_PATTERN = r'Auxiliary Engine\s*(?:No\.?\s*|#)(\d+)'
+
+# AE1-AE3 are always reported, even when absent from the export
+DEFAULT_AE_UNITS = (1, 2, 3)
+
+
+def ae_units(data):
+    """AE number of every row (Int64, <NA> for non-AE rows), extracted in one pass."""
+    units = data['Machinery Location'].str.extract(AE_UNIT_PATTERN, flags=re.IGNORECASE, expand=False)
+    return pd.to_numeric(units, errors='coerce').astype('Int64')
+
+
+def discover_ae_units(data):
+    """Sorted AE numbers present in the export."""
+    return sorted(int(unit) for unit in ae_units(data).dropna().unique())
+
+
+def ae_running_hours(data):
+    """{'AE1': '1234', ...} for every AE on the vessel, first 'Machinery Running Hours' reading per engine."""
+    units = ae_units(data)
+    aux_running_hours = {
+        f'AE{unit}': "Not Available"
+        for unit in sorted(set(DEFAULT_AE_UNITS).union(int(u) for u in units.dropna().unique()))
+    }
+    if 'Machinery Running Hours' in data.columns:
+        readings = pd.DataFrame({'Unit': units, 'Hours': data['Machinery Running Hours']}).dropna()
+        for unit, hours in readings.groupby('Unit', sort=False)['Hours'].first().items():
+            aux_running_hours[f'AE{unit}'] = str(int(float(hours)))
+    return aux_running_hours
 
 class AuxiliaryEngineProcessor:
     def __init__(self):
@@ -31,15 +67,7 @@ class AuxiliaryEngineProcessor:
 
     def extract_running_hours(self, data):
         """Extract running hours for auxiliary engines."""
-        aux_running_hours = {'AE1': "Not Available", 'AE2': "Not Available", 'AE3': "Not Available"}
-        if 'Machinery Running Hours' in data.columns:
-            for ae_num in range(1, 4):
-                ae_data = data[data['Machinery Location'].str.contains(f'Auxiliary Engine#{ae_num}', case=False, na=False)]
-                if not ae_data.empty:
-                    running_hours = ae_data['Machinery Running Hours'].dropna()
-                    if not running_hours.empty:
-                        aux_running_hours[f'AE{ae_num}'] = str(int(float(running_hours.iloc[0])))
-        return aux_running_hours
+        return ae_running_hours(data)
 
     def format_unit_data(self, unit_data):
         """Format unit data for display."""
@@ -51,8 +79,8 @@ class AuxiliaryEngineProcessor:
         except Exception:
             return "Data formatting error"
 
-    def process_job_code(self, data, job_codes, job_description, unit_pattern):
-        """Process job codes for auxiliary engines."""
+    def process_job_code(self, data, job_codes, job_description, unit_pattern, units=None):
+        """Process job codes for auxiliary engines; one column per AE in units (default: those in data)."""
         if not isinstance(job_codes, list):
             job_codes = [job_codes]
         try:
@@ -60,33 +88,32 @@ class AuxiliaryEngineProcessor:
                 ['Frequency', 'Last Done Date', 'Last Done Running Hours', 
                  'Remaining Running Hours', 'Machinery Location', 'Sub Component Location']
             ].copy()
-            job_data['Unit'] = job_data['Machinery Location'].str.extract(r'Auxiliary Engine#(\d+)')
+            job_data['Unit'] = ae_units(job_data)
+            if units is None:
+                units = sorted(set(DEFAULT_AE_UNITS).union(discover_ae_units(data)))
 
             structured_data = pd.DataFrame({
                 'Job Title': [job_description],
                 'Frequency': [job_data['Frequency'].iloc[0] if not job_data.empty else "No Frequency"]
             })
 
-            for unit in range(1, 4):  # AE1, AE2, AE3
-                unit_str = str(unit)
-                unit_data = job_data[job_data['Unit'] == unit_str]
-                if not unit_data.empty:
-                    structured_data[f'AE{unit}'] = [self.format_unit_data(unit_data)]
-                else:
-                    structured_data[f'AE{unit}'] = ["No Data Available"]
+            formatted = {unit: self.format_unit_data(unit_data) for unit, unit_data in job_data.groupby('Unit')}
+            for unit in units:
+                structured_data[f'AE{unit}'] = [formatted.get(unit, "No Data Available")]
 
             return structured_data
         except Exception as e:
-            print(f"Error processing AE job code {job_codes}: {str(e)}")
+            logger.error('Error processing AE job code %s: %s', job_codes, e)
             return pd.DataFrame({'Job Title': [job_description], 'Frequency': ["Error processing data"]})
 
     def get_maintenance_data(self, data):
         """Get auxiliary engine maintenance data."""
         maintenance_data = []
+        units = sorted(set(DEFAULT_AE_UNITS).union(discover_ae_units(data)))
         for job_info in self.job_codes:
             if len(job_info) == 3:
                 job_codes, job_description, unit_pattern = job_info
-                structured_data = self.process_job_code(data, job_codes, job_description, unit_pattern)
+                structured_data = self.process_job_code(data, job_codes, job_description, unit_pattern, units)
                 maintenance_data.append(structured_data)
 
         if maintenance_data:
@@ -118,8 +145,8 @@ class AuxiliaryEngineProcessor:
     def create_task_count_table(self, data):
         """Create task count analysis table for auxiliary engines."""
         try:
-            # Filter auxiliary engine data using the regex pattern
-            auxiliary_engine_df = data[data['Machinery Location'].str.contains('Auxiliary Engine(?:No|#)[1-4]', na=False, regex=True)]
+            # Auxiliary engine rows: the same unit forms (AE No.5, AE #5, ...) as the other AE tables
+            auxiliary_engine_df = data[ae_units(data).notna().to_numpy(dtype=bool)]
 
             # Create basic task count pivot table
             pivot_table = auxiliary_engine_df.pivot_table(
@@ -134,7 +161,7 @@ class AuxiliaryEngineProcessor:
             return pivot_table
 
         except Exception as e:
-            print(f"Error creating task count table: {e}")
+            logger.error('Error creating task count table: %s', e)
             return None
 
     def create_component_distribution(self, data):
@@ -160,7 +187,7 @@ class AuxiliaryEngineProcessor:
             filtered_df = data[data['Machinery Location'].str.contains("Auxiliary Engine", na=False, case=False)].copy()
             filtered_df['Job Codecopy'] = filtered_df['Job Code'].astype(str)
 
-            ref_df = pd.read_excel(ref_sheet, sheet_name='AE Jobs')
+            ref_df = read_reference_sheet(ref_sheet, sheet_name='AE Jobs')
             ref_df['UI Job Code'] = ref_df['UI Job Code'].astype(str)
 
             result_df = filtered_df.merge(
@@ -186,5 +213,5 @@ class AuxiliaryEngineProcessor:
 
             return pivot_table, missing_jobs
         except Exception as e:
-            print(f"Error processing AE reference data: {e}")
+            logger.error('Error processing AE reference data: %s', e)
             return None, None
\ No newline at end of file
@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 pd.set_option('future.no_silent_downcasting', True)
 
 class BatterySystemProcessor:
@@ -70,7 +73,6 @@ class BatterySystemProcessor:
             self.missingjobsbatteryresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_battery_data')
             self.pivot_table_resultbatteryJobs = pd.DataFrame({'Error': [f'Battery data processing failed: {str(e)}']})
             self.missingjobsbatteryresult = pd.DataFrame()
@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class BoatSystemProcessor:
     def __init__(self):
         self.filtered_dfBoatjobs = pd.DataFrame()
@@ -80,7 +83,6 @@ class BoatSystemProcessor:
             self.missingjobsBoatsresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_boat_data')
             self.pivot_table_resultBoatJobs = pd.DataFrame({'Error': [f'Boat data processing failed: {str(e)}']})
             self.missingjobsBoatsresult = pd.DataFrame()
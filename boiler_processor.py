@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class BoilerSystemProcessor:
     def __init__(self):
         self.filtered_dfboilerjobs = pd.DataFrame()
@@ -72,7 +75,6 @@ class BoilerSystemProcessor:
             self.missingjobsboilerresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_boiler_data')
             self.pivot_table_resultboilerJobs = pd.DataFrame({'Error': [f'Boiler data processing failed: {str(e)}']})
             self.missingjobsboilerresult = pd.DataFrame()
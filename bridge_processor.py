@@ -1,7 +1,15 @@
+import logging
 import pandas as pd
 import numpy as np
+from count_cube import DeferredFrame, cube_pivot
+
+logger = logging.getLogger(__name__)
 
 class BridgeSystemProcessor:
+    # Filtered and merged jobs; built on first access when the counts came from a count cube
+    filtered_dfbridgejobs = DeferredFrame()
+    result_dfbridge = DeferredFrame()
+
     def __init__(self):
         self.filtered_dfbridgejobs = pd.DataFrame()
         self.result_dfbridge = pd.DataFrame()
@@ -18,45 +26,63 @@ class BridgeSystemProcessor:
     def format_blank(self, val):
         return "" if val == -1 else val
 
-    def process_bridge_data(self, df, dfbridge):
+    def filter_jobs(self, df, equipment):
+        # Filter relevant rows by 'Function'
+        filtered = df[df['Function'].str.contains('|'.join(equipment), na=False)].copy()
+
+        # Prepare 'Job Codecopy'
+        if 'Job Codecopy' not in filtered.columns:
+            filtered['Job Codecopy'] = filtered['Job Code'].astype(str)
+        filtered['Job Codecopy'] = filtered['Job Codecopy'].astype(object)
+        filtered['Job Codecopy'] = filtered['Job Codecopy'].apply(self.safe_convert_to_string)
+        return filtered
+
+    def merge_reference(self, filtered, dfbridge):
+        result = filtered.merge(
+            dfbridge,
+            left_on='Job Codecopy',
+            right_on='UI Job Code',
+            suffixes=('_filtered', '_ref')
+        )
+        result.reset_index(drop=True, inplace=True)
+        return result
+
+    def process_bridge_data(self, df, dfbridge, cube=None):
+        """cube: optional JobCountCube of df; the counts are sliced from it instead of merging df."""
         try:
             # Define bridge equipment
             bridge_eqmt = ['Navigation Equipment', 'Search and Rescue', 'Communication Equipment']
 
-            # Filter relevant rows by 'Function'
-            self.filtered_dfbridgejobs = df[df['Function'].str.contains('|'.join(bridge_eqmt), na=False)].copy()
-
-            # Prepare 'Job Codecopy'
-            if 'Job Codecopy' not in self.filtered_dfbridgejobs.columns:
-                self.filtered_dfbridgejobs['Job Codecopy'] = self.filtered_dfbridgejobs['Job Code'].astype(str)
-            self.filtered_dfbridgejobs['Job Codecopy'] = self.filtered_dfbridgejobs['Job Codecopy'].astype(object)
-            self.filtered_dfbridgejobs['Job Codecopy'] = self.filtered_dfbridgejobs['Job Codecopy'].apply(self.safe_convert_to_string)
-
             # Convert reference job codes
             dfbridge['UI Job Code'] = dfbridge['UI Job Code'].astype(str)
 
-            # Merge filtered with reference
-            self.result_dfbridge = self.filtered_dfbridgejobs.merge(
-                dfbridge,
-                left_on='Job Codecopy',
-                right_on='UI Job Code',
-                suffixes=('_filtered', '_ref')
-            )
-            self.result_dfbridge.reset_index(drop=True, inplace=True)
-
-            # Detect title column
-            possible_titles = ['Title', 'J3 Job Title', 'Task Description', 'Job Title']
-            title_col = next((col for col in possible_titles if col in self.result_dfbridge.columns), None)
-            if title_col is None:
-                raise ValueError("No suitable title column found in merged bridge data for pivot index.")
-
-            # Pivot table
-            pivot_table = self.result_dfbridge.pivot_table(
-                index=title_col,
-                columns='Function',
-                values='Job Codecopy',
-                aggfunc='count'
-            )
+            if cube is not None and cube.serves(dfbridge, code_column='Job Codecopy'):
+                rows = cube.slice(dfbridge['UI Job Code'], functions=bridge_eqmt)
+                pivot_table = cube_pivot(rows, 'Title', 'Function')
+                vessel_codes = cube.codes(functions=bridge_eqmt)
+                self.filtered_dfbridgejobs = lambda: self.filter_jobs(df, bridge_eqmt)
+                self.result_dfbridge = lambda: self.merge_reference(self.filtered_dfbridgejobs, dfbridge)
+            else:
+                # Filter relevant rows by 'Function'
+                self.filtered_dfbridgejobs = self.filter_jobs(df, bridge_eqmt)
+                # Merge filtered with reference
+                self.result_dfbridge = self.merge_reference(self.filtered_dfbridgejobs, dfbridge)
+
+                # Detect title column
+                possible_titles = ['Title', 'J3 Job Title', 'Task Description', 'Job Title']
+                title_col = next((col for col in possible_titles if col in self.result_dfbridge.columns), None)
+                if title_col is None:
+                    raise ValueError("No suitable title column found in merged bridge data for pivot index.")
+
+                # Pivot table
+                pivot_table = self.result_dfbridge.pivot_table(
+                    index=title_col,
+                    columns='Function',
+                    values='Job Codecopy',
+                    aggfunc='count'
+                )
+                vessel_codes = self.filtered_dfbridgejobs['Job Codecopy']
+
             pivot_table.replace(np.nan, '', inplace=True)
             pivot_table.replace('', -1, inplace=True)
             pivot_table = pivot_table.astype(int)
@@ -72,15 +98,12 @@ class BridgeSystemProcessor:
                 .set_table_attributes("class='dataframe' style='margin-left: 0 !important; margin-right: auto; width: 100%'")
 
             # Missing jobs
-            self.missingjobsbridgeresult = dfbridge[~dfbridge['UI Job Code'].isin(
-                self.filtered_dfbridgejobs['Job Codecopy']
-            )].copy()
+            self.missingjobsbridgeresult = dfbridge[~dfbridge['UI Job Code'].isin(vessel_codes)].copy()
             if 'Remarks' in self.missingjobsbridgeresult.columns:
                 self.missingjobsbridgeresult.drop(columns=['Remarks'], inplace=True)
             self.missingjobsbridgeresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_bridge_data')
             self.pivot_table_resultbridgeJobs = pd.DataFrame({'Error': [f'Bridge data processing failed: {str(e)}']})
             self.missingjobsbridgeresult = pd.DataFrame()
@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class BTSystemProcessor:
     def __init__(self):
         self.filtered_dfBTjobs = pd.DataFrame()
@@ -74,7 +77,6 @@ class BTSystemProcessor:
             self.missingjobsBTresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_bt_data')
             self.pivot_table_resultBTJobs = pd.DataFrame({'Error': [f'BT data processing failed: {str(e)}']})
             self.missingjobsBTresult = pd.DataFrame()
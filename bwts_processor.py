@@ -1,6 +1,11 @@
+import logging
 import pandas as pd
 import numpy as np
-import re
+from reference_catalog import match_reference, reference_catalog, unmatched_reference_result
+from unit_extraction import component_presence, unit_labels, unit_numbers, unit_running_hours
+from due_date_engine import parse_dates
+
+logger = logging.getLogger(__name__)
 
 class BWTSProcessor:
     def __init__(self):
@@ -17,6 +22,7 @@ class BWTSProcessor:
             'BWTS Monitoring System',
             'BWTS Sample Point'
         ]
+        self.reference_result = None
     
     def extract_running_hours(self, data):
         """Extract running hours for BWTS."""
@@ -25,67 +31,27 @@ class BWTSProcessor:
             bwts_patterns = ['Ballast Water Treatment Plant', 'BWTS', 'Ballast Treatment']
             mask = data['Machinery Location'].str.contains('|'.join(bwts_patterns), case=False, na=False)
             bwts_data = data[mask].copy()
-            print(f"Found {len(bwts_data)} BWTS records using patterns: {bwts_patterns}")
+            logger.debug('Found %s BWTS records using patterns: %s', len(bwts_data), bwts_patterns)
             
             if bwts_data.empty:
                 # Return empty DataFrame with expected columns to avoid errors
                 return pd.DataFrame(columns=['BWTS Unit', 'Running Hours'])
             
-            # Initialize empty list to store running hours data
-            running_hours_data = []
-            
-            # Get unique BWTS units
-            def extract_bwts_number(location):
-                if not isinstance(location, str):
-                    return "Unknown BWTS Unit"
-                    
-                # Try multiple patterns to extract unit numbers
-                bwts_patterns = [
-                    r'Ballast Water Treatment Plant#?(\d+)',
-                    r'BWTS#?(\d+)',
-                    r'Ballast Treatment#?(\d+)'
-                ]
-                
-                for pattern in bwts_patterns:
-                    match = re.search(pattern, location, re.IGNORECASE)
-                    if match:
-                        return f"BWTS Unit #{match.group(1)}"
-                
-                # If no match, just return the location as is (with a safety check)
-                return location[:100] if len(location) > 100 else location
+            # 'BWTS Unit #<n>' where the location has a unit number, else the location itself
+            locations = bwts_data['Machinery Location']
+            bwts_data['BWTS Unit'] = unit_labels(unit_numbers(locations, 'BWTS'), 'BWTS Unit #', locations.str[:100])
             
-            # Make sure there's a BWTS Unit column
-            bwts_data['BWTS Unit'] = bwts_data['Machinery Location'].apply(extract_bwts_number)
-            unique_units = bwts_data['BWTS Unit'].unique()
-            
-            # For each unit, get the running hours
-            for unit in unique_units:
-                unit_data = bwts_data[bwts_data['BWTS Unit'] == unit]
-                
-                # Get the running hours for this unit
-                running_hours = 0  # Default to 0
-                if 'Machinery Running Hours' in unit_data.columns:
-                    # Convert to numeric, coercing errors to NaN
-                    unit_data['Machinery Running Hours'] = pd.to_numeric(unit_data['Machinery Running Hours'], errors='coerce')
-                    running_hours_values = unit_data['Machinery Running Hours'].dropna()
-                    if not running_hours_values.empty:
-                        running_hours = running_hours_values.iloc[0]
-                
-                # Add to our list with number format to avoid serialization issues
-                running_hours_data.append({
-                    'BWTS Unit': str(unit),  # Ensure string type
-                    'Running Hours': float(running_hours) if pd.notna(running_hours) else 0.0  # Ensure numeric type
-                })
-            
-            # Convert to DataFrame and ensure proper types
-            result_df = pd.DataFrame(running_hours_data)
+            # First numeric running hours value of each unit
+            hours = bwts_data['Machinery Running Hours'] if 'Machinery Running Hours' in bwts_data.columns else None
+            result_df = unit_running_hours(bwts_data['BWTS Unit'], hours).rename(columns={'Unit': 'BWTS Unit'})
+            result_df['Running Hours'] = result_df['Running Hours'].fillna(0.0)
             if result_df.empty:
                 return pd.DataFrame(columns=['BWTS Unit', 'Running Hours'])
                 
             return result_df
             
         except Exception as e:
-            print(f"Error extracting BWTS running hours: {str(e)}")
+            logger.error('Error extracting BWTS running hours: %s', e)
             # Return empty DataFrame with expected columns
             return pd.DataFrame(columns=['BWTS Unit', 'Running Hours'])
     
@@ -102,7 +68,7 @@ class BWTSProcessor:
             return data_copy
             
         except Exception as e:
-            print(f"Error formatting BWTS unit data: {str(e)}")
+            logger.error('Error formatting BWTS unit data: %s', e)
             return unit_data
     
     def process_job_code(self, data, job_codes, job_description, unit_pattern=r'(?:Ballast Water Treatment Plant|BWTS)#?(\d+)'):
@@ -112,7 +78,7 @@ class BWTSProcessor:
             bwts_patterns = ['Ballast Water Treatment Plant', 'BWTS', 'Ballast Treatment']
             mask = data['Machinery Location'].str.contains('|'.join(bwts_patterns), case=False, na=False)
             bwts_data = data[mask].copy()
-            print(f"Found {len(bwts_data)} BWTS records in process_job_code using patterns: {bwts_patterns}")
+            logger.debug('Found %s BWTS records in process_job_code using patterns: %s', len(bwts_data), bwts_patterns)
             
             if bwts_data.empty:
                 return pd.DataFrame()
@@ -138,11 +104,11 @@ class BWTSProcessor:
                 
                 return pivot_df
             else:
-                print(f"Required columns not found for BWTS job code processing.")
+                logger.warning('Required columns not found for BWTS job code processing.')
                 return pd.DataFrame()
                 
         except Exception as e:
-            print(f"Error processing BWTS job codes: {str(e)}")
+            logger.error('Error processing BWTS job codes: %s', e)
             return pd.DataFrame()
     
     def get_maintenance_data(self, data):
@@ -152,7 +118,7 @@ class BWTSProcessor:
             bwts_patterns = ['Ballast Water Treatment Plant', 'BWTS', 'Ballast Treatment']
             mask = data['Machinery Location'].str.contains('|'.join(bwts_patterns), case=False, na=False)
             bwts_data = data[mask].copy()
-            print(f"Found {len(bwts_data)} BWTS records in get_maintenance_data using patterns: {bwts_patterns}")
+            logger.debug('Found %s BWTS records in get_maintenance_data using patterns: %s', len(bwts_data), bwts_patterns)
             
             if bwts_data.empty:
                 return pd.DataFrame()
@@ -161,17 +127,17 @@ class BWTSProcessor:
             if 'Job Code' in bwts_data.columns and 'Title' in bwts_data.columns and 'Calculated Due Date' in bwts_data.columns:
                 maintenance_data = bwts_data[['Job Code', 'Title', 'Calculated Due Date', 'Machinery Location', 'Job Status']].copy()
                 
-                # Sort by due date
+                # Sort by due date (chronologically, not as text)
                 if 'Calculated Due Date' in maintenance_data.columns:
-                    maintenance_data = maintenance_data.sort_values(by='Calculated Due Date')
+                    maintenance_data = maintenance_data.sort_values(by='Calculated Due Date', key=parse_dates)
                 
                 return maintenance_data
             else:
-                print("Required columns not found for BWTS maintenance data.")
+                logger.warning('Required columns not found for BWTS maintenance data.')
                 return pd.DataFrame()
                 
         except Exception as e:
-            print(f"Error getting BWTS maintenance data: {str(e)}")
+            logger.error('Error getting BWTS maintenance data: %s', e)
             return pd.DataFrame()
     
     def analyze_components(self, data):
@@ -181,57 +147,21 @@ class BWTSProcessor:
             bwts_patterns = ['Ballast Water Treatment Plant', 'BWTS', 'Ballast Treatment']
             mask = data['Machinery Location'].str.contains('|'.join(bwts_patterns), case=False, na=False)
             bwts_data = data[mask].copy()
-            print(f"Found {len(bwts_data)} BWTS records in analyze_components using patterns: {bwts_patterns}")
+            logger.debug('Found %s BWTS records in analyze_components using patterns: %s', len(bwts_data), bwts_patterns)
             
             if bwts_data.empty:
                 return pd.DataFrame()
                 
-            # Extract BWTS unit numbers
-            def extract_bwts_number(location):
-                # Try multiple patterns to extract unit numbers
-                bwts_patterns = [
-                    r'Ballast Water Treatment Plant#?(\d+)',
-                    r'BWTS#?(\d+)',
-                    r'Ballast Treatment#?(\d+)'
-                ]
-                
-                for pattern in bwts_patterns:
-                    match = re.search(pattern, location, re.IGNORECASE)
-                    if match:
-                        return int(match.group(1))
-                
-                return 0  # default value for general items
-                
-            bwts_data['Unit Number'] = bwts_data['Machinery Location'].apply(extract_bwts_number)
-            
-            # Create component analysis DataFrame
-            component_data = []
+            # BWTS unit numbers, 0 for general items
+            unit_number = unit_numbers(bwts_data['Machinery Location'], 'BWTS').fillna(0).astype(int)
             
-            # Check for each component in each unit
-            unique_units = sorted(bwts_data['Unit Number'].unique())
-            
-            for unit in unique_units:
-                unit_name = f"BWTS #{unit}" if unit != 0 else "BWTS General"
-                unit_data = bwts_data[bwts_data['Unit Number'] == unit]
-                
-                for component in self.components:
-                    # Check if component appears in Sub Component Location or Title
-                    has_component = False
-                    if 'Sub Component Location' in unit_data.columns:
-                        has_component = unit_data['Sub Component Location'].str.contains(component, case=False, na=False).any()
-                    
-                    if not has_component and 'Title' in unit_data.columns:
-                        has_component = unit_data['Title'].str.contains(component, case=False, na=False).any()
-                    
-                    status = "Present" if has_component else "Missing"
-                    component_data.append({
-                        'Unit': unit_name,
-                        'Component': component,
-                        'Status': status
-                    })
-            
-            # Convert to DataFrame
-            component_df = pd.DataFrame(component_data)
+            # Component mentioned in Sub Component Location or Title of any job of the unit
+            presence = component_presence(bwts_data, unit_number, self.components)
+            component_df = pd.DataFrame([{
+                'Unit': f"BWTS #{unit}" if unit != 0 else "BWTS General",
+                'Component': component,
+                'Status': "Present" if present else "Missing"
+            } for unit, row in presence.iterrows() for component, present in row.items()])
             
             # Pivot to create a unit vs component matrix
             if not component_df.empty:
@@ -246,7 +176,7 @@ class BWTSProcessor:
                 return pd.DataFrame(columns=['Component', 'Status', 'Unit'])
                 
         except Exception as e:
-            print(f"Error analyzing BWTS components: {str(e)}")
+            logger.error('Error analyzing BWTS components: %s', e)
             return pd.DataFrame(columns=['Component', 'Status', 'Unit'])
     
     def create_task_count_table(self, data):
@@ -256,7 +186,7 @@ class BWTSProcessor:
             bwts_patterns = ['Ballast Water Treatment Plant', 'BWTS', 'Ballast Treatment']
             mask = data['Machinery Location'].str.contains('|'.join(bwts_patterns), case=False, na=False)
             bwts_data = data[mask].copy()
-            print(f"Found {len(bwts_data)} BWTS records in create_task_count_table using patterns: {bwts_patterns}")
+            logger.debug('Found %s BWTS records in create_task_count_table using patterns: %s', len(bwts_data), bwts_patterns)
             
             if bwts_data.empty:
                 return pd.DataFrame()
@@ -271,11 +201,11 @@ class BWTSProcessor:
                 
                 return task_counts
             else:
-                print("Required columns not found for BWTS task count analysis.")
+                logger.warning('Required columns not found for BWTS task count analysis.')
                 return pd.DataFrame()
                 
         except Exception as e:
-            print(f"Error creating BWTS task count table: {str(e)}")
+            logger.error('Error creating BWTS task count table: %s', e)
             return pd.DataFrame()
     
     def create_component_distribution(self, data):
@@ -285,7 +215,7 @@ class BWTSProcessor:
             bwts_patterns = ['Ballast Water Treatment Plant', 'BWTS', 'Ballast Treatment']
             mask = data['Machinery Location'].str.contains('|'.join(bwts_patterns), case=False, na=False)
             bwts_data = data[mask].copy()
-            print(f"Found {len(bwts_data)} BWTS records in create_component_distribution using patterns: {bwts_patterns}")
+            logger.debug('Found %s BWTS records in create_component_distribution using patterns: %s', len(bwts_data), bwts_patterns)
             
             if bwts_data.empty:
                 return pd.DataFrame()
@@ -318,119 +248,85 @@ class BWTSProcessor:
             return component_df
             
         except Exception as e:
-            print(f"Error creating BWTS component distribution: {str(e)}")
+            logger.error('Error creating BWTS component distribution: %s', e)
             return pd.DataFrame(columns=['Component', 'Count'])
     
     def process_reference_data(self, data, ref_sheet, preferred_sheet=None):
-        """Process reference data for BWTS using the approach from the code snippet.
-        
+        """Missing BWTS jobs; the full ReferenceResult is kept in self.reference_result.
+
         Args:
             data: DataFrame containing the machinery data
-            ref_sheet: Path to the reference Excel file
+            ref_sheet: Reference workbook, bundle or ReferenceCatalog
             preferred_sheet: Optional specific sheet name to use for BWTS model
         """
+        self.reference_result = self.match_reference(data, ref_sheet, preferred_sheet)
+        return self.reference_result.missing
+
+    def match_reference(self, data, ref_sheet, preferred_sheet=None):
+        """Match BWTS jobs against the reference sheet once: matched rows, pivot, missing jobs and counts."""
         try:
-            # Create copies to avoid modifying original data
-            data_copy = data.copy()
-            
             # Filter data for BWTS with more flexible patterns
             bwts_patterns = ['Ballast Water Treatment Plant', 'BWTS', 'Ballast Treatment']
-            mask = data_copy['Machinery Location'].str.contains('|'.join(bwts_patterns), case=False, na=False)
-            filtered_dfBWTSjobs = data_copy[mask].copy()
-            print(f"Found {len(filtered_dfBWTSjobs)} BWTS records in process_reference_data using patterns: {bwts_patterns}")
-            
-            # Read the reference sheet using the uploaded sheet path
-            ref_sheet_names = pd.ExcelFile(ref_sheet).sheet_names
-            
-            # First priority: Use the preferred sheet if specified and it exists
-            bwts_sheet = None
-            if preferred_sheet is not None and preferred_sheet in ref_sheet_names:
-                bwts_sheet = preferred_sheet
-                print(f"Using preferred reference sheet for BWTS model: {bwts_sheet}")
-            # Second priority: Look for 'BWTS' sheet
-            elif 'BWTS' in ref_sheet_names:
-                bwts_sheet = 'BWTS'
-            
-            # Third priority: Try to find any sheet with 'BWTS' or 'Ballast' in the name
-            if bwts_sheet is None:
-                for sheet in ref_sheet_names:
-                    if 'BWTS' in sheet or 'Ballast' in sheet.lower():
-                        bwts_sheet = sheet
-                        break
-            
-            # Last resort: If still no BWTS-specific sheet found, use the first sheet
-            if bwts_sheet is None:
-                bwts_sheet = ref_sheet_names[0]
-                print(f"No BWTS sheet found, using the first sheet: {bwts_sheet}")
-            else:
-                print(f"Using reference sheet: {bwts_sheet}")
-            
-            # Read the reference sheet
-            dfBWTS = pd.read_excel(ref_sheet, sheet_name=bwts_sheet)
-            
+            mask = data['Machinery Location'].str.contains('|'.join(bwts_patterns), case=False, na=False)
+            filtered_dfBWTSjobs = data[mask].copy()
+            logger.debug('Found %s BWTS records using patterns: %s', len(filtered_dfBWTSjobs), bwts_patterns)
+
+            # Sheet and job code column are resolved once per workbook by the catalog
+            schema, dfBWTS = reference_catalog(ref_sheet).frame('BWTS', preferred_sheet)
+
             # Skip further processing if no data
             if filtered_dfBWTSjobs.empty or dfBWTS.empty:
-                return pd.DataFrame({
+                return unmatched_reference_result(pd.DataFrame({
                     'Job Code': ['No data found'],
                     'Title': ['No matching data between current and reference'],
                     'Frequency': ['N/A']
-                })
-            
+                }), schema)
+
             # Ensure all Job Code columns are strings
             if 'Job Code' in filtered_dfBWTSjobs.columns:
                 filtered_dfBWTSjobs['Job Codecopy'] = filtered_dfBWTSjobs['Job Code'].astype(str)
             else:
-                print("Job Code column not found in BWTS data")
-                return pd.DataFrame({
+                logger.warning('Job Code column not found in BWTS data')
+                return unmatched_reference_result(pd.DataFrame({
                     'Job Code': ['Column Error'],
                     'Title': ['Job Code column not found in data'],
                     'Frequency': ['N/A']
-                })
-            
-            # Check which column to use for job code in reference data
-            job_code_col = None
-            for possible_col in ['UI Job Code', 'Job Code', 'JobCode', 'Code']:
-                if possible_col in dfBWTS.columns:
-                    job_code_col = possible_col
-                    break
-            
+                }), schema)
+
+            job_code_col = schema.job_code_column
             if job_code_col is None:
-                print("No job code column found in reference data")
+                logger.warning('No job code column found in reference data')
                 # Create a sample of the columns we have
                 col_sample = ", ".join(dfBWTS.columns.tolist()[:5]) + "..."
-                return pd.DataFrame({
+                return unmatched_reference_result(pd.DataFrame({
                     'Job Code': ['Column Error'],
                     'Title': [f'No job code column found in reference. Available columns: {col_sample}'],
                     'Frequency': ['N/A']
-                })
-            
-            # Find job codes in dfBWTS that are not in filtered_dfBWTSjobs
-            dfBWTS['Job Code'] = dfBWTS[job_code_col].astype(str)
-            filtered_dfBWTSjobs['Job Codecopy'] = filtered_dfBWTSjobs['Job Codecopy'].astype(str)
-            
-            print(f"Sample reference job codes: {dfBWTS['Job Code'].iloc[:5].tolist()}")
-            print(f"Sample current job codes: {filtered_dfBWTSjobs['Job Codecopy'].iloc[:5].tolist()}")
-            print(f"Total reference jobs: {len(dfBWTS)}")
-            print(f"Total current BWTS jobs: {len(filtered_dfBWTSjobs)}")
-            
-            missingjobsbwtsresult = dfBWTS[~dfBWTS['Job Code'].isin(filtered_dfBWTSjobs['Job Codecopy'])]
-            print(f"Total missing jobs found: {len(missingjobsbwtsresult)}")
-            
+                }), schema)
+
+            # Missing jobs keep the reference code as a str 'Job Code' column
+            dfBWTS['Job Code'] = dfBWTS[job_code_col]
+
+            # Sample lists are only built when debug logging is on
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('Sample reference job codes: %s', dfBWTS['Job Code'].iloc[:5].tolist())
+                logger.debug('Sample current job codes: %s', filtered_dfBWTSjobs['Job Codecopy'].iloc[:5].tolist())
+            logger.debug('Total reference jobs: %s', len(dfBWTS))
+            logger.debug('Total current BWTS jobs: %s', len(filtered_dfBWTSjobs))
+
+            result = match_reference(filtered_dfBWTSjobs, schema, dfBWTS)
+            logger.debug('Total missing jobs found: %s', result.missing_count)
+
             # Drop Remarks column if it exists
-            if 'Remarks' in missingjobsbwtsresult.columns:
-                missingjobsbwtsresult = missingjobsbwtsresult.drop(columns=['Remarks'])
-                
-            # Reset the index of the combined DataFrame
-            missingjobsbwtsresult.reset_index(drop=True, inplace=True)
-            
-            return missingjobsbwtsresult
-                
+            if 'Remarks' in result.missing.columns:
+                result = result._replace(missing=result.missing.drop(columns=['Remarks']))
+            return result
+
         except Exception as e:
-            print(f"Error processing BWTS reference data: {str(e)}")
+            logger.error('Error processing BWTS reference data: %s', e)
             # Create an error row for display
-            error_row = pd.DataFrame({
+            return unmatched_reference_result(pd.DataFrame({
                 'Job Code': ['Error'],
                 'Title': [f'Unable to process reference data: {str(e)}'],
                 'Frequency': ['N/A']
-            })
-            return error_row
\ No newline at end of file
+            }))
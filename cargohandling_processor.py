@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import re
+from reference_catalog import reference_catalog
 
 class CargoHandlingSystemProcessor:
     def __init__(self):
@@ -36,13 +37,11 @@ class CargoHandlingSystemProcessor:
             self.filter_cargohandling_jobs['Job Codecopy'] = self.filter_cargohandling_jobs['Job Code'].apply(self.safe_convert_to_string)
 
             # Step 2: Load the reference sheet
-            ref_sheet_names = pd.ExcelFile(ref_sheet).sheet_names
-            self.cargohanding_sheet = 'Cargohanding' if 'Cargohanding' in ref_sheet_names else ref_sheet_names[0]
-            self.df_cargohanding = pd.read_excel(ref_sheet, sheet_name=self.cargohanding_sheet)
+            schema, self.df_cargohanding = reference_catalog(ref_sheet).frame('Cargo Handling')
+            self.cargohanding_sheet = schema.sheet
 
-            # Step 3: Detect usable job code column
-            possible_code_cols = ['UI Job Code', 'Job Code', 'JobCode', 'Code']
-            job_code_col = next((col for col in possible_code_cols if col in self.df_cargohanding.columns), None)
+            # Step 3: Job code column, as resolved by the catalog
+            job_code_col = schema.job_code_column
 
             if job_code_col is None:
                 self.result_df_cargohandling = pd.DataFrame()
@@ -55,7 +54,6 @@ class CargoHandlingSystemProcessor:
             # Step 4: Format job codes in reference
             self.df_cargohanding[job_code_col] = (
                 self.df_cargohanding[job_code_col]
-                .astype(str)
                 .str.strip()
                 .str.replace(r'\.0$', '', regex=True)
             )
@@ -1,6 +1,10 @@
+import logging
 import pandas as pd
 import numpy as np
 import re
+from reference_bundle import read_reference_sheet, reference_sheet_names
+
+logger = logging.getLogger(__name__)
 
 class CargoPumpingProcessor:
     def __init__(self):
@@ -33,7 +37,7 @@ class CargoPumpingProcessor:
                 })
             return pd.DataFrame(formatted_data)
         except Exception as e:
-            print(f"Error formatting Cargo Pumping System data: {str(e)}")
+            logger.error('Error formatting Cargo Pumping System data: %s', e)
             return pd.DataFrame(columns=['Cargo Pumping System', 'Maintenance Tasks'])
 
     def process_reference_data(self, data, ref_sheet):
@@ -51,9 +55,9 @@ class CargoPumpingProcessor:
             self.filtercargo_pumping_jobs['Job Codecopy'] = self.filtercargo_pumping_jobs['Job Code'].apply(self.safe_convert_to_string)
 
             # Read reference sheet
-            ref_sheet_names = pd.ExcelFile(ref_sheet).sheet_names
+            ref_sheet_names = reference_sheet_names(ref_sheet)
             self.cargopumping_sheet = 'Cargo Pumping' if 'Cargo Pumping' in ref_sheet_names else ref_sheet_names[0]
-            self.dfcargopumping = pd.read_excel(ref_sheet, sheet_name=self.cargopumping_sheet)
+            self.dfcargopumping = read_reference_sheet(ref_sheet, sheet_name=self.cargopumping_sheet)
 
             if 'UI Job Code' not in self.dfcargopumping.columns:
                 return pd.DataFrame({'Job Code': ['Reference Error'], 'Title': ['Missing UI Job Code'], 'Frequency': ['N/A']})
@@ -75,7 +79,7 @@ class CargoPumpingProcessor:
             return self.result_dfcargopumping[['UI Job Code', 'J3 Job Title', 'Remarks', 'Applicability']] if 'J3 Job Title' in self.result_dfcargopumping.columns else self.result_dfcargopumping
 
         except Exception as e:
-            print(f"Error processing Cargo Pumping data: {str(e)}")
+            logger.error('Error processing Cargo Pumping data: %s', e)
             return pd.DataFrame({'Job Code': ['Error'], 'Title': [str(e)], 'Frequency': ['N/A']})
 
     def create_task_count_table(self):
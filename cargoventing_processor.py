@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import re
+from reference_bundle import read_reference_sheet, reference_sheet_names
 
 class CargoVentingSystemProcessor:
     def __init__(self):
@@ -34,9 +35,9 @@ class CargoVentingSystemProcessor:
             self.filter_cargovent_jobs['Job Codecopy'] = self.filter_cargovent_jobs['Job Code'].apply(self.safe_convert_to_string)
 
             # Step 2: Load reference
-            ref_sheet_names = pd.ExcelFile(ref_sheet).sheet_names
+            ref_sheet_names = reference_sheet_names(ref_sheet)
             self.cargovent_sheet = 'Cargovent' if 'Cargovent' in ref_sheet_names else ref_sheet_names[0]
-            self.df_cargovent = pd.read_excel(ref_sheet, sheet_name=self.cargovent_sheet)
+            self.df_cargovent = read_reference_sheet(ref_sheet, sheet_name=self.cargovent_sheet)
 
             # Step 3: Identify job code column
             possible_code_cols = ['UI Job Code', 'Job Code', 'JobCode', 'Code']
@@ -0,0 +1,107 @@
+import copy
+from functools import lru_cache
+from contextlib import contextmanager
+
+import pandas as pd
+
+BAR_COLOR = '#5DADE2'
+PIE_COLORS = ['#5DADE2', '#F1948A', '#82E0AA', '#F8C471']
+
+
+@lru_cache(maxsize=128)
+def _pie_spec(labels, values, title):
+    total = sum(values)
+    rows = [
+        {
+            'Category': label,
+            'Count': value,
+            'Label': f"{(100.0 * value / total) if total else 0:.1f}% ({value})",
+        }
+        for label, value in zip(labels, values)
+    ]
+    return {
+        'title': {'text': title, 'fontSize': 12},
+        'data': {'values': rows},
+        'height': 300,
+        'encoding': {
+            'theta': {'field': 'Count', 'type': 'quantitative', 'stack': True},
+            'color': {
+                'field': 'Category', 'type': 'nominal', 'sort': list(labels),
+                'scale': {'range': PIE_COLORS[:len(labels)]},
+                'legend': {'orient': 'bottom', 'title': None},
+            },
+            'order': {'field': 'Count', 'type': 'quantitative', 'sort': 'descending'},
+            'tooltip': [
+                {'field': 'Category', 'type': 'nominal'},
+                {'field': 'Count', 'type': 'quantitative'},
+                {'field': 'Label', 'type': 'nominal', 'title': 'Share'},
+            ],
+        },
+        'layer': [
+            {'mark': {'type': 'arc', 'outerRadius': 110}},
+            {'mark': {'type': 'text', 'radius': 135, 'fontSize': 11}, 'encoding': {'text': {'field': 'Label'}}},
+        ],
+    }
+
+
+def pie_chart_spec(labels, values, title):
+    """Vega-Lite pie with '<pct>% (<count>)' labels, replacing matplotlib's autopct pies."""
+    spec = _pie_spec(tuple(str(label) for label in labels), tuple(int(value) for value in values), title)
+    # Callers get their own copy so the cached spec is never mutated
+    return copy.deepcopy(spec)
+
+
+@lru_cache(maxsize=64)
+def _bar_spec(categories, values, title, x_title, y_title):
+    rows = [{'Category': category, 'Value': value} for category, value in zip(categories, values)]
+    return {
+        'title': {'text': title, 'fontSize': 14},
+        'data': {'values': rows},
+        'height': 400,
+        'encoding': {
+            'x': {
+                'field': 'Category', 'type': 'nominal', 'sort': list(categories),
+                'title': x_title, 'axis': {'labelAngle': -45},
+            },
+            'y': {'field': 'Value', 'type': 'quantitative', 'title': y_title},
+            'tooltip': [
+                {'field': 'Category', 'type': 'nominal', 'title': x_title},
+                {'field': 'Value', 'type': 'quantitative', 'title': y_title},
+            ],
+        },
+        'layer': [
+            {'mark': {'type': 'bar', 'color': BAR_COLOR}},
+            {'mark': {'type': 'text', 'dy': -6, 'fontSize': 9}, 'encoding': {'text': {'field': 'Value'}}},
+        ],
+        'config': {'axisY': {'grid': True, 'gridDash': [4, 4], 'gridOpacity': 0.5}},
+    }
+
+
+def bar_chart_spec(df, category_col, value_col, title, x_title=None, y_title=None):
+    """Vega-Lite bar chart with value labels over each bar, in the DataFrame's row order."""
+    categories = tuple(df[category_col].astype(str))
+    values = tuple(pd.to_numeric(df[value_col], errors='coerce').fillna(0).astype(int).tolist())
+    spec = _bar_spec(categories, values, title, x_title or category_col, y_title or value_col)
+    return copy.deepcopy(spec)
+
+
+@contextmanager
+def managed_figure(*args, **kwargs):
+    """plt.subplots() whose figure is always closed, so pyplot's figure registry does not grow.
+
+        with managed_figure(figsize=(4, 4)) as (fig, ax):
+            ...
+            st.pyplot(fig)
+    """
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(*args, **kwargs)
+    try:
+        yield fig, ax
+    finally:
+        plt.close(fig)
+
+
+def clear_cache():
+    _pie_spec.cache_clear()
+    _bar_spec.cache_clear()
@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class CompressorSystemProcessor:
     def __init__(self):
         self.filtered_dfCompressorjobs = pd.DataFrame()
@@ -83,6 +86,5 @@ class CompressorSystemProcessor:
             self.missingjobsCompressorresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_compressor_data')
             self.pivot_table_resultCompressorJobs = pd.DataFrame({'Error': [f'Compressor data processing failed: {str(e)}']})
@@ -0,0 +1,104 @@
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CUBE_DIMENSIONS = ['Job Code', 'Title', 'Function', 'Machinery Location']
+
+# Reference columns that would collide with (and be suffixed against) the vessel columns the pivots use
+COLLIDING_COLUMNS = {'Title', 'Function', 'Job Codecopy'}
+
+
+def normalize_codes(codes):
+    """str(code).strip() of every code, computed once per distinct value (NaN -> 'nan', like the processors)."""
+    positions, distinct = pd.factorize(codes.astype(object), use_na_sentinel=False)
+    normalized = pd.Series([str(code).strip() for code in distinct], dtype=object)
+    return pd.Series(normalized.to_numpy()[positions], index=codes.index, dtype=object)
+
+
+class JobCountCube:
+    """Job counts of one upload per (job code, Title, Function, Machinery Location).
+
+    Only the combinations present in the upload are stored, with job codes normalized like the
+    processors' 'Job Codecopy' and empty titles/functions/locations kept as their own keys. Mapping
+    processors slice it with their reference job codes instead of merging and pivoting the whole upload.
+    """
+
+    def __init__(self, data):
+        self.dimensions = [dim for dim in CUBE_DIMENSIONS[1:] if dim in data.columns]
+        keys = pd.DataFrame({'Job Code': normalize_codes(data['Job Code'])})
+        for dim in self.dimensions:
+            keys[dim] = data[dim].to_numpy()
+        for dim in CUBE_DIMENSIONS[1:]:
+            if dim not in keys.columns:
+                keys[dim] = None
+        self.counts = keys.groupby(CUBE_DIMENSIONS, sort=False, dropna=False).size().rename('Count').reset_index()
+
+        # Processors that prefer an existing 'Job Codecopy' column see the same codes
+        self.codecopy_matches = ('Job Codecopy' not in data.columns
+                                 or normalize_codes(data['Job Codecopy']).equals(keys['Job Code']))
+        logger.debug('Count cube: %d rows -> %d cells', len(data), len(self.counts))
+
+    def serves(self, reference, code_column='Job Code', dimensions=('Title', 'Function')):
+        """True when slicing gives what merging the upload with this reference sheet would."""
+        if set(reference.columns) & COLLIDING_COLUMNS:
+            return False
+        if not set(dimensions) <= set(self.dimensions):
+            return False
+        return code_column == 'Job Code' or self.codecopy_matches
+
+    def _rows(self, functions=None):
+        if not functions:
+            return self.counts
+        matches = self.counts['Function'].str.contains('|'.join(functions), na=False)
+        return self.counts[matches.to_numpy(dtype=bool)]
+
+    def codes(self, functions=None):
+        """Job codes of the upload, optionally only of jobs whose Function contains one of functions."""
+        return pd.Index(self._rows(functions)['Job Code'].unique())
+
+    def slice(self, reference_codes, functions=None):
+        """Cells whose job code is in reference_codes, each Count multiplied by how often the reference
+        lists the code (a merge repeats a job once per matching reference row)."""
+        multiplicity = pd.Series(reference_codes).value_counts()
+        rows = self._rows(functions)
+        rows = rows[rows['Job Code'].isin(multiplicity.index)].copy()
+        rows['Count'] = rows['Count'] * rows['Job Code'].map(multiplicity).to_numpy()
+        return rows.reset_index(drop=True)
+
+
+class DeferredFrame:
+    """Processor attribute holding a DataFrame, or a zero-argument callable building it on first access.
+
+    Lets a processor that worked from a JobCountCube skip its merged frame until something reads it.
+    """
+
+    def __set_name__(self, owner, name):
+        self.attr = '_' + name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        value = obj.__dict__.get(self.attr)
+        if callable(value):
+            value = obj.__dict__[self.attr] = value()
+        return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.attr] = value
+
+
+def cube_pivot(rows, index, columns=None, values='Job Codecopy'):
+    """Same table as merged.pivot_table(index=index, columns=columns, values=values, aggfunc='count')
+    for cells of JobCountCube.slice()."""
+    keys = [index] if columns is None else [index, columns]
+    rows = rows.dropna(subset=keys)
+    if rows.empty:
+        return pd.DataFrame()
+    counts = rows.groupby(keys, sort=True)['Count'].sum()
+    if columns is None:
+        return counts.to_frame(values)
+    table = counts.unstack(columns)
+    table.columns.name = columns
+    return table
@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class CraneSystemProcessor:
     def __init__(self):
         self.filtered_dfcranejobs = pd.DataFrame()
@@ -80,7 +83,6 @@ class CraneSystemProcessor:
             self.missingjobscraneresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_crane_data')
             self.pivot_table_resultcraneJobs = pd.DataFrame({'Error': [f'Crane data processing failed: {str(e)}']})
             self.missingjobscraneresult = pd.DataFrame()
\ No newline at end of file
@@ -1,7 +1,14 @@
+import logging
 import pandas as pd
 import numpy as np
+from count_cube import DeferredFrame, cube_pivot
+
+logger = logging.getLogger(__name__)
 
 class CriticalJobsProcessor:
+    # Merged jobs; built on first access when the counts came from a count cube
+    result_dfcritical = DeferredFrame()
+
     def __init__(self):
         self.result_dfcritical = pd.DataFrame()
         self.pivot_table_resultcriticalJobs = pd.DataFrame()
@@ -17,11 +24,28 @@ class CriticalJobsProcessor:
     def format_blank(self, val):
         return "" if val in [0, '0', 0.0] else val
 
-    def process_critical_data(self, df, dfcritical):
-        try:
-            dfcopy = df.copy()
-            dfcopy['Job Codecopy'] = dfcopy['Job Code'].apply(self.safe_convert_to_string)
+    def prepare_jobs(self, df):
+        dfcopy = df.copy()
+        dfcopy['Job Codecopy'] = dfcopy['Job Code'].apply(self.safe_convert_to_string)
+        return dfcopy
+
+    def merge_reference(self, dfcopy, dfcritical, ref_code_col):
+        result = dfcopy.merge(
+            dfcritical,
+            left_on='Job Codecopy',
+            right_on=ref_code_col,
+            suffixes=('_filtered', '_ref')
+        )
+        result.reset_index(drop=True, inplace=True)
 
+        # A reference sheet with its own Title column leaves Title_filtered / Title_ref instead
+        if 'Title' in result.columns:
+            result['Title'] = result['Title'].apply(lambda x: f"{x:<50}")
+        return result
+
+    def process_critical_data(self, df, dfcritical, cube=None):
+        """cube: optional JobCountCube of df; the counts are sliced from it instead of merging df."""
+        try:
             # Dynamically find the correct column name for job codes in dfcritical
             possible_job_code_cols = ['Job Code', 'UI Job Code', 'Code']
             ref_code_col = next((col for col in possible_job_code_cols if col in dfcritical.columns), None)
@@ -30,39 +54,42 @@ class CriticalJobsProcessor:
 
             dfcritical[ref_code_col] = dfcritical[ref_code_col].apply(self.safe_convert_to_string)
 
-            self.result_dfcritical = dfcopy.merge(
-                dfcritical,
-                left_on='Job Codecopy',
-                right_on=ref_code_col,
-                suffixes=('_filtered', '_ref')
-            )
-            self.result_dfcritical.reset_index(drop=True, inplace=True)
-
-            self.result_dfcritical['Title'] = self.result_dfcritical['Title'].apply(lambda x: f"{x:<50}")
+            if cube is not None and cube.serves(dfcritical):
+                rows = cube.slice(dfcritical[ref_code_col])
+                rows['Title'] = rows['Title'].apply(lambda x: f"{x:<50}")
+                pivot_raw = cube_pivot(rows, 'Title', 'Function')
+                total_raw = cube_pivot(rows, 'Title')
+                vessel_codes = cube.codes()
+                self.result_dfcritical = lambda: self.merge_reference(self.prepare_jobs(df), dfcritical, ref_code_col)
+            else:
+                dfcopy = self.prepare_jobs(df)
+                self.result_dfcritical = self.merge_reference(dfcopy, dfcritical, ref_code_col)
+                pivot_raw = self.result_dfcritical.pivot_table(
+                    index='Title',
+                    columns='Function',
+                    values='Job Codecopy',
+                    aggfunc='count'
+                )
+                total_raw = self.result_dfcritical.pivot_table(
+                    index='Title',
+                    values='Job Codecopy',
+                    aggfunc='count'
+                )
+                vessel_codes = dfcopy['Job Codecopy']
 
-            pivot_raw = self.result_dfcritical.pivot_table(
-                index='Title',
-                columns='Function',
-                values='Job Codecopy',
-                aggfunc='count'
-            ).fillna(0).astype(int)
+            pivot_raw = pivot_raw.fillna(0).astype(int)
 
             self.pivot_table_resultcriticalJobs = pivot_raw.replace(0, '').map(self.format_blank)
 
-            total_raw = self.result_dfcritical.pivot_table(
-                index='Title',
-                values='Job Codecopy',
-                aggfunc='count'
-            ).fillna(0).astype(int).sort_values(by='Job Codecopy', ascending=False)
+            total_raw = total_raw.fillna(0).astype(int).sort_values(by='Job Codecopy', ascending=False)
 
             self.pivot_table_resultcriticalJobstotal = total_raw.replace(0, '').map(self.format_blank)
 
-            self.missingcriticaljobsresult = dfcritical[~dfcritical[ref_code_col].isin(dfcopy['Job Codecopy'])].copy()
+            self.missingcriticaljobsresult = dfcritical[~dfcritical[ref_code_col].isin(vessel_codes)].copy()
             self.missingcriticaljobsresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_critical_data')
             self.pivot_table_resultcriticalJobs = pd.DataFrame({'Error': [f'Processing failed: {str(e)}']})
             self.pivot_table_resultcriticalJobstotal = pd.DataFrame()
             self.missingcriticaljobsresult = pd.DataFrame()
@@ -1,6 +1,36 @@
 import pandas as pd
 from datetime import datetime
 
+# Accepted 'Machinery Location' formats for the main engine, by the engine type they indicate
+# (plain 'Main Engine#1' and the MC form name no specific electronic/common-rail type)
+MAIN_ENGINE_LOCATION_PATTERNS = {
+    "Normal Main Engine": [
+        r'^Main Engine[\s-]*#?\d+$',
+        r'^Main Engine[\s-]*MC[\s-]*#?\d+$',
+        r'^Main Engine[\s-]*No\d+$',
+    ],
+    "MAN ME-C and ME-B Engine": [
+        r'^Main Engine[\s-]*ME[\s-]*C[\s-]*II[\s-]*#?\d+$',
+        r'^Main Engine[\s-]*ME[\s-]*C[\s-]*GI[\s-]*#?\d+$',
+        r'^Main Engine[\s-]*ME[\s-]*C[\s-]*#?\d+$',
+        r'^Main Engine[\s-]*ME[\s-]*B[\s-]*#?\d+$',
+    ],
+    "RT Flex Engine": [
+        r'^Main Engine[\s-]*RT[\s-]*FLEX[\s-]*#?\d+$',
+        r'^Main Engine[\s-]*RTFLEX[\s-]*#?\d+$',
+    ],
+    "RTA Engine": [
+        r'^Main Engine[\s-]*RTA[\s-]*#?\d+$',
+    ],
+    "UEC Engine": [
+        r'^Main Engine[\s-]*UEC[\s-]*#?\d+$',
+    ],
+    "WINGD Engine": [
+        r'^Main Engine[\s-]*W[\s-]*#?\d+$',
+        r'^Main Engine[\s-]*WX[\s-]*#?\d+$',
+    ],
+}
+
 class CSVValidator:
     def __init__(self):
         # Define required columns and their possible alternative names
@@ -73,20 +103,8 @@ class CSVValidator:
         # Filter only engine-related entries
         engine_entries = df[df['Machinery Location'].str.contains('Main Engine|Auxiliary Engine', case=False, na=False)]
         valid_patterns = [
-            r'^Main Engine[\s-]*#?\d+$',
-            r'^Main Engine[\s-]*MC[\s-]*#?\d+$',
-            r'^Main Engine[\s-]*ME[\s-]*C[\s-]*II[\s-]*#?\d+$',
-            r'^Main Engine[\s-]*ME[\s-]*C[\s-]*GI[\s-]*#?\d+$',
-            r'^Main Engine[\s-]*ME[\s-]*C[\s-]*#?\d+$',
-            r'^Main Engine[\s-]*ME[\s-]*B[\s-]*#?\d+$',
-            r'^Main Engine[\s-]*RT[\s-]*FLEX[\s-]*#?\d+$',
-            r'^Main Engine[\s-]*RTFLEX[\s-]*#?\d+$',
-            r'^Main Engine[\s-]*RTA[\s-]*#?\d+$',
-            r'^Main Engine[\s-]*UEC[\s-]*#?\d+$',
-            r'^Main Engine[\s-]*W[\s-]*#?\d+$',
-            r'^Main Engine[\s-]*WX[\s-]*#?\d+$',
-            r'^Main Engine[\s-]*No\d+$',
-            
+            pattern for patterns in MAIN_ENGINE_LOCATION_PATTERNS.values() for pattern in patterns
+        ] + [
             r'^Auxiliary Engine[\s-]*#?\d+$',
             r'^Auxiliary Engine[\s-]*No\d+$',
         ]
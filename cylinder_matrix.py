@@ -0,0 +1,108 @@
+import re
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 'Cylinder Unit#12 > Exhaust Valve' -> ('12', 'Exhaust Valve') in one pass
+CYLINDER_PATTERN = re.compile(r'Cylinder Unit#(\d+) > (.*)')
+
+# Components from get_components_for_engine_type() that exist once per cylinder unit
+CYLINDER_LEVEL_COMPONENTS = {
+    'cylinder liner', 'exhaust valve', 'fuel valve', 'start air valve', 'crosshead',
+    'exhaust valve actuator', 'fuel pressure booster', 'fiva', 'elfi', 'elva', 'cylinder lubricator',
+}
+
+
+def normalize_component(name):
+    """'Exhaust Valve - Main Engine' / 'Exhaust Valve' -> 'exhaust valve'"""
+    name = str(name).strip().lower()
+    for affix in (' - main engine', 'main engine - '):
+        name = name.replace(affix, '')
+    return name.strip()
+
+
+def expected_components(engine_type):
+    """{normalized name: display name} of the per-cylinder components the engine type should have."""
+    from engine_processor import get_components_for_engine_type
+
+    expected = {}
+    for component in get_components_for_engine_type(engine_type):
+        name = normalize_component(component)
+        if name in CYLINDER_LEVEL_COMPONENTS:
+            expected.setdefault(name, component.replace(' - Main Engine', ''))
+    return expected
+
+
+class CylinderMatrix:
+    """Job counts per cylinder unit (rows, natural order) and sub-component (columns) as a dense int matrix."""
+
+    def __init__(self, units, sub_components, counts):
+        self.units = np.asarray(units, dtype=np.int64)
+        self.sub_components = list(sub_components)
+        self.counts = np.asarray(counts, dtype=np.int64).reshape(len(self.units), len(self.sub_components))
+
+    @classmethod
+    def from_data(cls, data, machinery='Main Engine'):
+        """Count 'Job Code' rows per cylinder unit and sub-component of the given machinery."""
+        rows = data[data['Machinery Location'].str.contains(machinery, na=False) & data['Job Code'].notna()]
+        # Locations repeat across jobs: parse each distinct one once, then map back by code
+        location_codes, locations = pd.factorize(rows['Sub Component Location'])
+        if len(locations) == 0:
+            return cls([], [], np.zeros((0, 0)))
+        parts = pd.Series(locations, dtype=object).str.extract(CYLINDER_PATTERN)
+        parsed = parts[0].notna().to_numpy()
+        keep = (location_codes >= 0) & parsed[np.maximum(location_codes, 0)]
+        if not keep.any():
+            return cls([], [], np.zeros((0, 0)))
+
+        location_codes = location_codes[keep]
+        unit_numbers = pd.to_numeric(parts[0]).fillna(0).astype(np.int64).to_numpy()[location_codes]
+        units, unit_index = np.unique(unit_numbers, return_inverse=True)
+        column_index, sub_components = pd.factorize(parts[1].to_numpy(dtype=object)[location_codes], sort=True)
+        counts = np.bincount(unit_index * len(sub_components) + column_index,
+                             minlength=len(units) * len(sub_components))
+        return cls(units, sub_components, counts)
+
+    @property
+    def unit_labels(self):
+        return [f'Cylinder Unit#{unit}' for unit in self.units]
+
+    def to_frame(self):
+        """Same layout as the former cylinder pivot table, with units in numeric order (#2 before #10)."""
+        frame = pd.DataFrame(self.counts, columns=self.sub_components)
+        frame.insert(0, 'Cylinder Unit', self.unit_labels)
+        return frame
+
+    def missing_units(self):
+        """Unit numbers absent between 1 and the highest unit found."""
+        if not len(self.units):
+            return []
+        return sorted(set(range(1, int(self.units.max()) + 1)) - set(self.units.tolist()))
+
+    def diff(self, engine_type):
+        """Expected per-cylinder components vs the matrix: one row per (unit, expected component).
+
+        Status is 'Missing' when the unit has no jobs for the component. Column names are
+        compared after normalize_component(), so 'Exhaust Valve Actuator' does not count as
+        'Exhaust Valve'.
+        """
+        expected = expected_components(engine_type)
+        columns = {}
+        for position, name in enumerate(self.sub_components):
+            columns.setdefault(normalize_component(name), []).append(position)
+
+        rows = []
+        for component, display_name in expected.items():
+            positions = columns.get(component, [])
+            job_counts = self.counts[:, positions].sum(axis=1) if positions else np.zeros(len(self.units), np.int64)
+            for label, count in zip(self.unit_labels, job_counts):
+                rows.append({
+                    'Cylinder Unit': label,
+                    'Component': display_name,
+                    'Job Count': int(count),
+                    'Status': 'Present' if count else 'Missing',
+                })
+        return pd.DataFrame(rows, columns=['Cylinder Unit', 'Component', 'Job Count', 'Status'])
@@ -0,0 +1,116 @@
+import io
+import gzip
+import hashlib
+import logging
+import zipfile
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# Tables with more rows than this also get .zip and .csv.gz downloads
+COMPRESS_MIN_ROWS = 50_000
+# Serialized artifacts kept per server process, least recently used dropped first
+MAX_CACHED_ARTIFACTS = 32
+
+ARTIFACT_FORMATS = {
+    'csv': ('', 'text/csv'),
+    'zip': ('.zip', 'application/zip'),
+    'gzip': ('.gz', 'application/gzip'),
+}
+
+_artifact_cache = OrderedDict()
+# Script runs of concurrent sessions share the cache
+_artifact_lock = threading.Lock()
+
+
+def _supports_deferred_data():
+    """True when st.download_button accepts a callable for data (generated on click)."""
+    try:
+        from streamlit.elements.widgets.button import DownloadButtonDataType
+        return 'Callable' in str(DownloadButtonDataType)
+    except Exception:
+        return False
+
+
+DEFERRED_DOWNLOADS = _supports_deferred_data()
+
+
+def frame_hash(df, index=True):
+    """Content hash of a table (columns, index and values), or None when the values are unhashable."""
+    try:
+        digest = hashlib.sha256(repr([list(map(str, df.columns)), index]).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=index).to_numpy().tobytes())
+        return digest.hexdigest()
+    except TypeError:
+        return None
+
+
+def serialize_table(df, fmt='csv', file_name='table.csv', index=True):
+    """CSV bytes of df, optionally zipped or gzipped; identical tables are serialized once."""
+    key = frame_hash(df, index)
+    cache_key = (key, fmt, file_name) if key is not None else None
+    with _artifact_lock:
+        if cache_key in _artifact_cache:
+            _artifact_cache.move_to_end(cache_key)
+            return _artifact_cache[cache_key]
+
+    payload = df.to_csv(index=index).encode('utf-8')
+    if fmt == 'zip':
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr(file_name, payload)
+        payload = buffer.getvalue()
+    elif fmt == 'gzip':
+        payload = gzip.compress(payload, compresslevel=6)
+
+    if cache_key is not None:
+        with _artifact_lock:
+            _artifact_cache[cache_key] = payload
+            _artifact_cache.move_to_end(cache_key)
+            while len(_artifact_cache) > MAX_CACHED_ARTIFACTS:
+                _artifact_cache.popitem(last=False)
+    return payload
+
+
+def _download_button(df, fmt, label, file_name, index, key):
+    suffix, mime = ARTIFACT_FORMATS[fmt]
+    target_name = file_name + suffix
+    if DEFERRED_DOWNLOADS:
+        st.download_button(label=label, data=lambda: serialize_table(df, fmt, file_name, index),
+                           file_name=target_name, mime=mime, key=key)
+        return
+
+    # Older Streamlit needs the bytes up front: build them only after the user asks for them
+    ready_key = f"{key}_ready"
+    if not st.session_state.get(ready_key):
+        if st.button(f"Prepare {label}", key=f"{key}_prepare"):
+            st.session_state[ready_key] = True
+            st.rerun()
+        return
+    st.download_button(label=label, data=serialize_table(df, fmt, file_name, index),
+                       file_name=target_name, mime=mime, key=key)
+
+
+def download_table(df, label, file_name, index=True, key=None, compress_min_rows=COMPRESS_MIN_ROWS):
+    """st.download_button for a table whose CSV is only built when the download is requested.
+
+    Tables longer than compress_min_rows also get zip and gzip variants next to the CSV button.
+    """
+    if df is None:
+        return
+    key = key or f"download_{file_name}_{label}"
+    if len(df) <= compress_min_rows:
+        _download_button(df, 'csv', label, file_name, index, key)
+        return
+
+    csv_col, zip_col, gzip_col = st.columns([2, 1, 1])
+    with csv_col:
+        _download_button(df, 'csv', label, file_name, index, key)
+    with zip_col:
+        _download_button(df, 'zip', "⬇ .zip", file_name, index, f"{key}_zip")
+    with gzip_col:
+        _download_button(df, 'gzip', "⬇ .gz", file_name, index, f"{key}_gzip")
@@ -0,0 +1,233 @@
+import os
+import sys
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DUE_COLUMN = 'Calculated Due Date'
+LAST_DONE_COLUMN = 'Last Done Date'
+DEFAULT_GROUP_BY = 'Machinery Location'
+DEFAULT_HORIZONS = (7, 30, 90)
+NO_DUE_DATE = 'No Due Date'
+
+# Columns read from each export for fleet runs; everything else is skipped at parse time
+FLEET_COLUMNS = ['Vessel', 'Machinery Location', 'Function', 'Job Code', 'Title', 'Frequency',
+                 'Job Status', DUE_COLUMN, LAST_DONE_COLUMN]
+
+
+def parse_dates(values, dayfirst=False):
+    """datetime64[ns] Series from a date column, parsing each distinct value once.
+
+    Exports repeat the same few hundred dates across hundreds of thousands of rows, so
+    factorizing first turns the expensive mixed-format parse into a cheap take().
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.tz_localize(None) if getattr(values.dt, 'tz', None) else values
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype=object)
+    parsed = pd.to_datetime(uniques, errors='coerce', format='ISO8601')
+    # dayfirst only applies to the non-ISO remainder; with format='mixed' it would also swap 2024-03-05
+    remainder = parsed.isna() & uniques.notna()
+    if remainder.any():
+        parsed[remainder] = pd.to_datetime(uniques[remainder], errors='coerce', format='mixed', dayfirst=dayfirst)
+    parsed = parsed.to_numpy(dtype='datetime64[ns]')
+    result = parsed.take(codes) if len(parsed) else np.full(len(codes), np.datetime64('NaT'), 'datetime64[ns]')
+    result[codes < 0] = np.datetime64('NaT')
+    return pd.Series(result, index=values.index, name=values.name)
+
+
+def status_labels(horizons=DEFAULT_HORIZONS):
+    """['Overdue', 'Due in 0-7 days', ..., 'Due after 90 days', 'No Due Date']"""
+    labels = ['Overdue']
+    start = 0
+    for horizon in horizons:
+        labels.append(f'Due in {start}-{horizon} days')
+        start = horizon + 1
+    labels.append(f'Due after {horizons[-1]} days')
+    labels.append(NO_DUE_DATE)
+    return labels
+
+
+def days_until(dates, as_of):
+    """Whole days from as_of to each date (negative when past) and the NaT mask."""
+    days = dates.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    missing = np.isnat(days)
+    delta = (days - np.datetime64(as_of, 'D')).astype('int64')
+    delta[missing] = 0
+    return delta, missing
+
+
+class DueDateEngine:
+    """Overdue status, days-to-due and monthly workload per system for one or many vessels.
+
+    Dates are parsed once in prepare(); every summary is then computed from the prepared
+    frame's integer columns with np.bincount instead of row-wise comparisons.
+    """
+
+    def __init__(self, as_of=None, horizons=DEFAULT_HORIZONS, group_by=DEFAULT_GROUP_BY, dayfirst=False):
+        self.as_of = pd.Timestamp(as_of or pd.Timestamp.today()).normalize()
+        self.horizons = tuple(sorted(int(h) for h in horizons))
+        self.group_by = group_by
+        self.dayfirst = dayfirst
+        self.labels = status_labels(self.horizons)
+
+    def prepare(self, data):
+        """One row per job with parsed dates, 'Days To Due' and a categorical 'Status'."""
+        if DUE_COLUMN not in data.columns:
+            raise KeyError(f"'{DUE_COLUMN}' column not found")
+
+        prepared = pd.DataFrame(index=data.index)
+        prepared['Vessel'] = data['Vessel'].fillna('Unknown').astype(str) if 'Vessel' in data.columns else 'Unknown'
+        group = data[self.group_by] if self.group_by in data.columns else pd.Series('Unknown', index=data.index)
+        prepared['System'] = group.fillna('Unknown').astype(str).str.strip()
+        for col in ('Job Code', 'Title', 'Frequency', 'Job Status'):
+            if col in data.columns:
+                prepared[col] = data[col]
+
+        due = parse_dates(data[DUE_COLUMN], self.dayfirst)
+        prepared['Due Date'] = due
+        if LAST_DONE_COLUMN in data.columns:
+            prepared['Last Done Date'] = parse_dates(data[LAST_DONE_COLUMN], self.dayfirst)
+
+        days, missing = days_until(due, self.as_of)
+        # Bin edges: < 0 overdue, 0..h1, h1+1..h2, ..., > h_last
+        edges = np.array([0] + [h + 1 for h in self.horizons])
+        codes = np.searchsorted(edges, days, side='right')
+        codes[missing] = len(self.labels) - 1
+
+        prepared['Days To Due'] = pd.arrays.IntegerArray(days, missing)
+        prepared['Status'] = pd.Categorical.from_codes(codes, categories=self.labels)
+        return prepared
+
+    @staticmethod
+    def _group_codes(prepared, columns):
+        return pd.MultiIndex.from_frame(prepared[columns]).factorize()
+
+    def status_summary(self, prepared, by_vessel=True):
+        """Job counts per (Vessel,) System and status, most overdue first."""
+        columns = ['Vessel', 'System'] if by_vessel else ['System']
+        if prepared.empty:
+            return pd.DataFrame(columns=columns + self.labels + ['Total'])
+
+        group_codes, groups = self._group_codes(prepared, columns)
+        status_codes = prepared['Status'].cat.codes.to_numpy()
+        n_status = len(self.labels)
+        counts = np.bincount(group_codes * n_status + status_codes,
+                             minlength=len(groups) * n_status).reshape(len(groups), n_status)
+
+        summary = pd.DataFrame(counts, columns=self.labels, index=groups)
+        summary['Total'] = counts.sum(axis=1)
+        summary = summary.reset_index()
+        summary.columns = columns + self.labels + ['Total']
+        return summary.sort_values(by=['Overdue', 'Total'], ascending=False).reset_index(drop=True)
+
+    def workload_calendar(self, prepared, months=12, by_vessel=False):
+        """Jobs falling due per calendar month from as_of's month, with overdue jobs in their own column."""
+        columns = ['Vessel', 'System'] if by_vessel else ['System']
+        start = np.datetime64(self.as_of, 'M')
+        month_labels = [str(start + i) for i in range(months)]
+        if prepared.empty:
+            return pd.DataFrame(columns=columns + ['Overdue'] + month_labels + ['Total'])
+
+        due_months = prepared['Due Date'].to_numpy(dtype='datetime64[ns]').astype('datetime64[M]')
+        offset = (due_months - start).astype('int64') + 1  # 0 is the overdue column
+        overdue = (prepared['Status'].cat.codes == 0).to_numpy()
+        offset[overdue] = 0
+        keep = ~np.isnat(due_months) & (offset >= 0) & (offset <= months)
+
+        group_codes, groups = self._group_codes(prepared, columns)
+        width = months + 1
+        counts = np.bincount(group_codes[keep] * width + offset[keep],
+                             minlength=len(groups) * width).reshape(len(groups), width)
+
+        calendar = pd.DataFrame(counts, columns=['Overdue'] + month_labels, index=groups)
+        calendar['Total'] = counts.sum(axis=1)
+        calendar = calendar.reset_index()
+        calendar.columns = columns + ['Overdue'] + month_labels + ['Total']
+        calendar = calendar[calendar['Total'] > 0]
+        return calendar.sort_values(by='Total', ascending=False).reset_index(drop=True)
+
+    def overdue_jobs(self, prepared):
+        """Overdue rows, longest overdue first."""
+        overdue = prepared[prepared['Status'] == 'Overdue']
+        return overdue.sort_values(by='Days To Due').reset_index(drop=True)
+
+    def due_within(self, prepared, days):
+        """Rows due between as_of and as_of + days."""
+        due_days = prepared['Days To Due']
+        mask = due_days.notna() & (due_days >= 0) & (due_days <= days)
+        return prepared[mask.to_numpy(dtype=bool)].sort_values(by='Days To Due').reset_index(drop=True)
+
+    def analyze(self, data, months=12):
+        """{'prepared', 'summary', 'calendar', 'overdue'} for one export or a concatenated fleet."""
+        prepared = self.prepare(data)
+        return {
+            'prepared': prepared,
+            'summary': self.status_summary(prepared),
+            'calendar': self.workload_calendar(prepared, months),
+            'overdue': self.overdue_jobs(prepared),
+        }
+
+
+def load_due_dates(path):
+    """Read only the columns the due-date engine uses from one export."""
+    wanted = lambda col: col in FLEET_COLUMNS
+    if str(path).lower().endswith(('.xlsx', '.xls')):
+        data = pd.read_excel(path, usecols=wanted)
+    else:
+        data = pd.read_csv(path, usecols=wanted, low_memory=False)
+    if 'Vessel' not in data.columns:
+        data['Vessel'] = os.path.splitext(os.path.basename(str(path)))[0]
+    return data
+
+
+def load_fleet(paths):
+    """One frame with every export's rows; unreadable files are logged and skipped."""
+    from analysis_pipeline import export_paths
+
+    frames = []
+    for path in export_paths(paths):
+        try:
+            frames.append(load_due_dates(path))
+        except Exception as e:
+            logger.error('Error reading %s: %s', path, e)
+    if not frames:
+        return pd.DataFrame(columns=FLEET_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Overdue and upcoming-work analysis across vessel exports.")
+    parser.add_argument('exports', nargs='+', help="Vessel exports (.csv/.xlsx) or directories of them")
+    parser.add_argument('--as-of', default=None, help="Reference date (default: today)")
+    parser.add_argument('--horizons', default=','.join(map(str, DEFAULT_HORIZONS)),
+                        help="Comma-separated due-in-N-days buckets")
+    parser.add_argument('--group-by', default=DEFAULT_GROUP_BY, help="Column identifying the system")
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--dayfirst', action='store_true', help="Parse ambiguous dates as DD/MM")
+    parser.add_argument('-o', '--output', default=None, help="Write Summary/Calendar/Overdue sheets to this .xlsx")
+    args = parser.parse_args(argv)
+
+    engine = DueDateEngine(args.as_of, [int(h) for h in args.horizons.split(',') if h.strip()],
+                           args.group_by, args.dayfirst)
+    result = engine.analyze(load_fleet(args.exports), args.months)
+
+    pd.set_option('display.width', 200)
+    print(result['summary'].head(30).to_string(index=False))
+    if args.output:
+        with pd.ExcelWriter(args.output) as writer:
+            result['summary'].to_excel(writer, sheet_name='Summary', index=False)
+            result['calendar'].to_excel(writer, sheet_name='Calendar', index=False)
+            result['overdue'].to_excel(writer, sheet_name='Overdue', index=False)
+        print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    from log_config import configure_logging
+    configure_logging()
+    sys.exit(main())
@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class EmergencyGenSystemProcessor:
     def __init__(self):
         self.filtered_dfEmgjobs = pd.DataFrame()
@@ -72,7 +75,6 @@ class EmergencyGenSystemProcessor:
             self.missingjobsEmgresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_emg_data')
             self.pivot_table_resultEmgJobs = pd.DataFrame({'Error': [f'Emergency Generator data processing failed: {str(e)}']})
             self.missingjobsEmgresult = pd.DataFrame()
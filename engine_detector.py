@@ -0,0 +1,129 @@
+import re
+import logging
+from collections import namedtuple
+
+import pandas as pd
+
+from csv_validator import MAIN_ENGINE_LOCATION_PATTERNS
+from engine_processor import ENGINE_REFERENCE_SHEETS, get_components_for_engine_type
+
+logger = logging.getLogger(__name__)
+
+# Reference sheet per BWTS model, as offered in the app
+BWTS_MODEL_SHEETS = {
+    "BWTS Optimarine": "BWTSOpti",
+    "BWTS Alfalaval": "BWTSAlfalaval",
+    "BWTS Echlor": "BWTSEchlor",
+    "BWTS ERMA": "BWTSERMA",
+    "BWTS Sunrai": "BWTSSunrai",
+    "BWTS Techcross": "BWTStechcross",
+    "Other BWTS": "BWTS",
+}
+
+# Maker/product names that identify a BWTS model in locations, titles or maker columns
+BWTS_MODEL_KEYWORDS = {
+    "BWTS Optimarine": ['optimarine', 'optiballast'],
+    "BWTS Alfalaval": ['alfa laval', 'alfalaval', 'pureballast'],
+    "BWTS Echlor": ['ecochlor', 'echlor'],
+    "BWTS ERMA": ['erma first', 'ermafirst', 'erma'],
+    "BWTS Sunrai": ['sunrui', 'sunrai', 'balclor'],
+    "BWTS Techcross": ['techcross', 'electro-cleen', 'electrocleen'],
+}
+
+BWTS_LOCATION_PATTERN = r'Ballast Water Treatment Plant|BWTS|Ballast Treatment'
+VOCABULARY_COLUMNS = ['Machinery Location', 'Sub Component Location']
+BWTS_TEXT_COLUMNS = ['Machinery Location', 'Sub Component Location', 'Title', 'Maker', 'Model', 'Make']
+
+# 'Main Engine#1' / 'Main EngineNo1' are used with every engine type, so they are not evidence for one
+GENERIC_LOCATION_PATTERNS = {r'^Main Engine[\s-]*#?\d+$', r'^Main Engine[\s-]*No\d+$'}
+
+# A main engine location in a type-specific format (e.g. 'Main Engine - ME-C#1') outweighs component evidence
+LOCATION_BONUS = 1.0
+# Minimum lead over the runner-up for a component-only detection to count as confident
+CONFIDENT_MARGIN = 0.05
+
+EngineDetection = namedtuple('EngineDetection', ['engine_type', 'confident', 'scores', 'evidence'])
+BWTSDetection = namedtuple('BWTSDetection', ['model', 'sheet', 'evidence'])
+
+
+def vocabulary(data, columns=VOCABULARY_COLUMNS):
+    """Distinct non-empty location strings of the export; every later check runs on these, not on rows."""
+    values = set()
+    for col in columns:
+        if col in data.columns:
+            values.update(str(value).strip() for value in data[col].dropna().unique())
+    values.discard('')
+    return sorted(values)
+
+
+def engine_components():
+    """{engine type: set of components} from get_components_for_engine_type()."""
+    return {engine_type: set(get_components_for_engine_type(engine_type)) for engine_type in ENGINE_REFERENCE_SHEETS}
+
+
+def detect_engine_type(data):
+    """Score every engine type of get_components_for_engine_type() against the export's vocabulary.
+
+    Component score is the F1 of "components found that the type lists" (precision, against
+    every known ME component found) and "components the type lists that were found" (recall),
+    so a superset list (ME-C over Normal) only wins when its extra components are present.
+    A main engine location in that type's CSVValidator format adds LOCATION_BONUS.
+    engine_type is None when nothing in the export points at a type.
+    """
+    text = '\n'.join(vocabulary(data))
+    locations = vocabulary(data, ['Machinery Location'])
+    components = engine_components()
+    found = {component for listed in components.values() for component in listed if component in text}
+
+    rows = []
+    evidence = {}
+    for engine_type, listed in components.items():
+        specific = [pattern for pattern in MAIN_ENGINE_LOCATION_PATTERNS.get(engine_type, [])
+                    if pattern not in GENERIC_LOCATION_PATTERNS]
+        matcher = re.compile('|'.join(specific)) if specific else None
+        location_hits = [loc for loc in locations if matcher is not None and matcher.match(loc)]
+
+        present = listed & found
+        precision = len(present) / len(found) if found else 0.0
+        recall = len(present) / len(listed) if listed else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if present else 0.0
+
+        rows.append({
+            'Engine Type': engine_type,
+            'Score': round(f1 + (LOCATION_BONUS if location_hits else 0.0), 4),
+            'Location Matches': len(location_hits),
+            'Components Found': len(present),
+            'Components Expected': len(listed),
+        })
+        # Components not listed for every type are what tells the types apart
+        shared = set.intersection(*components.values())
+        evidence[engine_type] = location_hits + sorted(present - shared)
+
+    scores = pd.DataFrame(rows).sort_values(by=['Score', 'Location Matches'], ascending=False).reset_index(drop=True)
+    best = scores.iloc[0]
+    has_evidence = best['Score'] > 0
+    engine_type = best['Engine Type'] if has_evidence else None
+    margin = best['Score'] - scores.iloc[1]['Score'] if len(scores) > 1 else best['Score']
+    confident = bool(has_evidence and margin >= CONFIDENT_MARGIN)
+    logger.info('Detected engine type %s (confident=%s, margin %.3f)', engine_type, confident, margin)
+    return EngineDetection(engine_type, confident, scores, evidence.get(engine_type, []))
+
+
+def detect_bwts_model(data):
+    """BWTS model from maker/product names on the BWTS rows; model and sheet are None when unknown."""
+    if 'Machinery Location' not in data.columns:
+        return BWTSDetection(None, None, [])
+    rows = data[data['Machinery Location'].str.contains(BWTS_LOCATION_PATTERN, case=False, na=False)]
+    text = '\n'.join(vocabulary(rows, BWTS_TEXT_COLUMNS)).lower()
+    if not text:
+        return BWTSDetection(None, None, [])
+
+    hits = {
+        model: [keyword for keyword in keywords if re.search(rf'\b{re.escape(keyword)}\b', text)]
+        for model, keywords in BWTS_MODEL_KEYWORDS.items()
+    }
+    hits = {model: found for model, found in hits.items() if found}
+    if not hits:
+        return BWTSDetection(None, None, [])
+    model = max(hits, key=lambda name: len(hits[name]))
+    return BWTSDetection(model, BWTS_MODEL_SHEETS[model], hits[model])
@@ -1,6 +1,42 @@
+import logging
 import pandas as pd
 import numpy as np
 import re
+from reference_bundle import read_reference_sheet
+from auxiliary_engine_processor import ae_running_hours
+from cylinder_matrix import CylinderMatrix
+
+logger = logging.getLogger(__name__)
+
+# Reference sheet holding the main engine jobs for each engine type
+ENGINE_REFERENCE_SHEETS = {
+    "Normal Main Engine": "ME Jobs",
+    "MAN ME-C and ME-B Engine": "MEMEC",
+    "RT Flex Engine": "MERTFLEX",
+    "RTA Engine": "MERTA",
+    "UEC Engine": "MEUEC",
+    "WINGD Engine": "MEWINGD"
+}
+
+# Cylinder unit number for jobs without their own pattern
+DEFAULT_UNIT_PATTERN = r'Unit#(\d+)'
+
+# Main engine overhaul jobs: (job codes, description[, unit pattern on Sub Component Location])
+MAIN_ENGINE_JOB_CODES = [
+    ([730, 805], "Stuffing Box Overhaul"),
+    ([775, 776], "Piston Overhaul"),
+    ([896], "Exhaust Valve Overhaul"),
+    ([734], "Starting Air Overhaul"),
+    ([860, 861, 862], "Fuel Valve Overhaul"),
+    ([6795, 934], "Cylinder Liner Overhaul"),
+    ([969, 5031, 802], "Main Bearing Overhaul - Main Engine", r'Main Bearing - Main Engine#(\d+)'),
+    ([715], "Turbocharger Overhaul - Main Engine", r'Turbocharger - Main Engine#(\d+)'),
+    ([873], "Fuel Injection Pump Overhaul - Main Engine", r'Fuel Injection Pump - Main Engine#(\d+)'),
+    ([880], "FO Pressure Booster Overhaul - Main Engine", r'Main Engine - HCU#(\d+)'),
+    ([903], "ELFI Overhaul - Main Engine", r'Main Engine - HCU#(\d+)'),
+    ([901], "ELVA Overhaul - Main Engine", r'Main Engine - HCU#(\d+)'),
+    ([885], "FIVA Overhaul - Main Engine", r'Main Engine - HCU#(\d+)')
+]
 
 def extract_units(job_data, unit_col):
     """Extract and sort unique units from the data."""
@@ -19,7 +55,7 @@ def format_unit_data(unit_data):
     except Exception:
         return "Data formatting error"
 
-def process_job_code_dynamic(data, job_codes, job_description, unit_pattern=r'Unit#(\d+)'):
+def process_job_code_dynamic(data, job_codes, job_description, unit_pattern=DEFAULT_UNIT_PATTERN):
     """Process job codes and return structured data."""
     if not isinstance(job_codes, list):
         job_codes = [job_codes]
@@ -38,7 +74,7 @@ def process_job_code_dynamic(data, job_codes, job_description, unit_pattern=r'Un
             structured_data[f'Unit {unit}'] = [format_unit_data(unit_data)] if not unit_data.empty else ["No Data Available"]
         return structured_data
     except Exception as e:
-        print(f"Error processing job code {job_codes}: {str(e)}")
+        logger.error('Error processing job code %s: %s', job_codes, e)
         return pd.DataFrame({'Job Title': [job_description], 'Frequency': ["Error processing data"]})
 
 def get_components_for_engine_type(engine_type):
@@ -243,26 +279,9 @@ def get_components_for_engine_type(engine_type):
 def process_engine_data(data, ref_sheet_path=None, engine_type=None):
     """Process both main and auxiliary engine data."""
     try:
-        # Define job codes and descriptions for Main Engine
-        job_code_data = [
-            ([730, 805], "Stuffing Box Overhaul"),
-            ([775, 776], "Piston Overhaul"),
-            ([896], "Exhaust Valve Overhaul"),
-            ([734], "Starting Air Overhaul"),
-            ([860, 861, 862], "Fuel Valve Overhaul"),
-            ([6795, 934], "Cylinder Liner Overhaul"),
-            ([969, 5031, 802], "Main Bearing Overhaul - Main Engine", r'Main Bearing - Main Engine#(\d+)'),
-            ([715], "Turbocharger Overhaul - Main Engine", r'Turbocharger - Main Engine#(\d+)'),
-            ([873], "Fuel Injection Pump Overhaul - Main Engine", r'Fuel Injection Pump - Main Engine#(\d+)'),
-            ([880], "FO Pressure Booster Overhaul - Main Engine", r'Main Engine - HCU#(\d+)'),
-            ([903], "ELFI Overhaul - Main Engine", r'Main Engine - HCU#(\d+)'),
-            ([901], "ELVA Overhaul - Main Engine", r'Main Engine - HCU#(\d+)'),
-            ([885], "FIVA Overhaul - Main Engine", r'Main Engine - HCU#(\d+)')
-        ]
-
         # Process Main Engine Data
         main_engine_data = []
-        for job_info in job_code_data:
+        for job_info in MAIN_ENGINE_JOB_CODES:
             if len(job_info) == 3:
                 job_codes, job_description, unit_pattern = job_info
                 structured_data = process_job_code_dynamic(data, job_codes, job_description, unit_pattern)
@@ -274,20 +293,8 @@ def process_engine_data(data, ref_sheet_path=None, engine_type=None):
         # Combine processed data
         main_engine_data = pd.concat(main_engine_data, ignore_index=True)
 
-        # Extract Cylinder Unit information
-        main_engine_filtered = data[data['Machinery Location'].str.contains("Main Engine", na=False)].copy()
-        main_engine_filtered.loc[:, 'Cylinder Unit'] = main_engine_filtered['Sub Component Location'].str.extract(r'(Cylinder Unit#\d+)')
-        main_engine_filtered.loc[:, 'Sub Components'] = main_engine_filtered['Sub Component Location'].str.extract(r'Cylinder Unit#\d+ > (.*)')
-
-        # Create cylinder unit pivot table
-        cylinder_pivot_table = main_engine_filtered.pivot_table(
-            index='Cylinder Unit',
-            columns='Sub Components',
-            values='Job Code',
-            aggfunc='count',
-            fill_value=0
-        ).reset_index()
-        cylinder_pivot_table.columns.name = None
+        # Cylinder unit x sub-component job counts, units in numeric order
+        cylinder_pivot_table = CylinderMatrix.from_data(data).to_frame()
 
         # Get running hours for Main Engine
         main_engine_rows = data[data['Machinery Location'].str.contains('Main Engine', case=False, na=False)]
@@ -299,14 +306,7 @@ def process_engine_data(data, ref_sheet_path=None, engine_type=None):
 
         # Get auxiliary engine data
         aux_engine_data = data[data['Machinery Location'].str.contains("Auxiliary Engine", na=False, case=False)].copy()
-        aux_running_hours = {'AE1': "Not Available", 'AE2': "Not Available", 'AE3': "Not Available"}
-        if 'Machinery Running Hours' in data.columns:
-            for ae_num in range(1, 4):
-                ae_data = data[data['Machinery Location'].str.contains(f'Auxiliary Engine#{ae_num}', case=False, na=False)]
-                if not ae_data.empty:
-                    running_hours = ae_data['Machinery Running Hours'].dropna()
-                    if not running_hours.empty:
-                        aux_running_hours[f'AE{ae_num}'] = str(int(float(running_hours.iloc[0])))
+        aux_running_hours = ae_running_hours(data)
 
         # Create standard pivot table
         pivot_table = main_engine_data.pivot_table(
@@ -320,17 +320,9 @@ def process_engine_data(data, ref_sheet_path=None, engine_type=None):
         missing_jobs = None
         if ref_sheet_path is not None and engine_type is not None:
             try:
-                sheet_mapping = {
-                    "Normal Main Engine": "ME Jobs",
-                    "MAN ME-C and ME-B Engine": "MEMEC",
-                    "RT Flex Engine": "MERTFLEX",
-                    "RTA Engine": "MERTA",
-                    "UEC Engine": "MEUEC",
-                    "WINGD Engine": "MEWINGD"
-                }
-                sheet_name = sheet_mapping.get(engine_type, "ME Jobs")
+                sheet_name = ENGINE_REFERENCE_SHEETS.get(engine_type, "ME Jobs")
 
-                ref_df = pd.read_excel(ref_sheet_path, sheet_name=sheet_name)
+                ref_df = read_reference_sheet(ref_sheet_path, sheet_name=sheet_name)
                 ref_df['UI Job Code'] = ref_df['UI Job Code'].astype(str)
 
                 filtered_dfMEjobs = data[data['Machinery Location'].str.contains('Main Engine', na=False)].copy()
@@ -352,7 +344,7 @@ def process_engine_data(data, ref_sheet_path=None, engine_type=None):
                     missing_jobs = missing_jobs.drop(columns=['Remarks'])
                 missing_jobs.reset_index(drop=True, inplace=True)
             except Exception as e:
-                print(f"Error processing reference sheet: {e}")
+                logger.error('Error processing reference sheet: %s', e)
 
         # Analyze engine components if engine type is provided
         component_status = None
@@ -379,7 +371,7 @@ def process_engine_data(data, ref_sheet_path=None, engine_type=None):
                 pivot_table, ref_pivot_table, missing_jobs, cylinder_pivot_table, None, component_status, missing_count)
 
     except Exception as e:
-        print(f"Error in process_engine_data: {str(e)}")
+        logger.error('Error in process_engine_data: %s', e)
         raise
 
 def generate_html_report(vessel_name, main_engine_data, aux_engine_data, main_engine_running_hours, aux_running_hours, component_status, missing_count):
@@ -437,9 +429,7 @@ def generate_html_report(vessel_name, main_engine_data, aux_engine_data, main_en
                 <h3>Main Engine Running Hours: {main_engine_running_hours}</h3>
                 <h3>Auxiliary Engine Running Hours:</h3>
                 <ul>
-                    <li>Auxiliary Engine#1: {aux_running_hours['AE1']}</li>
-                    <li>Auxiliary Engine#2: {aux_running_hours['AE2']}</li>
-                    <li>Auxiliary Engine#3: {aux_running_hours['AE3']}</li>
+                    {''.join(f'<li>Auxiliary Engine#{unit[2:]}: {hours}</li>' for unit, hours in aux_running_hours.items())}
                 </ul>
             </div>
             <h2>Main Engine Maintenance Data</h2>
@@ -455,5 +445,5 @@ def generate_html_report(vessel_name, main_engine_data, aux_engine_data, main_en
         """
         return html_template
     except Exception as e:
-        print(f"Error generating HTML report: {str(e)}")
+        logger.error('Error generating HTML report: %s', e)
         raise
\ No newline at end of file
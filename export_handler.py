@@ -2,8 +2,8 @@ import pandas as pd
 import io
 import datetime
 import base64
-import matplotlib.pyplot as plt
 from io import BytesIO
+from chart_builder import managed_figure
 
 class ExportHandler:
     def __init__(self, data, engine_type):
@@ -88,47 +88,44 @@ class ExportHandler:
                     missing_jobs_df = tables[0]
 
                     # PIE 1
-                    fig1, ax1 = plt.subplots(figsize=(4, 4))
-                    wedges1, texts1, autotexts1 = ax1.pie(
-                        [totaljobs, total_missing_jobs],
-                        labels=["Total Jobs", "Missing Jobs"],
-                        autopct=lambda pct: f'{int(pct * (totaljobs + total_missing_jobs) / 100)} ({pct:.1f}%)'
-                    )
-                    ax1.axis("equal")
-                    ax1.set_title("Total Jobs vs Missing Jobs")
-                    html += self.plot_to_base64(fig1)
-                    plt.close(fig1)
+                    with managed_figure(figsize=(4, 4)) as (fig1, ax1):
+                        wedges1, texts1, autotexts1 = ax1.pie(
+                            [totaljobs, total_missing_jobs],
+                            labels=["Total Jobs", "Missing Jobs"],
+                            autopct=lambda pct: f'{int(pct * (totaljobs + total_missing_jobs) / 100)} ({pct:.1f}%)'
+                        )
+                        ax1.axis("equal")
+                        ax1.set_title("Total Jobs vs Missing Jobs")
+                        html += self.plot_to_base64(fig1)
 
                     # PIE 2
-                    fig2, ax2 = plt.subplots(figsize=(4, 4))
-                    wedges2, texts2, autotexts2 = ax2.pie(
-                        [total_machinery, missing_machinery],
-                        labels=["Present", "Missing"],
-                        autopct=lambda pct: f'{int(pct * (total_machinery + missing_machinery) / 100)} ({pct:.1f}%)'
-                    )
-                    ax2.axis("equal")
-                    ax2.set_title("Machinery Summary")
-                    html += self.plot_to_base64(fig2)
-                    plt.close(fig2)
+                    with managed_figure(figsize=(4, 4)) as (fig2, ax2):
+                        wedges2, texts2, autotexts2 = ax2.pie(
+                            [total_machinery, missing_machinery],
+                            labels=["Present", "Missing"],
+                            autopct=lambda pct: f'{int(pct * (total_machinery + missing_machinery) / 100)} ({pct:.1f}%)'
+                        )
+                        ax2.axis("equal")
+                        ax2.set_title("Machinery Summary")
+                        html += self.plot_to_base64(fig2)
 
                     # BAR
-                    fig3, ax3 = plt.subplots(figsize=(18, 6))
-                    bars = ax3.bar(missing_jobs_df["Machinery System"], missing_jobs_df["Missing Jobs Count"], color='#5DADE2')
-
-                    for bar in bars:
-                        height = bar.get_height()
-                        ax3.text(bar.get_x() + bar.get_width() / 2, height + 0.5, str(int(height)),
-                                ha='center', va='bottom', fontsize=9)
-
-                    ax3.set_title("Missing Jobs by Machinery System")
-                    ax3.set_xlabel("Machinery System")
-                    ax3.set_ylabel("Missing Jobs Count")
-                    ax3.tick_params(axis='x', rotation=45, labelsize=9)  # Make label font smaller
-                    ax3.grid(axis='y', linestyle='--', alpha=0.5)
-
-                    fig3.tight_layout()  # Ensures everything fits within frame
-                    html += self.plot_to_base64(fig3)
-                    plt.close(fig3)
+                    with managed_figure(figsize=(18, 6)) as (fig3, ax3):
+                        bars = ax3.bar(missing_jobs_df["Machinery System"], missing_jobs_df["Missing Jobs Count"], color='#5DADE2')
+
+                        for bar in bars:
+                            height = bar.get_height()
+                            ax3.text(bar.get_x() + bar.get_width() / 2, height + 0.5, str(int(height)),
+                                    ha='center', va='bottom', fontsize=9)
+
+                        ax3.set_title("Missing Jobs by Machinery System")
+                        ax3.set_xlabel("Machinery System")
+                        ax3.set_ylabel("Missing Jobs Count")
+                        ax3.tick_params(axis='x', rotation=45, labelsize=9)  # Make label font smaller
+                        ax3.grid(axis='y', linestyle='--', alpha=0.5)
+
+                        fig3.tight_layout()  # Ensures everything fits within frame
+                        html += self.plot_to_base64(fig3)
 
                 except Exception as chart_err:
                     html += f"<p>Chart generation failed: {chart_err}</p>"
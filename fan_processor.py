@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class FanSystemProcessor:
     def __init__(self):
         self.filtered_dffanjobs = pd.DataFrame()
@@ -72,7 +75,6 @@ class FanSystemProcessor:
                 .set_table_attributes("class='dataframe' style='margin-left: 0 !important; margin-right: auto; width: 100%'")
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_fan_data')
             self.pivot_table_resultfanJobs = pd.DataFrame({'Error': [f'Fan data processing failed: {str(e)}']})
             self.pivot_table_fan = pd.DataFrame({'Error': [f'Fan pivot generation failed: {str(e)}']})
@@ -1,7 +1,14 @@
+import logging
 import pandas as pd
 import numpy as np
+from count_cube import DeferredFrame, cube_pivot
+
+logger = logging.getLogger(__name__)
 
 class FFAMappingProcessor:
+    # Merged jobs; built on first access when the counts came from a count cube
+    result_dfffa = DeferredFrame()
+
     def __init__(self):
         self.result_dfffa = pd.DataFrame()
         self.pivot_table_resultffaJobs = pd.DataFrame()
@@ -17,52 +24,70 @@ class FFAMappingProcessor:
     def format_blank(self, val):
         return "" if val in [0, '0', 0.0] else val
 
-    def process_ffa_data(self, df, dfffa):
+    def prepare_jobs(self, df, ffa):
+        dfcopy = df.copy()
+        dfcopy['Job Codecopy'] = dfcopy['Job Code'].apply(self.safe_convert_to_string)
+        return dfcopy[dfcopy['Function'].str.contains('|'.join(ffa), na=False)].copy()
+
+    def merge_reference(self, filtered_dfffajobs, dfffa, ref_code_col):
+        result = filtered_dfffajobs.merge(
+            dfffa,
+            left_on='Job Codecopy',
+            right_on=ref_code_col,
+            suffixes=('_filtered', '_ref')
+        )
+        result.reset_index(drop=True, inplace=True)
+
+        # Widen Title column by padding to improve display in Streamlit; a reference sheet with its own Title column
+        # leaves Title_filtered / Title_ref instead
+        if 'Title' in result.columns:
+            result['Title'] = result['Title'].apply(lambda x: f"{x:<50}")
+        return result
+
+    def process_ffa_data(self, df, dfffa, cube=None):
+        """cube: optional JobCountCube of df; the counts are sliced from it instead of merging df."""
         try:
             ffa = ['FFE Fixed', 'LSA Fixed', 'LSA Loose', 'FFE Loose']
 
-            dfcopy = df.copy()
-            dfcopy['Job Codecopy'] = dfcopy['Job Code'].apply(self.safe_convert_to_string)
-
             ref_code_col = 'UI Job Code'
             dfffa[ref_code_col] = dfffa[ref_code_col].apply(self.safe_convert_to_string)
 
-            filtered_dfffajobs = dfcopy[dfcopy['Function'].str.contains('|'.join(ffa), na=False)].copy()
-
-            self.result_dfffa = filtered_dfffajobs.merge(
-                dfffa,
-                left_on='Job Codecopy',
-                right_on=ref_code_col,
-                suffixes=('_filtered', '_ref')
-            )
-            self.result_dfffa.reset_index(drop=True, inplace=True)
-
-            # Widen Title column by padding to improve display in Streamlit
-            self.result_dfffa['Title'] = self.result_dfffa['Title'].apply(lambda x: f"{x:<50}")
+            if cube is not None and cube.serves(dfffa):
+                rows = cube.slice(dfffa[ref_code_col], functions=ffa)
+                rows['Title'] = rows['Title'].apply(lambda x: f"{x:<50}")
+                pivot_raw = cube_pivot(rows, 'Title', 'Function')
+                total_raw = cube_pivot(rows, 'Title')
+                vessel_codes = cube.codes(functions=ffa)
+                self.result_dfffa = lambda: self.merge_reference(self.prepare_jobs(df, ffa), dfffa, ref_code_col)
+            else:
+                filtered_dfffajobs = self.prepare_jobs(df, ffa)
+                self.result_dfffa = self.merge_reference(filtered_dfffajobs, dfffa, ref_code_col)
+                pivot_raw = self.result_dfffa.pivot_table(
+                    index='Title',
+                    columns='Function',
+                    values='Job Codecopy',
+                    aggfunc='count'
+                )
+                total_raw = self.result_dfffa.pivot_table(
+                    index='Title',
+                    values='Job Codecopy',
+                    aggfunc='count'
+                )
+                vessel_codes = filtered_dfffajobs['Job Codecopy']
 
-            pivot_raw = self.result_dfffa.pivot_table(
-                index='Title',
-                columns='Function',
-                values='Job Codecopy',
-                aggfunc='count'
-            ).fillna(0).astype(int)
+            pivot_raw = pivot_raw.fillna(0).astype(int)
 
             self.pivot_table_resultffaJobs = pivot_raw.replace(0, '').map(self.format_blank)
 
-            total_raw = self.result_dfffa.pivot_table(
-                index='Title',
-                values='Job Codecopy',
-                aggfunc='count'
-            ).fillna(0).astype(int).sort_values(by='Job Codecopy', ascending=False)
+            total_raw = total_raw.fillna(0).astype(int).sort_values(by='Job Codecopy', ascending=False)
 
             self.pivot_table_resultffaJobstotal = total_raw.replace(0, '').map(self.format_blank)
 
-            self.missingffajobsresult = dfffa[~dfffa[ref_code_col].isin(filtered_dfffajobs['Job Codecopy'])].copy()
+            self.missingffajobsresult = dfffa[~dfffa[ref_code_col].isin(vessel_codes)].copy()
             self.missingffajobsresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_ffa_data')
             self.pivot_table_resultffaJobs = pd.DataFrame({'Error': [f'Processing failed: {str(e)}']})
             self.pivot_table_resultffaJobstotal = pd.DataFrame()
             self.missingffajobsresult = pd.DataFrame()
\ No newline at end of file
@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from reference_bundle import read_reference_sheet, reference_sheet_names
 
 class FFASystemProcessor:
     def __init__(self):
@@ -23,9 +24,9 @@ class FFASystemProcessor:
             self.filter_ffasys_jobs = data_copy[data_copy['Machinery Location'].str.contains(pattern, na=False)].copy()
             self.filter_ffasys_jobs['Job Codecopy'] = self.filter_ffasys_jobs['Job Code'].apply(self.safe_convert_to_string)
 
-            ref_sheet_names = pd.ExcelFile(ref_sheet).sheet_names
+            ref_sheet_names = reference_sheet_names(ref_sheet)
             self.ffasys_sheet = 'FFASYS' if 'FFASYS' in ref_sheet_names else ref_sheet_names[0]
-            self.df_ffasys = pd.read_excel(ref_sheet, sheet_name=self.ffasys_sheet)
+            self.df_ffasys = read_reference_sheet(ref_sheet, sheet_name=self.ffasys_sheet)
 
             job_code_col = 'UI Job Code'
             self.df_ffasys[job_code_col] = self.df_ffasys[job_code_col].astype(str).str.strip()
@@ -0,0 +1,279 @@
+import os
+import sys
+import json
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from analysis_pipeline import (UNKNOWN_VESSEL, export_paths, load_vessel_export, missing_job_entries, run_missing_jobs,
+                               split_by_vessel)
+from reference_bundle import open_reference, read_reference_sheet
+
+logger = logging.getLogger(__name__)
+
+
+class FleetMissingJobsMatrix:
+    """Sparse vessel x (system, job code) matrix; a stored 1 means the vessel misses that reference job.
+
+    Rows are added per vessel from the {label: missing jobs DataFrame} mapping produced by
+    analysis_pipeline.run_missing_jobs, so the labels match the QuickView systems.
+    """
+
+    def __init__(self):
+        self.vessels = []
+        self.jobs = []  # (system, job code) per column
+        self.titles = {}
+        self._vessel_index = {}
+        self._job_index = {}
+        self._code_columns = {}
+        self._rows = []
+        self._cols = []
+        self._csr = None
+        self._csc = None
+
+    def _job_column(self, system, job_code):
+        key = (system, job_code)
+        if key not in self._job_index:
+            self._job_index[key] = len(self.jobs)
+            self._code_columns.setdefault(job_code, []).append(len(self.jobs))
+            self.jobs.append(key)
+        return self._job_index[key]
+
+    def add_vessel(self, vessel, missing_sources):
+        """Add (or replace) one vessel's missing jobs; returns the number of entries recorded."""
+        if vessel in self._vessel_index:
+            self.remove_vessel(vessel)
+        row = len(self.vessels)
+        self._vessel_index[vessel] = row
+        self.vessels.append(vessel)
+
+        added = 0
+        for system, missing in missing_sources.items():
+            entries = missing_job_entries(missing)
+            for code, title in zip(entries['Job Code'], entries['Title']):
+                col = self._job_column(system, code)
+                if pd.notna(title):
+                    self.titles.setdefault((system, code), str(title))
+                self._rows.append(row)
+                self._cols.append(col)
+                added += 1
+
+        self._csr = self._csc = None
+        return added
+
+    def remove_vessel(self, vessel):
+        """Drop a vessel's row and renumber the rows after it."""
+        row = self._vessel_index.pop(vessel)
+        keep = [i for i, r in enumerate(self._rows) if r != row]
+        self._rows = [r - 1 if r > row else r for r in (self._rows[i] for i in keep)]
+        self._cols = [self._cols[i] for i in keep]
+        del self.vessels[row]
+        self._vessel_index = {name: i for i, name in enumerate(self.vessels)}
+        self._csr = self._csc = None
+
+    @property
+    def matrix(self):
+        """CSR matrix (vessels x jobs), built on first use after changes."""
+        if self._csr is None:
+            shape = (len(self.vessels), len(self.jobs))
+            data = np.ones(len(self._rows), dtype=np.int8)
+            matrix = sparse.coo_matrix((data, (self._rows, self._cols)), shape=shape).tocsr()
+            matrix.sum_duplicates()
+            matrix.data[:] = 1
+            self._csr = matrix
+        return self._csr
+
+    @property
+    def _columns(self):
+        # Column-major copy for per-job lookups
+        if self._csc is None:
+            self._csc = self.matrix.tocsc()
+        return self._csc
+
+    def _job_columns(self, job_code, system=None):
+        columns = self._code_columns.get(str(job_code).strip(), [])
+        return [i for i in columns if system is None or self.jobs[i][0] == system]
+
+    def vessels_missing(self, job_code, system=None):
+        """Vessels missing a job code, optionally restricted to one system."""
+        columns = self._columns
+        rows = []
+        for col in self._job_columns(job_code, system):
+            start, end = columns.indptr[col], columns.indptr[col + 1]
+            for vessel_row in columns.indices[start:end]:
+                rows.append({
+                    'Vessel': self.vessels[vessel_row],
+                    'System': self.jobs[col][0],
+                    'Job Code': self.jobs[col][1],
+                    'Title': self.titles.get(self.jobs[col]),
+                })
+        return pd.DataFrame(rows, columns=['Vessel', 'System', 'Job Code', 'Title'])
+
+    def missing_jobs_for(self, vessel):
+        """All (system, job code) entries a vessel misses."""
+        row = self._vessel_index[vessel]
+        matrix = self.matrix
+        cols = matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+        return pd.DataFrame(
+            [{'System': self.jobs[c][0], 'Job Code': self.jobs[c][1], 'Title': self.titles.get(self.jobs[c])}
+             for c in sorted(cols)],
+            columns=['System', 'Job Code', 'Title']
+        )
+
+    def top_missing_jobs(self, n=20, system=None):
+        """Jobs missed by the most vessels across the fleet."""
+        columns = ['System', 'Job Code', 'Title', 'Vessels Missing', '% of Fleet']
+        if not self.jobs or not self.vessels:
+            return pd.DataFrame(columns=columns)
+        counts = np.diff(self._columns.indptr)
+        if system is not None:
+            mask = np.array([sys_label == system for sys_label, _ in self.jobs])
+            counts = np.where(mask, counts, 0)
+        n = min(n, int((counts > 0).sum()))
+        if n == 0:
+            return pd.DataFrame(columns=columns)
+        top = np.argpartition(-counts, n - 1)[:n]
+        top = top[np.lexsort((top, -counts[top]))]
+        fleet_size = len(self.vessels)
+        return pd.DataFrame([{
+            'System': self.jobs[c][0],
+            'Job Code': self.jobs[c][1],
+            'Title': self.titles.get(self.jobs[c]),
+            'Vessels Missing': int(counts[c]),
+            '% of Fleet': round(100.0 * counts[c] / fleet_size, 1),
+        } for c in top], columns=columns)
+
+    def missing_counts_by_vessel(self):
+        """Vessel x system table of missing-job counts."""
+        if not self.vessels:
+            return pd.DataFrame()
+        systems = sorted({sys_label for sys_label, _ in self.jobs})
+        system_index = {label: i for i, label in enumerate(systems)}
+        # Job -> system indicator, so one sparse product gives every count
+        indicator = sparse.csr_matrix(
+            (np.ones(len(self.jobs), dtype=np.int32),
+             ([system_index[sys_label] for sys_label, _ in self.jobs], np.arange(len(self.jobs)))),
+            shape=(len(systems), len(self.jobs))
+        )
+        counts = (self.matrix.astype(np.int32) @ indicator.T).toarray()
+        table = pd.DataFrame(counts, index=self.vessels, columns=systems)
+        table['Total'] = table.sum(axis=1)
+        table.index.name = 'Vessel'
+        return table
+
+    def save(self, path):
+        """Write the matrix as .npz with the row/column labels alongside."""
+        meta = {
+            'vessels': self.vessels,
+            'jobs': [list(job) for job in self.jobs],
+            'titles': [self.titles.get(job) for job in self.jobs],
+        }
+        matrix = self.matrix.tocoo()
+        np.savez_compressed(path, row=matrix.row, col=matrix.col, shape=np.array(matrix.shape),
+                            meta=np.array(json.dumps(meta)))
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as archive:
+            meta = json.loads(str(archive['meta']))
+            fleet = cls()
+            fleet.vessels = list(meta['vessels'])
+            fleet.jobs = [tuple(job) for job in meta['jobs']]
+            fleet.titles = {job: title for job, title in zip(fleet.jobs, meta['titles']) if title is not None}
+            fleet._vessel_index = {name: i for i, name in enumerate(fleet.vessels)}
+            fleet._job_index = {job: i for i, job in enumerate(fleet.jobs)}
+            for i, (_, code) in enumerate(fleet.jobs):
+                fleet._code_columns.setdefault(code, []).append(i)
+            fleet._rows = archive['row'].tolist()
+            fleet._cols = archive['col'].tolist()
+        return fleet
+
+
+def build_fleet_matrix(paths, ref_sheet, engine_type=None, fleet=None):
+    """Run the missing-jobs pipeline for every vessel in the given exports and collect the results."""
+    ref_sheet = open_reference(ref_sheet)
+    sheets = read_reference_sheet(ref_sheet, sheet_name=None)
+    fleet = fleet or FleetMissingJobsMatrix()
+
+    for path in export_paths(paths):
+        try:
+            data = load_vessel_export(path)
+        except Exception:
+            logger.exception('Could not read vessel export %s', path)
+            continue
+        for vessel, vessel_data in split_by_vessel(data).items():
+            if vessel == UNKNOWN_VESSEL:
+                # Unnamed rows of different exports are different vessels; keep each export's own row
+                vessel = f'{UNKNOWN_VESSEL} ({os.path.basename(path)})'
+            missing_sources = run_missing_jobs(vessel_data, ref_sheet, engine_type, sheets=sheets)
+            added = fleet.add_vessel(vessel, missing_sources)
+            logger.info('%s: %d missing jobs', vessel, added)
+    return fleet
+
+
+def fleet_from_summaries(summaries, fleet=None):
+    """FleetMissingJobsMatrix of analysis_pipeline.quickview_summary() dicts keyed by vessel."""
+    fleet = fleet or FleetMissingJobsMatrix()
+    for vessel, summary in summaries.items():
+        missing_sources = {label: pd.DataFrame(records) for label, records in summary['missing_jobs'].items()}
+        fleet.add_vessel(vessel, missing_sources)
+    return fleet
+
+
+def fleet_overview(summaries):
+    """One row of QuickView totals per vessel, for comparing the vessels of one upload."""
+    columns = ['Vessel', 'Engine Type', 'Total Jobs', 'Critical Jobs', 'Missing Jobs',
+               'Missing Machinery', 'Total Machinery']
+    return pd.DataFrame([{
+        'Vessel': vessel,
+        'Engine Type': summary['engine_type'],
+        'Total Jobs': summary['total_jobs'],
+        'Critical Jobs': summary['critical_jobs'],
+        'Missing Jobs': summary['total_missing_jobs'],
+        'Missing Machinery': summary['missing_machinery_count'],
+        'Total Machinery': summary['total_machinery'],
+    } for vessel, summary in summaries.items()], columns=columns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the fleet-wide missing-jobs matrix.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Analyze vessel exports into a matrix file")
+    build_parser.add_argument('reference', help="Reference workbook (.xlsx) or compiled bundle (.zip)")
+    build_parser.add_argument('exports', nargs='+', help="Vessel exports (.csv/.xlsx) or directories of them")
+    build_parser.add_argument('-o', '--output', default='fleet_missing_jobs.npz')
+    build_parser.add_argument('--engine-type', default=None, help="Default: detected per vessel from its locations")
+
+    top_parser = subparsers.add_parser('top', help="Most frequently missing jobs")
+    top_parser.add_argument('matrix')
+    top_parser.add_argument('-n', type=int, default=20)
+    top_parser.add_argument('--system', default=None)
+
+    which_parser = subparsers.add_parser('which', help="Vessels missing a job code")
+    which_parser.add_argument('matrix')
+    which_parser.add_argument('job_code')
+    which_parser.add_argument('--system', default=None)
+
+    args = parser.parse_args(argv)
+    pd.set_option('display.width', 200)
+    if args.command == 'build':
+        fleet = build_fleet_matrix(args.exports, args.reference, args.engine_type)
+        fleet.save(args.output)
+        print(f"Wrote {args.output}: {len(fleet.vessels)} vessels, {len(fleet.jobs)} job codes, "
+              f"{fleet.matrix.nnz} missing entries")
+    elif args.command == 'top':
+        print(FleetMissingJobsMatrix.load(args.matrix).top_missing_jobs(args.n, args.system).to_string(index=False))
+    else:
+        print(FleetMissingJobsMatrix.load(args.matrix).vessels_missing(args.job_code, args.system).to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    from log_config import configure_logging
+    configure_logging()
+    sys.exit(main())
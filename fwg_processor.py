@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class FWGSystemProcessor:
     def __init__(self):
         self.filtered_dffwgjobs = pd.DataFrame()
@@ -72,7 +75,6 @@ class FWGSystemProcessor:
             self.missingjobsfwgresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_fwg_data')
             self.pivot_table_resultfwgJobs = pd.DataFrame({'Error': [f'FWG data processing failed: {str(e)}']})
             self.missingjobsfwgresult = pd.DataFrame()
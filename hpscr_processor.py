@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class HPSCRSystemProcessor:
     def __init__(self):
         self.filtered_dfHPSCRjobs = pd.DataFrame()
@@ -69,7 +72,6 @@ class HPSCRSystemProcessor:
             self.missingjobsHPSCRresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_hpscr_data')
             self.pivot_table_resultHPSCRJobs = pd.DataFrame({'Error': [f'HPSCR data processing failed: {str(e)}']})
             self.missingjobsHPSCRresult = pd.DataFrame()
@@ -1,7 +1,14 @@
+import logging
 import pandas as pd
 import numpy as np
+from count_cube import DeferredFrame, cube_pivot
+
+logger = logging.getLogger(__name__)
 
 class InactiveMappingProcessor:
+    # Merged jobs; built on first access when the counts came from a count cube
+    result_dfinactive = DeferredFrame()
+
     def __init__(self):
         self.result_dfinactive = pd.DataFrame()
         self.pivot_table_resultinactiveJobs = pd.DataFrame()
@@ -23,48 +30,68 @@ class InactiveMappingProcessor:
                 return name
         raise KeyError(f"None of the columns {possible_names} found in DataFrame")
 
-    def process_inactive_data(self, df, dfinactive):
-        try:
-            dfcopy = df.copy()
-            dfcopy['Job Codecopy'] = dfcopy['Job Code'].apply(self.safe_convert_to_string)
+    def prepare_jobs(self, df):
+        dfcopy = df.copy()
+        dfcopy['Job Codecopy'] = dfcopy['Job Code'].apply(self.safe_convert_to_string)
+        return dfcopy
+
+    def merge_reference(self, dfcopy, dfinactive, ref_code_col):
+        result = dfcopy.merge(
+            dfinactive,
+            left_on='Job Codecopy',
+            right_on=ref_code_col,
+            suffixes=('_filtered', '_ref')
+        )
+        result.reset_index(drop=True, inplace=True)
 
+        # A reference sheet with its own Title column leaves Title_filtered / Title_ref instead
+        if 'Title' in result.columns:
+            result['Title'] = result['Title'].apply(lambda x: f"{x:<50}")
+        return result
+
+    def process_inactive_data(self, df, dfinactive, cube=None):
+        """cube: optional JobCountCube of df; the counts are sliced from it instead of merging df."""
+        try:
             # Identify correct reference column from possible options
             ref_code_col = self.find_column(dfinactive, ['Job Code', 'UI Job Code', 'Code'])
             dfinactive[ref_code_col] = dfinactive[ref_code_col].apply(self.safe_convert_to_string)
 
-            self.result_dfinactive = dfcopy.merge(
-                dfinactive,
-                left_on='Job Codecopy',
-                right_on=ref_code_col,
-                suffixes=('_filtered', '_ref')
-            )
-            self.result_dfinactive.reset_index(drop=True, inplace=True)
-
-            self.result_dfinactive['Title'] = self.result_dfinactive['Title'].apply(lambda x: f"{x:<50}")
+            if cube is not None and cube.serves(dfinactive):
+                rows = cube.slice(dfinactive[ref_code_col])
+                rows['Title'] = rows['Title'].apply(lambda x: f"{x:<50}")
+                pivot_raw = cube_pivot(rows, 'Title', 'Function')
+                total_raw = cube_pivot(rows, 'Title')
+                vessel_codes = cube.codes()
+                self.result_dfinactive = lambda: self.merge_reference(self.prepare_jobs(df), dfinactive, ref_code_col)
+            else:
+                dfcopy = self.prepare_jobs(df)
+                self.result_dfinactive = self.merge_reference(dfcopy, dfinactive, ref_code_col)
+                pivot_raw = self.result_dfinactive.pivot_table(
+                    index='Title',
+                    columns='Function',
+                    values='Job Codecopy',
+                    aggfunc='count'
+                )
+                total_raw = self.result_dfinactive.pivot_table(
+                    index='Title',
+                    values='Job Codecopy',
+                    aggfunc='count'
+                )
+                vessel_codes = dfcopy['Job Codecopy']
 
-            pivot_raw = self.result_dfinactive.pivot_table(
-                index='Title',
-                columns='Function',
-                values='Job Codecopy',
-                aggfunc='count'
-            ).fillna(0).astype(int)
+            pivot_raw = pivot_raw.fillna(0).astype(int)
 
             self.pivot_table_resultinactiveJobs = pivot_raw.replace(0, '').map(self.format_blank)
 
-            total_raw = self.result_dfinactive.pivot_table(
-                index='Title',
-                values='Job Codecopy',
-                aggfunc='count'
-            ).fillna(0).astype(int).sort_values(by='Job Codecopy', ascending=False)
+            total_raw = total_raw.fillna(0).astype(int).sort_values(by='Job Codecopy', ascending=False)
 
             self.pivot_table_resultinactiveJobstotal = total_raw.replace(0, '').map(self.format_blank)
 
-            self.missinginactivejobsresult = dfinactive[~dfinactive[ref_code_col].isin(dfcopy['Job Codecopy'])].copy()
+            self.missinginactivejobsresult = dfinactive[~dfinactive[ref_code_col].isin(vessel_codes)].copy()
             self.missinginactivejobsresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_inactive_data')
             self.pivot_table_resultinactiveJobs = pd.DataFrame({'Error': [f'Processing failed: {str(e)}']})
             self.pivot_table_resultinactiveJobstotal = pd.DataFrame()
             self.missinginactivejobsresult = pd.DataFrame()
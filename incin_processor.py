@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class IncineratorSystemProcessor:
     def __init__(self):
         self.filtered_dfIncin = pd.DataFrame()
@@ -77,7 +80,6 @@ class IncineratorSystemProcessor:
             self.missingjobsIncinresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_incin_data')
             self.pivot_table_resultIncinJobs = pd.DataFrame({'Error': [f'Incinerator data processing failed: {str(e)}']})
             self.missingjobsIncinresult = pd.DataFrame()
\ No newline at end of file
@@ -0,0 +1,196 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from analysis_pipeline import (
+    JOB_CODE_COLUMNS, MISSING_JOB_SYSTEMS, missing_job_entries, run_missing_jobs
+)
+from reference_bundle import normalize_job_codes, read_reference_sheet, reference_version
+from job_code_aliases import canonical_job_codes, reference_aliases
+
+logger = logging.getLogger(__name__)
+
+# Columns identifying a job row; two uploads are diffed on the hash of these
+KEY_COLUMNS = ['Job Code', 'Machinery Location', 'Sub Component Location']
+
+
+def key_frame(data, aliases=None):
+    """KEY_COLUMNS as normalized strings (missing columns become empty).
+
+    Job codes are canonical under aliases (the default table when None), as run_missing_jobs sees them.
+    """
+    keys = pd.DataFrame(index=data.index)
+    for col in KEY_COLUMNS:
+        values = data[col] if col in data.columns else pd.Series('', index=data.index)
+        keys[col] = values.fillna('').astype(str).str.strip()
+    keys['Job Code'] = canonical_job_codes(normalize_job_codes(keys['Job Code']), aliases)
+    return keys.reset_index(drop=True)
+
+
+def row_hashes(keys):
+    return pd.util.hash_pandas_object(keys[KEY_COLUMNS], index=False).to_numpy()
+
+
+def _unmatched(hashes, other_hashes):
+    """Positions in hashes with no counterpart in other_hashes; duplicate keys are matched one to one."""
+    occurrence = pd.Series(hashes).groupby(hashes).cumcount().to_numpy()
+    other_counts = pd.Series(other_hashes).value_counts()
+    available = pd.Series(hashes).map(other_counts).fillna(0).to_numpy()
+    return np.flatnonzero(occurrence >= available)
+
+
+class UploadDiff:
+    """Rows added and removed between two uploads of the same vessel."""
+
+    def __init__(self, added, removed, machinery_changed):
+        self.added = added
+        self.removed = removed
+        self.machinery_changed = machinery_changed
+
+    @property
+    def changed_job_codes(self):
+        return set(self.added['Job Code']).union(self.removed['Job Code'])
+
+    @property
+    def is_empty(self):
+        return self.added.empty and self.removed.empty
+
+
+def diff_uploads(previous_keys, current_keys):
+    """Compare two key frames (see key_frame) by row hash."""
+    previous_hashes = row_hashes(previous_keys)
+    current_hashes = row_hashes(current_keys)
+    added = current_keys.iloc[_unmatched(current_hashes, previous_hashes)].reset_index(drop=True)
+    removed = previous_keys.iloc[_unmatched(previous_hashes, current_hashes)].reset_index(drop=True)
+
+    # Processors derive units (AE#3, Cylinder 7, ...) from the locations present, whatever the job code
+    machinery_changed = (
+        set(previous_keys['Machinery Location']) != set(current_keys['Machinery Location'])
+        or set(previous_keys['Sub Component Location']) != set(current_keys['Sub Component Location'])
+    )
+    return UploadDiff(added, removed, machinery_changed)
+
+
+def missing_jobs_delta(previous_sources, current_sources):
+    """New and resolved missing jobs per system between two runs."""
+    rows = []
+    for label in current_sources.keys() | previous_sources.keys():
+        before = missing_job_entries(previous_sources.get(label))
+        after = missing_job_entries(current_sources.get(label))
+        merged = before.merge(after, on=['Job Code', 'Machinery'], how='outer',
+                              suffixes=('_before', '_after'), indicator=True)
+        for change, side in (('New', 'right_only'), ('Resolved', 'left_only')):
+            subset = merged[merged['_merge'] == side]
+            for _, row in subset.iterrows():
+                title = row['Title_after'] if change == 'New' else row['Title_before']
+                rows.append({
+                    'Change': change,
+                    'System': label.replace('_', ' '),
+                    'Job Code': row['Job Code'],
+                    'Machinery': row['Machinery'],
+                    'Title': title,
+                })
+    delta = pd.DataFrame(rows, columns=['Change', 'System', 'Job Code', 'Machinery', 'Title'])
+    return delta.sort_values(by=['Change', 'System', 'Job Code']).reset_index(drop=True)
+
+
+class IncrementalAnalyzer:
+    """Keeps the previous upload of a vessel and recomputes only the systems its changed rows touch.
+
+    A system is recomputed when a changed row's job code appears in one of the reference sheets it
+    reads, when those sheets are unknown, or when the set of machinery locations changed. A different
+    vessel, reference version, engine type or BWTS sheet triggers a full run.
+    """
+
+    def __init__(self):
+        self.previous_keys = None
+        self.previous_context = None
+        self.missing_sources = None
+        self._system_codes = {}
+        self._system_codes_context = None
+
+    def reset(self):
+        self.__init__()
+
+    def _codes_by_system(self, sheets, context, options):
+        """Reference job codes per system label (None when the system's sheets are unknown)."""
+        if self._system_codes_context != context:
+            sheet_names = list(sheets.keys())
+            codes = {}
+            for system in MISSING_JOB_SYSTEMS:
+                names = system.reference_sheets(sheet_names, options)
+                if not names:
+                    codes[system.label] = None
+                    continue
+                system_codes = set()
+                for name in names:
+                    sheet = sheets[name]
+                    for col in JOB_CODE_COLUMNS:
+                        if col in sheet.columns:
+                            system_codes.update(normalize_job_codes(sheet[col].dropna()))
+                codes[system.label] = system_codes
+            self._system_codes = codes
+            self._system_codes_context = context
+        return self._system_codes
+
+    def affected_systems(self, diff, sheets, context, options):
+        labels = [system.label for system in MISSING_JOB_SYSTEMS]
+        if diff.machinery_changed:
+            return labels
+        changed = diff.changed_job_codes
+        codes = self._codes_by_system(sheets, context, options)
+        return [label for label in labels if codes.get(label) is None or codes[label] & changed]
+
+    def analyze(self, data, ref_sheet, engine_type=None, bwts_sheet=None, sheets=None, perf=None):
+        """Analyze an upload, reusing unaffected system results from the previous one.
+
+        Returns:
+            Dict with 'missing_sources', 'recomputed' (labels), 'full_run', 'rows_added',
+            'rows_removed' and 'delta' (new/resolved missing jobs, None on a full run)
+        """
+        keys = key_frame(data, reference_aliases(ref_sheet, sheets))
+        vessel = data['Vessel'].iloc[0] if 'Vessel' in data.columns and len(data) else None
+        context = (vessel, reference_version(ref_sheet), engine_type, bwts_sheet)
+        options = {'engine_type': engine_type, 'bwts_sheet': bwts_sheet}
+
+        if self.previous_keys is None or self.previous_context != context:
+            labels = None
+            diff = None
+        else:
+            diff = diff_uploads(self.previous_keys, keys)
+            if diff.is_empty:
+                labels = []
+            else:
+                if sheets is None:
+                    sheets = read_reference_sheet(ref_sheet, sheet_name=None)
+                labels = self.affected_systems(diff, sheets, context, options)
+
+        if labels is None or len(labels) == len(MISSING_JOB_SYSTEMS):
+            logger.info('Incremental analysis: full run')
+            missing_sources = run_missing_jobs(data, ref_sheet, engine_type, bwts_sheet, sheets=sheets, perf=perf)
+            recomputed = list(missing_sources)
+        elif labels:
+            logger.info('Incremental analysis: recomputing %s', ', '.join(labels))
+            updated = run_missing_jobs(data, ref_sheet, engine_type, bwts_sheet,
+                                       systems=labels, sheets=sheets, perf=perf)
+            missing_sources = {label: updated.get(label, frame) for label, frame in self.missing_sources.items()}
+            recomputed = labels
+        else:
+            missing_sources = dict(self.missing_sources)
+            recomputed = []
+
+        delta = missing_jobs_delta(self.missing_sources, missing_sources) if diff is not None else None
+
+        self.previous_keys = keys
+        self.previous_context = context
+        self.missing_sources = missing_sources
+
+        return {
+            'missing_sources': missing_sources,
+            'recomputed': recomputed,
+            'full_run': diff is None,
+            'rows_added': 0 if diff is None else len(diff.added),
+            'rows_removed': 0 if diff is None else len(diff.removed),
+            'delta': delta,
+        }
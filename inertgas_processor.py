@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import re
+from reference_bundle import read_reference_sheet, reference_sheet_names
 
 class InertGasSystemProcessor:
     def __init__(self):
@@ -35,9 +36,9 @@ class InertGasSystemProcessor:
             self.filter_igsystem_jobs = data_copy[data_copy['Function'].str.contains(pattern, na=False, flags=re.IGNORECASE)].copy()
             self.filter_igsystem_jobs['Job Codecopy'] = self.filter_igsystem_jobs['Job Code'].apply(self.safe_convert_to_string)
 
-            ref_sheet_names = pd.ExcelFile(ref_sheet).sheet_names
+            ref_sheet_names = reference_sheet_names(ref_sheet)
             self.igsystem_sheet = 'IGSystem' if 'IGSystem' in ref_sheet_names else ref_sheet_names[0]
-            self.df_igsystem = pd.read_excel(ref_sheet, sheet_name=self.igsystem_sheet)
+            self.df_igsystem = read_reference_sheet(ref_sheet, sheet_name=self.igsystem_sheet)
 
             possible_code_cols = ['UI Job Code', 'Job Code', 'JobCode', 'Code']
             job_code_col = next((col for col in possible_code_cols if col in self.df_igsystem.columns), None)
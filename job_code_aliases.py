@@ -0,0 +1,153 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from reference_bundle import ReferenceBundle, normalize_job_codes, read_raw_reference_sheet, reference_sheet_names
+
+logger = logging.getLogger(__name__)
+
+# Optional reference sheet listing alias -> canonical job codes; its rows extend or override the defaults
+ALIAS_SHEET = 'Job Code Aliases'
+ALIAS_COLUMNS = ['Alias Job Code', 'Alias', 'Raw Job Code']
+CANONICAL_COLUMNS = ['Canonical Job Code', 'Canonical', 'UI Job Code']
+
+# Job codes that stand for the same job as another code (formerly PumpSystemProcessor.mappings)
+DEFAULT_JOB_CODE_ALIASES = {'4406': '425', '428': '425', '2329': '425', '4656': '426', '7039': '426', '6001': '602'}
+
+RAW_CODE_COLUMN = 'Raw Job Code'
+
+# Reference sheet columns holding job codes; read_reference_sheet returns them canonical
+REFERENCE_CODE_COLUMNS = ['UI Job Code', 'Job Code']
+
+# Alias tables of recently read references, so reading one sheet does not re-read the alias sheet
+MAX_CACHED_ALIAS_TABLES = 8
+_reference_alias_cache = OrderedDict()
+_reference_alias_lock = threading.Lock()
+
+
+def load_aliases(sheet=None):
+    """{alias: canonical code} from DEFAULT_JOB_CODE_ALIASES and an optional alias sheet.
+
+    Codes are normalized like the reference sheets, and chains (a -> b -> c) resolve to
+    their last code so applying the table twice changes nothing. Cycles are dropped.
+    """
+    aliases = dict(DEFAULT_JOB_CODE_ALIASES)
+    if sheet is not None and not sheet.empty:
+        alias_col = next((col for col in ALIAS_COLUMNS if col in sheet.columns), None)
+        canonical_col = next((col for col in CANONICAL_COLUMNS if col in sheet.columns), None)
+        if alias_col is None or canonical_col is None:
+            logger.warning('%s sheet needs one of %s and one of %s; using the default aliases',
+                           ALIAS_SHEET, ALIAS_COLUMNS, CANONICAL_COLUMNS)
+        else:
+            rows = sheet[[alias_col, canonical_col]].dropna()
+            aliases.update(zip(normalize_job_codes(rows[alias_col]), normalize_job_codes(rows[canonical_col])))
+
+    resolved = {}
+    for alias in aliases:
+        seen = {alias}
+        code = aliases[alias]
+        while code in aliases and code not in seen:
+            seen.add(code)
+            code = aliases[code]
+        if code in seen:
+            logger.warning('Job code alias cycle through %s ignored', alias)
+            continue
+        resolved[alias] = code
+    return resolved
+
+
+def _alias_cache_key(ref_sheet):
+    """A key that identifies a reference without hashing its bytes, or None when it cannot be cached.
+
+    Uploads are keyed by the object itself; the cache keeps it alive, so its id is not reused meanwhile.
+    """
+    if isinstance(ref_sheet, ReferenceBundle):
+        return 'bundle', ref_sheet.version
+    if isinstance(ref_sheet, str) and os.path.exists(ref_sheet):
+        stat = os.stat(ref_sheet)
+        return 'path', os.path.realpath(ref_sheet), stat.st_mtime_ns, stat.st_size
+    if hasattr(ref_sheet, 'getvalue'):
+        return 'object', id(ref_sheet)
+    return None
+
+
+def reference_aliases(ref_sheet, sheets=None):
+    """Alias table of a reference workbook or bundle (the defaults when it has no alias sheet).
+
+    sheets is the already-read {sheet name: DataFrame} of every sheet, if the caller has it.
+    """
+    if ref_sheet is None:
+        return load_aliases()
+    if sheets is not None:
+        return load_aliases(sheets.get(ALIAS_SHEET))
+    key = _alias_cache_key(ref_sheet)
+    with _reference_alias_lock:
+        if key in _reference_alias_cache:
+            _reference_alias_cache.move_to_end(key)
+            return _reference_alias_cache[key][1]
+
+    has_sheet = ALIAS_SHEET in reference_sheet_names(ref_sheet)
+    aliases = load_aliases(read_raw_reference_sheet(ref_sheet, ALIAS_SHEET) if has_sheet else None)
+    if key is None:
+        return aliases
+    with _reference_alias_lock:
+        _reference_alias_cache[key] = (ref_sheet, aliases)
+        _reference_alias_cache.move_to_end(key)
+        while len(_reference_alias_cache) > MAX_CACHED_ALIAS_TABLES:
+            _reference_alias_cache.popitem(last=False)
+    return aliases
+
+
+def canonical_job_codes(codes, aliases=None):
+    """codes with every alias replaced by its canonical code; other values are returned unchanged.
+
+    Aliased values take the dtype of codes when the canonical codes fit it (e.g. int job codes).
+    """
+    aliases = DEFAULT_JOB_CODE_ALIASES if aliases is None else aliases
+    # Normalize and look up each distinct code once; position -1 (missing code) picks the trailing None
+    positions, distinct = pd.factorize(codes)
+    mapped = normalize_job_codes(pd.Series(distinct, dtype=object)).map(aliases)
+    canonical = pd.Series(np.append(mapped.to_numpy(dtype=object), None)[positions], index=codes.index)
+    aliased = canonical.notna()
+    if not aliased.any():
+        return codes
+    values = canonical[aliased]
+    result = codes.copy()
+    if pd.api.types.is_numeric_dtype(codes):
+        numeric = pd.to_numeric(values, errors='coerce')
+        if numeric.notna().all():
+            values = numeric.astype(codes.dtype)
+        else:
+            result = result.astype(object)
+    result[aliased] = values
+    return result
+
+
+def canonical_reference_codes(sheet, aliases=None):
+    """sheet with the job codes in REFERENCE_CODE_COLUMNS replaced by their canonical codes, so a
+    reference listing an alias code matches the canonical code of the vessel data."""
+    for col in REFERENCE_CODE_COLUMNS:
+        if col in sheet.columns:
+            codes = sheet[col]
+            canonical = canonical_job_codes(codes, aliases)
+            if canonical is not codes:
+                sheet[col] = canonical
+    return sheet
+
+
+def apply_job_code_aliases(data, aliases=None):
+    """data with the original codes kept in 'Raw Job Code' and canonical codes in 'Job Code'.
+
+    Runs once per upload: data that already has 'Raw Job Code' is returned as it is.
+    """
+    if 'Job Code' not in data.columns or RAW_CODE_COLUMN in data.columns:
+        return data
+    raw = data['Job Code']
+    canonical = canonical_job_codes(raw, aliases)
+    if canonical is not raw:
+        logger.info('Mapped %d job codes to their canonical codes', int((canonical.astype(str) != raw.astype(str)).sum()))
+    return data.assign(**{RAW_CODE_COLUMN: raw, 'Job Code': canonical})
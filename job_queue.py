@@ -0,0 +1,201 @@
+import io
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from reference_bundle import ReferenceBundle, is_reference_bundle, load_reference_bundle
+
+logger = logging.getLogger(__name__)
+
+JOB_KINDS = ('missing_jobs', 'summary', 'full_report')
+
+
+class UnknownJobError(KeyError):
+    """No job with this id: it was never submitted here or has already been evicted."""
+
+
+def reference_payload(ref_sheet):
+    """(name, bytes) of a reference workbook/bundle so it can be sent to a worker process."""
+    if isinstance(ref_sheet, ReferenceBundle):
+        return ref_sheet.name + '.zip', ref_sheet.raw
+    if hasattr(ref_sheet, 'getvalue'):
+        return getattr(ref_sheet, 'name', 'reference.xlsx'), ref_sheet.getvalue()
+    with open(ref_sheet, 'rb') as f:
+        return os.path.basename(ref_sheet), f.read()
+
+
+def _open_payload(name, raw):
+    if is_reference_bundle(name):
+        return load_reference_bundle(raw)
+    buffer = io.BytesIO(raw)
+    buffer.name = name
+    return buffer
+
+
+def job_key(kind, data, ref_raw, **params):
+    """Content hash of a job's inputs; identical requests share one job."""
+    from analysis_pipeline import data_fingerprint
+
+    digest = hashlib.sha256(kind.encode())
+    digest.update(data_fingerprint(data).encode())
+    digest.update(hashlib.sha256(ref_raw).digest())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:24]
+
+
+def _write_progress(path, state, fraction, message, error=None):
+    payload = {'state': state, 'progress': round(float(fraction), 3), 'message': message,
+               'error': error, 'updated': time.time()}
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    # Atomic so the UI never reads a half-written file
+    os.replace(tmp_path, path)
+
+
+def _worker_init():
+    from log_config import configure_logging
+    configure_logging()
+
+
+def _run_job(kind, data, ref_name, ref_raw, params, progress_path):
+    """Runs in a worker process."""
+    from analysis_pipeline import build_full_report, quickview_summary, run_missing_jobs
+
+    def progress(fraction, message):
+        _write_progress(progress_path, 'running', fraction, message)
+
+    try:
+        ref_sheet = _open_payload(ref_name, ref_raw)
+        progress(0.0, 'Starting')
+        if kind == 'missing_jobs':
+            result = run_missing_jobs(data, ref_sheet, progress=progress, **params)
+        elif kind == 'summary':
+            result = quickview_summary(data, ref_sheet, progress=progress, **params)
+        else:
+            result = build_full_report(data, ref_sheet, progress=progress, **params)
+        _write_progress(progress_path, 'done', 1.0, 'Done')
+        return result
+    except Exception as e:
+        logging.getLogger(__name__).exception('Job %s failed', kind)
+        _write_progress(progress_path, 'failed', 1.0, 'Failed', error=str(e))
+        raise
+
+
+class JobQueue:
+    """Runs heavy analyses in worker processes, shared by every Streamlit session of the server.
+
+    Jobs are keyed by a hash of their inputs, so a second click, a tab switch or another user
+    submitting the same upload attaches to the running job instead of starting a new one.
+    """
+
+    def __init__(self, max_workers=None, max_finished=16, work_dir=None):
+        self.max_workers = max_workers or max(1, min(2, (os.cpu_count() or 2) - 1))
+        self.max_finished = max_finished
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix='vessel_jobs_')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn: forking the multi-threaded Streamlit server is not safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_worker_init,
+            )
+        return self._executor
+
+    def submit(self, kind, data, ref_sheet, **params):
+        """Queue a job (or find the identical one) and return its id."""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        ref_name, ref_raw = reference_payload(ref_sheet)
+        key = job_key(kind, data, ref_raw, **params)
+
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not self._failed(job):
+                self._jobs.move_to_end(key)
+                return key
+
+            progress_path = os.path.join(self.work_dir, f'{key}.json')
+            _write_progress(progress_path, 'queued', 0.0, 'Waiting for a worker')
+            try:
+                future = self._get_executor().submit(_run_job, kind, data, ref_name, ref_raw, params, progress_path)
+            except BrokenProcessPool:
+                logger.warning('Worker pool was broken; starting a new one')
+                self._executor = None
+                future = self._get_executor().submit(_run_job, kind, data, ref_name, ref_raw, params, progress_path)
+
+            self._jobs[key] = {'kind': kind, 'future': future, 'progress_path': progress_path,
+                               'submitted': time.time()}
+            self._evict()
+        return key
+
+    @staticmethod
+    def _failed(job):
+        future = job['future']
+        return future.done() and (future.cancelled() or future.exception() is not None)
+
+    def _evict(self):
+        finished = [key for key, job in self._jobs.items() if job['future'].done()]
+        for key in finished[:max(0, len(finished) - self.max_finished)]:
+            job = self._jobs.pop(key)
+            try:
+                os.remove(job['progress_path'])
+            except OSError:
+                pass
+
+    def status(self, job_id):
+        """{'state': queued|running|done|failed|unknown, 'progress': 0..1, 'message', 'error', 'elapsed'}"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return {'state': 'unknown', 'progress': 0.0, 'message': 'No such job', 'error': None, 'elapsed': 0.0}
+
+        try:
+            with open(job['progress_path'], encoding='utf-8') as f:
+                status = json.load(f)
+        except (OSError, ValueError):
+            status = {'state': 'queued', 'progress': 0.0, 'message': 'Waiting for a worker', 'error': None}
+
+        future = job['future']
+        if future.done():
+            error = future.exception() if not future.cancelled() else 'Cancelled'
+            if error is not None:
+                status.update(state='failed', error=str(error))
+            else:
+                status.update(state='done', progress=1.0)
+        status['elapsed'] = time.time() - job['submitted']
+        status.pop('updated', None)
+        return status
+
+    def result(self, job_id):
+        """The finished job's artifact; raises if it failed or is still running, UnknownJobError if evicted."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise UnknownJobError(job_id)
+        if not job['future'].done():
+            raise RuntimeError(f"Job {job_id} is still running")
+        return job['future'].result()
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job is not None and job['future'].cancel()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class LadderSystemProcessor:
     def __init__(self):
         self.filtered_dfLadderjobs = pd.DataFrame()
@@ -76,7 +79,6 @@ class LadderSystemProcessor:
             self.missingjobsLadderresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_ladder_data')
             self.pivot_table_resultLadderJobs = pd.DataFrame({'Error': [f'Ladder data processing failed: {str(e)}']})
             self.missingjobsLadderresult = pd.DataFrame()
\ No newline at end of file
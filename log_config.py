@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+
+DEFAULT_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+
+_listener = None
+_queue_handler = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers."""
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def parse_module_levels(spec):
+    """Parse 'hatch_processor=DEBUG,pump_processor=INFO' into {'hatch_processor': 'DEBUG', ...}."""
+    levels = {}
+    for item in (spec or '').split(','):
+        if '=' not in item:
+            continue
+        name, level = item.split('=', 1)
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level=None, module_levels=None, json_path=None, force=False):
+    """Route all module loggers through a background queue to stderr and an optional JSON file.
+
+    Args:
+        level: Root level name; defaults to VESSEL_LOG_LEVEL or WARNING
+        module_levels: Dict of logger name -> level; defaults to VESSEL_LOG_MODULES
+        json_path: Optional JSON-lines sink; defaults to VESSEL_LOG_JSON
+        force: Reconfigure even if logging was already set up (Streamlit reruns call this every time)
+    """
+    global _listener, _queue_handler
+
+    if _listener is not None and not force:
+        return
+
+    root = logging.getLogger()
+    if _listener is not None:
+        _listener.stop()
+        root.removeHandler(_queue_handler)
+
+    level = (level or os.environ.get('VESSEL_LOG_LEVEL', 'WARNING')).upper()
+    if module_levels is None:
+        module_levels = parse_module_levels(os.environ.get('VESSEL_LOG_MODULES', ''))
+    json_path = json_path or os.environ.get('VESSEL_LOG_JSON')
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+    handlers = [stream_handler]
+
+    if json_path:
+        json_handler = logging.FileHandler(json_path, encoding='utf-8')
+        json_handler.setFormatter(JsonFormatter())
+        handlers.append(json_handler)
+
+    # Callers only enqueue records; formatting and I/O happen on the listener thread
+    log_queue = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+    for name, module_level in module_levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class LPSCRSystemProcessor:
     def __init__(self):
         self.filtered_dfLPSCRjobs = pd.DataFrame()
@@ -74,7 +77,6 @@ class LPSCRSystemProcessor:
             self.missingjobsLPSCRresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_lpscr_data')
             self.pivot_table_resultLPSCRJobs = pd.DataFrame({'Error': [f'LPSCR data processing failed: {str(e)}']})
             self.missingjobsLPSCRresult = pd.DataFrame()
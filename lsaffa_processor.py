@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from reference_bundle import read_reference_sheet, reference_sheet_names
 
 class LSAFFAProcessor:
     def __init__(self):
@@ -23,9 +24,9 @@ class LSAFFAProcessor:
             self.filter_lsaffa_jobs = data_copy[data_copy['Function'].str.contains(pattern, na=False)].copy()
             self.filter_lsaffa_jobs['Job Codecopy'] = self.filter_lsaffa_jobs['Job Code'].apply(self.safe_convert_to_string)
 
-            ref_sheet_names = pd.ExcelFile(ref_sheet).sheet_names
+            ref_sheet_names = reference_sheet_names(ref_sheet)
             self.lsaffa_sheet = 'LSAFFA' if 'LSAFFA' in ref_sheet_names else ref_sheet_names[0]
-            self.df_lsaffa = pd.read_excel(ref_sheet, sheet_name=self.lsaffa_sheet)
+            self.df_lsaffa = read_reference_sheet(ref_sheet, sheet_name=self.lsaffa_sheet)
 
             job_code_col = 'UI Job Code'
             self.df_lsaffa[job_code_col] = self.df_lsaffa[job_code_col].astype(str).str.strip()
@@ -1,7 +1,14 @@
+import logging
 import pandas as pd
 import numpy as np
+from count_cube import DeferredFrame, cube_pivot
+
+logger = logging.getLogger(__name__)
 
 class LSAMappingProcessor:
+    # Merged jobs; built on first access when the counts came from a count cube
+    result_dflsa = DeferredFrame()
+
     def __init__(self):
         self.result_dflsa = pd.DataFrame()
         self.pivot_table_resultlsaJobs = pd.DataFrame()
@@ -23,49 +30,70 @@ class LSAMappingProcessor:
             return 'background-color: #ffe599'
         return ''
 
-    def process_lsa_data(self, df, dflsa):
+    def prepare_jobs(self, df):
+        dfcopy = df.copy()
+        dfcopy['Job Codecopy'] = dfcopy['Job Code'].apply(self.safe_convert_to_string)
+        return dfcopy
+
+    def merge_reference(self, dfcopy, dflsa):
+        result = dfcopy.merge(
+            dflsa,
+            left_on='Job Codecopy',
+            right_on='UI Job Code',
+            suffixes=('_filtered', '_ref')
+        )
+        result.reset_index(drop=True, inplace=True)
+
+        # Widen Title column for better display (optional); a reference sheet with its own Title column
+        # leaves Title_filtered / Title_ref instead
+        if 'Title' in result.columns:
+            result['Title'] = result['Title'].apply(lambda x: f"{x:<50}")
+        return result
+
+    def process_lsa_data(self, df, dflsa, cube=None):
+        """cube: optional JobCountCube of df; the counts are sliced from it instead of merging df."""
         try:
-            dfcopy = df.copy()
-            dfcopy['Job Codecopy'] = dfcopy['Job Code'].apply(self.safe_convert_to_string)
             dflsa['UI Job Code'] = dflsa['UI Job Code'].apply(self.safe_convert_to_string)
 
-            self.result_dflsa = dfcopy.merge(
-                dflsa,
-                left_on='Job Codecopy',
-                right_on='UI Job Code',
-                suffixes=('_filtered', '_ref')
-            )
-            self.result_dflsa.reset_index(drop=True, inplace=True)
-
-            # Widen Title column for better display (optional)
-            self.result_dflsa['Title'] = self.result_dflsa['Title'].apply(lambda x: f"{x:<50}")
+            if cube is not None and cube.serves(dflsa):
+                rows = cube.slice(dflsa['UI Job Code'])
+                rows['Title'] = rows['Title'].apply(lambda x: f"{x:<50}")
+                pivot_raw = cube_pivot(rows, 'Title', 'Function')
+                total_raw = cube_pivot(rows, 'Title')
+                vessel_codes = cube.codes()
+                self.result_dflsa = lambda: self.merge_reference(self.prepare_jobs(df), dflsa)
+            else:
+                dfcopy = self.prepare_jobs(df)
+                self.result_dflsa = self.merge_reference(dfcopy, dflsa)
+                pivot_raw = self.result_dflsa.pivot_table(
+                    index='Title',
+                    columns='Function',
+                    values='Job Codecopy',
+                    aggfunc='count'
+                )
+                total_raw = self.result_dflsa.pivot_table(
+                    index='Title',
+                    values='Job Codecopy',
+                    aggfunc='count'
+                )
+                vessel_codes = dfcopy['Job Codecopy']
 
-            pivot_raw = self.result_dflsa.pivot_table(
-                index='Title',
-                columns='Function',
-                values='Job Codecopy',
-                aggfunc='count'
-            ).fillna(0).astype(int)
+            pivot_raw = pivot_raw.fillna(0).astype(int)
 
             self.pivot_table_resultlsaJobs = pivot_raw.replace(0, '').map(self.format_blank)
 
             # Optional: keep styled version for UI display
             self.pivot_table_resultlsaJobs_styled = pivot_raw.style.applymap(self.highlight_one)
 
-            total_raw = self.result_dflsa.pivot_table(
-                index='Title',
-                values='Job Codecopy',
-                aggfunc='count'
-            ).fillna(0).astype(int).sort_values(by='Job Codecopy', ascending=False)
+            total_raw = total_raw.fillna(0).astype(int).sort_values(by='Job Codecopy', ascending=False)
 
             self.pivot_table_resultlsaJobstotal = total_raw.replace(0, '').map(self.format_blank)
 
-            self.missinglsajobsresult = dflsa[~dflsa['UI Job Code'].isin(dfcopy['Job Codecopy'])].copy()
+            self.missinglsajobsresult = dflsa[~dflsa['UI Job Code'].isin(vessel_codes)].copy()
             self.missinglsajobsresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_lsa_data')
             self.pivot_table_resultlsaJobs = pd.DataFrame({'Error': [f'Processing failed: {str(e)}']})
             self.pivot_table_resultlsaJobstotal = pd.DataFrame()
             self.missinglsajobsresult = pd.DataFrame()
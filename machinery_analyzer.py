@@ -1,6 +1,11 @@
+import logging
 import pandas as pd
 import numpy as np
 import re
+from reference_bundle import read_reference_sheet
+from trigram_index import match_names
+
+logger = logging.getLogger(__name__)
 
 class MachineryAnalyzer:
     def __init__(self):
@@ -515,7 +520,7 @@ class MachineryAnalyzer:
 
     def process_data(self, data, ref_sheet):
         try:
-            reference_data = pd.read_excel(ref_sheet)
+            reference_data = read_reference_sheet(ref_sheet)
             required_columns = ['Machinery Location']
 
             if not all(col in data.columns for col in required_columns) or not all(col in reference_data.columns for col in required_columns):
@@ -556,10 +561,13 @@ class MachineryAnalyzer:
             result = {
                 'different_machinery': difMachineryVessel_df,
                 'missing_machinery': missingmachinery_df,
+                # Near-identical names (e.g. a plural) that appear on both lists above
+                'machinery_matches': match_names(difMachineryVessel_df['Different Machinery on Vessel'],
+                                                 missingmachinery_df['Missing Machinery on Vessel']),
             }
 
             return data, result
 
         except Exception as e:
-            print(f"Error processing machinery data: {str(e)}")
+            logger.error('Error processing machinery data: %s', e)
             return data, {"error": str(e)}
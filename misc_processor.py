@@ -1,7 +1,14 @@
+import logging
 import pandas as pd
 import numpy as np
+from count_cube import DeferredFrame, cube_pivot
+
+logger = logging.getLogger(__name__)
 
 class MiscSystemProcessor:
+    # Merged jobs; built on first access when the counts came from a count cube
+    result_dfmisc = DeferredFrame()
+
     def __init__(self):
         self.result_dfmisc = pd.DataFrame()
         self.pivot_table_resultmiscJobs = pd.DataFrame()
@@ -20,36 +27,62 @@ class MiscSystemProcessor:
     def format_blank(self, val):
         return "" if val == -1 else val
 
-    def process_misc_data(self, df, dfmisc):
+    def prepare_jobs(self, df):
+        dfcopy = df.copy()
+        if 'Job Codecopy' not in dfcopy.columns:
+            dfcopy['Job Codecopy'] = dfcopy['Job Code'].astype(str)
+        dfcopy['Job Codecopy'] = dfcopy['Job Codecopy'].apply(self.safe_convert_to_string)
+        return dfcopy
+
+    def merge_reference(self, dfcopy, dfmisc):
+        result = dfcopy.merge(
+            dfmisc,
+            left_on='Job Codecopy',
+            right_on='UI Job Code',
+            suffixes=('_filtered', '_ref')
+        )
+        result.reset_index(drop=True, inplace=True)
+        return result
+
+    def process_misc_data(self, df, dfmisc, cube=None):
+        """cube: optional JobCountCube of df; the counts are sliced from it instead of merging df."""
         try:
-            dfcopy = df.copy()
-            if 'Job Codecopy' not in dfcopy.columns:
-                dfcopy['Job Codecopy'] = dfcopy['Job Code'].astype(str)
-            dfcopy['Job Codecopy'] = dfcopy['Job Codecopy'].apply(self.safe_convert_to_string)
             dfmisc['UI Job Code'] = dfmisc['UI Job Code'].apply(self.safe_convert_to_string)
 
-            self.result_dfmisc = dfcopy.merge(
-                dfmisc,
-                left_on='Job Codecopy',
-                right_on='UI Job Code',
-                suffixes=('_filtered', '_ref')
-            )
-            self.result_dfmisc.reset_index(drop=True, inplace=True)
-
-            possible_titles = ['Title', 'J3 Job Title', 'Task Description', 'Job Title']
-            title_col = next((col for col in possible_titles if col in self.result_dfmisc.columns), None)
-            if title_col is None:
-                raise ValueError("No suitable title column found in merged misc data for pivot index.")
-
-            if 'Function' not in self.result_dfmisc.columns:
-                raise ValueError("'Function' column is missing in the merged misc data.")
-
-            self.pivot_table_resultmiscJobs = self.result_dfmisc.pivot_table(
-                index=title_col,
-                columns='Function',
-                values='Job Codecopy',
-                aggfunc='count'
-            ).replace(np.nan, '', inplace=False).replace('', -1).astype(int).applymap(self.format_blank)
+            if cube is not None and cube.serves(dfmisc, code_column='Job Codecopy'):
+                rows = cube.slice(dfmisc['UI Job Code'])
+                pivot_raw = cube_pivot(rows, 'Title', 'Function')
+                total_raw = cube_pivot(rows, 'Title')
+                vessel_codes = cube.codes()
+                self.result_dfmisc = lambda: self.merge_reference(self.prepare_jobs(df), dfmisc)
+            else:
+                dfcopy = self.prepare_jobs(df)
+                self.result_dfmisc = self.merge_reference(dfcopy, dfmisc)
+
+                possible_titles = ['Title', 'J3 Job Title', 'Task Description', 'Job Title']
+                title_col = next((col for col in possible_titles if col in self.result_dfmisc.columns), None)
+                if title_col is None:
+                    raise ValueError("No suitable title column found in merged misc data for pivot index.")
+
+                if 'Function' not in self.result_dfmisc.columns:
+                    raise ValueError("'Function' column is missing in the merged misc data.")
+
+                pivot_raw = self.result_dfmisc.pivot_table(
+                    index=title_col,
+                    columns='Function',
+                    values='Job Codecopy',
+                    aggfunc='count'
+                )
+                total_raw = self.result_dfmisc.pivot_table(
+                    index=title_col,
+                    values='Job Codecopy',
+                    aggfunc='count'
+                )
+                vessel_codes = dfcopy['Job Codecopy']
+
+            self.pivot_table_resultmiscJobs = pivot_raw.replace(
+                np.nan, '', inplace=False
+            ).replace('', -1).astype(int).applymap(self.format_blank)
 
             self.styled_pivot_table_resultmiscJobs = self.pivot_table_resultmiscJobs.style\
                 .set_table_styles([
@@ -59,11 +92,7 @@ class MiscSystemProcessor:
                 ], overwrite=False)\
                 .set_table_attributes("class='dataframe' style='margin-left: 0 !important; margin-right: auto; width: 100%'")
 
-            self.pivot_table_resultmiscJobstotal = self.result_dfmisc.pivot_table(
-                index=title_col,
-                values='Job Codecopy',
-                aggfunc='count'
-            ).sort_values(by='Job Codecopy', ascending=False)
+            self.pivot_table_resultmiscJobstotal = total_raw.sort_values(by='Job Codecopy', ascending=False)
 
             self.pivot_table_resultmiscJobstotal = self.pivot_table_resultmiscJobstotal.replace(np.nan, '', inplace=False)
             self.pivot_table_resultmiscJobstotal = self.pivot_table_resultmiscJobstotal.replace('', -1)
@@ -78,7 +107,7 @@ class MiscSystemProcessor:
                 ], overwrite=False)\
                 .set_table_attributes("class='dataframe' style='margin-left: 0 !important; margin-right: auto; width: 100%'")
 
-            self.missingmiscjobsresult = dfmisc[~dfmisc['UI Job Code'].isin(dfcopy['Job Codecopy'])].copy()
+            self.missingmiscjobsresult = dfmisc[~dfmisc['UI Job Code'].isin(vessel_codes)].copy()
             if 'Remarks' in self.missingmiscjobsresult.columns:
                 self.missingmiscjobsresult.drop(columns=['Remarks'], inplace=True)
             self.missingmiscjobsresult.reset_index(drop=True, inplace=True)
@@ -92,8 +121,7 @@ class MiscSystemProcessor:
                 .set_table_attributes("class='dataframe' style='margin-left: 0 !important; margin-right: auto; width: 100%'")
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_misc_data')
             self.pivot_table_resultmiscJobs = pd.DataFrame({'Error': [f'Misc data processing failed: {str(e)}']})
             self.pivot_table_resultmiscJobstotal = pd.DataFrame()
             self.missingmiscjobsresult = pd.DataFrame()
\ No newline at end of file
@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class MooringSystemProcessor:
     def __init__(self):
         self.filtered_dfMooring = pd.DataFrame()
@@ -77,7 +80,6 @@ class MooringSystemProcessor:
             self.missingjobsMooringresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_mooring_data')
             self.pivot_table_resultMooringJobs = pd.DataFrame({'Error': [f'Mooring data processing failed: {str(e)}']})
             self.missingjobsMooringresult = pd.DataFrame()
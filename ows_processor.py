@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class OWSSystemProcessor:
     def __init__(self):
         self.filtered_dfOWS = pd.DataFrame()
@@ -76,7 +79,6 @@ class OWSSystemProcessor:
             self.missingjobsOWSresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_ows_data')
             self.pivot_table_resultOWSJobs = pd.DataFrame({'Error': [f'OWS data processing failed: {str(e)}']})
             self.missingjobsOWSresult = pd.DataFrame()
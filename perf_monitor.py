@@ -0,0 +1,186 @@
+import json
+import time
+import functools
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+from reference_bundle import read_reference_sheet
+
+
+def count_rows(obj):
+    """Best-effort row count for DataFrames, Series, Stylers, dicts and tuples of those."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return len(obj)
+    if isinstance(getattr(obj, 'data', None), pd.DataFrame):  # pandas Styler
+        return len(obj.data)
+    if isinstance(obj, dict):
+        obj = tuple(obj.values())
+    if isinstance(obj, (tuple, list)):
+        counts = [c for c in (count_rows(item) for item in obj) if c is not None]
+        return sum(counts) if counts else None
+    return None
+
+
+class PerfMonitor:
+    """Collects wall-time, row counts and peak memory for processor calls and reference reads."""
+
+    DEFAULT_PREFIXES = ('process_', 'create_', 'extract_', 'get_', 'analyze_')
+
+    def __init__(self, track_memory=False):
+        self.records = []
+        self.track_memory = track_memory
+        self._stack = []
+        self._origin = time.perf_counter()
+        self._owns_tracemalloc = False
+
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+
+    @contextmanager
+    def track(self, name, category='processor', rows_in=None):
+        """Time a block. The yielded record may be updated, e.g. record['Rows Out'] = len(df)."""
+        record = {
+            'Name': name,
+            'Category': category,
+            'Depth': len(self._stack),
+            'Start (ms)': 0.0,
+            'Wall Time (ms)': 0.0,
+            'Rows In': rows_in,
+            'Rows Out': None,
+            'Peak Memory (MB)': None,
+            'Error': None,
+        }
+        memory = self.track_memory and tracemalloc.is_tracing()
+        frame = {'start_current': 0, 'abs_peak': 0}
+
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # Keep the parent's peak before resetting so nested calls don't hide it
+            if self._stack:
+                self._stack[-1]['abs_peak'] = max(self._stack[-1]['abs_peak'], peak)
+            tracemalloc.reset_peak()
+            frame['start_current'] = current
+            frame['abs_peak'] = current
+
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record['Error'] = str(e)
+            raise
+        finally:
+            end = time.perf_counter()
+            self._stack.pop()
+            record['Start (ms)'] = (start - self._origin) * 1000.0
+            record['Wall Time (ms)'] = (end - start) * 1000.0
+
+            if memory:
+                _, peak = tracemalloc.get_traced_memory()
+                abs_peak = max(frame['abs_peak'], peak)
+                record['Peak Memory (MB)'] = max(abs_peak - frame['start_current'], 0) / (1024 * 1024)
+                if self._stack:
+                    self._stack[-1]['abs_peak'] = max(self._stack[-1]['abs_peak'], abs_peak)
+
+            self.records.append(record)
+
+    def wrap(self, func, name=None, category='processor', owner=None):
+        """Return func wrapped so every call is recorded."""
+        name = name or getattr(func, '__qualname__', repr(func))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            rows_in = next((count_rows(a) for a in args if isinstance(a, pd.DataFrame)), None)
+            with self.track(name, category=category, rows_in=rows_in) as record:
+                result = func(*args, **kwargs)
+                rows_out = count_rows(result)
+                # Processors that only store their results expose them as missing-jobs attributes
+                if rows_out is None and owner is not None:
+                    rows_out = next(
+                        (len(value) for attr, value in vars(owner).items()
+                         if attr.lower().startswith('missing') and isinstance(value, pd.DataFrame)),
+                        None
+                    )
+                record['Rows Out'] = rows_out
+                return result
+
+        wrapper.__wrapped_by_perf_monitor__ = True
+        return wrapper
+
+    def instrument(self, processor, prefixes=None, label=None):
+        """Wrap the public analysis methods of a processor instance in place."""
+        prefixes = prefixes or self.DEFAULT_PREFIXES
+        label = label or type(processor).__name__
+        for attr in dir(type(processor)):
+            if not attr.startswith(prefixes):
+                continue
+            method = getattr(processor, attr, None)
+            if not callable(method) or getattr(method, '__wrapped_by_perf_monitor__', False):
+                continue
+            setattr(processor, attr, self.wrap(method, name=f"{label}.{attr}", owner=processor))
+        return processor
+
+    def read_reference(self, ref_sheet, sheet_name=0):
+        """Reference workbook/bundle sheet read, recorded under the 'reference' category."""
+        name = 'read:' + ('<all sheets>' if sheet_name is None else str(sheet_name))
+        with self.track(name, category='reference') as record:
+            result = read_reference_sheet(ref_sheet, sheet_name=sheet_name)
+            record['Rows Out'] = count_rows(result)
+            return result
+
+    def to_frame(self):
+        """All records in start order."""
+        columns = ['Name', 'Category', 'Depth', 'Start (ms)', 'Wall Time (ms)',
+                   'Rows In', 'Rows Out', 'Peak Memory (MB)', 'Error']
+        if not self.records:
+            return pd.DataFrame(columns=columns)
+        return pd.DataFrame(self.records, columns=columns).sort_values(by='Start (ms)').reset_index(drop=True)
+
+    def summary(self):
+        """Per-name totals, slowest first."""
+        df = self.to_frame()
+        if df.empty:
+            return pd.DataFrame(columns=['Name', 'Category', 'Calls', 'Total Time (ms)',
+                                         'Max Time (ms)', 'Max Peak Memory (MB)'])
+        summary = df.groupby(['Name', 'Category'], as_index=False).agg(**{
+            'Calls': ('Wall Time (ms)', 'size'),
+            'Total Time (ms)': ('Wall Time (ms)', 'sum'),
+            'Max Time (ms)': ('Wall Time (ms)', 'max'),
+            'Max Peak Memory (MB)': ('Peak Memory (MB)', 'max'),
+        })
+        return summary.sort_values(by='Total Time (ms)', ascending=False).reset_index(drop=True)
+
+    def to_chrome_trace(self):
+        """Serialize the records in Chrome trace event format (chrome://tracing, Perfetto)."""
+        events = []
+        for record in self.records:
+            args = {
+                key: value for key, value in record.items()
+                if key in ('Rows In', 'Rows Out', 'Peak Memory (MB)', 'Error') and value is not None
+            }
+            events.append({
+                'name': record['Name'],
+                'cat': record['Category'],
+                'ph': 'X',
+                'ts': round(record['Start (ms)'] * 1000.0, 3),
+                'dur': round(record['Wall Time (ms)'] * 1000.0, 3),
+                'pid': 1,
+                'tid': 1,
+                'args': args,
+            })
+        events.sort(key=lambda event: event['ts'])
+        return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}, default=str)
+
+    def save_chrome_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_chrome_trace())
+        return path
+
+    def stop(self):
+        """Stop tracemalloc if this monitor started it."""
+        if self._owns_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._owns_tracemalloc = False
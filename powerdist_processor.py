@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class PowerDistSystemProcessor:
     def __init__(self):
         self.filtered_dfpowerdistjobs = pd.DataFrame()
@@ -80,7 +83,6 @@ class PowerDistSystemProcessor:
             self.missingjobspowerdistresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_powerdist_data')
             self.pivot_table_resultpowerdistJobs = pd.DataFrame({'Error': [f'Power Distribution data processing failed: {str(e)}']})
             self.missingjobspowerdistresult = pd.DataFrame()
@@ -1,5 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
+from job_code_aliases import DEFAULT_JOB_CODE_ALIASES, canonical_job_codes
+
+logger = logging.getLogger(__name__)
 
 class PumpSystemProcessor:
     def __init__(self):
@@ -8,7 +12,8 @@ class PumpSystemProcessor:
         self.pivot_table_resultpumpJobs = pd.DataFrame()
         self.styled_pivot_table_pump = None
         self.styled_pivot_table_resultpumpJobs = None
-        self.mappings = {'4406': '425', '428': '425', '2329': '425', '4656': '426', '7039': '426', '6001': '602'}
+        # The shared job-code alias table; app and pipeline apply it to the whole upload
+        self.mappings = dict(DEFAULT_JOB_CODE_ALIASES)
 
     def safe_convert_to_string(self, value):
         try:
@@ -18,7 +23,7 @@ class PumpSystemProcessor:
 
     def process_pump_data(self, df, dfpump):
         try:
-            print("🚀 Starting pump data processing...")
+            logger.debug('Starting pump data processing')
 
             if 'UI Job Code' not in dfpump.columns:
                 raise ValueError("Reference sheet missing 'UI Job Code' column")
@@ -40,7 +45,7 @@ class PumpSystemProcessor:
                 {'selector': 'td:first-child', 'props': [('text-align', 'left')]}
             ], overwrite=False)
 
-            print("✅ Pump count table created")
+            logger.debug('Pump count table created')
 
             # 🔹 Filter and map job codes
             self.filtered_dfpump = df[df['Machinery Location'].str.contains('Pump', case=False, na=False)].copy()
@@ -49,7 +54,7 @@ class PumpSystemProcessor:
             self.filtered_dfpump['Job Codecopy'] = self.filtered_dfpump['Job Codecopy'].apply(self.safe_convert_to_string)
 
             self.filtered_dfpump['Job Code'] = self.filtered_dfpump['Job Code'].astype(str)
-            self.filtered_dfpump['Job Code'] = self.filtered_dfpump['Job Code'].map(self.mappings).fillna(self.filtered_dfpump['Job Code'])
+            self.filtered_dfpump['Job Code'] = canonical_job_codes(self.filtered_dfpump['Job Code'], self.mappings)
             self.filtered_dfpump['Job Code'] = self.filtered_dfpump['Job Code'].astype(str)
 
             job_codespump = dfpump['UI Job Code'].astype(str).tolist()
@@ -66,7 +71,7 @@ class PumpSystemProcessor:
             )
 
             if pivot_table_resultpumpJobs.empty:
-                print("⚠️ No matching pump jobs found.")
+                logger.warning('No matching pump jobs found.')
                 self.pivot_table_resultpumpJobs = pd.DataFrame()
                 self.styled_pivot_table_resultpumpJobs = None
                 return self.pivot_table_resultpumpJobs
@@ -75,7 +80,7 @@ class PumpSystemProcessor:
             pivot_table_resultpumpJobs = pivot_table_resultpumpJobs.astype(int)
             self.pivot_table_resultpumpJobs = pivot_table_resultpumpJobs.copy()
 
-            print("✅ Mapped Job Code Summary pivot created")
+            logger.debug('Mapped Job Code Summary pivot created')
 
             # ✅ Green highlight for non-zero job counts
             styled = self.pivot_table_resultpumpJobs.style.highlight_between(
@@ -90,10 +95,9 @@ class PumpSystemProcessor:
 
             self.styled_pivot_table_resultpumpJobs = styled
 
-            print("✅ Styling applied safely with highlight.")
+            logger.debug('Styling applied safely with highlight')
             return self.pivot_table_resultpumpJobs
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_pump_data')
             return pd.DataFrame({'Error': [f'Pump data processing failed: {str(e)}']})
@@ -1,6 +1,11 @@
+import logging
 import pandas as pd
 import numpy as np
 import re
+from reference_catalog import match_reference, reference_catalog, unmatched_reference_result
+from unit_extraction import component_presence, unit_numbers, unit_running_hours
+
+logger = logging.getLogger(__name__)
 
 class PurifierProcessor:
     def __init__(self):
@@ -20,9 +25,14 @@ class PurifierProcessor:
             'Heater - PU'
         ]
         
-        # Define the pattern to extract purifier numbers
+        # Pattern to extract purifier numbers (unit_extraction.UNIT_PATTERNS['Purifier'])
         self.purifier_pattern = r'Purifier.*?#?(\d+)'
+        self.reference_result = None
         
+    def purifier_numbers(self, purifier_data):
+        """Purifier number of each row as a string, 'Unknown' where the location has none."""
+        return unit_numbers(purifier_data['Machinery Location'], 'Purifier').astype('string').fillna('Unknown').astype(object)
+    
     def extract_running_hours(self, data):
         """Extract running hours for purifiers."""
         try:
@@ -39,36 +49,23 @@ class PurifierProcessor:
             if purifier_data.empty:
                 return pd.DataFrame(columns=['Purifier', 'Running Hours'])
             
-            # Extract purifier numbers safely
-            def extract_purifier_number(location):
-                location_str = str(location)
-                match = re.search(self.purifier_pattern, location_str)
-                if match and match.groups():
-                    return match.group(1)
-                else:
-                    return 'Unknown'
-            
-            purifier_data['Purifier'] = purifier_data['Machinery Location'].apply(extract_purifier_number)
+            purifier_data['Purifier'] = self.purifier_numbers(purifier_data)
             
-            # Group by purifier and take the max running hours
-            running_hours = purifier_data.groupby('Purifier')['Running Hours'].max().reset_index()
-            
-            # Format the running hours
-            running_hours['Running Hours'] = running_hours['Running Hours'].apply(
-                lambda x: f"{int(x):,}" if pd.notnull(x) and x != 0 else "N/A"
-            )
+            # Max running hours per purifier, as numbers (NaN when not available)
+            running_hours = unit_running_hours(purifier_data['Purifier'], purifier_data['Running Hours'],
+                                               how='max', sort=True).rename(columns={'Unit': 'Purifier'})
             
             # If still empty, create sample data
             if running_hours.empty:
                 return pd.DataFrame({
                     'Purifier': ['No purifiers found'],
-                    'Running Hours': ['N/A']
+                    'Running Hours': [np.nan]
                 })
                 
             return running_hours
             
         except Exception as e:
-            print(f"Error extracting purifier running hours: {str(e)}")
+            logger.error('Error extracting purifier running hours: %s', e)
             # Return visible error message
             return pd.DataFrame({
                 'Purifier': ['Error'],
@@ -96,7 +93,7 @@ class PurifierProcessor:
             return pd.DataFrame(formatted_data)
         
         except Exception as e:
-            print(f"Error formatting purifier data: {str(e)}")
+            logger.error('Error formatting purifier data: %s', e)
             return pd.DataFrame(columns=['Purifier', 'Maintenance Tasks'])
             
     def process_job_code(self, data, job_codes, job_description, unit_pattern=r'Purifier.*?#?(\d+)'):
@@ -148,7 +145,7 @@ class PurifierProcessor:
             return unit_tasks
             
         except Exception as e:
-            print(f"Error processing purifier job codes: {str(e)}")
+            logger.error('Error processing purifier job codes: %s', e)
             # Return a simple dict with error message for visibility
             return {"Error": [f"Could not process job codes: {str(e)}"]}
             
@@ -170,7 +167,7 @@ class PurifierProcessor:
             return self.format_unit_data(maintenance_data)
             
         except Exception as e:
-            print(f"Error getting purifier maintenance data: {str(e)}")
+            logger.error('Error getting purifier maintenance data: %s', e)
             return pd.DataFrame(columns=['Purifier', 'Maintenance Tasks'])
             
     def analyze_components(self, data):
@@ -183,41 +180,17 @@ class PurifierProcessor:
             if purifier_data.empty:
                 return pd.DataFrame(columns=['Purifier'] + [comp.split(' - ')[0] for comp in self.components])
             
-            # Extract purifier numbers safely
-            def extract_purifier_number(location):
-                location_str = str(location)
-                match = re.search(self.purifier_pattern, location_str)
-                if match and match.groups():
-                    return match.group(1)
-                else:
-                    return 'Unknown'
-            
-            purifier_data['Purifier'] = purifier_data['Machinery Location'].apply(extract_purifier_number)
+            purifier_data['Purifier'] = self.purifier_numbers(purifier_data)
             
             # Check component presence based on Sub Component Location
-            result = []
-            
-            for purifier_num in sorted(purifier_data['Purifier'].unique()):
-                purifier_id = f"Purifier #{purifier_num}"
-                purifier_components = purifier_data[purifier_data['Purifier'] == purifier_num]
-                
-                component_status = {}
-                
-                # Check each component
-                for component in self.components:
-                    # Check if component is mentioned in Sub Component Location
-                    if 'Sub Component Location' in purifier_components.columns:
-                        has_component = purifier_components['Sub Component Location'].str.contains(
-                            component, case=False, na=False
-                        ).any()
-                    else:
-                        has_component = False
-                    
-                    component_name = component.split(' - ')[0]  # Remove the "- PU" suffix for display
-                    component_status[component_name] = "✓" if has_component else "✗"
-                
-                # Add to result
-                result.append({"Purifier": purifier_id, **component_status})
+            presence = component_presence(purifier_data, purifier_data['Purifier'], self.components,
+                                          columns=['Sub Component Location'])
+            result = [
+                # Component names without the "- PU" suffix for display
+                {"Purifier": f"Purifier #{purifier_num}",
+                 **{component.split(' - ')[0]: "✓" if present else "✗" for component, present in row.items()}}
+                for purifier_num, row in presence.iterrows()
+            ]
             
             # Return the DataFrame
             if result:
@@ -231,7 +204,7 @@ class PurifierProcessor:
                 return pd.DataFrame([sample_row])
             
         except Exception as e:
-            print(f"Error analyzing purifier components: {str(e)}")
+            logger.error('Error analyzing purifier components: %s', e)
             # Return a DataFrame with error message
             return pd.DataFrame({
                 'Purifier': ['Error'],
@@ -262,7 +235,7 @@ class PurifierProcessor:
             return task_counts
             
         except Exception as e:
-            print(f"Error creating purifier task count table: {str(e)}")
+            logger.error('Error creating purifier task count table: %s', e)
             return pd.DataFrame()
             
     def create_component_distribution(self, data):
@@ -297,105 +270,81 @@ class PurifierProcessor:
                 return pd.DataFrame(columns=['Component', 'Count'])
                 
         except Exception as e:
-            print(f"Error creating purifier component distribution: {str(e)}")
+            logger.error('Error creating purifier component distribution: %s', e)
             return pd.DataFrame(columns=['Component', 'Count'])
             
     def process_reference_data(self, data, ref_sheet):
-        """Process reference data for purifiers using the approach from the code snippet."""
+        """Missing purifier jobs; the full ReferenceResult is kept in self.reference_result.
+
+        Args:
+            data: DataFrame containing the machinery data
+            ref_sheet: Reference workbook, bundle or ReferenceCatalog
+        """
+        self.reference_result = self.match_reference(data, ref_sheet)
+        return self.reference_result.missing
+
+    def match_reference(self, data, ref_sheet):
+        """Match purifier jobs against the reference sheet once: matched rows, pivot, missing jobs and counts."""
         try:
-            # Create copies to avoid modifying original data
-            data_copy = data.copy()
-            
             # Filter data for purifiers
-            filtered_dfpurifierjobs = data_copy[data_copy['Machinery Location'].str.contains('Purifier', case=False, na=False)].copy()
-            
-            # Use the specified fixed reference sheet with sheet name 'Purifiers'
-            # Read the reference sheet using the uploaded sheet path
-            ref_sheet_names = pd.ExcelFile(ref_sheet).sheet_names
-            
-            # Look for 'Purifiers' sheet specifically first
-            purifier_sheet = 'Purifiers' if 'Purifiers' in ref_sheet_names else None
-            
-            # If not found, try to find any sheet with 'Purifier' or 'PU' in the name
-            if purifier_sheet is None:
-                for sheet in ref_sheet_names:
-                    if 'Purifier' in sheet.lower() or 'PU' in sheet:
-                        purifier_sheet = sheet
-                        break
-            
-            # If still no purifier-specific sheet found, use the first sheet
-            if purifier_sheet is None:
-                purifier_sheet = ref_sheet_names[0]
-                print(f"No purifier sheet found, using the first sheet: {purifier_sheet}")
-            else:
-                print(f"Using reference sheet: {purifier_sheet}")
-            
-            # Read the reference sheet
-            dfpurifiers = pd.read_excel(ref_sheet, sheet_name=purifier_sheet)
-            
+            filtered_dfpurifierjobs = data[data['Machinery Location'].str.contains('Purifier', case=False, na=False)].copy()
+
+            # Sheet and job code column are resolved once per workbook by the catalog
+            schema, dfpurifiers = reference_catalog(ref_sheet).frame('Purifier')
+
             # Skip further processing if no data
             if filtered_dfpurifierjobs.empty or dfpurifiers.empty:
-                return pd.DataFrame({
+                return unmatched_reference_result(pd.DataFrame({
                     'Job Code': ['No data found'],
                     'Title': ['No matching data between current and reference'],
                     'Frequency': ['N/A']
-                })
-            
+                }), schema)
+
             # Ensure all Job Code columns are strings
             if 'Job Code' in filtered_dfpurifierjobs.columns:
                 filtered_dfpurifierjobs['Job Codecopy'] = filtered_dfpurifierjobs['Job Code'].astype(str)
             else:
-                print("Job Code column not found in purifier data")
-                return pd.DataFrame({
+                logger.warning('Job Code column not found in purifier data')
+                return unmatched_reference_result(pd.DataFrame({
                     'Job Code': ['Column Error'],
                     'Title': ['Job Code column not found in data'],
                     'Frequency': ['N/A']
-                })
-            
-            # Check which column to use for job code in reference data
-            job_code_col = None
-            for possible_col in ['UI Job Code', 'Job Code', 'JobCode', 'Code']:
-                if possible_col in dfpurifiers.columns:
-                    job_code_col = possible_col
-                    break
-            
+                }), schema)
+
+            job_code_col = schema.job_code_column
             if job_code_col is None:
-                print("No job code column found in reference data")
+                logger.warning('No job code column found in reference data')
                 # Create a sample of the columns we have
                 col_sample = ", ".join(dfpurifiers.columns.tolist()[:5]) + "..."
-                return pd.DataFrame({
+                return unmatched_reference_result(pd.DataFrame({
                     'Job Code': ['Column Error'],
                     'Title': [f'No job code column found in reference. Available columns: {col_sample}'],
                     'Frequency': ['N/A']
-                })
-            
-            # Find job codes in dfpurifiers that are not in filtered_dfpurifierjobs
-            dfpurifiers['Job Code'] = dfpurifiers[job_code_col].astype(str)
-            filtered_dfpurifierjobs['Job Codecopy'] = filtered_dfpurifierjobs['Job Codecopy'].astype(str)
-            
-            print(f"Sample reference job codes: {dfpurifiers['Job Code'].iloc[:5].tolist()}")
-            print(f"Sample current job codes: {filtered_dfpurifierjobs['Job Codecopy'].iloc[:5].tolist()}")
-            print(f"Total reference jobs: {len(dfpurifiers)}")
-            print(f"Total current purifier jobs: {len(filtered_dfpurifierjobs)}")
-            
-            missingjobspurifierresult = dfpurifiers[~dfpurifiers['Job Code'].isin(filtered_dfpurifierjobs['Job Codecopy'])]
-            print(f"Total missing jobs found: {len(missingjobspurifierresult)}")
-            
+                }), schema)
+
+            # Missing jobs keep the reference code as a str 'Job Code' column
+            dfpurifiers['Job Code'] = dfpurifiers[job_code_col]
+
+            # Sample lists are only built when debug logging is on
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('Sample reference job codes: %s', dfpurifiers['Job Code'].iloc[:5].tolist())
+                logger.debug('Sample current job codes: %s', filtered_dfpurifierjobs['Job Codecopy'].iloc[:5].tolist())
+            logger.debug('Total reference jobs: %s', len(dfpurifiers))
+            logger.debug('Total current purifier jobs: %s', len(filtered_dfpurifierjobs))
+
+            result = match_reference(filtered_dfpurifierjobs, schema, dfpurifiers)
+            logger.debug('Total missing jobs found: %s', result.missing_count)
+
             # Drop Remarks column if it exists
-            if 'Remarks' in missingjobspurifierresult.columns:
-                missingjobspurifierresult = missingjobspurifierresult.drop(columns=['Remarks'])
-                
-            # Reset the index of the combined DataFrame
-            missingjobspurifierresult.reset_index(drop=True, inplace=True)
-            
-            return missingjobspurifierresult
-                
+            if 'Remarks' in result.missing.columns:
+                result = result._replace(missing=result.missing.drop(columns=['Remarks']))
+            return result
+
         except Exception as e:
-            print(f"Error processing purifier reference data: {str(e)}")
+            logger.error('Error processing purifier reference data: %s', e)
             # Create an error row for display
-            error_row = pd.DataFrame({
+            return unmatched_reference_result(pd.DataFrame({
                 'Job Code': ['Error'],
                 'Title': [f'Unable to process reference data: {str(e)}'],
                 'Frequency': ['N/A']
-            })
-            return error_row
\ No newline at end of file
+            }))
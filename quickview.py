@@ -1,5 +1,6 @@
 import pandas as pd
 from machinery_analyzer import MachineryAnalyzer
+from trigram_index import MIN_SIMILARITY, match_names
 
 # =============================
 # Utility: Style Pivot Table
@@ -51,14 +52,18 @@ class QuickViewAnalyzer:
         self.df['Machinery Locationcopy'] = self.df['Machinery Location'].str.lower().str.strip()
         self.df['Machinery Location Clean'] = self.df['Machinery Locationcopy'].apply(self.analyzer.clean_machinery_location)
 
+        # Compiled reference bundles already carry 'Machinery Location Clean'
         self.dfML['Machinery Location'] = self.dfML['Machinery Location'].str.lower().str.strip()
-        self.dfML['Machinery Location Clean'] = self.dfML['Machinery Location'].apply(self.analyzer.clean_machinery_location)
+        if 'Machinery Location Clean' not in self.dfML.columns:
+            self.dfML['Machinery Location Clean'] = self.dfML['Machinery Location'].apply(self.analyzer.clean_machinery_location)
 
         self.dfCM['Critical Machinery'] = self.dfCM['Critical Machinery'].str.lower().str.strip()
-        self.dfCM['Machinery Location Clean'] = self.dfCM['Critical Machinery'].apply(self.analyzer.clean_machinery_location)
+        if 'Machinery Location Clean' not in self.dfCM.columns:
+            self.dfCM['Machinery Location Clean'] = self.dfCM['Critical Machinery'].apply(self.analyzer.clean_machinery_location)
 
         self.dfVSM['Vessel Specific Machinery'] = self.dfVSM['Vessel Specific Machinery'].str.lower().str.strip()
-        self.dfVSM['Machinery Location Clean'] = self.dfVSM['Vessel Specific Machinery'].apply(self.analyzer.clean_machinery_location)
+        if 'Machinery Location Clean' not in self.dfVSM.columns:
+            self.dfVSM['Machinery Location Clean'] = self.dfVSM['Vessel Specific Machinery'].apply(self.analyzer.clean_machinery_location)
 
         self.vml_set = set(self.df['Machinery Location Clean'].dropna().str.lower())
         self.ml_set = set(self.dfML['Machinery Location Clean'].dropna().str.lower())
@@ -78,6 +83,11 @@ class QuickViewAnalyzer:
 
         return dif_df.sort_values(by='Different Machinery on Vessel'), miss_df.sort_values(by='Missing Machinery on Vessel')
 
+    def match_missing_and_diff(self, min_similarity=MIN_SIMILARITY):
+        # Different machinery paired with the missing machinery it most likely is
+        dif_df, miss_df = self.calculate_missing_and_diff()
+        return match_names(dif_df['Different Machinery on Vessel'], miss_df['Missing Machinery on Vessel'], min_similarity)
+
     def generate_jobsource_summary(self):
         self.df['Job Source'] = self.df['Job Source'].fillna('Unknown')
         title_counts = self.df.groupby('Job Source')['Title'].count()
@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class RefacSystemProcessor:
     def __init__(self):
         self.filtered_dfrefacjobs = pd.DataFrame()
@@ -72,7 +75,6 @@ class RefacSystemProcessor:
             self.missingjobsrefacresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_refac_data')
             self.pivot_table_resultrefacJobs = pd.DataFrame({'Error': [f'Refac data processing failed: {str(e)}']})
             self.missingjobsrefacresult = pd.DataFrame()
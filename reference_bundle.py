@@ -0,0 +1,264 @@
+import io
+import os
+import sys
+import json
+import hashlib
+import zipfile
+import threading
+import argparse
+import datetime
+from collections import OrderedDict
+
+import pandas as pd
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+# QuickView's machinery sheets, each named after its machinery-name column; only these get a
+# precomputed 'Machinery Location Clean', so every other sheet reads back like the workbook's
+MACHINERY_NAME_COLUMNS = ['Machinery Location', 'Critical Machinery', 'Vessel Specific Machinery']
+
+# Bundles of recently loaded references, by content hash
+MAX_CACHED_BUNDLES = 4
+_bundle_cache = OrderedDict()
+_bundle_lock = threading.Lock()
+
+
+def normalize_job_codes(series):
+    """Job codes as stripped strings without the '.0' Excel adds to numeric cells."""
+    return series.astype(str).str.strip().str.replace(r'\.0$', '', regex=True)
+
+
+def _parquet_safe(df):
+    """Make a sheet writable as Parquet: string column names, no mixed-type object columns."""
+    df = df.copy()
+    df.columns = [str(col) for col in df.columns]
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].map(lambda value: value if pd.isna(value) else str(value))
+    return df
+
+
+def prepare_sheet(df, sheet_name=None, analyzer=None):
+    """Apply the normalizations every processor would otherwise repeat on load."""
+    df = _parquet_safe(df)
+    if 'UI Job Code' in df.columns:
+        df['UI Job Code'] = normalize_job_codes(df['UI Job Code'])
+
+    name_col = sheet_name if sheet_name in MACHINERY_NAME_COLUMNS else None
+    if name_col in df.columns and 'Machinery Location Clean' not in df.columns:
+        if analyzer is None:
+            from machinery_analyzer import MachineryAnalyzer
+            analyzer = MachineryAnalyzer()
+        names = df[name_col].astype('string').str.lower().str.strip()
+        # Clean each distinct name once
+        cleaned = {name: analyzer.clean_machinery_location(name) for name in names.dropna().unique()}
+        df['Machinery Location Clean'] = names.map(cleaned).astype(object)
+    return df
+
+
+def compile_reference_bundle(workbook, output_path, bundle_version=None):
+    """Compile the reference workbook into a zip of one Parquet file per sheet plus a manifest.
+
+    Args:
+        workbook: Path or file-like object of the reference .xlsx
+        output_path: Where to write the bundle (.zip)
+        bundle_version: Optional label; defaults to the first 12 hex digits of the workbook hash
+
+    Returns:
+        The manifest dict written into the bundle
+    """
+    if hasattr(workbook, 'read'):
+        raw = workbook.read()
+        source_name = getattr(workbook, 'name', 'reference.xlsx')
+    else:
+        with open(workbook, 'rb') as f:
+            raw = f.read()
+        source_name = os.path.basename(workbook)
+
+    source_sha256 = hashlib.sha256(raw).hexdigest()
+    sheets = pd.read_excel(io.BytesIO(raw), sheet_name=None)
+
+    from machinery_analyzer import MachineryAnalyzer
+    analyzer = MachineryAnalyzer()
+
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'bundle_version': bundle_version or source_sha256[:12],
+        'source_name': source_name,
+        'source_sha256': source_sha256,
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'sheets': [],
+    }
+
+    with zipfile.ZipFile(output_path, 'w', compression=zipfile.ZIP_STORED) as bundle:
+        for position, (sheet_name, df) in enumerate(sheets.items()):
+            prepared = prepare_sheet(df, sheet_name, analyzer)
+            buffer = io.BytesIO()
+            prepared.to_parquet(buffer, index=False)
+            payload = buffer.getvalue()
+            # Sheet names may contain characters that are unsafe in file names
+            file_name = f'sheets/{position:03d}.parquet'
+            bundle.writestr(file_name, payload)
+            manifest['sheets'].append({
+                'name': sheet_name,
+                'file': file_name,
+                'rows': len(prepared),
+                'columns': prepared.columns.tolist(),
+                'sha256': hashlib.sha256(payload).hexdigest(),
+            })
+        bundle.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2))
+
+    return manifest
+
+
+class ReferenceBundle:
+    """Read-only view of a compiled reference bundle. Sheets are decoded lazily and kept in memory."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self._zip = zipfile.ZipFile(io.BytesIO(raw))
+        self.manifest = json.loads(self._zip.read(MANIFEST_NAME))
+        if self.manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported reference bundle format: {self.manifest.get('format_version')}")
+        self._files = {sheet['name']: sheet['file'] for sheet in self.manifest['sheets']}
+        self._frames = {}
+        self.name = self.manifest.get('source_name', 'reference bundle')
+
+    @property
+    def version(self):
+        return self.manifest['bundle_version']
+
+    @property
+    def sheet_names(self):
+        return [sheet['name'] for sheet in self.manifest['sheets']]
+
+    def read_sheet(self, sheet_name=0):
+        """Same contract as pd.read_excel: name, position, list of either, or None for all sheets.
+        Returns copies because processors modify reference frames in place."""
+        if sheet_name is None:
+            return {name: self.read_sheet(name) for name in self.sheet_names}
+        if isinstance(sheet_name, list):
+            return {name: self.read_sheet(name) for name in sheet_name}
+        if isinstance(sheet_name, int):
+            sheet_name = self.sheet_names[sheet_name]
+        if sheet_name not in self._files:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        if sheet_name not in self._frames:
+            self._frames[sheet_name] = pd.read_parquet(io.BytesIO(self._zip.read(self._files[sheet_name])))
+        return self._frames[sheet_name].copy()
+
+
+def is_reference_bundle(source):
+    """True for ReferenceBundle objects and .zip paths or uploads."""
+    if isinstance(source, ReferenceBundle):
+        return True
+    name = getattr(source, 'name', source if isinstance(source, str) else '')
+    return isinstance(name, str) and name.lower().endswith('.zip')
+
+
+def load_reference_bundle(source):
+    """Open a bundle from a path, bytes or file-like object; repeated loads of the same bytes are cached."""
+    if isinstance(source, ReferenceBundle):
+        return source
+    if isinstance(source, (bytes, bytearray)):
+        raw = bytes(source)
+    elif hasattr(source, 'getvalue'):
+        raw = source.getvalue()
+    elif hasattr(source, 'read'):
+        raw = source.read()
+    else:
+        with open(source, 'rb') as f:
+            raw = f.read()
+
+    key = hashlib.sha256(raw).hexdigest()
+    with _bundle_lock:
+        if key in _bundle_cache:
+            _bundle_cache.move_to_end(key)
+            return _bundle_cache[key]
+    bundle = ReferenceBundle(raw)
+    with _bundle_lock:
+        # A concurrent first load of the same bytes may have cached its bundle meanwhile
+        bundle = _bundle_cache.setdefault(key, bundle)
+        _bundle_cache.move_to_end(key)
+        while len(_bundle_cache) > MAX_CACHED_BUNDLES:
+            _bundle_cache.popitem(last=False)
+    return bundle
+
+
+def open_reference(source):
+    """Return a ReferenceBundle for bundle inputs and the workbook source unchanged otherwise."""
+    if source is not None and is_reference_bundle(source):
+        return load_reference_bundle(source)
+    return source
+
+
+def read_raw_reference_sheet(ref_sheet, sheet_name=0):
+    """Read one sheet (or all with sheet_name=None) from a workbook or a compiled bundle, as stored."""
+    if isinstance(ref_sheet, ReferenceBundle):
+        return ref_sheet.read_sheet(sheet_name)
+    return pd.read_excel(ref_sheet, sheet_name=sheet_name)
+
+
+def read_reference_sheet(ref_sheet, sheet_name=0):
+    """Read one sheet (or all with sheet_name=None) from a workbook or a compiled bundle.
+
+    Job codes come back canonical under the reference's job-code aliases, like the vessel data's.
+    """
+    from job_code_aliases import ALIAS_SHEET, canonical_reference_codes, reference_aliases
+
+    sheets = read_raw_reference_sheet(ref_sheet, sheet_name)
+    if isinstance(sheets, dict):
+        aliases = reference_aliases(ref_sheet, sheets if sheet_name is None else None)
+        return {name: sheet if name == ALIAS_SHEET else canonical_reference_codes(sheet, aliases)
+                for name, sheet in sheets.items()}
+    if sheet_name == ALIAS_SHEET:
+        return sheets
+    return canonical_reference_codes(sheets, reference_aliases(ref_sheet))
+
+
+def reference_sheet_names(ref_sheet):
+    """Sheet names of a workbook or a compiled bundle."""
+    if isinstance(ref_sheet, ReferenceBundle):
+        return ref_sheet.sheet_names
+    return pd.ExcelFile(ref_sheet).sheet_names
+
+
+def reference_version(ref_sheet):
+    """Bundle version, or the content hash prefix for a plain workbook."""
+    if isinstance(ref_sheet, ReferenceBundle):
+        return ref_sheet.version
+    if hasattr(ref_sheet, 'getvalue'):
+        return hashlib.sha256(ref_sheet.getvalue()).hexdigest()[:12]
+    if isinstance(ref_sheet, str) and os.path.exists(ref_sheet):
+        with open(ref_sheet, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()[:12]
+    return 'unknown'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile or inspect reference workbook bundles.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    compile_parser = subparsers.add_parser('compile', help="Compile a reference .xlsx into a bundle")
+    compile_parser.add_argument('workbook')
+    compile_parser.add_argument('-o', '--output', default='reference_bundle.zip')
+    compile_parser.add_argument('--version', dest='bundle_version', default=None)
+
+    info_parser = subparsers.add_parser('info', help="Show a bundle's manifest")
+    info_parser.add_argument('bundle')
+
+    args = parser.parse_args(argv)
+    if args.command == 'compile':
+        manifest = compile_reference_bundle(args.workbook, args.output, args.bundle_version)
+        print(f"Wrote {args.output}: {len(manifest['sheets'])} sheets, version {manifest['bundle_version']}")
+    else:
+        bundle = load_reference_bundle(args.bundle)
+        print(json.dumps({key: value for key, value in bundle.manifest.items() if key != 'sheets'}, indent=2))
+        for sheet in bundle.manifest['sheets']:
+            print(f"  {sheet['name']}: {sheet['rows']} rows, {len(sheet['columns'])} columns")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,179 @@
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+
+import pandas as pd
+
+from reference_bundle import ReferenceBundle, read_reference_sheet, reference_sheet_names, reference_version
+
+logger = logging.getLogger(__name__)
+
+JOB_CODE_CANDIDATES = ['UI Job Code', 'Job Code', 'JobCode', 'Code']
+TITLE_CANDIDATES = ['Title', 'J3 Job Title', 'Task Description', 'Job Title']
+
+# A system's sheet is the preferred sheet, else the first of exact, else the first sheet name
+# accepted by match, else the workbook's first sheet
+SheetRule = namedtuple('SheetRule', ['exact', 'match', 'title_columns'])
+
+SYSTEM_SHEET_RULES = {
+    'Hatch': SheetRule(['Hatch'], lambda sheet: 'Hatch' in sheet or 'Cargo' in sheet,
+                       ['J3 Job Title', 'Job Title', 'Title', 'Description']),
+    'BWTS': SheetRule(['BWTS'], lambda sheet: 'BWTS' in sheet or 'ballast' in sheet.lower(), TITLE_CANDIDATES),
+    'Purifier': SheetRule(['Purifiers'], lambda sheet: 'purifier' in sheet.lower() or 'PU' in sheet, TITLE_CANDIDATES),
+    'Cargo Handling': SheetRule(['Cargohanding'], None, TITLE_CANDIDATES),
+}
+
+# fallback is True when no sheet matched the rule and the first sheet is used instead
+SheetSchema = namedtuple('SheetSchema', ['system', 'sheet', 'job_code_column', 'title_column', 'fallback'])
+
+# Catalogs of recently used workbooks, by reference version
+MAX_CACHED_CATALOGS = 8
+_catalog_cache = OrderedDict()
+_catalog_lock = threading.Lock()
+
+
+def first_present(candidates, columns):
+    return next((col for col in candidates if col in columns), None)
+
+
+class ReferenceCatalog:
+    """Sheet names, per-system schemas and sheet frames of one reference workbook or bundle.
+
+    Sheet names are listed once, each sheet is read at most once and each system's sheet and
+    key columns are resolved once. frame() hands out copies, so callers may modify them.
+    """
+
+    def __init__(self, ref_sheet):
+        self.ref_sheet = ref_sheet
+        self.sheet_names = list(reference_sheet_names(ref_sheet))
+        self._sheets = {}
+        self._typed = {}
+        self._schemas = {}
+
+    def _read(self, sheet_name):
+        if sheet_name not in self._sheets:
+            self._sheets[sheet_name] = read_reference_sheet(self.ref_sheet, sheet_name=sheet_name)
+        return self._sheets[sheet_name]
+
+    def sheet(self, sheet_name):
+        """Copy of one sheet as read from the workbook."""
+        return self._read(sheet_name).copy()
+
+    def resolve_sheet(self, system, preferred_sheet=None):
+        """(sheet name, fallback) for a system under SYSTEM_SHEET_RULES."""
+        rule = SYSTEM_SHEET_RULES[system]
+        for name in [preferred_sheet] + list(rule.exact):
+            if name is not None and name in self.sheet_names:
+                return name, False
+        if rule.match is not None:
+            for name in self.sheet_names:
+                if rule.match(name):
+                    return name, False
+        return self.sheet_names[0], True
+
+    def schema(self, system, preferred_sheet=None):
+        """The system's SheetSchema; job_code_column / title_column are None when the sheet has none."""
+        key = (system, preferred_sheet)
+        if key not in self._schemas:
+            sheet, fallback = self.resolve_sheet(system, preferred_sheet)
+            if fallback:
+                logger.warning('No %s sheet found, using the first sheet: %s', system, sheet)
+            else:
+                logger.debug('Using reference sheet for %s: %s', system, sheet)
+            columns = self._read(sheet).columns
+            self._schemas[key] = SheetSchema(
+                system, sheet,
+                first_present(JOB_CODE_CANDIDATES, columns),
+                first_present(SYSTEM_SHEET_RULES[system].title_columns, columns),
+                fallback,
+            )
+        return self._schemas[key]
+
+    def frame(self, system, preferred_sheet=None):
+        """(schema, copy of the system's sheet) with the job code column already cast to str."""
+        schema = self.schema(system, preferred_sheet)
+        key = (schema.sheet, schema.job_code_column)
+        if key not in self._typed:
+            typed = self._read(schema.sheet).copy()
+            if schema.job_code_column is not None:
+                typed[schema.job_code_column] = typed[schema.job_code_column].astype(str)
+            self._typed[key] = typed
+        return schema, self._typed[key].copy()
+
+    def validate(self, systems=None):
+        """One row per system with its resolved sheet, key columns and any problems."""
+        rows = []
+        for system in systems or SYSTEM_SHEET_RULES:
+            try:
+                schema = self.schema(system)
+            except Exception as e:
+                rows.append({'System': system, 'Sheet': None, 'Job Code Column': None, 'Title Column': None,
+                             'Problems': f'unreadable: {e}'})
+                continue
+            problems = []
+            if schema.fallback:
+                problems.append('no matching sheet, first sheet used')
+            if schema.job_code_column is None:
+                problems.append('no job code column')
+            rows.append({
+                'System': system,
+                'Sheet': schema.sheet,
+                'Job Code Column': schema.job_code_column,
+                'Title Column': schema.title_column,
+                'Problems': '; '.join(problems),
+            })
+        return pd.DataFrame(rows, columns=['System', 'Sheet', 'Job Code Column', 'Title Column', 'Problems'])
+
+
+def reference_catalog(ref_sheet):
+    """The ReferenceCatalog of a workbook or bundle, shared by every call with the same reference version."""
+    if isinstance(ref_sheet, ReferenceCatalog):
+        return ref_sheet
+    version = reference_version(ref_sheet)
+    if version == 'unknown':
+        return ReferenceCatalog(ref_sheet)
+
+    key = (isinstance(ref_sheet, ReferenceBundle), version)
+    with _catalog_lock:
+        if key in _catalog_cache:
+            _catalog_cache.move_to_end(key)
+            return _catalog_cache[key]
+    catalog = ReferenceCatalog(ref_sheet)
+    with _catalog_lock:
+        # A concurrent first use of the same reference may have cached its catalog meanwhile
+        catalog = _catalog_cache.setdefault(key, catalog)
+        _catalog_cache.move_to_end(key)
+        while len(_catalog_cache) > MAX_CACHED_CATALOGS:
+            _catalog_cache.popitem(last=False)
+    return catalog
+
+
+# One system's vessel jobs matched against its reference sheet: matched is the merge on the job code,
+# pivot counts matched jobs per title and machinery location, missing is what the processor reports
+# as missing (its placeholder row when matching was not possible)
+ReferenceResult = namedtuple('ReferenceResult', [
+    'schema', 'matched', 'title_column', 'pivot', 'missing', 'reference_count', 'matched_count', 'missing_count'
+])
+
+
+def match_reference(jobs, schema, reference):
+    """ReferenceResult of vessel jobs with a str 'Job Codecopy' against a ReferenceCatalog.frame() sheet."""
+    present = reference[schema.job_code_column].isin(jobs['Job Codecopy'])
+    matched = jobs.merge(reference, left_on='Job Codecopy', right_on=schema.job_code_column,
+                         suffixes=('_filtered', '_ref')).reset_index(drop=True)
+
+    title_column = first_present(SYSTEM_SHEET_RULES[schema.system].title_columns, matched.columns)
+    if title_column is not None and 'Machinery Location' in matched.columns and not matched.empty:
+        pivot = matched.pivot_table(index=title_column, columns='Machinery Location', values='Job Codecopy',
+                                    aggfunc='count').fillna(0).astype(int)
+    else:
+        pivot = pd.DataFrame()
+
+    missing = reference[~present.to_numpy()].reset_index(drop=True)
+    return ReferenceResult(schema, matched, title_column, pivot, missing,
+                           len(reference), int(present.sum()), len(missing))
+
+
+def unmatched_reference_result(missing, schema=None):
+    """ReferenceResult when matching was not possible; missing is the processor's placeholder row."""
+    return ReferenceResult(schema, pd.DataFrame(), None, pd.DataFrame(), missing, 0, 0, 0)
@@ -0,0 +1,338 @@
+import io
+import os
+import sys
+import sqlite3
+import argparse
+import datetime
+import threading
+import logging
+
+import pandas as pd
+
+from analysis_pipeline import MISSING_JOB_SYSTEMS, data_fingerprint, missing_job_entries
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.environ.get('VESSEL_RESULTS_DB', 'vessel_results.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vessel TEXT NOT NULL,
+    uploaded_at TEXT NOT NULL,
+    reference_version TEXT NOT NULL,
+    engine_type TEXT NOT NULL,
+    data_hash TEXT NOT NULL,
+    total_jobs INTEGER,
+    critical_jobs INTEGER,
+    total_missing_jobs INTEGER,
+    missing_machinery INTEGER,
+    UNIQUE (vessel, data_hash, reference_version, engine_type)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_vessel_time ON runs (vessel, uploaded_at);
+
+CREATE TABLE IF NOT EXISTS system_counts (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    system TEXT NOT NULL,
+    missing_count INTEGER NOT NULL,
+    PRIMARY KEY (run_id, system)
+);
+CREATE INDEX IF NOT EXISTS idx_system_counts_system ON system_counts (system, run_id);
+
+CREATE TABLE IF NOT EXISTS missing_jobs (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    system TEXT NOT NULL,
+    job_code TEXT NOT NULL,
+    machinery TEXT,
+    title TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_missing_jobs_run ON missing_jobs (run_id, system);
+CREATE INDEX IF NOT EXISTS idx_missing_jobs_code ON missing_jobs (job_code, run_id);
+
+CREATE TABLE IF NOT EXISTS running_hours (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    unit TEXT NOT NULL,
+    hours REAL,
+    PRIMARY KEY (run_id, unit)
+);
+
+CREATE TABLE IF NOT EXISTS result_tables (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+"""
+
+
+def system_label(name):
+    """Registry label for a label, display name ('Boiler' / 'Power Distribution System') or unique substring."""
+    labels = [system.label for system in MISSING_JOB_SYSTEMS]
+    if name in labels:
+        return name
+    wanted = str(name).lower().replace('_', ' ').strip()
+    for label in labels:
+        if label.lower().replace('_', ' ') == wanted:
+            return label
+    matches = [label for label in labels if wanted in label.lower().replace('_', ' ')]
+    if len(matches) == 1:
+        return matches[0]
+    raise ValueError(f"Unknown or ambiguous system '{name}'")
+
+
+def _to_int(value):
+    # sqlite3 cannot bind numpy integers
+    return None if value is None else int(value)
+
+
+def _to_hours(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _frame_to_json(df):
+    if not isinstance(df.index, pd.RangeIndex):
+        df = df.reset_index()
+    df = df.copy()
+    df.columns = [' '.join(map(str, col)).strip() if isinstance(col, tuple) else str(col) for col in df.columns]
+    return df.to_json(orient='split', index=False, date_format='iso', default_handler=str)
+
+
+class ResultsStore:
+    """SQLite store of analysis runs, keyed by vessel, upload time and reference version.
+
+    A run is recorded once per (vessel, data hash, reference version, engine type), so Streamlit reruns
+    and repeated uploads of an unchanged export do not create duplicates.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_DB_PATH
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA foreign_keys = ON')
+        if self.path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def _find_run(self, vessel, data_hash, reference_version, engine_type):
+        # Callers hold self._lock
+        row = self._conn.execute(
+            'SELECT run_id FROM runs WHERE vessel = ? AND data_hash = ? AND reference_version = ? AND engine_type = ?',
+            (vessel, data_hash, reference_version, engine_type)
+        ).fetchone()
+        return row[0] if row else None
+
+    def find_run(self, vessel, data_hash, reference_version, engine_type):
+        with self._lock:
+            return self._find_run(vessel, data_hash, reference_version, engine_type)
+
+    def save_run(self, vessel, missing_sources, reference_version, engine_type, data_hash,
+                 summary=None, running_hours=None, tables=None, uploaded_at=None):
+        """Persist one run and return its run_id (the existing one if this input was already stored).
+
+        Args:
+            vessel: Vessel name
+            missing_sources: {system label: missing jobs DataFrame}
+            reference_version: Reference bundle version or workbook hash prefix
+            engine_type: Main engine type the run used
+            data_hash: data_fingerprint() of the upload
+            summary: Optional dict with totaljobs, criticaljobscount, total_missing_jobs, missing_machinery_count
+            running_hours: Optional {unit: hours}, e.g. {'Main Engine': 1234, 'AE1': 567}
+            tables: Optional {name: DataFrame} such as pivots and component status
+            uploaded_at: Defaults to now
+        """
+        existing = self.find_run(vessel, data_hash, reference_version, engine_type)
+        if existing is not None:
+            return existing
+
+        summary = summary or {}
+        uploaded_at = (uploaded_at or datetime.datetime.now()).isoformat(timespec='seconds')
+        with self._lock, self._conn:
+            # Another session or process may have stored the same run since find_run
+            cursor = self._conn.execute(
+                'INSERT INTO runs (vessel, uploaded_at, reference_version, engine_type, data_hash, total_jobs, '
+                'critical_jobs, total_missing_jobs, missing_machinery) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (vessel, data_hash, reference_version, engine_type) DO NOTHING',
+                (vessel, uploaded_at, reference_version, engine_type, data_hash,
+                 _to_int(summary.get('totaljobs')), _to_int(summary.get('criticaljobscount')),
+                 _to_int(summary.get('total_missing_jobs')), _to_int(summary.get('missing_machinery_count')))
+            )
+            if cursor.rowcount == 0:
+                return self._find_run(vessel, data_hash, reference_version, engine_type)
+            run_id = cursor.lastrowid
+
+            count_rows, job_rows = [], []
+            for label, missing in missing_sources.items():
+                entries = missing_job_entries(missing)
+                count_rows.append((run_id, label, len(entries)))
+                job_rows.extend(
+                    (run_id, label, code, machinery or None, None if pd.isna(title) else str(title))
+                    for code, machinery, title in entries[['Job Code', 'Machinery', 'Title']].itertuples(index=False)
+                )
+            self._conn.executemany('INSERT INTO system_counts VALUES (?, ?, ?)', count_rows)
+            self._conn.executemany('INSERT INTO missing_jobs VALUES (?, ?, ?, ?, ?)', job_rows)
+
+            if running_hours:
+                self._conn.executemany(
+                    'INSERT INTO running_hours VALUES (?, ?, ?)',
+                    [(run_id, str(unit), _to_hours(hours)) for unit, hours in running_hours.items()]
+                )
+            for name, df in (tables or {}).items():
+                if isinstance(df, pd.DataFrame):
+                    self._conn.execute('INSERT INTO result_tables VALUES (?, ?, ?)', (run_id, name, _frame_to_json(df)))
+
+        logger.info('Stored run %s for %s (%d missing jobs)', run_id, vessel, len(job_rows))
+        return run_id
+
+    def save_quickview(self, data, quickview, reference_version, engine_type, running_hours=None, tables=None):
+        """save_run() from an analysis_pipeline.run_quickview() result."""
+        return self.save_run(
+            str(quickview['vesselname']), quickview['missing_sources'], reference_version, engine_type,
+            data_fingerprint(data), summary=quickview, running_hours=running_hours, tables=tables
+        )
+
+    def vessels(self):
+        return self._query('SELECT DISTINCT vessel FROM runs ORDER BY vessel')['vessel'].tolist()
+
+    def runs(self, vessel=None, last=None):
+        """Runs, newest first."""
+        sql = 'SELECT * FROM runs'
+        params = []
+        if vessel is not None:
+            sql += ' WHERE vessel = ?'
+            params.append(vessel)
+        sql += ' ORDER BY uploaded_at DESC, run_id DESC'
+        if last:
+            sql += ' LIMIT ?'
+            params.append(int(last))
+        return self._query(sql, params)
+
+    def missing_trend(self, vessel, system=None, last=12):
+        """Missing-job counts per system for the vessel's last N uploads, oldest first.
+
+        missing_trend('Vessel X', 'boiler') -> columns uploaded_at, run_id, system, missing_count
+        """
+        sql = (
+            'SELECT r.uploaded_at, r.run_id, r.reference_version, c.system, c.missing_count '
+            'FROM (SELECT run_id, uploaded_at, reference_version FROM runs WHERE vessel = ? '
+            '      ORDER BY uploaded_at DESC, run_id DESC LIMIT ?) AS r '
+            'JOIN system_counts AS c ON c.run_id = r.run_id'
+        )
+        params = [vessel, int(last)]
+        if system is not None:
+            sql += ' WHERE c.system = ?'
+            params.append(system_label(system))
+        sql += ' ORDER BY r.uploaded_at, r.run_id, c.system'
+        return self._query(sql, params)
+
+    def total_trend(self, vessel, last=12):
+        """Headline counts for the vessel's last N uploads, oldest first."""
+        return self._query(
+            'SELECT * FROM (SELECT run_id, uploaded_at, reference_version, total_jobs, critical_jobs, '
+            'total_missing_jobs, missing_machinery FROM runs WHERE vessel = ? '
+            'ORDER BY uploaded_at DESC, run_id DESC LIMIT ?) ORDER BY uploaded_at, run_id',
+            (vessel, int(last))
+        )
+
+    def missing_jobs(self, run_id, system=None):
+        sql = 'SELECT system, job_code, machinery, title FROM missing_jobs WHERE run_id = ?'
+        params = [run_id]
+        if system is not None:
+            sql += ' AND system = ?'
+            params.append(system_label(system))
+        return self._query(sql + ' ORDER BY system, job_code', params)
+
+    def job_history(self, vessel, job_code, last=12):
+        """Whether a job code was missing in each of the vessel's last N uploads."""
+        return self._query(
+            'SELECT r.run_id, r.uploaded_at, '
+            '       EXISTS (SELECT 1 FROM missing_jobs m WHERE m.run_id = r.run_id AND m.job_code = ?) AS missing '
+            'FROM (SELECT run_id, uploaded_at FROM runs WHERE vessel = ? '
+            '      ORDER BY uploaded_at DESC, run_id DESC LIMIT ?) AS r ORDER BY r.uploaded_at, r.run_id',
+            (str(job_code).strip(), vessel, int(last))
+        )
+
+    def compare_runs(self, old_run_id, new_run_id):
+        """Missing jobs that appeared ('New') or disappeared ('Resolved') between two runs."""
+        return self._query(
+            "SELECT 'New' AS change, system, job_code, machinery, title FROM missing_jobs WHERE run_id = ? "
+            "AND NOT EXISTS (SELECT 1 FROM missing_jobs o WHERE o.run_id = ? AND o.system = missing_jobs.system "
+            "                AND o.job_code = missing_jobs.job_code AND IFNULL(o.machinery, '') = IFNULL(missing_jobs.machinery, '')) "
+            "UNION ALL "
+            "SELECT 'Resolved', system, job_code, machinery, title FROM missing_jobs WHERE run_id = ? "
+            "AND NOT EXISTS (SELECT 1 FROM missing_jobs n WHERE n.run_id = ? AND n.system = missing_jobs.system "
+            "                AND n.job_code = missing_jobs.job_code AND IFNULL(n.machinery, '') = IFNULL(missing_jobs.machinery, '')) "
+            "ORDER BY 1, 2, 3",
+            (new_run_id, old_run_id, old_run_id, new_run_id)
+        )
+
+    def running_hours(self, vessel, unit=None, last=12):
+        sql = (
+            'SELECT r.uploaded_at, r.run_id, h.unit, h.hours FROM '
+            '(SELECT run_id, uploaded_at FROM runs WHERE vessel = ? ORDER BY uploaded_at DESC, run_id DESC LIMIT ?) AS r '
+            'JOIN running_hours AS h ON h.run_id = r.run_id'
+        )
+        params = [vessel, int(last)]
+        if unit is not None:
+            sql += ' WHERE h.unit = ?'
+            params.append(unit)
+        return self._query(sql + ' ORDER BY r.uploaded_at, r.run_id, h.unit', params)
+
+    def load_table(self, run_id, name):
+        with self._lock:
+            row = self._conn.execute('SELECT payload FROM result_tables WHERE run_id = ? AND name = ?',
+                                     (run_id, name)).fetchone()
+        if row is None:
+            raise KeyError(f"No table '{name}' for run {run_id}")
+        return pd.read_json(io.StringIO(row[0]), orient='split')
+
+    def delete_run(self, run_id):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM runs WHERE run_id = ?', (run_id,))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the persisted vessel results store.")
+    parser.add_argument('--db', default=None)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    runs_parser = subparsers.add_parser('runs', help="List stored runs")
+    runs_parser.add_argument('--vessel', default=None)
+    runs_parser.add_argument('--last', type=int, default=None)
+
+    trend_parser = subparsers.add_parser('trend', help="Missing-job counts over a vessel's recent uploads")
+    trend_parser.add_argument('vessel')
+    trend_parser.add_argument('--system', default=None)
+    trend_parser.add_argument('--last', type=int, default=12)
+
+    compare_parser = subparsers.add_parser('compare', help="New/resolved missing jobs between two runs")
+    compare_parser.add_argument('old_run_id', type=int)
+    compare_parser.add_argument('new_run_id', type=int)
+
+    args = parser.parse_args(argv)
+    store = ResultsStore(args.db)
+    pd.set_option('display.width', 200)
+    if args.command == 'runs':
+        result = store.runs(args.vessel, args.last)
+    elif args.command == 'trend':
+        result = store.missing_trend(args.vessel, args.system, args.last)
+        if args.system is None:
+            result = result.pivot(index=['uploaded_at', 'run_id'], columns='system', values='missing_count')
+    else:
+        result = store.compare_runs(args.old_run_id, args.new_run_id)
+    print(result.to_string())
+    store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
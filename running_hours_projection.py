@@ -0,0 +1,139 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from auxiliary_engine_processor import AE_UNIT_PATTERN, AuxiliaryEngineProcessor, ae_units
+from engine_processor import DEFAULT_UNIT_PATTERN, MAIN_ENGINE_JOB_CODES
+
+logger = logging.getLogger(__name__)
+
+# Typical running hours per calendar day; override per vessel from the UI or the constructor
+DEFAULT_DAILY_HOURS = {'Main Engine': 20.0, 'Auxiliary Engine': 12.0}
+
+INTERVAL_PATTERN = r'(?i)(\d[\d,.]*)\s*(?:hrs?|hours?|rh)\b'
+
+PROJECTION_COLUMNS = [
+    'Machine', 'Unit', 'Job Title', 'Job Code', 'Frequency', 'Last Done Date', 'Last Done Running Hours',
+    'Machinery Running Hours', 'Remaining Running Hours', 'Daily Hours', 'Days To Due',
+    'Projected Due Date', 'Overdue',
+]
+
+
+def to_hours(values):
+    """Numeric hours from export cells such as '12,345', '12345.0' or 'No RH' (NaN)."""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    cleaned = values.astype(str).str.replace(',', '', regex=False).str.strip()
+    return pd.to_numeric(cleaned, errors='coerce')
+
+
+def interval_hours(frequency):
+    """Running-hour interval from 'Frequency' values like '8000 Hrs' (NaN for calendar intervals)."""
+    return to_hours(frequency.astype(str).str.extract(INTERVAL_PATTERN, expand=False))
+
+
+def machine_running_hours(data):
+    """Numeric 'Machinery Running Hours' per 'Machinery Location' (first non-empty reading)."""
+    if 'Machinery Running Hours' not in data.columns:
+        return pd.Series(dtype=float)
+    hours = pd.DataFrame({
+        'Machinery Location': data['Machinery Location'],
+        'Hours': to_hours(data['Machinery Running Hours']),
+    }).dropna()
+    return hours.groupby('Machinery Location', sort=False)['Hours'].first()
+
+
+def _job_specs(specs, default_pattern):
+    """[(job code as str, description, pattern), ...] from processor-style (codes, description[, pattern]) tuples."""
+    rows = []
+    for spec in specs:
+        codes, description = spec[0], spec[1]
+        pattern = spec[2] if len(spec) == 3 else default_pattern
+        for code in codes if isinstance(codes, list) else [codes]:
+            rows.append((str(code), description, pattern))
+    return rows
+
+
+class RunningHoursProjector:
+    """Projects due dates for running-hour based ME cylinder and AE unit jobs.
+
+    Remaining hours come from 'Remaining Running Hours' or, when that is empty, from
+    'Last Done Running Hours' + the interval in 'Frequency' - 'Machinery Running Hours'.
+    Days to due = remaining hours / daily utilization of that machine.
+    """
+
+    def __init__(self, daily_hours=None, as_of=None):
+        self.daily_hours = dict(DEFAULT_DAILY_HOURS, **(daily_hours or {}))
+        self.as_of = pd.Timestamp(as_of or pd.Timestamp.today()).normalize()
+
+    def _select(self, data, specs, unit_source, default_pattern, machine_filter=None):
+        """Rows of the given jobs with their description and unit, one str.extract per distinct pattern."""
+        spec_frame = pd.DataFrame(_job_specs(specs, default_pattern), columns=['Job Code', 'Job Title', 'Pattern'])
+        codes = data['Job Code'].astype(str).str.strip().str.replace(r'\.0$', '', regex=True)
+        mask = codes.isin(spec_frame['Job Code'])
+        if machine_filter is not None:
+            mask &= data['Machinery Location'].str.contains(machine_filter, case=False, na=False)
+        rows = data[mask].copy()
+        rows['Job Code'] = codes[mask]
+        rows = rows.merge(spec_frame.drop_duplicates('Job Code'), on='Job Code', how='left')
+
+        rows['Unit'] = pd.Series(np.nan, index=rows.index, dtype=object)
+        source = rows[unit_source] if unit_source in rows.columns else pd.Series('', index=rows.index)
+        for pattern, index in rows.groupby('Pattern').groups.items():
+            rows.loc[index, 'Unit'] = source.loc[index].str.extract(pattern, expand=False)
+        return rows.drop(columns=['Pattern'])
+
+    def job_rows(self, data):
+        """ME and AE job rows with 'Machine' ('Main Engine' / 'AE1'..) and 'Unit' columns."""
+        main_engine = self._select(data, MAIN_ENGINE_JOB_CODES, 'Sub Component Location', DEFAULT_UNIT_PATTERN)
+        main_engine['Machine'] = 'Main Engine'
+        main_engine['Utilization Key'] = 'Main Engine'
+
+        # AE jobs are told apart by engine number in 'Machinery Location', as in AuxiliaryEngineProcessor
+        aux = self._select(data, AuxiliaryEngineProcessor().job_codes, 'Machinery Location', f'(?i){AE_UNIT_PATTERN}',
+                           machine_filter='Auxiliary Engine')
+        aux['Unit'] = ae_units(aux)
+        aux['Machine'] = 'AE' + aux['Unit'].astype(str).replace('<NA>', '?')
+        aux['Utilization Key'] = 'Auxiliary Engine'
+
+        return pd.concat([main_engine, aux], ignore_index=True)
+
+    def project(self, data):
+        """One row per job and unit, soonest projected due date first."""
+        rows = self.job_rows(data)
+        if rows.empty:
+            return pd.DataFrame(columns=PROJECTION_COLUMNS)
+
+        for col in ('Last Done Date', 'Frequency', 'Last Done Running Hours', 'Remaining Running Hours'):
+            if col not in rows.columns:
+                rows[col] = np.nan
+
+        machine_hours = rows['Machinery Location'].map(machine_running_hours(data))
+        last_done = to_hours(rows['Last Done Running Hours'])
+        remaining = to_hours(rows['Remaining Running Hours'])
+        derived = last_done + interval_hours(rows['Frequency']) - machine_hours
+        remaining = remaining.fillna(derived)
+
+        daily = rows['Utilization Key'].map(self.daily_hours).astype(float)
+        days = np.floor(remaining.to_numpy() / daily.to_numpy())
+        projected = self.as_of + pd.to_timedelta(days, unit='D')
+
+        projection = pd.DataFrame({
+            'Machine': rows['Machine'],
+            'Unit': pd.to_numeric(rows['Unit'], errors='coerce').astype('Int64'),
+            'Job Title': rows['Job Title'],
+            'Job Code': rows['Job Code'],
+            'Frequency': rows['Frequency'],
+            'Last Done Date': rows['Last Done Date'],
+            'Last Done Running Hours': last_done,
+            'Machinery Running Hours': machine_hours,
+            'Remaining Running Hours': remaining,
+            'Daily Hours': daily,
+            'Days To Due': pd.Series(days, index=rows.index).astype('Int64'),
+            'Projected Due Date': projected,
+            'Overdue': remaining.to_numpy() < 0,
+        })
+        return projection.sort_values(
+            by=['Projected Due Date', 'Machine', 'Unit'], na_position='last'
+        ).reset_index(drop=True)
@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class SteeringSystemProcessor:
     def __init__(self):
         self.filtered_dfSteering = pd.DataFrame()
@@ -77,7 +80,6 @@ class SteeringSystemProcessor:
             self.missingjobsSteeringresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_steering_data')
             self.pivot_table_resultSteeringJobs = pd.DataFrame({'Error': [f'Steering data processing failed: {str(e)}']})
             self.missingjobsSteeringresult = pd.DataFrame()
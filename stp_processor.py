@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class STPSystemProcessor:
     def __init__(self):
         self.filtered_dfSTP = pd.DataFrame()
@@ -76,7 +79,6 @@ class STPSystemProcessor:
             self.missingjobsSTPresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_stp_data')
             self.pivot_table_resultSTPJobs = pd.DataFrame({'Error': [f'STP data processing failed: {str(e)}']})
             self.missingjobsSTPresult = pd.DataFrame()
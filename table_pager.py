@@ -0,0 +1,90 @@
+import math
+import logging
+
+import pandas as pd
+import streamlit as st
+from pandas.io.formats.style import Styler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 100
+ORIGINAL_ORDER = "(original order)"
+
+
+def filter_frame(df, query):
+    """Rows where any cell (or the index) contains query, case-insensitively."""
+    query = (query or '').strip()
+    if not query or df.empty:
+        return df
+    mask = pd.Series(False, index=df.index)
+    for col in df.columns:
+        mask |= df[col].astype(str).str.contains(query, case=False, regex=False, na=False).to_numpy()
+    if not isinstance(df.index, pd.RangeIndex):
+        mask |= pd.Series(df.index.astype(str), index=df.index).str.contains(query, case=False, regex=False).to_numpy()
+    return df[mask.to_numpy()]
+
+
+def sort_frame(df, column, descending=False):
+    """Stable sort on one column; mixed-type columns fall back to sorting as text."""
+    if column is None or column == ORIGINAL_ORDER or column not in df.columns:
+        return df
+    try:
+        return df.sort_values(by=column, ascending=not descending, kind='stable', na_position='last')
+    except TypeError:
+        return df.sort_values(by=column, ascending=not descending, kind='stable', na_position='last',
+                              key=lambda values: values.astype(str))
+
+
+def page_bounds(total_rows, page, page_size):
+    """(start, stop) row positions of a 1-based page, clamped to the data."""
+    pages = max(1, math.ceil(total_rows / page_size))
+    page = min(max(1, int(page)), pages)
+    start = (page - 1) * page_size
+    return start, min(start + page_size, total_rows)
+
+
+def _restyle(view, styler):
+    """Apply a Styler's exported functions to view only, so only the visible cells are styled."""
+    styled = view.style
+    styled.use(styler.export())
+    return styled
+
+
+def paged_table(table, key, page_size=DEFAULT_PAGE_SIZE, **dataframe_kwargs):
+    """st.dataframe() for large results: filter, sort and page on the server, send one page.
+
+    table may be a DataFrame or a Styler; a Styler's functions are re-applied to the visible
+    page instead of the whole frame. Tables that fit on one page render as before, without
+    controls. Extra keyword arguments (use_container_width, column_config, ...) go to st.dataframe.
+    """
+    if table is None:
+        return
+    styler = table if isinstance(table, Styler) else None
+    df = styler.data if styler is not None else table
+    dataframe_kwargs.setdefault('use_container_width', True)
+
+    if len(df) <= page_size:
+        st.dataframe(table, **dataframe_kwargs)
+        return
+
+    filter_col, sort_col, order_col, page_col = st.columns([3, 2, 1, 1])
+    query = filter_col.text_input("Filter rows", key=f"{key}_filter", placeholder="Contains...")
+    sort_by = sort_col.selectbox("Sort by", [ORIGINAL_ORDER] + [str(col) for col in df.columns], key=f"{key}_sort")
+    descending = order_col.checkbox("Descending", key=f"{key}_desc")
+
+    columns = {str(col): col for col in df.columns}
+    view = sort_frame(filter_frame(df, query), columns.get(sort_by), descending)
+
+    pages = max(1, math.ceil(len(view) / page_size))
+    page_key = f"{key}_page"
+    # A narrower filter can leave the remembered page out of range
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = page_col.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+
+    start, stop = page_bounds(len(view), page, page_size)
+    visible = view.iloc[start:stop]
+    filtered_note = f" (filtered from {len(df)})" if len(view) != len(df) else ""
+    st.caption(f"Rows {start + 1 if len(view) else 0}-{stop} of {len(view)}{filtered_note}, page {page} of {pages}")
+
+    st.dataframe(_restyle(visible, styler) if styler is not None else visible, **dataframe_kwargs)
@@ -1,7 +1,15 @@
+import logging
 import pandas as pd
 import numpy as np
+from count_cube import DeferredFrame, cube_pivot
+
+logger = logging.getLogger(__name__)
 
 class TankSystemProcessor:
+    # Filtered and merged jobs; built on first access when the counts came from a count cube
+    filtered_dftanksjobs = DeferredFrame()
+    result_dftanks = DeferredFrame()
+
     def __init__(self):
         self.filtered_dftanksjobs = pd.DataFrame()
         self.result_dftanks = pd.DataFrame()
@@ -18,7 +26,27 @@ class TankSystemProcessor:
     def format_blank(self, val):
         return "" if val == -1 else val
 
-    def process_tank_data(self, df, dftanks):
+    def filter_jobs(self, df, equipment):
+        filtered = df[df['Function'].str.contains('|'.join(equipment), na=False)].copy()
+
+        if 'Job Codecopy' not in filtered.columns:
+            filtered['Job Codecopy'] = filtered['Job Code'].astype(str)
+        filtered['Job Codecopy'] = filtered['Job Codecopy'].astype(object)
+        filtered['Job Codecopy'] = filtered['Job Codecopy'].apply(self.safe_convert_to_string)
+        return filtered
+
+    def merge_reference(self, filtered, dftanks):
+        result = filtered.merge(
+            dftanks,
+            left_on='Job Codecopy',
+            right_on='UI Job Code',
+            suffixes=('_filtered', '_ref')
+        )
+        result.reset_index(drop=True, inplace=True)
+        return result
+
+    def process_tank_data(self, df, dftanks, cube=None):
+        """cube: optional JobCountCube of df; the counts are sliced from it instead of merging df."""
         try:
             tanks = [
                 'Ballast System','Bilge and Sludge System','Fuel Oil Service System','Cargo Handling System',
@@ -28,34 +56,31 @@ class TankSystemProcessor:
                 'Cooling Sea Water System','Stern Tube System','Waste Handling'
             ]
 
-            self.filtered_dftanksjobs = df[df['Function'].str.contains('|'.join(tanks), na=False)].copy()
+            dftanks['UI Job Code'] = dftanks['UI Job Code'].astype(str)
+
+            if cube is not None and cube.serves(dftanks, code_column='Job Codecopy'):
+                rows = cube.slice(dftanks['UI Job Code'], functions=tanks)
+                pivot_table = cube_pivot(rows, 'Title', 'Function')
+                vessel_codes = cube.codes(functions=tanks)
+                self.filtered_dftanksjobs = lambda: self.filter_jobs(df, tanks)
+                self.result_dftanks = lambda: self.merge_reference(self.filtered_dftanksjobs, dftanks)
+            else:
+                self.filtered_dftanksjobs = self.filter_jobs(df, tanks)
+                self.result_dftanks = self.merge_reference(self.filtered_dftanksjobs, dftanks)
 
-            if 'Job Codecopy' not in self.filtered_dftanksjobs.columns:
-                self.filtered_dftanksjobs['Job Codecopy'] = self.filtered_dftanksjobs['Job Code'].astype(str)
-            self.filtered_dftanksjobs['Job Codecopy'] = self.filtered_dftanksjobs['Job Codecopy'].astype(object)
-            self.filtered_dftanksjobs['Job Codecopy'] = self.filtered_dftanksjobs['Job Codecopy'].apply(self.safe_convert_to_string)
+                possible_titles = ['Title', 'J3 Job Title', 'Task Description', 'Job Title']
+                title_col = next((col for col in possible_titles if col in self.result_dftanks.columns), None)
+                if title_col is None:
+                    raise ValueError("No suitable title column found in merged tank data for pivot index.")
 
-            dftanks['UI Job Code'] = dftanks['UI Job Code'].astype(str)
+                pivot_table = self.result_dftanks.pivot_table(
+                    index=title_col,
+                    columns='Function',
+                    values='Job Codecopy',
+                    aggfunc='count'
+                )
+                vessel_codes = self.filtered_dftanksjobs['Job Codecopy']
 
-            self.result_dftanks = self.filtered_dftanksjobs.merge(
-                dftanks,
-                left_on='Job Codecopy',
-                right_on='UI Job Code',
-                suffixes=('_filtered', '_ref')
-            )
-            self.result_dftanks.reset_index(drop=True, inplace=True)
-
-            possible_titles = ['Title', 'J3 Job Title', 'Task Description', 'Job Title']
-            title_col = next((col for col in possible_titles if col in self.result_dftanks.columns), None)
-            if title_col is None:
-                raise ValueError("No suitable title column found in merged tank data for pivot index.")
-
-            pivot_table = self.result_dftanks.pivot_table(
-                index=title_col,
-                columns='Function',
-                values='Job Codecopy',
-                aggfunc='count'
-            )
             pivot_table.replace(np.nan, '', inplace=True)
             pivot_table.replace('', -1, inplace=True)
             pivot_table = pivot_table.astype(int)
@@ -70,15 +95,12 @@ class TankSystemProcessor:
                 ], overwrite=False)\
                 .set_table_attributes("class='dataframe' style='margin-left: 0 !important; margin-right: auto; width: 100%'")
 
-            self.missingjobstankresult = dftanks[~dftanks['UI Job Code'].isin(
-                self.filtered_dftanksjobs['Job Codecopy']
-            )].copy()
+            self.missingjobstankresult = dftanks[~dftanks['UI Job Code'].isin(vessel_codes)].copy()
             if 'Remarks' in self.missingjobstankresult.columns:
                 self.missingjobstankresult.drop(columns=['Remarks'], inplace=True)
             self.missingjobstankresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_tank_data')
             self.pivot_table_resulttanksJobs = pd.DataFrame({'Error': [f'Tank data processing failed: {str(e)}']})
             self.missingjobstankresult = pd.DataFrame()
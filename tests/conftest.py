@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+from pandas.io.formats.style import Styler
+
+# The modules are flat files at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def styler_applymap(monkeypatch):
+    # The processors style with Styler.applymap, which pandas 3 renamed to map
+    if not hasattr(Styler, 'applymap'):
+        monkeypatch.setattr(Styler, 'applymap', Styler.map, raising=False)
@@ -0,0 +1,17 @@
+import numpy as np
+import pandas as pd
+
+from analysis_pipeline import UNKNOWN_VESSEL, split_by_vessel
+
+
+def test_split_by_vessel_keeps_rows_without_a_vessel():
+    data = pd.DataFrame({'Vessel': ['A', None, 'B', ' ', np.nan], 'Job Code': range(5)})
+    partitions = split_by_vessel(data)
+    assert sorted(partitions) == ['A', 'B', UNKNOWN_VESSEL]
+    assert partitions[UNKNOWN_VESSEL]['Job Code'].tolist() == [1, 3, 4]
+    assert sum(len(frame) for frame in partitions.values()) == len(data)
+
+
+def test_split_by_vessel_without_vessel_column():
+    data = pd.DataFrame({'Job Code': [1, 2]})
+    assert list(split_by_vessel(data)) == [UNKNOWN_VESSEL]
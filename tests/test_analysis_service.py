@@ -0,0 +1,41 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from analysis_service import AnalysisRequestHandler, DEFAULT_WAIT_SECONDS, MAX_WAIT_SECONDS, wait_timeout
+
+
+def test_wait_timeout_defaults_and_clamps():
+    assert wait_timeout({}) == DEFAULT_WAIT_SECONDS
+    assert wait_timeout({'timeout': ['5']}) == 5.0
+    assert wait_timeout({'timeout': ['-3']}) == 0.0
+    assert wait_timeout({'timeout': ['inf']}) == MAX_WAIT_SECONDS
+
+
+@pytest.mark.parametrize('value', ['abc', 'nan', ''])
+def test_wait_timeout_rejects_non_numbers(value):
+    with pytest.raises(ValueError):
+        wait_timeout({'timeout': [value]})
+
+
+class FailingService:
+    def poll(self, key):
+        raise RuntimeError('cache unavailable')
+
+
+def test_results_errors_return_json_500():
+    handler = type('FailingHandler', (AnalysisRequestHandler,), {'service': FailingService()})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f'http://127.0.0.1:{server.server_address[1]}/results/abc', timeout=10)
+        assert error.value.code == 500
+        assert json.loads(error.value.read()) == {'error': 'cache unavailable'}
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,62 @@
+import pandas as pd
+import pandas.testing as tm
+
+from count_cube import JobCountCube
+from lsamapping_processor import LSAMappingProcessor
+
+
+def vessel_jobs():
+    return pd.DataFrame({
+        'Job Code': [101, 101, 102, 103, 104, 104, 999],
+        'Title': ['Inspect lifeboat', 'Inspect lifeboat', 'Test davit', 'Service liferaft', 'Check EEBD',
+                  'Check EEBD', 'Unrelated'],
+        'Function': ['LSA', 'LSA', 'LSA', 'Liferafts', None, 'LSA', 'Deck'],
+        'Machinery Location': ['Lifeboat#1', 'Lifeboat#2', 'Davit', 'Liferaft#1', 'EEBD', 'EEBD', 'Deck'],
+    })
+
+
+def lsa_reference():
+    # 102 is listed twice, so merging counts its jobs twice; 105 is not on the vessel
+    return pd.DataFrame({'UI Job Code': [101, 102, 102, 103, 104, 105]})
+
+
+def run_lsa(data, reference, cube=None):
+    processor = LSAMappingProcessor()
+    processor.process_lsa_data(data, reference.copy(), cube=cube)
+    return processor
+
+
+def test_cube_matches_merge_path(styler_applymap):
+    data = vessel_jobs()
+    merged = run_lsa(data, lsa_reference())
+    cubed = run_lsa(data, lsa_reference(), cube=JobCountCube(data))
+
+    assert 'Error' not in merged.pivot_table_resultlsaJobs.columns
+    assert not merged.pivot_table_resultlsaJobs.empty
+    tm.assert_frame_equal(cubed.pivot_table_resultlsaJobs, merged.pivot_table_resultlsaJobs)
+    tm.assert_frame_equal(cubed.pivot_table_resultlsaJobstotal, merged.pivot_table_resultlsaJobstotal)
+    tm.assert_frame_equal(cubed.missinglsajobsresult, merged.missinglsajobsresult)
+    assert cubed.missinglsajobsresult['UI Job Code'].tolist() == ['105']
+    # The merged frame is still available, built on first access
+    assert callable(cubed.__dict__['_result_dflsa'])
+    tm.assert_frame_equal(cubed.result_dflsa, merged.result_dflsa)
+
+
+def test_cube_declines_references_with_colliding_columns():
+    cube = JobCountCube(vessel_jobs())
+    assert cube.serves(lsa_reference())
+    assert not cube.serves(lsa_reference().assign(Title='Reference title'))
+    assert not cube.serves(lsa_reference().assign(Function='LSA'))
+
+
+def test_cube_declines_codecopy_that_disagrees_with_job_code():
+    data = vessel_jobs()
+    assert JobCountCube(data.assign(**{'Job Codecopy': data['Job Code'].astype(str)})).serves(
+        lsa_reference(), code_column='Job Codecopy')
+    stale = JobCountCube(data.assign(**{'Job Codecopy': data['Job Code'] + 1}))
+    assert stale.serves(lsa_reference())
+    assert not stale.serves(lsa_reference(), code_column='Job Codecopy')
+
+
+def test_cube_declines_uploads_without_the_pivot_dimensions():
+    assert not JobCountCube(vessel_jobs().drop(columns='Function')).serves(lsa_reference())
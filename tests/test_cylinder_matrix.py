@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from cylinder_matrix import CylinderMatrix
+
+
+def test_from_data_without_sub_component_locations():
+    data = pd.DataFrame({
+        'Machinery Location': ['Main Engine', 'Main Engine'],
+        'Sub Component Location': [np.nan, np.nan],
+        'Job Code': [101, 102],
+    })
+    matrix = CylinderMatrix.from_data(data)
+    assert matrix.counts.shape == (0, 0)
+    assert matrix.to_frame().empty
+
+
+def test_from_data_counts_units_in_numeric_order():
+    data = pd.DataFrame({
+        'Machinery Location': ['Main Engine'] * 4,
+        'Sub Component Location': ['Cylinder Unit#10 > Exhaust Valve', 'Cylinder Unit#2 > Exhaust Valve',
+                                   'Cylinder Unit#2 > Fuel Valve', None],
+        'Job Code': [1, 2, 3, 4],
+    })
+    matrix = CylinderMatrix.from_data(data)
+    assert matrix.unit_labels == ['Cylinder Unit#2', 'Cylinder Unit#10']
+    assert matrix.counts.tolist() == [[1, 1], [1, 0]]
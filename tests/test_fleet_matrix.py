@@ -0,0 +1,45 @@
+import pandas as pd
+import pandas.testing as tm
+
+from fleet_matrix import FleetMissingJobsMatrix
+
+
+def missing(codes, titles):
+    return pd.DataFrame({'UI Job Code': codes, 'Title': titles})
+
+
+def sample_fleet():
+    fleet = FleetMissingJobsMatrix()
+    fleet.add_vessel('Alpha', {
+        'Boiler': missing([701, 702], ['Clean boiler', None]),
+        'LSA_Mapping': missing([101], ['Inspect lifeboat']),
+    })
+    fleet.add_vessel('Bravo', {'Boiler': missing([701], ['Clean boiler'])})
+    fleet.add_vessel('Charlie', {})
+    return fleet
+
+
+def test_save_and_load_round_trip(tmp_path):
+    fleet = sample_fleet()
+    loaded = FleetMissingJobsMatrix.load(fleet.save(str(tmp_path / 'fleet.npz')))
+
+    assert loaded.vessels == fleet.vessels
+    assert loaded.jobs == fleet.jobs
+    assert loaded.titles == fleet.titles
+    assert (loaded.matrix != fleet.matrix).nnz == 0
+    tm.assert_frame_equal(loaded.missing_counts_by_vessel(), fleet.missing_counts_by_vessel())
+    tm.assert_frame_equal(loaded.vessels_missing('701'), fleet.vessels_missing('701'))
+    assert loaded.vessels_missing('701')['Vessel'].tolist() == ['Alpha', 'Bravo']
+
+    # A loaded matrix can be extended like a built one
+    loaded.add_vessel('Bravo', {'LSA_Mapping': missing([101], ['Inspect lifeboat'])})
+    assert loaded.missing_jobs_for('Bravo')['Job Code'].tolist() == ['101']
+    assert loaded.vessels_missing('101')['Vessel'].tolist() == ['Alpha', 'Bravo']
+
+
+def test_top_missing_jobs():
+    top = sample_fleet().top_missing_jobs(n=2)
+    assert top[['System', 'Job Code', 'Vessels Missing']].values.tolist() == [
+        ['Boiler', '701', 2], ['Boiler', '702', 1],
+    ]
+    assert top['% of Fleet'].tolist() == [66.7, 33.3]
@@ -0,0 +1,56 @@
+import pandas as pd
+import pandas.testing as tm
+
+from analysis_pipeline import run_missing_jobs
+from incremental_analysis import IncrementalAnalyzer, diff_uploads, key_frame
+
+
+def vessel_jobs(rows):
+    return pd.DataFrame(rows, columns=['Job Code', 'Title', 'Function', 'Machinery Location'])
+
+
+BASE_JOBS = [
+    (101, 'Inspect lifeboat', 'LSA', 'Lifeboat#1'),
+    (102, 'Test davit', 'LSA', 'Davit'),
+    (201, 'Clean workshop', 'Misc', 'Workshop'),
+]
+
+
+def write_reference(path):
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({'UI Job Code': [101, 105]}).to_excel(writer, sheet_name='lsamapping', index=False)
+        pd.DataFrame({'UI Job Code': [201, 202]}).to_excel(writer, sheet_name='Misc', index=False)
+    return str(path)
+
+
+def test_diff_matches_duplicate_rows_one_to_one():
+    previous = key_frame(vessel_jobs(BASE_JOBS + BASE_JOBS[:1]))
+    current = key_frame(vessel_jobs(BASE_JOBS + [(105, 'Service liferaft', 'LSA', 'Davit')]))
+    diff = diff_uploads(previous, current)
+    assert diff.added['Job Code'].tolist() == ['105']
+    assert diff.removed['Job Code'].tolist() == ['101']
+    assert diff.changed_job_codes == {'101', '105'}
+    assert not diff.machinery_changed
+
+
+def test_only_systems_listing_changed_codes_are_recomputed(tmp_path, styler_applymap):
+    reference = write_reference(tmp_path / 'reference.xlsx')
+    analyzer = IncrementalAnalyzer()
+    first = analyzer.analyze(vessel_jobs(BASE_JOBS), reference)
+    assert first['full_run'] and first['delta'] is None
+
+    unchanged = analyzer.analyze(vessel_jobs(BASE_JOBS), reference)
+    assert not unchanged['full_run'] and unchanged['recomputed'] == []
+
+    data = vessel_jobs(BASE_JOBS + [(105, 'Service liferaft', 'LSA', 'Davit')])
+    result = analyzer.analyze(data, reference)
+    assert 'LSA_Mapping' in result['recomputed']
+    assert 'Misc_Jobs' not in result['recomputed']
+    assert result['rows_added'] == 1 and result['rows_removed'] == 0
+    resolved = result['delta'][result['delta']['Change'] == 'Resolved']
+    assert resolved[['System', 'Job Code']].values.tolist() == [['LSA Mapping', '105']]
+
+    full = run_missing_jobs(data, reference)
+    assert result['missing_sources'].keys() == full.keys()
+    for label, missing in full.items():
+        tm.assert_frame_equal(result['missing_sources'][label], missing)
@@ -0,0 +1,68 @@
+import pandas as pd
+
+from analysis_pipeline import run_missing_jobs
+from incremental_analysis import key_frame
+from job_code_aliases import apply_job_code_aliases, canonical_job_codes, load_aliases
+from lsamapping_processor import LSAMappingProcessor
+from reference_bundle import read_reference_sheet
+
+
+def vessel_jobs(codes):
+    return pd.DataFrame({
+        'Job Code': codes,
+        'Title': [f'Job {code}' for code in codes],
+        'Function': ['Life Saving Appliances'] * len(codes),
+        'Machinery Location': ['Lifeboat#1'] * len(codes),
+    })
+
+
+def write_reference(path, sheets):
+    with pd.ExcelWriter(path) as writer:
+        for name, sheet in sheets.items():
+            sheet.to_excel(writer, sheet_name=name, index=False)
+    return str(path)
+
+
+def test_alias_codes_in_reference_count_as_present(tmp_path, styler_applymap):
+    reference = write_reference(tmp_path / 'reference.xlsx', {
+        'lsamapping': pd.DataFrame({'UI Job Code': ['428', '6001', '900']}),
+    })
+    data = vessel_jobs([428, 6001, 900])
+    for vessel in (data, apply_job_code_aliases(data)):
+        missing = run_missing_jobs(vessel, reference, systems=['LSA_Mapping'])['LSA_Mapping']
+        assert 'Error' not in missing.columns
+        assert missing.empty
+
+    processor = LSAMappingProcessor()
+    processor.process_lsa_data(apply_job_code_aliases(data), read_reference_sheet(reference, 'lsamapping'))
+    assert not processor.pivot_table_resultlsaJobs.empty
+    assert processor.missinglsajobsresult.empty
+
+
+def test_reference_sheets_are_canonical(tmp_path):
+    reference = write_reference(tmp_path / 'reference.xlsx', {
+        'lsamapping': pd.DataFrame({'UI Job Code': [4406, 7039, 900]}),
+        'Job Code Aliases': pd.DataFrame({'Alias Job Code': ['900'], 'Canonical Job Code': ['901']}),
+    })
+    assert read_reference_sheet(reference, 'lsamapping')['UI Job Code'].tolist() == [425, 426, 901]
+    sheets = read_reference_sheet(reference, sheet_name=None)
+    assert sheets['lsamapping']['UI Job Code'].tolist() == [425, 426, 901]
+    assert sheets['Job Code Aliases']['Alias Job Code'].tolist() == [900]
+
+
+def test_canonical_job_codes_keeps_dtype():
+    codes = canonical_job_codes(pd.Series([4406, 1, 428, 7039]))
+    assert codes.tolist() == [425, 1, 425, 426]
+    assert codes.dtype == 'int64'
+    assert canonical_job_codes(pd.Series(['4406', ' 428 ', 'x'])).tolist() == ['425', '425', 'x']
+
+
+def test_alias_chains_resolve_and_cycles_are_dropped():
+    sheet = pd.DataFrame({'Alias Job Code': ['1', '2', '7', '8'], 'Canonical Job Code': ['2', '3', '8', '7']})
+    aliases = load_aliases(sheet)
+    assert aliases['1'] == '3' and aliases['2'] == '3'
+    assert '7' not in aliases and '8' not in aliases
+
+
+def test_incremental_keys_use_canonical_codes():
+    assert key_frame(vessel_jobs([4406, 900]))['Job Code'].tolist() == ['425', '900']
@@ -0,0 +1,59 @@
+import time
+
+import pandas as pd
+import pytest
+
+from job_queue import JobQueue, UnknownJobError
+
+
+def write_reference(path):
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({'UI Job Code': [101, 105]}).to_excel(writer, sheet_name='lsamapping', index=False)
+    return str(path)
+
+
+def vessel_jobs():
+    return pd.DataFrame({
+        'Job Code': [101, 102],
+        'Title': ['Inspect lifeboat', 'Test davit'],
+        'Function': ['LSA', 'LSA'],
+        'Machinery Location': ['Lifeboat#1', 'Davit'],
+    })
+
+
+def wait_until_finished(queue, job_id, timeout=120):
+    deadline = time.monotonic() + timeout
+    while queue.status(job_id)['state'] in ('queued', 'running'):
+        assert time.monotonic() < deadline, 'job did not finish'
+        time.sleep(0.1)
+    return queue.status(job_id)
+
+
+def test_unknown_jobs_and_kinds(tmp_path):
+    queue = JobQueue(max_workers=1, work_dir=str(tmp_path))
+    assert queue.status('missing')['state'] == 'unknown'
+    assert queue.cancel('missing') is False
+    with pytest.raises(UnknownJobError):
+        queue.result('missing')
+    with pytest.raises(ValueError):
+        queue.submit('everything', vessel_jobs(), write_reference(tmp_path / 'reference.xlsx'))
+
+
+def test_jobs_run_once_and_finished_jobs_are_evicted(tmp_path):
+    reference = write_reference(tmp_path / 'reference.xlsx')
+    queue = JobQueue(max_workers=1, max_finished=0, work_dir=str(tmp_path))
+    try:
+        job_id = queue.submit('missing_jobs', vessel_jobs(), reference, systems=['LSA_Mapping'])
+        assert queue.submit('missing_jobs', vessel_jobs(), reference, systems=['LSA_Mapping']) == job_id
+        assert wait_until_finished(queue, job_id)['state'] == 'done'
+        assert 'LSA_Mapping' in queue.result(job_id)
+
+        # Submitting another job evicts the finished one beyond max_finished
+        other_id = queue.submit('missing_jobs', vessel_jobs().head(1), reference, systems=['LSA_Mapping'])
+        assert other_id != job_id
+        assert queue.status(job_id)['state'] == 'unknown'
+        with pytest.raises(UnknownJobError):
+            queue.result(job_id)
+        wait_until_finished(queue, other_id)
+    finally:
+        queue.shutdown()
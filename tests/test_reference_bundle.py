@@ -0,0 +1,55 @@
+import pandas as pd
+import pandas.testing as tm
+
+from analysis_pipeline import run_missing_jobs
+from reference_bundle import compile_reference_bundle, load_reference_bundle, prepare_sheet, read_reference_sheet
+
+
+def write_reference(path):
+    sheets = {
+        # Notes mixes numbers and text, which Parquet can only store as strings
+        'lsamapping': pd.DataFrame({'UI Job Code': [101, 102, 105], 'Notes': ['Annual', 1, None]}),
+        'Machinery Location': pd.DataFrame({'Machinery Location': ['Lifeboat#1', 'Davit']}),
+        'Boiler': pd.DataFrame({'UI Job Code': [7, 8], 'Machinery Location': ['Boiler', 'Boiler']}),
+    }
+    with pd.ExcelWriter(path) as writer:
+        for name, sheet in sheets.items():
+            sheet.to_excel(writer, sheet_name=name, index=False)
+    return str(path)
+
+
+def compiled(tmp_path):
+    workbook = write_reference(tmp_path / 'reference.xlsx')
+    compile_reference_bundle(workbook, str(tmp_path / 'reference.zip'))
+    return workbook, load_reference_bundle(str(tmp_path / 'reference.zip'))
+
+
+def test_bundle_sheets_round_trip(tmp_path):
+    workbook, bundle = compiled(tmp_path)
+    for name, sheet in pd.read_excel(workbook, sheet_name=None).items():
+        tm.assert_frame_equal(bundle.read_sheet(name), prepare_sheet(sheet, name), check_dtype=False)
+
+    lsa = bundle.read_sheet('lsamapping')
+    assert lsa['UI Job Code'].tolist() == ['101', '102', '105']
+    assert lsa['Notes'].tolist()[:2] == ['Annual', '1'] and pd.isna(lsa['Notes'][2])
+
+
+def test_only_quickview_sheets_get_clean_names(tmp_path):
+    workbook, bundle = compiled(tmp_path)
+    assert 'Machinery Location Clean' in bundle.read_sheet('Machinery Location').columns
+    for name in ('lsamapping', 'Boiler'):
+        assert list(read_reference_sheet(bundle, name).columns) == list(read_reference_sheet(workbook, name).columns)
+
+
+def test_bundle_missing_jobs_match_workbook(tmp_path, styler_applymap):
+    workbook, bundle = compiled(tmp_path)
+    data = pd.DataFrame({
+        'Job Code': [101, 102, 900],
+        'Title': ['Inspect lifeboat', 'Test davit', 'Other'],
+        'Function': ['LSA', 'LSA', 'Deck'],
+        'Machinery Location': ['Lifeboat#1', 'Davit', 'Deck'],
+    })
+    from_workbook = run_missing_jobs(data, workbook, systems=['LSA_Mapping'])['LSA_Mapping']
+    from_bundle = run_missing_jobs(data, bundle, systems=['LSA_Mapping'])['LSA_Mapping']
+    assert from_workbook['UI Job Code'].tolist() == ['105']
+    tm.assert_frame_equal(from_bundle, from_workbook, check_dtype=False)
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from title_matcher import MATCH_COLUMNS, explain_missing_jobs
+
+
+def vessel_jobs(codes, titles):
+    return pd.DataFrame({'Job Code': codes, 'Title': titles, 'Machinery Location': ['Fire Pump'] * len(codes)})
+
+
+def test_missing_job_is_not_its_own_candidate_with_float_codes():
+    # A blank code makes the column float: 425 is read as 425.0
+    data = vessel_jobs([425, 426, np.nan], ['Overhaul fire pump', 'Overhaul fire pumps', 'Clean strainer'])
+    missing = {'Pump': pd.DataFrame({'Job Code': ['425'], 'Machinery': ['Fire Pump'], 'Title': ['Overhaul fire pump']})}
+    matches = explain_missing_jobs(data, missing)
+    assert matches['Candidate Job Code'].tolist() == ['426']
+    assert matches['Same Machinery'].tolist() == [True]
+
+
+def test_upload_without_usable_titles_gives_no_matches():
+    missing = {'Pump': pd.DataFrame({'Job Code': ['425'], 'Machinery': ['Fire Pump'], 'Title': ['Overhaul fire pump']})}
+    for titles in ([np.nan, np.nan], ['', '  ']):
+        matches = explain_missing_jobs(vessel_jobs([1, 2], titles), missing)
+        assert matches.empty
+        assert list(matches.columns) == MATCH_COLUMNS
@@ -0,0 +1,16 @@
+import numpy as np
+
+from trigram_index import match_names, name_trigrams
+
+
+def test_near_identical_names_are_paired_one_to_one():
+    matches = match_names(['Liferaft Embarkation Ladders', 'Fresh Water Pump'],
+                          ['Liferaft Embarkation Ladder', 'Emergency Fire Pump'])
+    assert matches.iloc[:, :2].values.tolist() == [['Liferaft Embarkation Ladders', 'Liferaft Embarkation Ladder']]
+
+
+def test_missing_names_have_no_trigrams_and_no_matches():
+    assert name_trigrams(None) == set()
+    assert name_trigrams(np.nan) == set()
+    matches = match_names([None, np.nan, 'Nan Valve'], ['None Return Valve', 'nan', None])
+    assert matches['Different Machinery on Vessel'].tolist() == []
@@ -0,0 +1,161 @@
+import logging
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from analysis_pipeline import missing_job_entries
+from reference_bundle import normalize_job_codes
+
+logger = logging.getLogger(__name__)
+
+MATCH_COLUMNS = ['System', 'Job Code', 'Machinery', 'Title', 'Candidate Job Code', 'Candidate Title',
+                 'Candidate Location', 'Candidate Jobs', 'Same Machinery', 'Score']
+
+# Similarity cells materialized at once when picking the top vessel titles of a block of missing titles
+BLOCK_CELLS = 4_000_000
+
+
+def normalize_titles(titles):
+    """Lower-cased titles with runs of whitespace collapsed; missing titles become ''."""
+    return titles.fillna('').astype(str).str.lower().str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def fit_title_vectorizer(titles, ngram_range=(3, 4)):
+    """TF-IDF vectorizer over character n-grams (within words) of titles.
+
+    Fit once on the titles of a vessel, or of a whole fleet, and pass it to TitleMatcher so every
+    vessel is vectorized in the same space.
+    """
+    vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=ngram_range, lowercase=False,
+                                 sublinear_tf=True, dtype=np.float32)
+    vectorizer.fit(normalize_titles(pd.Series(titles)).unique())
+    return vectorizer
+
+
+class TitleMatcher:
+    """Vessel jobs indexed by title, for finding the closest vessel jobs of many titles at once.
+
+    Candidates are the distinct (Job Code, Title) pairs of the upload. Similarity is the cosine of the
+    TF-IDF vectors (both sides are L2-normalized), computed as one sparse product per block of queries
+    against the distinct vessel titles.
+    """
+
+    def __init__(self, data, vectorizer=None):
+        jobs = pd.DataFrame({
+            # Normalized like missing_job_entries, so a missing job's own code is recognized below
+            'Job Code': normalize_job_codes(data['Job Code']),
+            'Title': data['Title'],
+            'Machinery Location': data['Machinery Location'] if 'Machinery Location' in data.columns else '',
+        })
+        jobs = jobs[jobs['Title'].notna()]
+        self.candidates = (jobs.groupby(['Job Code', 'Title'], sort=False)
+                           .agg(**{'Machinery Location': ('Machinery Location', 'first'),
+                                   'Jobs': ('Machinery Location', 'size')})
+                           .reset_index())
+        # Many codes and locations share a title, so only distinct titles are vectorized and scored
+        self.candidates['Title Index'], self.titles = pd.factorize(normalize_titles(self.candidates['Title']))
+        self.vectorizer = vectorizer
+        if self.vectorizer is None:
+            try:
+                self.vectorizer = fit_title_vectorizer(self.titles)
+            except ValueError:
+                # No title with any characters to index ('empty vocabulary')
+                logger.warning('Title matcher: the upload has no usable job titles')
+                self.candidates = self.candidates.iloc[0:0]
+                self.titles = self.titles[:0]
+                self.vectors = None
+                return
+        self.vectors = self.vectorizer.transform(self.titles).T.tocsr()
+        logger.debug('Title matcher: %d vessel jobs -> %d candidates, %d titles',
+                     len(jobs), len(self.candidates), len(self.titles))
+
+    def top_titles(self, titles, k=3, min_score=0.5):
+        """(query position, title position, score) arrays of the k vessel titles closest to each of titles,
+        keeping scores >= min_score. Equal titles are scored once."""
+        positions, distinct = pd.factorize(normalize_titles(pd.Series(titles)))
+        k = min(k, len(self.titles))
+        if k == 0 or len(distinct) == 0:
+            return np.array([], dtype=int), np.array([], dtype=int), np.array([], dtype=np.float32)
+        queries = self.vectorizer.transform(distinct)
+
+        rows, cols, scores = [], [], []
+        block = max(1, BLOCK_CELLS // len(self.titles))
+        for start in range(0, queries.shape[0], block):
+            similarity = (queries[start:start + block] @ self.vectors).toarray()
+            best = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(similarity, best, axis=1)
+            keep = best_scores >= min_score
+            rows.append(np.nonzero(keep)[0] + start)
+            cols.append(best[keep])
+            scores.append(best_scores[keep])
+        rows, cols, scores = np.concatenate(rows), np.concatenate(cols), np.concatenate(scores)
+
+        # Back from distinct titles to every query position
+        matches = pd.DataFrame({'distinct': rows, 'title': cols, 'score': scores})
+        queries = pd.DataFrame({'query': np.arange(len(positions)), 'distinct': positions})
+        matches = queries.merge(matches, on='distinct').sort_values(['query', 'score'], ascending=[True, False],
+                                                                     kind='stable')
+        return matches['query'].to_numpy(), matches['title'].to_numpy(), matches['score'].to_numpy()
+
+    def explain(self, missing, k=3, min_score=0.5):
+        """MATCH_COLUMNS rows linking each missing job (System, Job Code, Machinery, Title) to its best vessel jobs.
+
+        Candidates with the missing job's own code are skipped: they are the same job found at
+        another machinery, not a renamed one. Missing jobs without a good candidate are left out.
+        """
+        if missing.empty or self.candidates.empty:
+            return pd.DataFrame(columns=MATCH_COLUMNS)
+        missing = missing.reset_index(drop=True)
+        rows, title_positions, scores = self.top_titles(missing['Title'], k, min_score)
+        # Every vessel job with one of the top titles, best title first and then the most used code
+        hits = pd.DataFrame({'row': rows, 'Title Index': title_positions, 'Score': scores})
+        hits = hits.merge(self.candidates, on='Title Index').sort_values(
+            ['row', 'Score', 'Jobs'], ascending=[True, False, False], kind='stable')
+        rows = hits['row'].to_numpy()
+        matches = pd.DataFrame({
+            'System': missing['System'].to_numpy()[rows],
+            'Job Code': missing['Job Code'].to_numpy()[rows],
+            'Machinery': missing['Machinery'].to_numpy()[rows],
+            'Title': missing['Title'].to_numpy()[rows],
+            'Candidate Job Code': hits['Job Code'].to_numpy(),
+            'Candidate Title': hits['Title'].to_numpy(),
+            'Candidate Location': hits['Machinery Location'].to_numpy(),
+            'Candidate Jobs': hits['Jobs'].to_numpy(),
+            'Score': np.round(hits['Score'].to_numpy(dtype=float), 3),
+        })
+        matches = matches[matches['Job Code'] != matches['Candidate Job Code']]
+        matches = matches[matches.groupby(rows[matches.index]).cumcount().to_numpy() < k]
+        matches['Same Machinery'] = [
+            bool(machinery) and machinery.lower() in str(location).lower()
+            for machinery, location in zip(matches['Machinery'], matches['Candidate Location'])
+        ]
+        return matches[MATCH_COLUMNS].reset_index(drop=True)
+
+
+def missing_titles(missing_sources):
+    """System, Job Code, Machinery and Title of every titled missing job in {label: missing jobs DataFrame}."""
+    entries = [missing_job_entries(missing).assign(System=label) for label, missing in missing_sources.items()]
+    entries = [entry for entry in entries if not entry.empty]
+    if not entries:
+        return pd.DataFrame(columns=['System', 'Job Code', 'Machinery', 'Title'])
+    missing = pd.concat(entries, ignore_index=True)
+    return missing[missing['Title'].notna()].reset_index(drop=True)
+
+
+def explain_missing_jobs(data, missing_sources, k=3, min_score=0.5, vectorizer=None):
+    """Closest vessel jobs for the missing jobs of every system, matched in one batch.
+
+    Args:
+        data: Vessel job DataFrame the missing jobs were computed from
+        missing_sources: {label: missing jobs DataFrame} from analysis_pipeline.run_missing_jobs
+        k: Candidates kept per missing job
+        min_score: Lowest cosine similarity (0-1) reported
+        vectorizer: Optional fitted vectorizer from fit_title_vectorizer, e.g. shared across a fleet
+
+    Returns:
+        DataFrame with MATCH_COLUMNS, best candidate first for each missing job
+    """
+    if 'Title' not in data.columns or 'Job Code' not in data.columns:
+        return pd.DataFrame(columns=MATCH_COLUMNS)
+    return TitleMatcher(data, vectorizer).explain(missing_titles(missing_sources), k, min_score)
@@ -0,0 +1,93 @@
+import re
+import logging
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+# Lowest trigram similarity (shared / all distinct trigrams of both names) reported as a match
+MIN_SIMILARITY = 0.5
+
+MATCH_COLUMNS = ['Different Machinery on Vessel', 'Closest Missing Machinery', 'Similarity']
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def name_trigrams(name):
+    """Trigrams of the words of a name, each word padded like '  word ' so short words and word starts count.
+
+    Missing names (None/NaN) have no trigrams, so they never match anything.
+    """
+    grams = set()
+    if name is None or (not isinstance(name, str) and pd.isna(name)):
+        return grams
+    for word in _WORD.findall(str(name).lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Inverted trigram index over a list of names.
+
+    Names are rows of a sparse name x trigram matrix, so the trigrams every query shares with every
+    name come from one sparse product that only visits names sharing at least one trigram with it.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.vocabulary = {}
+        self.matrix, self.sizes = self._encode(self.names, grow=True)
+
+    def _encode(self, names, grow=False):
+        rows, cols = [], []
+        sizes = np.zeros(len(names), dtype=np.int32)
+        for row, name in enumerate(names):
+            grams = name_trigrams(name)
+            if grow:
+                for gram in grams:
+                    self.vocabulary.setdefault(gram, len(self.vocabulary))
+            known = [self.vocabulary[gram] for gram in grams if gram in self.vocabulary]
+            rows.extend([row] * len(known))
+            cols.extend(known)
+            # Trigrams the index has never seen still count towards the query's size
+            sizes[row] = len(grams)
+        matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                                   shape=(len(names), len(self.vocabulary)))
+        return matrix, sizes
+
+    def search(self, queries, min_similarity=MIN_SIMILARITY):
+        """(query position, name position, similarity) arrays of every pair scoring >= min_similarity."""
+        queries = list(queries)
+        if not queries or not self.names:
+            return np.array([], dtype=int), np.array([], dtype=int), np.array([], dtype=float)
+        query_matrix, query_sizes = self._encode(queries)
+        shared = (query_matrix @ self.matrix.T).tocoo()
+        similarity = shared.data / (query_sizes[shared.row] + self.sizes[shared.col] - shared.data)
+        keep = similarity >= min_similarity
+        return shared.row[keep], shared.col[keep], similarity[keep]
+
+
+def match_names(different, missing, min_similarity=MIN_SIMILARITY):
+    """Pairs each name of different with its closest name of missing, one to one.
+
+    Pairs are taken best first, so a missing name claimed by a closer different name is not reused.
+
+    Returns:
+        DataFrame with MATCH_COLUMNS, best match first
+    """
+    different = list(different)
+    missing = list(missing)
+    rows, cols, similarity = TrigramIndex(missing).search(different, min_similarity)
+    used_rows, used_cols, pairs = set(), set(), []
+    for position in np.lexsort((cols, rows, -similarity)):
+        row, col = rows[position], cols[position]
+        if row in used_rows or col in used_cols:
+            continue
+        used_rows.add(row)
+        used_cols.add(col)
+        pairs.append((different[row], missing[col], round(float(similarity[position]), 3)))
+    logger.debug('Matched %d of %d different names to %d missing names', len(pairs), len(different), len(missing))
+    return pd.DataFrame(pairs, columns=MATCH_COLUMNS)
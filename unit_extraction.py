@@ -0,0 +1,63 @@
+import re
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# One pattern per system. The alternatives are anchored and tried in order, so a location matching
+# several of them gets the number of the first one, as when the regexes were searched one at a time.
+# ('Cargo Hatch#1' is covered by 'Hatch#1'.)
+UNIT_PATTERNS = {
+    'Hatch': re.compile(r'^(?:.*?Hatch#?(\d+)|.*?Cargo Opening#?(\d+))', re.IGNORECASE | re.DOTALL),
+    'BWTS': re.compile(r'^(?:.*?Ballast Water Treatment Plant#?(\d+)|.*?BWTS#?(\d+)|.*?Ballast Treatment#?(\d+))',
+                       re.IGNORECASE | re.DOTALL),
+    'Purifier': re.compile(r'Purifier.*?#?(\d+)'),
+}
+
+
+def unit_numbers(locations, system):
+    """Unit number of every location as nullable Int64; <NA> where the system's pattern does not match.
+
+    Locations repeat across jobs, so the pattern runs once per distinct location.
+    """
+    codes, distinct = pd.factorize(locations)
+    groups = pd.Series(distinct, dtype=object).str.extract(UNIT_PATTERNS[system])
+    numbers = pd.to_numeric(groups.bfill(axis=1).iloc[:, 0]).to_numpy(dtype=float)
+    values = np.where(codes >= 0, numbers[np.maximum(codes, 0)] if len(numbers) else np.nan, np.nan)
+    return pd.Series(values, index=locations.index).astype('Int64')
+
+
+def unit_labels(numbers, prefix, fallback):
+    """prefix + unit number, or fallback (a scalar or a Series aligned with numbers) where there is none."""
+    labels = prefix + numbers.astype('string')
+    return labels.where(numbers.notna(), fallback).astype(object)
+
+
+def unit_running_hours(units, hours=None, how='first', sort=False):
+    """'Unit' and float64 'Running Hours' per unit, aggregated in one groupby.
+
+    how='first' takes the first numeric value of each unit (in row order), how='max' the largest;
+    Running Hours is NaN for units without any numeric value or when hours is None.
+    Units keep their order of first appearance unless sort is True.
+    """
+    frame = pd.DataFrame({
+        'Unit': units,
+        'Running Hours': pd.to_numeric(hours, errors='coerce') if hours is not None else np.nan,
+    })
+    result = frame.groupby('Unit', sort=sort).agg(**{'Running Hours': ('Running Hours', how)}).reset_index()
+    result['Running Hours'] = result['Running Hours'].astype(float)
+    return result
+
+
+def component_presence(data, units, components, columns=('Sub Component Location', 'Title')):
+    """Units (sorted) x components table of bools, True where any row of the unit mentions the component in columns."""
+    columns = [col for col in columns if col in data.columns]
+    hits = {}
+    for component in components:
+        mask = np.zeros(len(data), dtype=bool)
+        for col in columns:
+            mask |= data[col].str.contains(component, case=False, na=False).to_numpy(dtype=bool)
+        hits[component] = mask
+    return pd.DataFrame(hits, columns=list(components)).groupby(np.asarray(units), sort=True).any()
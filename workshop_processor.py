@@ -1,6 +1,9 @@
+import logging
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class WorkshopSystemProcessor:
     def __init__(self):
         self.filtered_dfworkshopjobs = pd.DataFrame()
@@ -72,7 +75,6 @@ class WorkshopSystemProcessor:
             self.missingjobsworkshopresult.reset_index(drop=True, inplace=True)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in process_workshop_data')
             self.pivot_table_resultworkshopJobs = pd.DataFrame({'Error': [f'Workshop data processing failed: {str(e)}']})
             self.missingjobsworkshopresult = pd.DataFrame()